@@ -0,0 +1,212 @@
+`timescale 1ns/1ps
+`default_nettype none
+
+// ============================================================
+// tb_debug_uart: top_debug_system completo (compilar con -DSIM: sin MMCM) manejado
+// por la UART desde un script de comandos. Todo lo que sale por uart_tx se escribe
+// en un archivo, un byte hex por línea, para compararlo con lo que manda SimHost
+// para el mismo script (riscv_debug_gui/bench/hdl_equiv.py arma ambos y compara).
+//
+// Script (+CMDS=archivo), una operación por línea:
+//   s XX    manda el byte XX (hex) por uart_rx
+//   q NN    espera a que uart_tx quede quieta NN tiempos de byte (NN hex; 0 = QUIET_BYTES):
+//           fin de la respuesta del comando anterior (o de que lo consuma, si no responde)
+// Salida: +OUT=archivo (por defecto tb_debug_uart.out)
+// Corte: +MAX_CYCLES=n (por defecto 200M ciclos)
+//
+// iverilog -g2012 -DSIM -s tb_debug_uart -o tb.vvp tb_debug_uart.v <sources_1/new/*.v>
+// vvp tb.vvp +CMDS=cmds.txt +OUT=out.hex
+// ============================================================
+module tb_debug_uart;
+
+    localparam integer CLK_HZ      = 100_000_000;
+    localparam integer BAUD        = 1_562_500;               // M_TICK = 4: rápido de simular
+    localparam integer M_TICK      = CLK_HZ / (BAUD * 16);
+    localparam integer BIT_CYC     = 16 * M_TICK;             // ciclos por bit
+    localparam integer BYTE_CYC    = 10 * BIT_CYC;            // start + 8 + stop
+    localparam integer QUIET_BYTES = 16;
+
+    reg  clk;
+    reg  reset;
+    reg  uart_rx;
+    wire uart_tx;
+    wire s_tick_out;
+
+    top_debug_system #(
+        .CLK_IN_HZ(CLK_HZ),
+        .BAUD(BAUD),
+        .DELTA_EN(1),           // el delta ('K') se valida acá antes de prenderlo en el bitstream
+        .IMEM_FILE(""),
+        .DMEM_FILE("")
+    ) dut (
+        .clk(clk),
+        .reset(reset),
+        .uart_rx(uart_rx),
+        .uart_tx(uart_tx),
+        .s_tick_out(s_tick_out)
+    );
+
+    // clock 100MHz sim (10ns)
+    initial clk = 0;
+    always #5 clk = ~clk;
+
+    reg [63:0] cycle;
+    initial cycle = 0;
+    always @(posedge clk) cycle <= cycle + 1;
+
+    // ----------------------------
+    // Receptor: uart_tx -> archivo
+    // ----------------------------
+    integer    fo;
+    integer    n_rx;
+    reg        rx_busy;
+    reg [63:0] last_act;     // ciclo de la última actividad en la línea (o del último envío)
+    reg [7:0]  rb;
+    integer    k;
+
+    initial begin
+        n_rx     = 0;
+        rx_busy  = 1'b0;
+        last_act = 0;
+    end
+
+    always begin
+        @(negedge uart_tx);
+        if (!reset) begin
+            rx_busy = 1'b1;
+            // mitad del bit de start, después de a un bit
+            repeat (BIT_CYC / 2) @(posedge clk);
+            for (k = 0; k < 8; k = k + 1) begin
+                repeat (BIT_CYC) @(posedge clk);
+                rb[k] = uart_tx;
+            end
+            repeat (BIT_CYC) @(posedge clk);
+            if (uart_tx !== 1'b1)
+                $display("[TB] ERROR: stop bit inválido en el byte %0d", n_rx);
+            $fdisplay(fo, "%02x", rb);
+            n_rx     = n_rx + 1;
+            last_act = cycle;
+            rx_busy  = 1'b0;
+        end
+    end
+
+    // ----------------------------
+    // FIFO RX: ocupación máxima y bytes perdidos (llegan con la FIFO llena)
+    // ----------------------------
+    integer fifo_occ;
+    integer fifo_max;
+    integer n_drop;
+
+    initial begin
+        fifo_occ = 0;
+        fifo_max = 0;
+        n_drop   = 0;
+    end
+
+    always @(posedge clk) begin
+        if (!reset) begin
+            if (dut.rx_done_tick && dut.u_rx_fifo.full_reg) begin
+                n_drop = n_drop + 1;
+                $display("[TB] ERROR: byte perdido con la FIFO RX llena (ciclo %0d)", cycle);
+            end
+            fifo_occ = fifo_occ + ((dut.rx_done_tick && !dut.u_rx_fifo.full_reg) ? 1 : 0)
+                                - (dut.dbg_rx_pop ? 1 : 0);
+            if (fifo_occ > fifo_max)
+                fifo_max = fifo_occ;
+        end
+    end
+
+    // ----------------------------
+    // Transmisor: script -> uart_rx
+    // ----------------------------
+    task send_byte;
+        input [7:0] b;
+        integer i;
+        begin
+            uart_rx = 1'b0;
+            repeat (BIT_CYC) @(posedge clk);
+            for (i = 0; i < 8; i = i + 1) begin
+                uart_rx = b[i];
+                repeat (BIT_CYC) @(posedge clk);
+            end
+            uart_rx = 1'b1;
+            repeat (BIT_CYC) @(posedge clk);
+            last_act = cycle;
+        end
+    endtask
+
+    task wait_quiet;
+        input integer n_bytes;
+        reg [63:0] need;
+        begin
+            need = n_bytes * BYTE_CYC;
+            @(posedge clk);
+            while (rx_busy || (cycle - last_act) < need)
+                @(posedge clk);
+        end
+    endtask
+
+    reg [8*256-1:0] cmds_path;
+    reg [8*256-1:0] out_path;
+    reg [63:0]      max_cycles;
+    integer         fd;
+    integer         r;
+    integer         n_tx;
+    reg [7:0]       op;
+    reg [31:0]      val;
+
+    initial begin
+        if (!$value$plusargs("CMDS=%s", cmds_path)) begin
+            $display("[TB] ERROR: falta +CMDS=archivo");
+            $finish;
+        end
+        if (!$value$plusargs("OUT=%s", out_path))
+            out_path = "tb_debug_uart.out";
+        if (!$value$plusargs("MAX_CYCLES=%d", max_cycles))
+            max_cycles = 200_000_000;
+
+        fd = $fopen(cmds_path, "r");
+        if (fd == 0) begin
+            $display("[TB] ERROR: no pude abrir %0s", cmds_path);
+            $finish;
+        end
+        fo = $fopen(out_path, "w");
+
+        uart_rx = 1'b1;
+        reset   = 1'b1;
+        repeat (20) @(posedge clk);
+        reset   = 1'b0;
+        repeat (BYTE_CYC) @(posedge clk);
+
+        n_tx = 0;
+        while (!$feof(fd)) begin
+            r = $fscanf(fd, " %c %h\n", op, val);
+            if (r == 2) begin
+                if (op == "s") begin
+                    send_byte(val[7:0]);
+                    n_tx = n_tx + 1;
+                end else if (op == "q") begin
+                    wait_quiet(val == 0 ? QUIET_BYTES : val);
+                end
+            end
+        end
+
+        $fclose(fd);
+        $fclose(fo);
+        $display("[TB] fin: %0d bytes enviados, %0d recibidos, %0d ciclos", n_tx, n_rx, cycle);
+        $display("[TB] FIFO RX: %0d ocupados como máximo, %0d bytes perdidos", fifo_max, n_drop);
+        $finish;
+    end
+
+    // watchdog
+    always @(posedge clk) begin
+        if (cycle == max_cycles) begin
+            $display("[TB] ERROR: corte por MAX_CYCLES (%0d bytes recibidos)", n_rx);
+            $fclose(fo);
+            $finish;
+        end
+    end
+
+endmodule
+
+`default_nettype wire
@@ -16,6 +16,7 @@ module cpu_top #(
     input  wire        imem_dbg_we,
     input  wire [31:0] imem_dbg_addr,
     input  wire [31:0] imem_dbg_wdata,
+    output wire [31:0] imem_dbg_rdata,
 
     input  wire        dbg_run,
     input  wire        dbg_step,
@@ -159,6 +160,7 @@ module cpu_top #(
         .imem_dbg_we(imem_dbg_we),
         .imem_dbg_addr(imem_dbg_addr),
         .imem_dbg_wdata(imem_dbg_wdata),
+        .imem_dbg_rdata(imem_dbg_rdata),
 
         .dbg_load_pc(dbg_load_pc),
         .dbg_pc_value(dbg_pc_value),
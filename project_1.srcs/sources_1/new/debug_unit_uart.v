@@ -1,7 +1,11 @@
 `timescale 1ns / 1ps
 
 module debug_unit_uart #(
-    parameter DM_DUMP_BYTES = 64
+    parameter DM_DUMP_BYTES = 64,
+    // Dumps delta ('K'). Con 0 'K' se acepta pero todos los dumps son keyframes y la
+    // sombra, el scan y el codificador delta quedan fuera de la síntesis (key_on = 0).
+    // Pendiente de validar en simulación contra SimHost (sim_1/new/tb_debug_uart.v).
+    parameter DELTA_EN = 0
 )(
     input  wire clk,
     input  wire reset,
@@ -9,6 +13,7 @@ module debug_unit_uart #(
     // UART RX
     input  wire       rx_done_tick,
     input  wire [7:0] rx_dout,
+    output wire       rx_ready,     // 1 = la FSM consume bytes este ciclo (pop de la FIFO RX)
 
     // UART TX
     output reg        tx_start,
@@ -34,6 +39,7 @@ module debug_unit_uart #(
     output reg         imem_dbg_we,
     output reg  [31:0] imem_dbg_addr,
     output reg  [31:0] imem_dbg_wdata,
+    input  wire [31:0] imem_dbg_rdata,   // lectura combinacional en imem_dbg_addr
 
     // DEBUG -> REGFILE (lectura)
     output reg  [4:0]  rf_dbg_addr,
@@ -53,14 +59,68 @@ module debug_unit_uart #(
     localparam ST_STEP   = 4'd5;
     localparam ST_DUMP   = 4'd6;
     localparam ST_STEP_WAIT = 4'd7;
+    localparam ST_CKSUM     = 4'd8;   // 'C': recorre IMEM acumulando el checksum
+    localparam ST_CKSUM_TX  = 4'd9;   // manda 0xC5 + addr + n_words (eco) + checksum, todo 4B LE
+    localparam ST_MASK      = 4'd10;  // 'M': recibe máscara + ventana de DMEM
+    localparam ST_KEY       = 4'd11;  // 'K': recibe el intervalo de keyframes
+    localparam ST_XADDR     = 4'd12;  // 'X': recibe addr + len del rango de DMEM
+    localparam ST_XMEM_TX   = 4'd13;  // manda 0xA5 + addr + len + bytes de DMEM
 
     reg [3:0] state;
 
+    // Sólo se aceptan bytes en IDLE y en los estados que reciben argumentos (P_ADDR /
+    // P_DATA para P, C y N; MASK, KEY y XADDR); el resto queda en la FIFO RX
+    assign rx_ready = (state == ST_IDLE) || (state == ST_P_ADDR) || (state == ST_P_DATA) ||
+                      (state == ST_MASK) || (state == ST_KEY) || (state == ST_XADDR);
+
     reg [2:0]  rx_cnt;
     reg [31:0] rx_addr_buf;
     reg [31:0] rx_data_buf;
 
-    reg [7:0] dump_type; // 1=STEP 2=RUN_END 3=MANUAL
+    reg [7:0] dump_type; // 1=STEP 2=RUN_END 3=MANUAL 4=STEP_SAMPLE
+
+    // 'C' + addr(4B) + n_words(4B): reusa ST_P_ADDR/ST_P_DATA para recibir los argumentos
+    // checksum = rotl(checksum, 1) ^ word, sobre n_words words desde addr
+    reg        cmd_cksum;
+    reg [31:0] cksum;
+    reg [31:0] cksum_left;
+
+    // 'N' + n(4B) + every(4B): n ciclos por ST_STEP/ST_STEP_WAIT sin dump intermedio,
+    // salvo cada `every` ciclos (dump_type 4; every=0: sólo al final). El último dump
+    // es un STEP normal (tipo 1), igual al de n 'S' seguidos. n=0: sólo dump.
+    // No corta en dbg_halt_seen: se prende también con un ebreak buscado especulativamente.
+    reg        cmd_nstep;
+    reg        nstep_active;
+    reg [31:0] step_left;
+    reg [31:0] step_every;
+    reg [31:0] step_phase;
+
+    // 'M' + mask(1B) + addr(2B LE) + len(2B LE): secciones de los dumps siguientes
+    // (bit0 PC, bit1 PIPE, bit2 REGS, bit3 MEM) y ventana de DMEM. Si no es la
+    // configuración de reset (todo, 0, DM_DUMP_BYTES) el frame es parcial: pad =
+    // 8'h80 | mask, sólo vienen las secciones pedidas y MEM empieza con addr + len.
+    reg [3:0]  sec_mask;
+    reg        sec_varlen;
+    reg [15:0] win_addr;
+    reg [15:0] win_len;
+
+    // 'K' + every(2B LE): dumps delta con un keyframe (frame normal) cada `every` dumps;
+    // every=0 apaga el delta. Un frame delta (pad = 8'hC0 | mask) trae el PC como
+    // siempre; PIPE y REGS son máscara de words cambiadas (4B LE) + sólo esas words, y
+    // MEM es addr + len + bitmap de bytes cambiados ((len+7)/8 B) + sólo esos bytes,
+    // respecto del dump anterior. 'R', 'M' y 'K' fuerzan keyframe. Hace falta que la ventana
+    // entre en la sombra (win_len <= DM_DUMP_BYTES); si no, todos son keyframes. Sin
+    // DELTA_EN, key_every se guarda pero no tiene efecto.
+    reg [15:0] key_every;
+    reg [15:0] key_cnt;      // dumps desde el último keyframe
+    reg        shadow_ok;    // la sombra tiene el dump anterior
+    wire       key_on = (DELTA_EN != 0) && (key_every != 16'd0);
+
+    // 'X' + addr(2B LE) + len(2B LE): lee len bytes de DMEM desde addr (sin dump, CPU
+    // congelada); respuesta 0xA5 + addr + len + bytes. La dirección da la vuelta como
+    // dmem_dbg_addr (el tamaño real de DMEM).
+    reg [15:0] x_addr;
+    reg [15:0] x_len;
 
     // TX inflight
     reg tx_inflight;
@@ -116,6 +176,28 @@ module debug_unit_uart #(
             dump_type      <= 8'd0;
             pending_step_dump <= 1'b0;
 
+            cmd_cksum      <= 1'b0;
+            cksum          <= 32'b0;
+            cksum_left     <= 32'b0;
+
+            cmd_nstep      <= 1'b0;
+            nstep_active   <= 1'b0;
+            step_left      <= 32'b0;
+            step_every     <= 32'b0;
+            step_phase     <= 32'b0;
+
+            sec_mask       <= 4'hF;
+            sec_varlen     <= 1'b0;
+            win_addr       <= 16'd0;
+            win_len        <= DUMP_MEM_BYTES;
+
+            key_every      <= 16'd0;
+            key_cnt        <= 16'd0;
+            shadow_ok      <= 1'b0;
+
+            x_addr         <= 16'd0;
+            x_len          <= 16'd0;
+
         end else begin
             // pulsos default
             dbg_step       <= 1'b0;
@@ -135,12 +217,32 @@ module debug_unit_uart #(
                                 rx_cnt      <= 3'd0;
                                 rx_addr_buf <= 32'b0;
                                 rx_data_buf <= 32'b0;
+                                cmd_cksum   <= 1'b0;
+                                cmd_nstep   <= 1'b0;
+                                state       <= ST_P_ADDR;
+                            end
+                            "C": begin
+                                rx_cnt      <= 3'd0;
+                                rx_addr_buf <= 32'b0;
+                                rx_data_buf <= 32'b0;
+                                cmd_cksum   <= 1'b1;
+                                cmd_nstep   <= 1'b0;
+                                state       <= ST_P_ADDR;
+                            end
+                            "N": begin
+                                rx_cnt      <= 3'd0;
+                                rx_addr_buf <= 32'b0;
+                                rx_data_buf <= 32'b0;
+                                cmd_cksum   <= 1'b0;
+                                cmd_nstep   <= 1'b1;
                                 state       <= ST_P_ADDR;
                             end
                             "R": begin
                                 dbg_pc_value   <= 32'h0000_0000;
                                 dbg_flush_pipe <= 1'b1;
                                 dbg_load_pc    <= 1'b1;
+                                shadow_ok      <= 1'b0;
+                                key_cnt        <= 16'd0;
                             end
                             "T": begin
                                 dbg_freeze <= 1'b1;
@@ -158,6 +260,18 @@ module debug_unit_uart #(
                                 state <= ST_RUN;
                                 pending_step_dump <= 1'b0;
                             end
+                            "M": begin
+                                rx_cnt <= 3'd0;
+                                state  <= ST_MASK;
+                            end
+                            "K": begin
+                                rx_cnt <= 3'd0;
+                                state  <= ST_KEY;
+                            end
+                            "X": begin
+                                rx_cnt <= 3'd0;
+                                state  <= ST_XADDR;
+                            end
                             default: ;
                         endcase
                     end
@@ -181,16 +295,90 @@ module debug_unit_uart #(
                     if (rx_cnt == 3'd3) begin
                       // IMPORTANTÍSIMO: usar data_next, no rx_data_buf
                       imem_dbg_addr  <= rx_addr_buf; // ya quedó completo en ST_P_ADDR
-                      imem_dbg_wdata <= data_next;
-                      imem_dbg_we    <= 1'b1;  // pulso de 1 ciclo
                       rx_cnt         <= 3'd0;
-                      state          <= ST_IDLE;
+                      if (cmd_cksum) begin
+                        cksum      <= 32'b0;
+                        cksum_left <= data_next;     // n_words
+                        state      <= ST_CKSUM;
+                      end else if (cmd_nstep) begin
+                        step_left  <= rx_addr_buf;   // n
+                        step_every <= data_next;     // every
+                        step_phase <= 32'd0;
+                        dump_type  <= 8'd1;
+                        if (rx_addr_buf == 32'd0) begin
+                          state <= ST_DUMP;
+                        end else begin
+                          nstep_active <= 1'b1;
+                          state        <= ST_STEP;
+                        end
+                      end else begin
+                        imem_dbg_wdata <= data_next;
+                        imem_dbg_we    <= 1'b1;  // pulso de 1 ciclo
+                        state          <= ST_IDLE;
+                      end
                     end else begin
                       rx_cnt <= rx_cnt + 1'b1;
                     end
                   end
                 end
 
+                ST_MASK: begin
+                  if (rx_done_tick) begin
+                    rx_cnt <= rx_cnt + 1'b1;
+                    case (rx_cnt)
+                      3'd0: sec_mask       <= rx_dout[3:0];
+                      3'd1: win_addr[7:0]  <= rx_dout;
+                      3'd2: win_addr[15:8] <= rx_dout;
+                      3'd3: win_len[7:0]   <= rx_dout;
+                      default: begin
+                        win_len[15:8] <= rx_dout;
+                        sec_varlen    <= !(sec_mask == 4'hF && win_addr == 16'd0 &&
+                                           {rx_dout, win_len[7:0]} == DUMP_MEM_BYTES);
+                        shadow_ok     <= 1'b0;
+                        key_cnt       <= 16'd0;
+                        rx_cnt        <= 3'd0;
+                        state         <= ST_IDLE;
+                      end
+                    endcase
+                  end
+                end
+
+                ST_KEY: begin
+                  if (rx_done_tick) begin
+                    if (rx_cnt == 3'd0) begin
+                      key_every[7:0] <= rx_dout;
+                      rx_cnt         <= 3'd1;
+                    end else begin
+                      key_every[15:8] <= rx_dout;
+                      shadow_ok       <= 1'b0;
+                      key_cnt         <= 16'd0;
+                      rx_cnt          <= 3'd0;
+                      state           <= ST_IDLE;
+                    end
+                  end
+                end
+
+                ST_XADDR: begin
+                  if (rx_done_tick) begin
+                    rx_cnt <= rx_cnt + 1'b1;
+                    case (rx_cnt)
+                      3'd0: x_addr[7:0]  <= rx_dout;
+                      3'd1: x_addr[15:8] <= rx_dout;
+                      3'd2: x_len[7:0]   <= rx_dout;
+                      default: begin
+                        x_len[15:8] <= rx_dout;
+                        rx_cnt      <= 3'd0;
+                        state       <= ST_XMEM_TX;
+                      end
+                    endcase
+                  end
+                end
+
+                ST_XMEM_TX: begin
+                    if (dump_done)
+                        state <= ST_IDLE;
+                end
+
                 ST_RUN: begin
                     dbg_freeze <= 1'b0;
                     dbg_run    <= 1'b1;
@@ -229,11 +417,49 @@ module debug_unit_uart #(
                     dbg_freeze <= 1'b1;   // congelar CPU
                     dbg_drain  <= 1'b0;   // no drenar
                     dump_type  <= 8'd1;   // STEP
-                    state      <= ST_DUMP;
+                    if (!nstep_active) begin
+                        state <= ST_DUMP;
+                    end else if (step_left == 32'd1) begin
+                        // último ciclo de 'N': dump STEP normal y fin
+                        nstep_active <= 1'b0;
+                        step_left    <= 32'd0;
+                        state        <= ST_DUMP;
+                    end else begin
+                        step_left <= step_left - 1'b1;
+                        if (step_every != 32'd0 && step_phase + 1'b1 == step_every) begin
+                            step_phase <= 32'd0;
+                            dump_type  <= 8'd4;   // STEP_SAMPLE: después se sigue con ST_STEP
+                            state      <= ST_DUMP;
+                        end else begin
+                            step_phase <= step_phase + 1'b1;
+                            state      <= ST_STEP;
+                        end
+                    end
                 end
 
                 ST_DUMP: begin
                     dbg_freeze <= 1'b1;
+                    if (dump_done) begin
+                        state <= nstep_active ? ST_STEP : ST_IDLE;
+                        if (key_on) begin
+                            shadow_ok <= 1'b1;
+                            key_cnt   <= (key_cnt + 1'b1 == key_every) ? 16'd0 : key_cnt + 1'b1;
+                        end
+                    end
+                end
+
+                ST_CKSUM: begin
+                    // una word por ciclo (lectura combinacional de IMEM)
+                    if (cksum_left == 32'd0) begin
+                        state <= ST_CKSUM_TX;
+                    end else begin
+                        cksum         <= {cksum[30:0], cksum[31]} ^ imem_dbg_rdata;
+                        imem_dbg_addr <= imem_dbg_addr + 32'd4;
+                        cksum_left    <= cksum_left - 1'b1;
+                    end
+                end
+
+                ST_CKSUM_TX: begin
                     if (dump_done)
                         state <= ST_IDLE;
                 end
@@ -294,9 +520,128 @@ module debug_unit_uart #(
     wire [31:0] pipe_w    = pipe_word(pipe_widx);
 
     // pre-cálculos para mem (bytes)
-    wire [15:0] mem_off   = dump_idx - OFF_MEM; // 0..DM_DUMP_BYTES-1
+    // frame parcial: addr(2B) + len(2B) antes de los datos y la ventana arranca en win_addr
+    localparam [15:0] OFF_MEMD_V = OFF_MEM + 16'd4;
+    wire [15:0] mem_off   = sec_varlen ? (dump_idx - OFF_MEMD_V + win_addr) : (dump_idx - OFF_MEM);
     wire [11:0] mem_idx   = mem_off[11:0];
 
+    // ---------------- delta ('K') ----------------
+    // Sombra del dump anterior. Antes del primer byte de cada dump (con key_on)
+    // se recorren los 32 registros, las 23 pipe words y la ventana de DMEM, 3 ciclos
+    // por elemento (dirección, lectura, comparación): quedan reg_chg/pipe_chg/mem_chg
+    // y la sombra al día.
+    reg [31:0] reg_shadow  [0:31];
+    reg [31:0] pipe_shadow [0:PIPE_WORDS-1];
+    reg [7:0]  mem_shadow  [0:DUMP_MEM_BYTES-1];
+    reg [31:0] reg_chg;
+    reg [31:0] pipe_chg;
+    reg [DUMP_MEM_BYTES-1:0] mem_chg;
+    reg        scan_done;
+    reg [12:0] scan_idx;     // 0..31 registros, SCAN_PIPE.. pipe words, SCAN_MEM.. ventana
+    reg [1:0]  scan_sub;
+
+    localparam [12:0] SCAN_PIPE = 13'd32;
+    localparam [12:0] SCAN_MEM  = 13'd32 + PIPE_WORDS;
+
+    wire [12:0] scan_mem_n  = (win_len <= DUMP_MEM_BYTES) ? win_len[12:0] : 13'd0;
+    wire [12:0] scan_pidx   = scan_idx - SCAN_PIPE;
+    wire [12:0] scan_midx   = scan_idx - SCAN_MEM;
+    wire [31:0] scan_pipe_w = pipe_word(scan_pidx[5:0]);
+    wire        dump_delta  = key_on && shadow_ok && (key_cnt != 16'd0) &&
+                              (win_len <= DUMP_MEM_BYTES);
+
+    // Offsets de un frame delta: PIPE y REGS empiezan con su máscara de cambiados
+    // (4B) y después van sólo esas words; MEM = addr + len + bitmap + bytes cambiados
+    localparam [15:0] OFF_DPIPE = OFF_PIPE + 16'd4;
+    localparam [15:0] OFF_DRM   = OFF_DPIPE + DUMP_PIPE_BYTES;
+    localparam [15:0] OFF_DREG  = OFF_DRM + 16'd4;
+    localparam [15:0] OFF_DMEM  = OFF_DREG + DUMP_REG_BYTES;
+    localparam [15:0] OFF_DBMP  = OFF_DMEM + 16'd4;
+    wire [15:0] d_bytes   = OFF_DBMP + ((win_len + 16'd7) >> 3);
+    wire [15:0] d_end     = d_bytes + win_len;
+
+    wire [15:0] dpipe_off = (dump_idx - OFF_DPIPE);
+    wire [31:0] dpipe_w   = pipe_word(dpipe_off[7:2]);
+    wire [15:0] dreg_off  = (dump_idx - OFF_DREG);
+    wire [4:0]  dreg_idx  = dreg_off[6:2];
+    wire [15:0] dbmp_off  = (dump_idx - OFF_DBMP);
+    wire [DUMP_MEM_BYTES-1:0] dbmp_sh = mem_chg >> {dbmp_off[12:0], 3'b000};
+    wire [15:0] dmem_off  = (dump_idx - d_bytes + win_addr);
+
+    // primera word marcada en chg con índice >= from (32 = ninguna)
+    function [5:0] next_chg_word;
+        input [31:0] chg;
+        input [5:0]  from;
+        integer k;
+        begin
+            next_chg_word = 6'd32;
+            for (k = 31; k >= 0; k = k - 1)
+                if (k >= from && chg[k]) next_chg_word = k;
+        end
+    endfunction
+
+    // primer byte cambiado de la ventana >= from (DUMP_MEM_BYTES = ninguno)
+    function [12:0] next_chg_byte;
+        input [12:0] from;
+        integer k;
+        begin
+            next_chg_byte = DUMP_MEM_BYTES;
+            for (k = DUMP_MEM_BYTES - 1; k >= 0; k = k - 1)
+                if (k >= from && mem_chg[k]) next_chg_byte = k;
+        end
+    endfunction
+
+    function [15:0] skip_delta;
+        input [15:0] i;
+        reg   [15:0] j;
+        reg   [15:0] o;
+        reg   [5:0]  w;
+        reg   [12:0] m;
+        begin
+            j = i;
+            if (j >= OFF_PC   && j < OFF_PIPE && !sec_mask[0]) j = OFF_PIPE;
+            if (j >= OFF_PIPE && j < OFF_DRM  && !sec_mask[1]) j = OFF_DRM;
+            o = j - OFF_DPIPE;
+            if (j >= OFF_DPIPE && j < OFF_DRM && o[1:0] == 2'd0) begin
+                // primer byte de una pipe word: saltar a la próxima que cambió
+                w = next_chg_word(pipe_chg, o[7:2]);
+                j = (w >= PIPE_WORDS) ? OFF_DRM : OFF_DPIPE + {w, 2'b00};
+            end
+            if (j >= OFF_DRM  && j < OFF_DMEM && !sec_mask[2]) j = OFF_DMEM;
+            o = j - OFF_DREG;
+            if (j >= OFF_DREG && j < OFF_DMEM && o[1:0] == 2'd0) begin
+                // ídem registros
+                w = next_chg_word(reg_chg, o[7:2]);
+                j = (w == 6'd32) ? OFF_DMEM : OFF_DREG + {w, 2'b00};
+            end
+            if (j >= OFF_DMEM && !sec_mask[3]) j = d_end;
+            if (j >= d_bytes && j < d_end) begin
+                m = next_chg_byte(j - d_bytes);
+                j = (m >= win_len) ? d_end : d_bytes + m;
+            end
+            skip_delta = j;
+        end
+    endfunction
+
+    // índice lógico siguiente: en un frame parcial se saltean las secciones fuera de sec_mask
+    wire [15:0] dump_end  = dump_delta ? d_end : sec_varlen ? (OFF_MEMD_V + win_len) : DUMP_TOTAL;
+
+    function [15:0] skip_sections;
+        input [15:0] i;
+        reg   [15:0] j;
+        begin
+            j = i;
+            if (j >= OFF_PC   && j < OFF_PIPE && !sec_mask[0]) j = OFF_PIPE;
+            if (j >= OFF_PIPE && j < OFF_REG  && !sec_mask[1]) j = OFF_REG;
+            if (j >= OFF_REG  && j < OFF_MEM  && !sec_mask[2]) j = OFF_MEM;
+            if (j >= OFF_MEM  && !sec_mask[3])                 j = dump_end;
+            skip_sections = j;
+        end
+    endfunction
+
+    wire [15:0] idx_next  = dump_delta ? skip_delta(dump_idx + 16'd1) :
+                            sec_varlen ? skip_sections(dump_idx + 16'd1) : (dump_idx + 16'd1);
+
     wire [31:0] reg_word  = rf_dbg_data;
 
     always @(posedge clk) begin
@@ -311,6 +656,13 @@ module debug_unit_uart #(
             rf_dbg_addr   <= 5'd0;
             dmem_dbg_addr <= 12'd0;
 
+            reg_chg   <= 32'b0;
+            pipe_chg  <= 32'b0;
+            mem_chg   <= {DUMP_MEM_BYTES{1'b0}};
+            scan_done <= 1'b0;
+            scan_idx  <= 13'd0;
+            scan_sub  <= 2'd0;
+
         end else begin
             tx_start  <= 1'b0;
             dump_done <= 1'b0;
@@ -318,17 +670,68 @@ module debug_unit_uart #(
             if (tx_done_tick)
                 tx_inflight <= 1'b0;
 
-            if (state == ST_DUMP) begin
-                // Mantener direcciones coherentes con dump_idx
-                if (dump_idx >= OFF_REG && dump_idx < (OFF_REG + DUMP_REG_BYTES))
-                    rf_dbg_addr <= reg_idx;
-                else
-                    rf_dbg_addr <= 5'd0;
+            if (state == ST_DUMP && key_on && !scan_done) begin
+                // comparación contra la sombra (antes del header)
+                case (scan_sub)
+                    2'd0: begin
+                        if (scan_idx == 13'd0) begin
+                            reg_chg  <= 32'b0;
+                            pipe_chg <= 32'b0;
+                            mem_chg  <= {DUMP_MEM_BYTES{1'b0}};
+                        end
+                        if (scan_idx < SCAN_PIPE)
+                            rf_dbg_addr <= scan_idx[4:0];
+                        else if (scan_idx >= SCAN_MEM)
+                            dmem_dbg_addr <= win_addr[11:0] + scan_midx[11:0];
+                        scan_sub <= 2'd1;
+                    end
+                    2'd1: scan_sub <= 2'd2;
+                    default: begin
+                        if (scan_idx < SCAN_PIPE) begin
+                            // x0 nunca se marca
+                            reg_chg[scan_idx[4:0]]    <= (scan_idx != 13'd0) &&
+                                                         (rf_dbg_data != reg_shadow[scan_idx[4:0]]);
+                            reg_shadow[scan_idx[4:0]] <= rf_dbg_data;
+                        end else if (scan_idx < SCAN_MEM) begin
+                            pipe_chg[scan_pidx[4:0]]    <= (scan_pipe_w != pipe_shadow[scan_pidx[4:0]]);
+                            pipe_shadow[scan_pidx[4:0]] <= scan_pipe_w;
+                        end else begin
+                            mem_chg[scan_midx]    <= (dmem_dbg_data != mem_shadow[scan_midx]);
+                            mem_shadow[scan_midx] <= dmem_dbg_data;
+                        end
+                        scan_sub <= 2'd0;
+                        if (scan_idx + 13'd1 >= SCAN_MEM + scan_mem_n) begin
+                            scan_idx  <= 13'd0;
+                            scan_done <= 1'b1;
+                        end else begin
+                            scan_idx <= scan_idx + 13'd1;
+                        end
+                    end
+                endcase
 
-                if (dump_idx >= OFF_MEM)
-                    dmem_dbg_addr <= mem_idx;
-                else
-                    dmem_dbg_addr <= 12'd0;
+            end else if (state == ST_DUMP) begin
+                // Mantener direcciones coherentes con dump_idx
+                if (dump_delta) begin
+                    if (dump_idx >= OFF_DREG && dump_idx < OFF_DMEM)
+                        rf_dbg_addr <= dreg_idx;
+                    else
+                        rf_dbg_addr <= 5'd0;
+
+                    if (dump_idx >= d_bytes)
+                        dmem_dbg_addr <= dmem_off[11:0];
+                    else
+                        dmem_dbg_addr <= 12'd0;
+                end else begin
+                    if (dump_idx >= OFF_REG && dump_idx < (OFF_REG + DUMP_REG_BYTES))
+                        rf_dbg_addr <= reg_idx;
+                    else
+                        rf_dbg_addr <= 5'd0;
+
+                    if (dump_idx >= OFF_MEM)
+                        dmem_dbg_addr <= mem_idx;
+                    else
+                        dmem_dbg_addr <= 12'd0;
+                end
 
                 if (!tx_inflight) begin
                     // elegir byte a transmitir
@@ -338,7 +741,8 @@ module debug_unit_uart #(
                             16'd0: tx_din <= 8'hD0;
                             16'd1: tx_din <= dump_type;
                             16'd2: tx_din <= {6'b0, dbg_pipe_empty, dbg_halt_seen};
-                            16'd3: tx_din <= 8'h00;
+                            16'd3: tx_din <= dump_delta ? {4'hC, sec_mask} :
+                                             sec_varlen ? {4'h8, sec_mask} : 8'h00;
                             default: tx_din <= 8'h00;
                         endcase
 
@@ -352,6 +756,49 @@ module debug_unit_uart #(
                             default: tx_din <= 8'h00;
                         endcase
 
+                    end else if (dump_delta) begin
+                        // PIPE / REGS / MEM de un frame delta
+                        if (dump_idx < OFF_DPIPE) begin
+                            case (dump_idx - OFF_PIPE)
+                                16'd0: tx_din <= pipe_chg[7:0];
+                                16'd1: tx_din <= pipe_chg[15:8];
+                                16'd2: tx_din <= pipe_chg[23:16];
+                                default: tx_din <= pipe_chg[31:24];
+                            endcase
+                        end else if (dump_idx < OFF_DRM) begin
+                            case (dpipe_off[1:0])
+                                2'd0: tx_din <= dpipe_w[7:0];
+                                2'd1: tx_din <= dpipe_w[15:8];
+                                2'd2: tx_din <= dpipe_w[23:16];
+                                default: tx_din <= dpipe_w[31:24];
+                            endcase
+                        end else if (dump_idx < OFF_DREG) begin
+                            case (dump_idx - OFF_DRM)
+                                16'd0: tx_din <= reg_chg[7:0];
+                                16'd1: tx_din <= reg_chg[15:8];
+                                16'd2: tx_din <= reg_chg[23:16];
+                                default: tx_din <= reg_chg[31:24];
+                            endcase
+                        end else if (dump_idx < OFF_DMEM) begin
+                            case (dreg_off[1:0])
+                                2'd0: tx_din <= reg_word[7:0];
+                                2'd1: tx_din <= reg_word[15:8];
+                                2'd2: tx_din <= reg_word[23:16];
+                                default: tx_din <= reg_word[31:24];
+                            endcase
+                        end else if (dump_idx < OFF_DBMP) begin
+                            case (dump_idx - OFF_DMEM)
+                                16'd0: tx_din <= win_addr[7:0];
+                                16'd1: tx_din <= win_addr[15:8];
+                                16'd2: tx_din <= win_len[7:0];
+                                default: tx_din <= win_len[15:8];
+                            endcase
+                        end else if (dump_idx < d_bytes) begin
+                            tx_din <= dbmp_sh[7:0];
+                        end else begin
+                            tx_din <= dmem_dbg_data;
+                        end
+
                     end else if (dump_idx < OFF_REG) begin
                         // PIPE (23 words = 92 bytes)
                         case (pipe_bidx)
@@ -372,6 +819,15 @@ module debug_unit_uart #(
                             default: tx_din <= 8'h00;
                         endcase
 
+                    end else if (sec_varlen && dump_idx < OFF_MEMD_V) begin
+                        // sub-header de la ventana de DMEM (frame parcial)
+                        case (dump_idx - OFF_MEM)
+                            16'd0: tx_din <= win_addr[7:0];
+                            16'd1: tx_din <= win_addr[15:8];
+                            16'd2: tx_din <= win_len[7:0];
+                            default: tx_din <= win_len[15:8];
+                        endcase
+
                     end else begin
                         // DMEM bytes
                         tx_din <= dmem_dbg_data;
@@ -380,7 +836,59 @@ module debug_unit_uart #(
                     tx_start    <= 1'b1;
                     tx_inflight <= 1'b1;
 
-                    if (dump_idx == DUMP_TOTAL-1) begin
+                    if (idx_next >= dump_end) begin
+                        dump_idx  <= 16'd0;
+                        dump_done <= 1'b1;
+                        scan_done <= 1'b0;
+                    end else begin
+                        dump_idx <= idx_next;
+                    end
+                end
+            end else if (state == ST_CKSUM_TX) begin
+                // Respuesta de 'C' (reusa dump_idx / dump_done): 0xC5, eco de addr y n_words
+                // (rx_addr_buf / rx_data_buf no cambian hasta el próximo comando) y checksum
+                if (!tx_inflight) begin
+                    case (dump_idx)
+                        16'd0:  tx_din <= 8'hC5;
+                        16'd1:  tx_din <= rx_addr_buf[7:0];
+                        16'd2:  tx_din <= rx_addr_buf[15:8];
+                        16'd3:  tx_din <= rx_addr_buf[23:16];
+                        16'd4:  tx_din <= rx_addr_buf[31:24];
+                        16'd5:  tx_din <= rx_data_buf[7:0];
+                        16'd6:  tx_din <= rx_data_buf[15:8];
+                        16'd7:  tx_din <= rx_data_buf[23:16];
+                        16'd8:  tx_din <= rx_data_buf[31:24];
+                        16'd9:  tx_din <= cksum[7:0];
+                        16'd10: tx_din <= cksum[15:8];
+                        16'd11: tx_din <= cksum[23:16];
+                        default: tx_din <= cksum[31:24];
+                    endcase
+                    tx_start    <= 1'b1;
+                    tx_inflight <= 1'b1;
+
+                    if (dump_idx == 16'd12) begin
+                        dump_idx  <= 16'd0;
+                        dump_done <= 1'b1;
+                    end else begin
+                        dump_idx <= dump_idx + 1'b1;
+                    end
+                end
+            end else if (state == ST_XMEM_TX) begin
+                // Respuesta de 'X' (reusa dump_idx / dump_done): header de 5 bytes y datos
+                dmem_dbg_addr <= x_addr[11:0] + (dump_idx[11:0] - 12'd5);
+                if (!tx_inflight) begin
+                    case (dump_idx)
+                        16'd0: tx_din <= 8'hA5;
+                        16'd1: tx_din <= x_addr[7:0];
+                        16'd2: tx_din <= x_addr[15:8];
+                        16'd3: tx_din <= x_len[7:0];
+                        16'd4: tx_din <= x_len[15:8];
+                        default: tx_din <= dmem_dbg_data;
+                    endcase
+                    tx_start    <= 1'b1;
+                    tx_inflight <= 1'b1;
+
+                    if ({1'b0, dump_idx} + 17'd1 >= 17'd5 + x_len) begin
                         dump_idx  <= 16'd0;
                         dump_done <= 1'b1;
                     end else begin
@@ -388,7 +896,10 @@ module debug_unit_uart #(
                     end
                 end
             end else begin
-                dump_idx <= 16'd0;
+                dump_idx  <= 16'd0;
+                scan_done <= 1'b0;
+                scan_idx  <= 13'd0;
+                scan_sub  <= 2'd0;
 
                 // Opcional: estacionar direcciones
                 rf_dbg_addr   <= 5'd0;
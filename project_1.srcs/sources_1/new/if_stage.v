@@ -17,6 +17,7 @@ module if_stage #(
     input  wire             imem_dbg_we,
     input  wire [XLEN-1:0]  imem_dbg_addr,
     input  wire [31:0]      imem_dbg_wdata,
+    output wire [31:0]      imem_dbg_rdata,
 
     // --- Soft reset de fetch (cargar PC) ---
     input  wire             dbg_load_pc,
@@ -56,7 +57,8 @@ module if_stage #(
         .clk(clk),
         .dbg_we(imem_dbg_we),
         .dbg_addr(imem_dbg_addr),
-        .dbg_wdata(imem_dbg_wdata)
+        .dbg_wdata(imem_dbg_wdata),
+        .dbg_rdata(imem_dbg_rdata)
     );
 
 endmodule
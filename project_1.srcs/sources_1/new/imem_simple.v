@@ -13,7 +13,8 @@ module imem_simple #(
     input  wire            clk,
     input  wire            dbg_we,
     input  wire [XLEN-1:0] dbg_addr,   // byte address (tipo PC)
-    input  wire [31:0]     dbg_wdata
+    input  wire [31:0]     dbg_wdata,
+    output wire [31:0]     dbg_rdata   // lectura en dbg_addr (checksum 'C')
 );
 
     localparam integer AW = $clog2(DEPTH);
@@ -35,6 +36,9 @@ module imem_simple #(
     // Lectura combinacional (CPU)
     assign instr = mem[cpu_word];
 
+    // Lectura combinacional (Debug)
+    assign dbg_rdata = mem[dbg_word];
+
     // Escritura síncrona (Debug)
     always @(posedge clk) begin
         if (dbg_we) begin
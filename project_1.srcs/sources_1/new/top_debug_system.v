@@ -8,6 +8,12 @@ module top_debug_system #(
     // UART baud
     parameter integer BAUD   = 115200,
 
+    // FIFO RX (2**RX_FIFO_W bytes): permite encolar comandos mientras la debug unit dumpea
+    parameter integer RX_FIFO_W = 5,
+
+    // Dumps delta ('K') en la debug unit; apagado hasta validarlo con tb_debug_uart
+    parameter integer DELTA_EN = 0,
+
     // CPU params
     parameter IMEM_FILE = "",
     parameter DMEM_FILE = ""
@@ -99,6 +105,29 @@ module top_debug_system #(
         .dout(rx_dout)
     );
 
+    // La debug unit sólo consume bytes (dbg_rx_ready) en IDLE y mientras recibe los
+    // argumentos de P/C/N/M/K/X; lo que llega mientras hace STEP/DUMP/RUN, el checksum o
+    // la respuesta de 'X' queda encolado acá (el host puede tener varios 'S'/'D' en vuelo).
+    // El host no debe superar 2**RX_FIFO_W - 1 bytes pendientes.
+    wire       rx_fifo_empty;
+    wire [7:0] rx_fifo_data;
+    wire       dbg_rx_ready;
+    wire       dbg_rx_pop = dbg_rx_ready & ~rx_fifo_empty;
+
+    fifo #(
+        .B(8),
+        .W(RX_FIFO_W)
+    ) u_rx_fifo (
+        .clk(clk_sys),
+        .reset(reset_sys),
+        .rd(dbg_rx_pop),
+        .wr(rx_done_tick),
+        .w_data(rx_dout),
+        .empty(rx_fifo_empty),
+        .full(),
+        .r_data(rx_fifo_data)
+    );
+
     wire       tx_done_tick;
     wire       tx_start;
     wire [7:0] tx_din;
@@ -131,6 +160,7 @@ module top_debug_system #(
     wire        imem_dbg_we;
     wire [31:0] imem_dbg_addr;
     wire [31:0] imem_dbg_wdata;
+    wire [31:0] imem_dbg_rdata;
 
     wire [31:0] dbg_pc;
     wire        dbg_pipe_empty;
@@ -148,12 +178,15 @@ module top_debug_system #(
     // ============================================================
     // 4) Debug Unit
     // ============================================================
-    debug_unit_uart u_dbg (
+    debug_unit_uart #(
+        .DELTA_EN(DELTA_EN)
+    ) u_dbg (
         .clk(clk_sys),
         .reset(reset_sys),
 
-        .rx_done_tick(rx_done_tick),
-        .rx_dout(rx_dout),
+        .rx_done_tick(dbg_rx_pop),
+        .rx_dout(rx_fifo_data),
+        .rx_ready(dbg_rx_ready),
 
         .tx_start(tx_start),
         .tx_din(tx_din),
@@ -176,6 +209,7 @@ module top_debug_system #(
         .imem_dbg_we(imem_dbg_we),
         .imem_dbg_addr(imem_dbg_addr),
         .imem_dbg_wdata(imem_dbg_wdata),
+        .imem_dbg_rdata(imem_dbg_rdata),
 
         .rf_dbg_addr(rf_dbg_addr),
         .rf_dbg_data(rf_dbg_data),
@@ -201,6 +235,7 @@ module top_debug_system #(
       .imem_dbg_we(imem_dbg_we),
       .imem_dbg_addr(imem_dbg_addr),
       .imem_dbg_wdata(imem_dbg_wdata),
+      .imem_dbg_rdata(imem_dbg_rdata),
 
       .dbg_run(dbg_run),
       .dbg_step(dbg_step),
@@ -0,0 +1,451 @@
+"""
+Ensamblador RV32I para el set de instrucciones del README, en proceso y sin toolchain.
+
+    asm = assemble_file("prog.s")        # incremental: cacheado por archivo
+    host.program_image(image_items(asm.base, asm.words))   # program_parser.image_items
+
+Sintaxis estilo GNU as:
+  - labels "nombre:", comentarios #, // y ;
+  - registros x0..x31 y nombres ABI (zero, ra, sp, ..., s0/fp, t6)
+  - directivas: .word, .equ/.set, .org (sólo hacia adelante, rellena con NOP);
+    .text/.globl/.global se ignoran
+  - pseudo: nop, halt (= ebreak), li, mv, not, neg, seqz, snez, j, jr, ret,
+    beqz, bnez, jal label (rd = ra), jalr rs
+  - destino de branch/jal: con símbolos es una dirección absoluta; un número solo es
+    un offset relativo al PC
+
+lui en este CPU suma x[instr[19:15]] + imm (ver sim_host.decode_instr), así que `li`
+sólo usa lui+addi cuando esos bits del inmediato son 0; si no, arma la constante
+con addi/slli/ori.
+
+Incremental: el parseo de cada línea se memoiza por texto y la codificación por
+(instrucción, dirección, valores de los símbolos que usa; en saltos, relativos al pc);
+al reensamblar sólo se recodifican las líneas que cambiaron o cuyos destinos se movieron.
+"""
+import os
+import re
+from array import array
+from functools import lru_cache
+
+INSTR_NOP = 0x00000013      # addi x0,x0,0
+INSTR_HALT = 0x00100073     # ebreak
+
+ASM_EXTS = (".s", ".asm")
+
+
+class AsmError(ValueError):
+    def __init__(self, lineno: int, msg: str):
+        super().__init__(f"línea {lineno}: {msg}")
+        self.lineno = lineno
+
+
+_ABI = ["zero", "ra", "sp", "gp", "tp", "t0", "t1", "t2", "s0", "s1",
+        "a0", "a1", "a2", "a3", "a4", "a5", "a6", "a7",
+        "s2", "s3", "s4", "s5", "s6", "s7", "s8", "s9", "s10", "s11",
+        "t3", "t4", "t5", "t6"]
+REGS = {f"x{k}": k for k in range(32)}
+REGS.update({name: k for k, name in enumerate(_ABI)})
+REGS["fp"] = 8
+
+# mnemónico -> (funct3, funct7)
+_R_OPS = {
+    "add": (0b000, 0x00), "sub": (0b000, 0x20), "sll": (0b001, 0x00),
+    "slt": (0b010, 0x00), "sltu": (0b011, 0x00), "xor": (0b100, 0x00),
+    "srl": (0b101, 0x00), "sra": (0b101, 0x20), "or": (0b110, 0x00), "and": (0b111, 0x00),
+}
+_I_OPS = {"addi": 0b000, "slti": 0b010, "sltiu": 0b011, "xori": 0b100, "ori": 0b110, "andi": 0b111}
+_SHIFT_OPS = {"slli": (0b001, 0x00), "srli": (0b101, 0x00), "srai": (0b101, 0x20)}
+_LOAD_OPS = {"lb": 0b000, "lh": 0b001, "lw": 0b010, "lbu": 0b100, "lhu": 0b101}
+_STORE_OPS = {"sb": 0b000, "sh": 0b001, "sw": 0b010}
+_BRANCH_OPS = {"beq": 0b000, "bne": 0b001}
+# con símbolos codifican (destino - pc): el cache los guarda relativos al pc
+_PCREL = {"beq", "bne", "beqz", "bnez", "jal", "j"}
+_UNSUPPORTED = {"blt", "bge", "bltu", "bgeu", "auipc", "ecall", "fence", "call", "la"}
+
+_LABEL_RE = re.compile(r"\s*([A-Za-z_.$][\w.$]*)\s*:")
+_IDENT_RE = re.compile(r"(?<![\w.$])[A-Za-z_.$][\w.$]*")
+_MEM_RE = re.compile(r"^(.*)\(\s*([\w$]+)\s*\)$")
+_EXPR_TOK_RE = re.compile(r"\s*([+-]|[^+\-\s]+)")
+
+
+# ---------------- parseo (memoizado por texto de línea) ----------------
+def _strip_comment(line: str) -> str:
+    for mark in ("//", "#", ";"):
+        if mark in line:
+            line = line.split(mark, 1)[0]
+    return line.strip()
+
+
+@lru_cache(maxsize=8192)
+def _parse_line(raw: str) -> tuple[tuple[str, ...], str | None, tuple[str, ...], frozenset]:
+    """-> (labels, mnemónico, operandos, símbolos referenciados)."""
+    s = _strip_comment(raw)
+    labels = []
+    while True:
+        m = _LABEL_RE.match(s)
+        if not m:
+            break
+        labels.append(m.group(1))
+        s = s[m.end():].strip()
+    if not s:
+        return tuple(labels), None, (), frozenset()
+    parts = s.split(None, 1)
+    mnem, rest = parts[0], (parts[1] if len(parts) > 1 else "")
+    ops = tuple(o.strip() for o in rest.split(",")) if rest.strip() else ()
+    refs = set()
+    if mnem.lower() not in (".equ", ".set"):
+        for o in ops:
+            refs.update(t for t in _IDENT_RE.findall(o) if t not in REGS)
+    else:
+        refs.update(t for o in ops[1:] for t in _IDENT_RE.findall(o))
+    return tuple(labels), mnem.lower(), ops, frozenset(refs)
+
+
+def _eval(expr: str, syms: dict[str, int], lineno: int) -> int:
+    toks = _EXPR_TOK_RE.findall(expr)
+    if not toks:
+        raise AsmError(lineno, "falta un valor")
+    val, sign, want_term = 0, 1, True
+    for t in toks:
+        if t in ("+", "-"):
+            if not want_term:
+                sign, want_term = 1, True
+            if t == "-":
+                sign = -sign
+            continue
+        if not want_term:
+            raise AsmError(lineno, f"expresión inválida: {expr!r}")
+        if t in syms:
+            v = syms[t]
+        else:
+            try:
+                v = int(t, 0)
+            except ValueError:
+                raise AsmError(lineno, f"símbolo no definido: {t!r}") from None
+        val += sign * v
+        sign, want_term = 1, False
+    if want_term:
+        raise AsmError(lineno, f"expresión incompleta: {expr!r}")
+    return val
+
+
+def _reg(op: str, lineno: int) -> int:
+    r = REGS.get(op.strip().lower())
+    if r is None:
+        raise AsmError(lineno, f"registro inválido: {op!r}")
+    return r
+
+
+def _nops(ops: tuple, n: int, mnem: str, lineno: int):
+    if len(ops) != n:
+        raise AsmError(lineno, f"{mnem}: se esperaban {n} operandos, hay {len(ops)}")
+
+
+def _has_syms(expr: str) -> bool:
+    return bool(_IDENT_RE.search(expr))
+
+
+# ---------------- codificación ----------------
+def _check_imm(v: int, lo: int, hi: int, what: str, lineno: int) -> int:
+    if not lo <= v <= hi:
+        raise AsmError(lineno, f"{what} fuera de rango: {v}")
+    return v
+
+
+def enc_r(f3: int, f7: int, rd: int, rs1: int, rs2: int) -> int:
+    return (f7 << 25) | (rs2 << 20) | (rs1 << 15) | (f3 << 12) | (rd << 7) | 0x33
+
+
+def enc_i(opcode: int, f3: int, rd: int, rs1: int, imm: int) -> int:
+    return ((imm & 0xFFF) << 20) | (rs1 << 15) | (f3 << 12) | (rd << 7) | opcode
+
+
+def enc_s(f3: int, rs1: int, rs2: int, imm: int) -> int:
+    return (((imm >> 5) & 0x7F) << 25) | (rs2 << 20) | (rs1 << 15) | (f3 << 12) | ((imm & 0x1F) << 7) | 0x23
+
+
+def enc_b(f3: int, rs1: int, rs2: int, off: int) -> int:
+    return ((((off >> 12) & 1) << 31) | (((off >> 5) & 0x3F) << 25) | (rs2 << 20) | (rs1 << 15) |
+            (f3 << 12) | (((off >> 1) & 0xF) << 8) | (((off >> 11) & 1) << 7) | 0x63)
+
+
+def enc_u(rd: int, imm20: int) -> int:
+    return ((imm20 & 0xFFFFF) << 12) | (rd << 7) | 0x37
+
+
+def enc_j(rd: int, off: int) -> int:
+    return ((((off >> 20) & 1) << 31) | (((off >> 1) & 0x3FF) << 21) | (((off >> 11) & 1) << 20) |
+            (((off >> 12) & 0xFF) << 12) | (rd << 7) | 0x6F)
+
+
+def li_words(rd: int, value: int) -> list[int]:
+    """Secuencia para li rd, value (ver nota sobre lui en el docstring del módulo)."""
+    v = value & 0xFFFFFFFF
+    sv = v - (1 << 32) if v & 0x80000000 else v
+    if -2048 <= sv <= 2047:
+        return [enc_i(0x13, 0b000, rd, 0, sv)]
+    lo = ((v & 0xFFF) ^ 0x800) - 0x800
+    hi = ((v - lo) >> 12) & 0xFFFFF
+    if (hi >> 3) & 0x1F == 0:
+        # instr[19:15] = 0: la ALU suma x0 + imm, lui se comporta como en la ISA
+        return [enc_u(rd, hi)] + ([enc_i(0x13, 0b000, rd, rd, lo)] if lo else [])
+    return [enc_i(0x13, 0b000, rd, 0, v >> 22),
+            enc_i(0x13, 0b001, rd, rd, 11),
+            enc_i(0x13, 0b110, rd, rd, (v >> 11) & 0x7FF),
+            enc_i(0x13, 0b001, rd, rd, 11),
+            enc_i(0x13, 0b110, rd, rd, v & 0x7FF)]
+
+
+def _target(expr: str, pc: int, syms: dict[str, int], lineno: int) -> int:
+    v = _eval(expr, syms, lineno)
+    return v - pc if _has_syms(expr) else v
+
+
+def _encode(mnem: str, ops: tuple, pc: int, syms: dict[str, int], lineno: int) -> list[int]:
+    ev = lambda e: _eval(e, syms, lineno)
+    reg = lambda o: _reg(o, lineno)
+
+    if mnem in _R_OPS:
+        _nops(ops, 3, mnem, lineno)
+        f3, f7 = _R_OPS[mnem]
+        return [enc_r(f3, f7, reg(ops[0]), reg(ops[1]), reg(ops[2]))]
+    if mnem in _I_OPS:
+        _nops(ops, 3, mnem, lineno)
+        imm = _check_imm(ev(ops[2]), -2048, 2047, "inmediato", lineno)
+        return [enc_i(0x13, _I_OPS[mnem], reg(ops[0]), reg(ops[1]), imm)]
+    if mnem in _SHIFT_OPS:
+        _nops(ops, 3, mnem, lineno)
+        f3, f7 = _SHIFT_OPS[mnem]
+        sh = _check_imm(ev(ops[2]), 0, 31, "shamt", lineno)
+        return [enc_i(0x13, f3, reg(ops[0]), reg(ops[1]), (f7 << 5) | sh)]
+    if mnem in _LOAD_OPS or mnem in _STORE_OPS or mnem == "jalr":
+        if mnem == "jalr" and len(ops) == 1:
+            ops = ("ra", f"0({ops[0]})")
+        elif mnem == "jalr" and len(ops) == 3:
+            ops = (ops[0], f"{ops[2]}({ops[1]})")
+        _nops(ops, 2, mnem, lineno)
+        m = _MEM_RE.match(ops[1])
+        if not m:
+            raise AsmError(lineno, f"{mnem}: se esperaba imm(rs1), hay {ops[1]!r}")
+        off = _check_imm(ev(m.group(1)) if m.group(1).strip() else 0, -2048, 2047, "offset", lineno)
+        rs1 = reg(m.group(2))
+        if mnem in _STORE_OPS:
+            return [enc_s(_STORE_OPS[mnem], rs1, reg(ops[0]), off)]
+        if mnem == "jalr":
+            return [enc_i(0x67, 0b000, reg(ops[0]), rs1, off)]
+        return [enc_i(0x03, _LOAD_OPS[mnem], reg(ops[0]), rs1, off)]
+    if mnem in _BRANCH_OPS or mnem in ("beqz", "bnez"):
+        if mnem in ("beqz", "bnez"):
+            _nops(ops, 2, mnem, lineno)
+            mnem, ops = mnem[:3], (ops[0], "zero", ops[1])
+        _nops(ops, 3, mnem, lineno)
+        off = _check_imm(_target(ops[2], pc, syms, lineno), -4096, 4094, "salto", lineno)
+        if off & 1:
+            raise AsmError(lineno, f"salto impar: {off}")
+        return [enc_b(_BRANCH_OPS[mnem], reg(ops[0]), reg(ops[1]), off)]
+    if mnem in ("jal", "j"):
+        if mnem == "j":
+            _nops(ops, 1, mnem, lineno)
+            ops = ("zero", ops[0])
+        elif len(ops) == 1:
+            ops = ("ra", ops[0])
+        _nops(ops, 2, mnem, lineno)
+        off = _check_imm(_target(ops[1], pc, syms, lineno), -(1 << 20), (1 << 20) - 2, "salto", lineno)
+        if off & 1:
+            raise AsmError(lineno, f"salto impar: {off}")
+        return [enc_j(reg(ops[0]), off)]
+    if mnem == "lui":
+        _nops(ops, 2, mnem, lineno)
+        imm = _check_imm(ev(ops[1]), -(1 << 19), 0xFFFFF, "inmediato de lui", lineno)
+        return [enc_u(reg(ops[0]), imm)]
+    if mnem == "li":
+        _nops(ops, 2, mnem, lineno)
+        v = _check_imm(ev(ops[1]), -(1 << 31), 0xFFFFFFFF, "constante", lineno)
+        return li_words(reg(ops[0]), v)
+    if mnem in ("ebreak", "halt"):
+        _nops(ops, 0, mnem, lineno)
+        return [INSTR_HALT]
+    if mnem == "nop":
+        _nops(ops, 0, mnem, lineno)
+        return [INSTR_NOP]
+    if mnem == "mv":
+        _nops(ops, 2, mnem, lineno)
+        return [enc_i(0x13, 0b000, reg(ops[0]), reg(ops[1]), 0)]
+    if mnem == "not":
+        _nops(ops, 2, mnem, lineno)
+        return [enc_i(0x13, 0b100, reg(ops[0]), reg(ops[1]), -1)]
+    if mnem == "neg":
+        _nops(ops, 2, mnem, lineno)
+        return [enc_r(0b000, 0x20, reg(ops[0]), 0, reg(ops[1]))]
+    if mnem == "seqz":
+        _nops(ops, 2, mnem, lineno)
+        return [enc_i(0x13, 0b011, reg(ops[0]), reg(ops[1]), 1)]
+    if mnem == "snez":
+        _nops(ops, 2, mnem, lineno)
+        return [enc_r(0b011, 0x00, reg(ops[0]), 0, reg(ops[1]))]
+    if mnem == "jr":
+        _nops(ops, 1, mnem, lineno)
+        return [enc_i(0x67, 0b000, 0, reg(ops[0]), 0)]
+    if mnem == "ret":
+        _nops(ops, 0, mnem, lineno)
+        return [enc_i(0x67, 0b000, 0, 1, 0)]
+    if mnem == ".word":
+        if not ops:
+            raise AsmError(lineno, ".word sin valores")
+        return [_check_imm(ev(o), -(1 << 31), 0xFFFFFFFF, ".word", lineno) & 0xFFFFFFFF for o in ops]
+    if mnem in _UNSUPPORTED:
+        raise AsmError(lineno, f"{mnem}: no está implementada en este CPU")
+    raise AsmError(lineno, f"instrucción desconocida: {mnem!r}")
+
+
+# ---------------- resultado ----------------
+class Assembly:
+    """Imagen ensamblada: base + words contiguas (huecos de .org en NOP) y símbolos."""
+    __slots__ = ("base", "words", "symbols", "lines", "encoded", "reused")
+
+    def __init__(self, base: int, words: array, symbols: dict[str, int], lines: dict[int, int],
+                 encoded: int, reused: int):
+        self.base = base
+        self.words = words
+        self.symbols = symbols
+        self.lines = lines          # dirección -> línea del fuente (1-based)
+        self.encoded = encoded      # líneas codificadas en esta pasada
+        self.reused = reused        # líneas tomadas del cache
+
+
+@lru_cache(maxsize=4096)
+def _li_len(ops: tuple) -> int | None:
+    """Words de un `li` con constante numérica (None si el valor es inválido)."""
+    try:
+        return len(_encode("li", ops, 0, {}, 0))
+    except AsmError:
+        return None
+
+
+class Assembler:
+    """Ensamblador con cache entre pasadas (uno por archivo fuente)."""
+
+    _MAX_RELAX = 16
+
+    def __init__(self):
+        self._enc: dict[tuple, tuple[int, ...]] = {}
+        self._last: tuple[str, int, Assembly] | None = None
+
+    def _layout(self, stmts: list, base: int, li_size: dict[int, int]):
+        syms: dict[str, int] = {}
+        placed = []     # (k, addr, n)
+        pc = base
+        for k, (lineno, labels, mnem, ops, refs) in enumerate(stmts):
+            for lab in labels:
+                if lab in syms:
+                    raise AsmError(lineno, f"símbolo duplicado: {lab!r}")
+                syms[lab] = pc
+            if mnem is None or mnem in (".text", ".globl", ".global"):
+                continue
+            if mnem in (".equ", ".set"):
+                _nops(ops, 2, mnem, lineno)
+                if ops[0] in syms:
+                    raise AsmError(lineno, f"símbolo duplicado: {ops[0]!r}")
+                syms[ops[0]] = _eval(ops[1], syms, lineno)
+                continue
+            if mnem == ".org":
+                _nops(ops, 1, mnem, lineno)
+                org = _eval(ops[0], syms, lineno)
+                if org < pc:
+                    raise AsmError(lineno, f".org 0x{org:x} hacia atrás (pc=0x{pc:x})")
+                pc = org
+                continue
+            if mnem == ".word":
+                n = len(ops)
+            elif mnem == "li":
+                n = li_size.get(k, 1) if refs else (_li_len(ops) or 1)
+            else:
+                n = 1
+            placed.append((k, pc, n))
+            pc += 4 * n
+        return syms, placed, pc
+
+    def assemble(self, source: str, base: int = 0) -> Assembly:
+        last = self._last
+        if last is not None and last[0] == source and last[1] == base:
+            a = last[2]
+            return Assembly(base, array("I", a.words), dict(a.symbols), dict(a.lines),
+                            0, a.encoded + a.reused)
+
+        stmts = []
+        for lineno, raw in enumerate(source.splitlines(), 1):
+            labels, mnem, ops, refs = _parse_line(raw)
+            if labels or mnem is not None:
+                stmts.append((lineno, labels, mnem, ops, refs))
+
+        # `li` con símbolos puede ocupar 1, 2 o 5 words según su valor; con labels hacia
+        # adelante se itera hasta que ningún tamaño crece (sólo crecen: converge)
+        sym_li = [k for k, st in enumerate(stmts) if st[2] == "li" and st[4]]
+        li_size: dict[int, int] = {}
+        for _ in range(self._MAX_RELAX):
+            syms, placed, end = self._layout(stmts, base, li_size)
+            grown = False
+            for k in sym_li:
+                lineno, _, mnem, ops, _ = stmts[k]
+                need = len(_encode(mnem, ops, 0, syms, lineno))
+                if need > li_size.get(k, 1):
+                    li_size[k] = need
+                    grown = True
+            if not grown:
+                break
+        else:
+            raise AsmError(0, "el layout no converge")
+
+        out: list[int] = []
+        lines: dict[int, int] = {}
+        prev, enc = self._enc, {}
+        encoded = reused = 0
+        pc = base
+        for k, addr, n in placed:
+            lineno, _, mnem, ops, refs = stmts[k]
+            if addr > pc:
+                out.extend([INSTR_NOP] * ((addr - pc) >> 2))     # hueco de .org
+            if not refs:
+                key = (mnem, ops, n)
+            elif mnem in _PCREL and len(refs) == 1:
+                # un salto a un label que se movió junto con él (línea insertada antes) se reusa
+                (s,) = refs
+                key = (mnem, ops, n, s, syms[s] - addr if s in syms else None)
+            else:
+                key = (mnem, ops, n, addr if mnem in _PCREL else None,
+                       tuple(sorted((s, syms.get(s)) for s in refs)))
+            ws = enc.get(key) or prev.get(key)
+            if ws is None:
+                ws = tuple(_encode(mnem, ops, addr, syms, lineno))
+                ws += (INSTR_NOP,) * (n - len(ws))     # li reservado más largo de lo necesario
+                encoded += 1
+            else:
+                reused += 1
+            enc[key] = ws
+            out.extend(ws)
+            for j in range(n):
+                lines[addr + 4*j] = lineno
+            pc = addr + 4*n
+        self._enc = enc
+
+        asm = Assembly(base, array("I", out), syms, lines, encoded, reused)
+        self._last = (source, base, asm)
+        return Assembly(base, array("I", out), dict(syms), dict(lines), encoded, reused)
+
+
+def assemble(source: str, base: int = 0) -> Assembly:
+    return Assembler().assemble(source, base)
+
+
+# abspath -> Assembler
+_assemblers: dict[str, Assembler] = {}
+
+
+def assemble_file(path: str, base: int = 0) -> Assembly:
+    """Ensambla un .s reusando lo codificado en la pasada anterior sobre el mismo archivo."""
+    key = os.path.abspath(path)
+    asm = _assemblers.get(key)
+    if asm is None:
+        asm = _assemblers[key] = Assembler()
+    with open(key, "r", encoding="utf-8", errors="ignore") as f:
+        return asm.assemble(f.read(), base)
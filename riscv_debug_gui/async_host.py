@@ -0,0 +1,135 @@
+"""
+Host asyncio: las operaciones de DebugHost como corrutinas, para manejar muchas
+placas desde un solo event loop sin un thread por acción.
+
+    host = await AsyncDebugHost.open("socket://127.0.0.1:5555")   # o "/dev/ttyUSB1"
+    await host.program_image(items)
+    await host.reset()
+    frame = await host.step(timeout_s=1.0)
+
+Los puertos serie reales necesitan pyserial-asyncio; socket:// / tcp:// (fake_board,
+un bridge TCP) usan asyncio.open_connection y no dependen de nada extra.
+"""
+import asyncio
+
+from debughost import DUMP_TYPE_OF, P_RECORD
+from framer import Framer
+from pipe_decode import PIPE_WORDS
+
+
+class AsyncDebugHost:
+    """
+    Un comando a la vez por placa (asyncio.Lock). Si una llamada se cancela o vence
+    su timeout esperando el frame, ese frame queda adeudado y se descarta antes del
+    próximo comando, así la respuesta vieja nunca se confunde con la nueva.
+    """
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 pipe_words: int = PIPE_WORDS, dm_dump_bytes: int = 64, timeout_s: float = 5.0):
+        self.reader = reader
+        self.writer = writer
+        self.pipe_words = pipe_words
+        self.dm_dump_bytes = dm_dump_bytes
+        self.frame_len = 4 + 4 + pipe_words*4 + 32*4 + dm_dump_bytes
+        self.timeout_s = timeout_s
+
+        self.framer = Framer(None, self.frame_len, off_reg=8 + pipe_words*4)
+        self._lock = asyncio.Lock()
+        self._owed = 0
+
+    @classmethod
+    async def open(cls, url: str, baud: int = 115200, pipe_words: int = PIPE_WORDS,
+                   dm_dump_bytes: int = 64, timeout_s: float = 5.0) -> "AsyncDebugHost":
+        if url.startswith(("socket://", "tcp://")):
+            host, _, port = url.split("://", 1)[1].rpartition(":")
+            reader, writer = await asyncio.open_connection(host, int(port))
+        else:
+            try:
+                import serial_asyncio
+            except ImportError:
+                raise RuntimeError("Para puertos serie hace falta pyserial-asyncio "
+                                   "(pip install pyserial-asyncio)") from None
+            reader, writer = await serial_asyncio.open_serial_connection(url=url, baudrate=baud)
+        return cls(reader, writer, pipe_words, dm_dump_bytes, timeout_s)
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except (OSError, ConnectionError):
+            pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # ---------------- framing ----------------
+    async def _read_frame(self, expect: int | None) -> bytes:
+        fr = self.framer
+        while True:
+            r = fr.poll(expect)
+            if not isinstance(r, int):
+                return r
+            data = await self.reader.read(max(r - (len(fr.buf) - fr.pos), fr.chunk_bytes))
+            if not data:
+                raise ConnectionError("La placa cerró la conexión")
+            fr.feed(data)
+
+    async def _drain_owed(self):
+        # Frames de comandos cancelados / vencidos: si llegan, se tiran
+        while self._owed:
+            try:
+                await asyncio.wait_for(self._read_frame(None), self.timeout_s)
+            except asyncio.TimeoutError:
+                self.framer.timeouts += 1
+                self._owed = 0
+                return
+            self._owed -= 1
+
+    async def _command(self, cmd: str, timeout_s: float | None) -> bytes:
+        async with self._lock:
+            await self._drain_owed()
+            self._owed += 1
+            self.writer.write(cmd.encode("ascii"))
+            await self.writer.drain()
+            try:
+                frame = await asyncio.wait_for(self._read_frame(DUMP_TYPE_OF[cmd]),
+                                               self.timeout_s if timeout_s is None else timeout_s)
+            except asyncio.TimeoutError:
+                self.framer.timeouts += 1
+                raise TimeoutError(f"Timeout esperando frame de '{cmd}'") from None
+            self._owed -= 1
+            return frame
+
+    # ---------------- comandos ----------------
+    async def dump(self, timeout_s: float | None = None) -> bytes:
+        return await self._command("D", timeout_s)
+
+    async def step(self, timeout_s: float | None = None) -> bytes:
+        return await self._command("S", timeout_s)
+
+    async def run(self, timeout_s: float | None = None) -> bytes:
+        return await self._command("G", timeout_s)
+
+    async def reset(self):
+        async with self._lock:
+            self.writer.write(b"R")
+            await self.writer.drain()
+
+    async def program_image(self, items: list[tuple[int, int]], progress=None,
+                            chunk_bytes: int = 4096) -> int:
+        """Igual que DebugHost.program_image; drain() por bloque hace de control de flujo."""
+        n = len(items)
+        buf = bytearray(n * P_RECORD.size)
+        for k, (addr, data) in enumerate(items):
+            P_RECORD.pack_into(buf, k * P_RECORD.size, b"P", addr & 0xFFFFFFFF, data & 0xFFFFFFFF)
+
+        chunk = max(P_RECORD.size, chunk_bytes - chunk_bytes % P_RECORD.size)
+        async with self._lock:
+            for off in range(0, len(buf), chunk):
+                self.writer.write(buf[off:off + chunk])
+                await self.writer.drain()
+                if progress is not None:
+                    progress(min(n, (off + chunk) // P_RECORD.size), n)
+        return n
@@ -0,0 +1,98 @@
+"""
+Benchmark + chequeo del ensamblador: un programa de prueba corre en RV32Sim con los
+resultados esperados (incluye `li` con constantes que esquivan la particularidad de
+lui), y sobre un fuente grande se mide el reensamblado incremental (sin cambios,
+una línea editada, una línea insertada al principio) contra uno desde cero,
+verificando que ambos den la misma imagen.
+
+Uso (desde riscv_debug_gui):
+    python -m bench.assembler [bloques] [repeticiones]
+"""
+import sys
+import time
+
+from assembler import Assembler, assemble
+from sim_host import RV32Sim
+
+from bench.suite import arg_int, timed
+
+_CHECK = """
+.equ BIG, 0x12345678
+        li   x3, BIG            # lui no sirve: instr[19:15] != 0
+        li   x4, 0x1000         # lui + x0
+        li   x5, -0x80000000
+        li   x6, done           # label hacia adelante
+        li   x1, 4
+        sw   x3, 0(zero)
+        lbu  x10, 1(x0)
+loop:   addi x1, x1, -1
+        bnez x1, loop
+        jal  fn
+        j    done
+fn:     addi x21, x0, 42
+        ret
+done:   halt
+        nop
+"""
+
+
+def _check_program():
+    a = assemble(_CHECK)
+    sim = RV32Sim()
+    for k, w in enumerate(a.words):
+        sim.write_imem(a.base + 4*k, w)
+    sim.run(10_000)
+    r = sim.regs
+    exp = {3: 0x12345678, 4: 0x1000, 5: 0x80000000, 6: a.symbols["done"], 10: 0x56, 21: 42,
+           1: a.symbols["fn"] - 4}    # ra = dirección del jal + 4 (jal; j; fn:)
+    bad = {f"x{k}": (hex(r[k]), hex(v)) for k, v in exp.items() if r[k] != v}
+    if bad or not sim.halt_seen:
+        raise SystemExit(f"[ERROR] programa de prueba: {bad} halt={sim.halt_seen}")
+
+
+def _block(k: int) -> str:
+    return (f"blk{k}:  li   t0, {k * 977}\n"
+            f"        addi t1, t0, {k % 2000}\n"
+            f"        sw   t1, {4 * (k % 256)}(zero)\n"
+            f"        lw   t2, {4 * (k % 256)}(zero)\n"
+            f"        beq  t1, t2, blk{k + 1}\n"
+            f"        xor  t3, t1, t2\n")
+
+
+def main(argv: list[str]) -> int:
+    blocks = arg_int(argv, 1, 2000)
+    reps = arg_int(argv, 2, 5)
+
+    _check_program()
+    print("[OK] programa de prueba: registros esperados en RV32Sim")
+
+    src = "".join(_block(k) for k in range(blocks)) + f"blk{blocks}: halt\n"
+    lines = src.splitlines()
+    edited = "\n".join(lines[:7] + ["        addi t1, t0, -7"] + lines[8:])
+    inserted = "        nop\n" + src
+
+    dt_full, ref = timed(lambda: Assembler().assemble(src), reps)
+    print(f"{len(lines)} líneas, {len(ref.words)} words")
+    print(f"{'desde cero':22s} {dt_full*1e3:8.2f} ms")
+
+    for name, text in (("sin cambios", src), ("una línea editada", edited), ("línea insertada", inserted)):
+        def inc(text=text):
+            asm = Assembler()
+            asm.assemble(src)
+            t0 = time.perf_counter()
+            out = asm.assemble(text)
+            return time.perf_counter() - t0, out
+        runs = [inc() for _ in range(reps)]
+        dt = sum(t for t, _ in runs) / reps
+        out = runs[-1][1]
+        fresh = Assembler().assemble(text)
+        if out.words != fresh.words or out.symbols != fresh.symbols:
+            raise SystemExit(f"[ERROR] {name}: la imagen incremental difiere de la completa")
+        print(f"{name:22s} {dt*1e3:8.2f} ms  speedup={dt_full / dt:5.1f}x  "
+              f"(codificadas {out.encoded}, reusadas {out.reused})")
+    print("[OK] reensamblado incremental idéntico al completo")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,111 @@
+"""
+AsyncDebugHost contra N fake_board en paralelo desde un solo event loop.
+Verifica que cada placa devuelva los mismos frames que SimHost (sincrónico) y que
+un step cancelado o vencido no desincronice la línea; mide frames/s agregados.
+
+Uso (desde riscv_debug_gui):
+    python -m bench.async_hosts [n_boards] [steps] [baud]
+"""
+import asyncio
+import sys
+import time
+
+from async_host import AsyncDebugHost
+from fake_board import FakeBoard
+from sim_host import SimHost
+
+from bench.suite import arg_int
+
+# addi x1,x1,1 ; sw x1,0(x0) ; jal x0,-8
+_PROG = [(0, 0x00108093), (4, 0x00102023), (8, 0xFF9FF06F)]
+
+
+def _reference(steps: int) -> list[bytes]:
+    h = SimHost()
+    h.program_image(_PROG)
+    h.send_cmd("R")
+    out = []
+    for _ in range(steps):
+        h.send_cmd("S")
+        out.append(h.wait_dump())
+    h.close()
+    return out
+
+
+async def _drive(url: str, steps: int) -> list[bytes]:
+    async with await AsyncDebugHost.open(url, timeout_s=2.0) as host:
+        await host.program_image(_PROG)
+        await host.reset()
+        return [await host.step() for _ in range(steps)]
+
+
+async def _check_cancel(board: FakeBoard) -> None:
+    async with await AsyncDebugHost.open(board.url, timeout_s=2.0) as host:
+        await host.program_image(_PROG)
+        await host.reset()
+        first = await host.step()
+        base = board.frames
+
+        # timeout más corto que un frame: el frame queda adeudado y se descarta
+        try:
+            await host.step(timeout_s=0.001)
+            raise SystemExit("[ERROR] se esperaba TimeoutError")
+        except TimeoutError:
+            pass
+
+        # cancelación a mitad de frame: apenas la placa procesó el 'S'
+        t = asyncio.create_task(host.step())
+        while board.frames < base + 2:
+            await asyncio.sleep(0.001)
+        t.cancel()
+        try:
+            await t
+        except asyncio.CancelledError:
+            pass
+
+        d = await host.dump()
+        if d[1] != 3:
+            raise SystemExit(f"[ERROR] tras cancelar llegó dump_type={d[1]} en vez de MANUAL")
+        nxt = await host.step()
+        # 3 STEPs ejecutados desde `first` (1 normal + 1 vencido + 1 cancelado) -> PC avanzó 3 instrucciones
+        pc0 = int.from_bytes(first[4:8], "little")
+        pc1 = int.from_bytes(nxt[4:8], "little")
+        if pc1 != (pc0 + 3 * 4) % 12:
+            raise SystemExit(f"[ERROR] PC inesperado tras cancelación: 0x{pc0:x} -> 0x{pc1:x}")
+
+
+async def _main(n_boards: int, steps: int, baud: int) -> int:
+    ref = _reference(steps)
+    frame_len = len(ref[0])
+    wire_fps = baud / 10 / frame_len
+
+    boards = [FakeBoard(baud=baud, latency_s=1e-3) for _ in range(n_boards)]
+    try:
+        t0 = time.perf_counter()
+        results = await asyncio.gather(*(_drive(b.url, steps) for b in boards))
+        dt = time.perf_counter() - t0
+        for k, frames in enumerate(results):
+            if frames != ref:
+                raise SystemExit(f"[ERROR] placa {k}: frames distintos a SimHost")
+        total = n_boards * steps
+        print(f"[OK] {n_boards} placas x {steps} steps, frames idénticos a SimHost")
+        print(f"[BENCH] {total / dt:8.1f} frames/s agregados  ({total / dt / n_boards:.1f} por placa, "
+              f"límite de cable {wire_fps:.1f})")
+
+        await _check_cancel(boards[0])
+        print("[OK] timeout y cancelación: la línea sigue sincronizada")
+    finally:
+        for b in boards:
+            b.close()
+    return 0
+
+
+def main(argv: list[str]) -> int:
+    n_boards = arg_int(argv, 1, 8)
+    steps = arg_int(argv, 2, 40)
+    baud = arg_int(argv, 3, 115200)
+    return asyncio.run(_main(n_boards, steps, baud))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,106 @@
+"""
+debug_server contra una fake_board a baud real: varios clientes DebugHost por tcp://
+comparten la placa. Verifica
+  - cache: un 'D' tras un 'S' sale del cache (idéntico salvo dump_type) sin tocar la placa,
+  - fan-out: un suscriptor 'W' recibe los frames de los demás,
+  - equidad: dos clientes haciendo STEP a la vez reciben ~la misma cantidad de frames,
+y mide la latencia de un 'D' cacheado vs uno que va a la placa.
+
+Uso (desde riscv_debug_gui):
+    python -m bench.debug_server [segundos] [baud]
+"""
+import sys
+import threading
+import time
+
+from debug_server import DebugServer
+from debughost import DebugHost
+from fake_board import FakeBoard
+from pipe_decode import PIPE_WORDS
+
+from bench.suite import arg_int
+
+# addi x1,x1,1 ; sw x1,0(x0) ; jal x0,-8
+_PROG = [(0, 0x00108093), (4, 0x00102023), (8, 0xFF9FF06F)]
+
+
+def _stepper(url: str, stop: threading.Event, counts: list, k: int):
+    h = DebugHost(url, 0, PIPE_WORDS)
+    try:
+        while not stop.is_set():
+            h.send_cmd("S")
+            h.read_frame(5.0, expect=1)
+            counts[k] += 1
+    finally:
+        h.close()
+
+
+def main(argv: list[str]) -> int:
+    secs = float(argv[1]) if len(argv) > 1 else 3.0
+    baud = arg_int(argv, 2, 115200)
+
+    board = FakeBoard(baud=baud, latency_s=1e-3)
+    owner = DebugHost(board.url, baud, PIPE_WORDS)
+    srv = DebugServer(owner, ("127.0.0.1", 0), log=lambda s: None)
+    try:
+        a = DebugHost(srv.url, 0, PIPE_WORDS)
+        b = DebugHost(srv.url, 0, PIPE_WORDS)
+        watcher = DebugHost(srv.url, 0, PIPE_WORDS)
+        watcher.send_cmd("W")
+        time.sleep(0.05)
+
+        a.program_image(_PROG)
+        a.send_cmd("R")
+
+        # --- cache ---
+        t0 = time.perf_counter()
+        a.send_cmd("D")
+        a.read_frame(5.0, expect=3)
+        dt_board = time.perf_counter() - t0
+
+        a.send_cmd("S")
+        f = a.read_frame(5.0, expect=1)
+        before = board.frames
+        t0 = time.perf_counter()
+        b.send_cmd("D")
+        g = b.read_frame(5.0, expect=3)
+        dt_cache = time.perf_counter() - t0
+        if g[1] != 3 or g[:1] + g[2:] != f[:1] + f[2:] or board.frames != before:
+            raise SystemExit("[ERROR] el 'D' cacheado no coincide o fue a la placa")
+        print(f"[OK] cache: 'D' {dt_cache*1e3:.2f} ms (placa: {dt_board*1e3:.1f} ms)")
+
+        # --- fan-out: el watcher vio el D inicial de a, el S de a y el D (cache) de b ---
+        seen = [watcher.read_frame(2.0) for _ in range(3)]
+        if seen[1] != f or seen[2] != g:
+            raise SystemExit("[ERROR] fan-out: el suscriptor no recibió los frames esperados")
+        print("[OK] fan-out: el suscriptor recibió los frames de los otros clientes")
+        watcher.send_cmd("w")
+
+        # --- equidad ---
+        stop = threading.Event()
+        counts = [0, 0]
+        ths = [threading.Thread(target=_stepper, args=(srv.url, stop, counts, k)) for k in range(2)]
+        for th in ths:
+            th.start()
+        time.sleep(secs)
+        stop.set()
+        for th in ths:
+            th.join()
+        total = sum(counts)
+        print(f"[BENCH] 2 clientes STEP {secs:.0f} s: {counts} frames  "
+              f"({total / secs:.1f} frames/s, límite de cable {baud / 10 / owner.frame_len:.1f})")
+        if min(counts) < 0.8 * max(counts):
+            raise SystemExit("[ERROR] reparto injusto entre clientes")
+        print(f"[OK] reparto justo  stats={srv.stats()}")
+
+        for h in (a, b, watcher):
+            h.close()
+    finally:
+        srv.close()
+        owner.close()
+        board.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
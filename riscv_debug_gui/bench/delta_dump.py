@@ -0,0 +1,167 @@
+"""
+Dumps delta ('K'): un stream de STEPs con delta tiene que reconstruirse igual al stream
+sin delta (completo, parcial y con ventana de DMEM, cruzando 'R' y 'M'), recuperarse
+de un frame perdido con el próximo keyframe, y mandar varias veces menos bytes a
+igual baud. Se mide contra una fake_board y a través de debug_server.
+
+Uso (desde riscv_debug_gui):
+    python -m bench.delta_dump [pasos] [key_every] [baud]
+"""
+import sys
+import time
+
+from debug_server import DebugServer
+from debughost import DebugHost
+from fake_board import FakeBoard
+from framer import SEC_MEM, SEC_PC, SEC_PIPE, SEC_REGS
+from pipe_decode import PIPE_WORDS
+from sim_host import SimHost
+
+from bench.suite import arg_int, load_asm, step_frames
+
+# contador en x1 guardado en DMEM: cambia un registro y unos pocos bytes por vuelta
+_PROG = """
+    li   x1, 0
+    li   x2, 100000
+loop:
+    addi x1, x1, 1
+    sw   x1, 0(x0)
+    sw   x1, 8(x0)
+    bne  x1, x2, loop
+    ebreak
+"""
+
+# (nombre, máscara, addr, len) como en bench.partial_dump; None = frame completo
+CASES = [
+    ("completo", None),
+    ("regs", (SEC_PC | SEC_MEM | SEC_REGS, 0, None)),
+    ("pipeline", (SEC_PC | SEC_MEM | SEC_PIPE, 0, None)),
+    ("dmem 16B @0x4", (SEC_MEM, 0x4, 16)),
+]
+
+
+def _steps_reset(host: DebugHost, n: int) -> list[bytes]:
+    # n pasos, 'R' (fuerza keyframe) y 3 pasos más
+    out = step_frames(host, n)
+    host.send_cmd("R")
+    return out + step_frames(host, 3)
+
+
+def _equiv(n: int, key_every: int):
+    for name, sections in CASES:
+        a = SimHost(cycle_accurate=True)
+        b = SimHost(cycle_accurate=True)
+        for h in (a, b):
+            load_asm(h, _PROG)
+            if sections is not None:
+                h.set_sections(*sections)
+        b.set_delta(key_every)
+        ref = _steps_reset(a, n)
+        got = _steps_reset(b, n)
+        if got != ref:
+            raise SystemExit(f"[ERROR] {name}: frames reconstruidos distintos de los normales")
+        if b.framer.delta_frames == 0:
+            raise SystemExit(f"[ERROR] {name}: no llegó ningún frame delta")
+        print(f"[OK] {name:14s} {n + 3} STEPs iguales ({b.framer.delta_frames} delta, "
+              f"{b.framer.wire_bytes} B vs {a.framer.wire_bytes} B)")
+
+    # 'M' en el medio: el próximo dump es keyframe y sigue cerrando
+    a = SimHost(cycle_accurate=True)
+    b = SimHost(cycle_accurate=True)
+    for h in (a, b):
+        load_asm(h, _PROG)
+    b.set_delta(key_every)
+    step_frames(a, 10)
+    step_frames(b, 10)
+    for h in (a, b):
+        h.set_sections(SEC_PC | SEC_REGS)
+    if step_frames(a, 10) != step_frames(b, 10):
+        raise SystemExit("[ERROR] delta después de 'M' distinto")
+    print("[OK] keyframe después de 'M'")
+
+    # frame perdido: el delta siguiente se tira y DebugHost pide un keyframe
+    step_frames(a, 5)
+    step_frames(b, 4)
+    b.send_cmd("S")
+    b.ser.read(5)   # se pierden los primeros bytes de un frame
+    misses = b.framer.delta_misses
+    b.send_cmd("S")
+    try:
+        b.read_frame(0.5, expect=1)
+        raise SystemExit("[ERROR] se aceptó un delta sin referencia")
+    except TimeoutError:
+        pass
+    if b.framer.delta_misses == misses:
+        raise SystemExit("[ERROR] el frame perdido no invalidó la referencia")
+    step_frames(a, 1)
+    if step_frames(a, 10) != step_frames(b, 10):
+        raise SystemExit("[ERROR] no se recuperó con el keyframe")
+    print(f"[OK] frame perdido: {b.framer.delta_misses - misses} delta tirado(s) y recuperado con keyframe")
+
+
+def main(argv: list[str]) -> int:
+    n = arg_int(argv, 1, 200)
+    key_every = arg_int(argv, 2, 32)
+    baud = arg_int(argv, 3, 115200)
+
+    _equiv(n, key_every)
+
+    # --- cable a baud real: stream de 'S' y 'N' cada 1 ---
+    board = FakeBoard(baud=baud, latency_s=1e-3, cycle_accurate=True)
+    host = DebugHost(board.url, baud, PIPE_WORDS)
+    try:
+        load_asm(host, _PROG)
+        for name, sections in CASES:
+            host.set_sections(*(sections or ()))
+            res = []
+            for k in (0, key_every):
+                host.set_delta(k)
+                w0 = host.framer.wire_bytes
+                t0 = time.perf_counter()
+                step_frames(host, n)
+                dt = time.perf_counter() - t0
+                res.append((host.framer.wire_bytes - w0, dt))
+                w0 = host.framer.wire_bytes
+                t0 = time.perf_counter()
+                host.step(n, every=1)
+                res.append((host.framer.wire_bytes - w0, time.perf_counter() - t0))
+            (b_s, t_s), (b_n, t_n), (bd_s, td_s), (bd_n, td_n) = res
+            print(f"[BENCH] {name:14s} S x{n}: {b_s / n:5.0f} -> {bd_s / n:5.1f} B/paso "
+                  f"{t_s * 1e3:7.1f} -> {td_s * 1e3:7.1f} ms ({t_s / td_s:4.1f}x)   "
+                  f"N cada 1: {b_n / n:5.0f} -> {bd_n / n:5.1f} B/paso ({b_n / bd_n:4.1f}x bytes, "
+                  f"{t_n / td_n:4.1f}x tiempo)")
+        host.set_delta(0)
+        host.set_sections()
+    finally:
+        host.close()
+
+    board.close()
+
+    # --- debug_server con delta hacia la placa: los clientes reciben frames completos ---
+    ref_host = SimHost(cycle_accurate=True)
+    load_asm(ref_host, _PROG)
+    ref = step_frames(ref_host, 50)
+    board = FakeBoard(baud=baud, latency_s=1e-3, cycle_accurate=True)
+    owner = DebugHost(board.url, baud, PIPE_WORDS)
+    owner.set_delta(key_every)
+    srv = DebugServer(owner, ("127.0.0.1", 0), log=lambda s: None)
+    try:
+        cli = DebugHost(srv.url, 0, PIPE_WORDS)
+        cli.set_delta(key_every)    # se ignora: por TCP van completos
+        load_asm(cli, _PROG)
+        got = step_frames(cli, 50)
+        cli.close()
+        if got != ref:
+            raise SystemExit("[ERROR] frames vía debug_server distintos")
+        if owner.framer.delta_frames == 0:
+            raise SystemExit("[ERROR] el dueño no recibió frames delta")
+        print(f"[OK] vía debug_server: 50 STEPs completos ({owner.framer.delta_frames} delta hacia la placa)")
+    finally:
+        srv.close()
+        owner.close()
+        board.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,90 @@
+"""
+Benchmark + chequeo del desensamblador: costo por frame de anotar IF/ID e ID/EX
+(memoizado vs sin cache) sobre frames reales de sim://pipeline, y verificación de
+que disasm -> assembler devuelve la misma word y de que la instrucción reconstruida
+de ID/EX coincide con la de IMEM en esa dirección.
+
+Uso (desde riscv_debug_gui):
+    python -m bench.disasm [frames] [prog.mem]
+"""
+import random
+import sys
+import time
+
+from assembler import INSTR_HALT, assemble
+from disasm import decode, disasm, idex_disasm, idex_word
+from dump_frame import DumpFrame
+from program_parser import parse_program_file
+from sim_host import SimHost
+
+from bench.suite import arg_int
+
+
+def _roundtrip(n: int):
+    rnd = random.Random(0)
+    checked = 0
+    for _ in range(n):
+        w = rnd.getrandbits(32)
+        text, _ = decode(w)
+        if text.startswith((".word", "blt", "bge", "auipc")):
+            continue    # sin equivalente en el ensamblador (no están en el CPU)
+        if assemble(text).words[0] != w:
+            raise SystemExit(f"[ERROR] 0x{w:08x} -> {text!r} no vuelve a la misma word")
+        checked += 1
+    return checked
+
+
+def main(argv: list[str]) -> int:
+    n_frames = arg_int(argv, 1, 5000)
+    path = argv[2] if len(argv) > 2 else "src/prog1.mem"
+
+    print(f"[OK] roundtrip disasm -> assembler: {_roundtrip(100_000)} words válidas")
+
+    items = parse_program_file(path)
+    imem = dict(items)
+    h = SimHost(cycle_accurate=True)
+    h.program_image(items)
+    h.send_cmd("R")
+    frames = []
+    for _ in range(n_frames):
+        h.send_cmd("S")
+        f = DumpFrame(h.wait_dump())
+        if f.halt_seen:
+            h.send_cmd("R")
+        frames.append((f.ifid["instr"], f.ifid["pc"], f.idex["pc"], tuple(f.pipe_words[8:11])))
+    h.close()
+
+    for instr, pc, idex_pc, (w8, w9, w10) in frames:
+        exp = imem.get(idex_pc, 0x13)
+        got = idex_word(w8, w9, w10)
+        if w10 & 1 and got != exp and not (got is None and exp == INSTR_HALT):
+            raise SystemExit(f"[ERROR] ID/EX @0x{idex_pc:x}: reconstruida {got} != 0x{exp:08x}")
+    print(f"[OK] ID/EX reconstruida = IMEM en {len(frames)} frames")
+
+    def annotate():
+        for instr, pc, _, ws in frames:
+            disasm(instr, pc)
+            idex_disasm(*ws)
+
+    t0 = time.perf_counter()
+    annotate()
+    dt_cached = (time.perf_counter() - t0) / len(frames)
+    info = decode.cache_info()
+
+    decode.cache_clear()
+    idex_word.cache_clear()
+    t0 = time.perf_counter()
+    for instr, pc, _, ws in frames:
+        decode.__wrapped__(instr)
+        w = idex_word.__wrapped__(*ws)
+        if w is not None:
+            decode.__wrapped__(w)
+    dt_raw = (time.perf_counter() - t0) / len(frames)
+
+    print(f"[BENCH] anotación por frame: memoizado {dt_cached*1e6:.2f} us  "
+          f"sin cache {dt_raw*1e6:.2f} us  ({dt_raw / dt_cached:.1f}x)  {info}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
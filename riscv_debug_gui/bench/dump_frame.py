@@ -0,0 +1,115 @@
+"""
+Micro-benchmark: parseo de frames de dump con el camino dict (struct.unpack a
+listas + decode_pipe_words) vs DumpFrame (memoryview, decodificación perezosa).
+
+Los frames salen del modelo de pipeline (un STEP por ciclo) sobre un programa .mem.
+
+Uso (desde riscv_debug_gui):
+    python -m bench.dump_frame [prog.mem] [n_frames]
+"""
+import struct
+import sys
+import time
+import tracemalloc
+
+from dump_frame import DumpFrame
+from pipe_decode import PIPE_WORDS, decode_pipe_words
+from program_parser import parse_program_file
+
+from bench.suite import arg_int, model_frames
+
+DM_BYTES = 64
+
+
+def parse_dict(frame: bytes) -> dict:
+    # Mismo camino que el parse_frame original de MainWindow.run_action
+    flags = frame[2]
+    off = 4
+    pc = struct.unpack_from("<I", frame, off)[0]
+    off += 4
+    pipe_words = list(struct.unpack_from(f"<{PIPE_WORDS}I", frame, off))
+    off += PIPE_WORDS * 4
+    regs = list(struct.unpack_from("<32I", frame, off))
+    off += 32 * 4
+    return {
+        "dump_type": frame[1], "flags": flags, "pipe_empty": (flags >> 1) & 1,
+        "halt_seen": flags & 1, "pad": frame[3], "pc": pc,
+        "pipe_words": pipe_words, "pipe_decoded": decode_pipe_words(pipe_words),
+        "regs": regs, "mem": frame[off:off + DM_BYTES],
+    }
+
+
+def parse_lazy(frame: bytes) -> DumpFrame:
+    return DumpFrame(frame, PIPE_WORDS, DM_BYTES)
+
+
+def record_frames(path: str, n: int) -> list[bytes]:
+    return model_frames(parse_program_file(path), n, PIPE_WORDS, DM_BYTES)
+
+
+def check_equivalence(frames: list[bytes]):
+    for fr in frames:
+        d = parse_dict(fr)
+        f = parse_lazy(fr)
+        pd = d["pipe_decoded"]
+        ok = (d["pc"] == f.pc and d["flags"] == f.flags and d["halt_seen"] == f.halt_seen
+              and d["pipe_empty"] == f.pipe_empty and list(f.regs) == d["regs"]
+              and list(f.pipe_words) == d["pipe_words"] and bytes(f.mem) == d["mem"]
+              and pd["ifid"] == f.ifid and pd["idex"] == f.idex
+              and pd["exmem"] == f.exmem and pd["memwb"] == f.memwb)
+        if not ok:
+            raise SystemExit(f"[ERROR] DumpFrame difiere del camino dict en pc=0x{d['pc']:08x}")
+
+
+def _time(cases: list[tuple[str, object]], frames: list[bytes], reps: int = 7) -> list[float]:
+    # pasadas intercaladas y la mejor de cada caso: así el ruido de la máquina pega
+    # parejo en todos y no decide el orden en que se miden
+    best = [float("inf")] * len(cases)
+    for _ in range(reps):
+        for k, (_label, fn) in enumerate(cases):
+            t0 = time.perf_counter()
+            for fr in frames:
+                fn(fr)
+            best[k] = min(best[k], time.perf_counter() - t0)
+    for (label, _fn), dt in zip(cases, best):
+        print(f"{label:<28} {dt*1e3:9.2f} ms  {dt / len(frames) * 1e6:7.2f} us/frame")
+    return best
+
+
+def _mem(label: str, fn, frames: list[bytes]):
+    # Memoria retenida al guardar todos los frames parseados (ej. un trace en RAM)
+    tracemalloc.start()
+    keep = [fn(fr) for fr in frames]
+    cur, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {cur / 1024:9.1f} KiB  {cur / len(keep):7.0f} B/frame")
+
+
+def main(argv: list[str]) -> int:
+    path = argv[1] if len(argv) > 1 else "src/prog1.mem"
+    n = arg_int(argv, 2, 20000)
+
+    frames = record_frames(path, n)
+    check_equivalence(frames[:2000])
+    print(f"[BENCH] {path}: {n} frames de {len(frames[0])} bytes (equivalencia OK)")
+
+    def lazy_header(fr):
+        f = parse_lazy(fr)
+        return f.pc, f.flags
+
+    def lazy_full(fr):
+        f = parse_lazy(fr)
+        return f.pc, f.regs[31], f.ifid, f.idex, f.exmem, f.memwb
+
+    t_dict, t_hdr, t_full = _time([("dict (original)", parse_dict),
+                                   ("DumpFrame, solo header", lazy_header),
+                                   ("DumpFrame, todas las etapas", lazy_full)], frames)
+    print(f"[BENCH] speedup header={t_dict / t_hdr:.1f}x  completo={t_dict / t_full:.2f}x")
+
+    _mem("dict (original)", parse_dict, frames)
+    _mem("DumpFrame", parse_lazy, frames)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
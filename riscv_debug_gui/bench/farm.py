@@ -0,0 +1,73 @@
+"""
+Escalado de farm.Farm con 1, 2, 4, 8 placas (fake_board, a baud real) corriendo el
+mismo lote de programas. Verifica que cada resultado coincida con el de un SimHost
+limpio para ese programa, sin importar en qué placa ni en qué orden corrió. El
+speedup ideal con n placas es trabajos / ceil(trabajos / n) (la última tanda puede
+quedar incompleta); con lotes chicos la cola manda más que el paralelismo.
+
+Uso (desde riscv_debug_gui):
+    python -m bench.farm [repeticiones_del_lote] [baud] [prog.mem ...]
+"""
+import glob
+import math
+import sys
+import time
+
+from debughost import DebugHost
+from fake_board import FakeBoard
+from farm import Farm, frame_result, run_job
+from pipe_decode import PIPE_WORDS
+from program_parser import parse_program_file
+from sim_host import SimHost
+
+from bench.suite import arg_int
+
+_KEYS = ("pc", "flags", "regs", "dmem")
+
+
+def _reference(programs: list[str]) -> dict[str, dict]:
+    ref = {}
+    for p in programs:
+        h = SimHost()
+        ref[p] = frame_result(run_job(h, parse_program_file(p), 5.0), PIPE_WORDS, 64)
+        h.close()
+    return ref
+
+
+def main(argv: list[str]) -> int:
+    reps = arg_int(argv, 1, 16)
+    baud = arg_int(argv, 2, 115200)
+    programs = argv[3:] or sorted(glob.glob("src/prog*.mem"))
+    batch = programs * reps
+    ref = _reference(programs)
+    print(f"[BENCH] {len(batch)} trabajos ({len(programs)} programas x {reps}) baud={baud}")
+
+    base = None
+    for n in (1, 2, 4, 8):
+        boards = [FakeBoard(baud=baud, latency_s=1e-3) for _ in range(n)]
+        hosts = [(f"board{k}", DebugHost(b.url, baud, PIPE_WORDS)) for k, b in enumerate(boards)]
+        try:
+            t0 = time.perf_counter()
+            results = Farm(hosts).run(batch)
+            dt = time.perf_counter() - t0
+        finally:
+            for _, h in hosts:
+                h.close()
+            for b in boards:
+                b.close()
+
+        for r in results:
+            if not r["ok"] or any(r[k] != ref[r["program"]][k] for k in _KEYS):
+                raise SystemExit(f"[ERROR] {r['program']} @ {r['host']}: resultado distinto a SimHost")
+        jps = len(batch) / dt
+        base = base or jps
+        used = len({r["host"] for r in results})
+        ideal = len(batch) / math.ceil(len(batch) / n)
+        print(f"placas={n}  {jps:7.2f} trabajos/s  speedup={jps / base:4.2f}x  "
+              f"(ideal {ideal:4.2f}x, placas usadas={used})")
+    print("[OK] todos los resultados coinciden con SimHost")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,117 @@
+"""
+Benchmark + chequeo del framer: lectura byte a byte (sync_to_magic + read_exact,
+la implementación anterior) vs framer.Framer, sobre un stream en memoria con
+basura intercalada entre frames (incluye bytes 0xD0 sueltos y headers falsos).
+Cuenta llamadas a read() (≈ syscalls en un puerto real) y frames correctos.
+
+Uso (desde riscv_debug_gui):
+    python -m bench.framer [n_frames] [basura_max_bytes]
+"""
+import random
+import sys
+import time
+
+from framer import MAGIC, Framer
+from pipe_decode import PIPE_WORDS
+from sim_host import RV32Sim
+
+from bench.suite import MemSerial, arg_int
+
+
+# --- implementación anterior (debughost/gui antes del framer) ---
+def _read_exact(ser, n: int) -> bytes:
+    data = bytearray()
+    while len(data) < n:
+        chunk = ser.read(n - len(data))
+        if not chunk:
+            raise TimeoutError
+        data += chunk
+    return bytes(data)
+
+
+def _sync_to_magic(ser, deadline_s: float) -> None:
+    while time.time() < deadline_s:
+        b = ser.read(1)
+        if b and b[0] == MAGIC:
+            return
+        if not b:
+            raise TimeoutError
+    raise TimeoutError
+
+
+def _legacy_frames(ser, frame_len: int) -> list[bytes]:
+    out = []
+    while True:
+        try:
+            _sync_to_magic(ser, time.time() + 5.0)
+            out.append(bytes([MAGIC]) + _read_exact(ser, frame_len - 1))
+        except TimeoutError:
+            return out
+
+
+def _framer_frames(ser, frame_len: int) -> tuple[list[bytes], Framer]:
+    fr = Framer(ser, frame_len, off_reg=8 + PIPE_WORDS * 4)
+    out = []
+    while ser.in_waiting or fr.pos < len(fr.buf):
+        try:
+            out.append(fr.read_frame(timeout_s=0.01))
+        except TimeoutError:
+            break
+    return out, fr
+
+
+def _stream(n: int, junk_max: int, seed: int = 1) -> tuple[bytes, list[bytes]]:
+    rng = random.Random(seed)
+    sim = RV32Sim()
+    sim.write_imem(0, 0x00108093)   # addi x1,x1,1
+    sim.write_imem(4, 0xFFDFF06F)   # jal x0,-4
+    frames = []
+    out = bytearray()
+    for _ in range(n):
+        junk = bytearray(rng.randbytes(rng.randint(0, junk_max)))
+        for k in range(0, len(junk), 7):
+            junk[k] = MAGIC          # muchos MAGIC falsos
+        if junk and rng.random() < 0.3:
+            junk[-1:] = bytes([MAGIC, 1, 0, 0])   # header válido cortado por un frame real
+            junk = junk[:-3]
+        out += junk
+        sim.step()
+        f = sim.dump_frame(1, PIPE_WORDS, 64)
+        frames.append(f)
+        out += f
+    return bytes(out), frames
+
+
+def main(argv: list[str]) -> int:
+    n = arg_int(argv, 1, 2000)
+    junk_max = arg_int(argv, 2, 64)
+    frame_len = 4 + 4 + PIPE_WORDS * 4 + 32 * 4 + 64
+
+    data, ref = _stream(n, junk_max)
+    print(f"[BENCH] frames={n} bytes={len(data)} basura≤{junk_max} B entre frames")
+
+    ser = MemSerial(data)
+    t0 = time.perf_counter()
+    old = _legacy_frames(ser, frame_len)
+    dt_old = time.perf_counter() - t0
+    ok_old = len(set(old) & set(ref))
+    print(f"byte a byte  {dt_old*1e3:9.1f} ms  read()={ser.reads:>8}  frames={len(old):>6}  correctos={ok_old}")
+
+    ser = MemSerial(data)
+    t0 = time.perf_counter()
+    new, fr = _framer_frames(ser, frame_len)
+    dt_new = time.perf_counter() - t0
+    print(f"Framer       {dt_new*1e3:9.1f} ms  read()={ser.reads:>8}  frames={len(new):>6}  {fr.stats()}")
+
+    # Los frames reales deben salir todos y en orden; sólo se admiten de más los que
+    # caen enteros dentro de la basura (no puede pasar con basura < frame_len)
+    it = iter(new)
+    if not all(any(f == g for g in it) for f in ref):
+        raise SystemExit("[ERROR] el framer perdió o desordenó frames reales")
+    print(f"[OK] {len(ref)}/{len(ref)} frames reales recuperados  "
+          f"speedup={dt_old / dt_new:.1f}x  read() {ser.reads / max(1, len(new)):.2f}/frame")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,304 @@
+"""
+top_debug_system (HDL) contra SimHost ciclo a ciclo: el mismo guión de bytes por la
+UART tiene que dar exactamente los mismos bytes de vuelta. El guión se arma por casos
+(uno por comando o grupo de comandos, sobre src/prog1.mem) que corren en orden sobre
+el mismo estado. El guión y lo esperado quedan en el directorio de salida (cmds.txt
+para project_1.srcs/sim_1/new/tb_debug_uart.v y expected.hex); si hay iverilog se
+compila y corre el testbench y se compara byte a byte, con el resultado por caso y el
+comando donde aparece la primera diferencia. Sin iverilog queda para correrlo a mano
+(xsim, con -d SIM).
+
+Uso (desde riscv_debug_gui):
+    python -m bench.hdl_equiv [programa.mem] [dir_salida]
+"""
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+
+from debughost import DMEM_BYTES, K_RECORD, M_RECORD, P_RECORD, X_RECORD
+from framer import SEC_ALL, SEC_MEM, SEC_PC, SEC_PIPE, SEC_REGS
+from program_parser import parse_program_file
+from sim_host import SimHost
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_GUI = os.path.dirname(_HERE)
+_HDL = os.path.join(os.path.dirname(_GUI), "project_1.srcs")
+_TB = os.path.join(_HDL, "sim_1", "new", "tb_debug_uart.v")
+_SRC = os.path.join(_HDL, "sources_1", "new")
+
+# top.v es el otro top (sin debug_unit_uart): no entra en la compilación
+_SKIP_SRC = {"top.v"}
+
+# tiempos de byte sin actividad en uart_tx para dar un comando por terminado (0 = el del TB)
+_QUIET = 0
+_QUIET_RUN = 0x40
+
+# FIFO RX de top_debug_system (2**RX_FIFO_W)
+_RX_FIFO = 32
+
+# (etiqueta, bytes a mandar, espera); espera None = el próximo comando sale pegado
+Cmd = tuple[str, bytes, int | None]
+
+
+def _c(addr: int, n_words: int) -> bytes:
+    return b"C" + struct.pack("<II", addr, n_words)
+
+
+def _n(n: int, every: int) -> bytes:
+    return b"N" + struct.pack("<II", n, every)
+
+
+def _base(items: list[tuple[int, int]]) -> list[Cmd]:
+    # P seguidos (la FSM los consume a medida que llegan), R/T/D y S sueltos
+    out = [(f"P 0x{a:03x}", P_RECORD.pack(b"P", a, w), None) for a, w in items]
+    out[-1] = out[-1][:2] + (_QUIET,)
+    out += [("R", b"R", _QUIET), ("T", b"T", _QUIET), ("D", b"D", _QUIET)]
+    out += [(f"S #{k}", b"S", _QUIET) for k in range(5)]
+    return out
+
+
+def _stream(items: list[tuple[int, int]]) -> list[Cmd]:
+    # como stream(): S/D pegados sin esperar respuesta. El primero sale enseguida y los
+    # otros quedan en la FIFO RX mientras se dumpea: 2**RX_FIFO_W - 1 pendientes, el
+    # máximo que admite top_debug_system
+    out: list[Cmd] = [(f"S/D seguido #{k}", b"SD"[k % 2:k % 2 + 1], None) for k in range(_RX_FIFO)]
+    out[-1] = out[-1][:2] + (_QUIET,)
+    # un 'P' que llega mientras se dumpea y un 'S' detrás: los argumentos también esperan
+    out += [("D antes de P", b"D", None),
+            ("P 0x3fc durante el dump", P_RECORD.pack(b"P", 0x3FC, 0x00000013), None),
+            ("S detrás de P", b"S", _QUIET)]
+    return out
+
+
+def _cksum(items: list[tuple[int, int]]) -> list[Cmd]:
+    # 'C': eco de addr/n_words + checksum; con vuelta al final de IMEM, vacío y sin alinear
+    return [
+        ("C programa", _c(items[0][0], len(items)), _QUIET),
+        ("C con vuelta 0x3f0/8", _c(0x3F0, 8), _QUIET),
+        ("C 0 words", _c(0x10, 0), _QUIET),
+        ("C sin alinear 0x6/3", _c(0x6, 3), _QUIET),
+        # un 'S' pegado espera en la FIFO RX mientras se recorre IMEM
+        ("C IMEM entera", _c(0, 256), None),
+        ("S detrás de C", b"S", _QUIET),
+    ]
+
+
+def _nstep(items: list[tuple[int, int]]) -> list[Cmd]:
+    # 'N' por ST_P_ADDR/ST_P_DATA: con muestras, sin muestras, n = 0 / 1 y every = n
+    return [
+        ("R", b"R", _QUIET),
+        ("N 7 cada 3", _n(7, 3), _QUIET),
+        ("N 0", _n(0, 0), _QUIET),
+        ("N 1", _n(1, 0), _QUIET),
+        ("N 4", _n(4, 0), _QUIET),
+        ("N 6 cada 6", _n(6, 6), _QUIET),
+        ("N 5 cada 1", _n(5, 1), None),
+        ("S detrás de N", b"S", _QUIET),
+    ]
+
+
+def _mask(items: list[tuple[int, int]]) -> list[Cmd]:
+    # 'M': secciones sueltas, ventanas que cruzan el final de DMEM (win_addr + win_len >
+    # DMEM_BYTES: la dirección da la vuelta), ventana vacía, más grande que DM_DUMP_BYTES
+    # y vuelta a la configuración de reset (frame completo)
+    def m(mask: int, addr: int, n: int) -> bytes:
+        return M_RECORD.pack(b"M", mask, addr, n)
+
+    return [
+        ("M PC|REGS", m(SEC_PC | SEC_REGS, 0, 16), _QUIET),
+        ("S parcial #0", b"S", _QUIET),
+        ("S parcial #1", b"S", _QUIET),
+        ("D parcial", b"D", _QUIET),
+        ("M PIPE", m(SEC_PIPE, 0, 64), _QUIET),
+        ("S sólo PIPE", b"S", _QUIET),
+        ("M MEM 0x3f8/16", m(SEC_MEM, DMEM_BYTES - 8, 16), _QUIET),
+        ("D ventana con vuelta", b"D", _QUIET),
+        ("M PC|MEM 0x3f0/64", m(SEC_PC | SEC_MEM, DMEM_BYTES - 16, 64), _QUIET),
+        ("D ventana de 64 con vuelta", b"D", _QUIET),
+        ("M MEM 0x20/0", m(SEC_MEM, 0x20, 0), _QUIET),
+        ("D ventana vacía", b"D", _QUIET),
+        ("M sin secciones", m(0, 0, 0), _QUIET),
+        ("D sólo header", b"D", _QUIET),
+        ("M todo 0/256", m(SEC_ALL, 0, 256), _QUIET),
+        ("D con ventana grande", b"D", _QUIET),
+        ("M por defecto", m(SEC_ALL, 0, 64), _QUIET),
+        ("D completo", b"D", _QUIET),
+    ]
+
+
+def _delta(items: list[tuple[int, int]]) -> list[Cmd]:
+    # 'K' (tb_debug_uart instancia DELTA_EN=1): keyframe y deltas, keyframe periódico, 'N'
+    # con muestras delta, 'R'/'M'/'K' fuerzan keyframe, delta parcial, ventana más grande
+    # que la sombra (todos keyframes), every = 1 y apagado
+    def k(every: int) -> bytes:
+        return K_RECORD.pack(b"K", every)
+
+    def m(mask: int, addr: int, n: int) -> bytes:
+        return M_RECORD.pack(b"M", mask, addr, n)
+
+    out = [("R", b"R", _QUIET), ("K 4", k(4), _QUIET)]
+    out += [(f"S delta #{i}", b"S", _QUIET) for i in range(6)]
+    out += [
+        ("N 5 cada 1 (delta)", _n(5, 1), _QUIET),
+        ("D delta", b"D", _QUIET),
+        ("R (keyframe)", b"R", _QUIET),
+        ("S tras R #0", b"S", _QUIET),
+        ("S tras R #1", b"S", _QUIET),
+        ("M PC|MEM 0x20/8 (keyframe)", m(SEC_PC | SEC_MEM, 0x20, 8), _QUIET),
+    ]
+    out += [(f"S delta parcial #{i}", b"S", _QUIET) for i in range(3)]
+    out += [
+        ("M REGS|MEM 0x3f8/16 (cruza el final)", m(SEC_REGS | SEC_MEM, DMEM_BYTES - 8, 16), _QUIET),
+        ("S delta con vuelta #0", b"S", _QUIET),
+        ("S delta con vuelta #1", b"S", _QUIET),
+        ("M todo 0/128 (más que la sombra)", m(SEC_ALL, 0, 128), _QUIET),
+        ("S sin sombra #0", b"S", _QUIET),
+        ("S sin sombra #1", b"S", _QUIET),
+        ("M por defecto", m(SEC_ALL, 0, 64), _QUIET),
+        ("K 1", k(1), _QUIET),
+        ("S con K 1 #0", b"S", _QUIET),
+        ("S con K 1 #1", b"S", _QUIET),
+        ("K 2", k(2), _QUIET),
+        ("S seguido #0 (keyframe)", b"S", None),
+        ("D seguido (delta)", b"D", None),
+        ("S seguido #1 (keyframe)", b"S", _QUIET),
+        ("K 0", k(0), _QUIET),
+        ("S sin delta", b"S", _QUIET),
+    ]
+    return out
+
+
+def _xmem(items: list[tuple[int, int]]) -> list[Cmd]:
+    # 'X': x_len = 0, rangos que cruzan el final de DMEM (1 KiB) y direcciones fuera de
+    # ella (dan la vuelta como dmem_dbg_addr), DMEM entera y un 'S' detrás en la FIFO RX
+    def x(addr: int, n: int) -> bytes:
+        return X_RECORD.pack(b"X", addr, n)
+
+    return [
+        ("X 0/32", x(0, 32), _QUIET),
+        ("X 0/0", x(0, 0), _QUIET),
+        ("X 0x3fe/0", x(DMEM_BYTES - 2, 0), _QUIET),
+        ("X 0x3fc/8 (cruza el final)", x(DMEM_BYTES - 4, 8), _QUIET),
+        ("X 0x3f0/0x20 (cruza el final)", x(DMEM_BYTES - 16, 32), _QUIET),
+        ("X 0x3ff/1", x(DMEM_BYTES - 1, 1), _QUIET),
+        ("X 0x41e/4 (fuera de DMEM)", x(DMEM_BYTES + 0x1E, 4), _QUIET),
+        ("X DMEM entera", x(0, DMEM_BYTES), None),
+        ("S detrás de X", b"S", _QUIET),
+    ]
+
+
+def _end(items: list[tuple[int, int]]) -> list[Cmd]:
+    # 'R' antes de 'G': más arriba se pudo haber pasado el ebreak a fuerza de pasos
+    return [("R", b"R", _QUIET), ("G", b"G", _QUIET_RUN), ("D final", b"D", _QUIET)]
+
+
+# casos en orden de ejecución (nombre, armado del guión)
+CASES = [
+    ("base P/R/T/D/S", _base),
+    ("stream (FIFO RX llena)", _stream),
+    ("C (checksum de IMEM)", _cksum),
+    ("N (pasos contados)", _nstep),
+    ("M (secciones y ventana)", _mask),
+    ("K (dumps delta)", _delta),
+    ("X (lectura de DMEM)", _xmem),
+    ("fin R/G/D", _end),
+]
+
+
+def _script(items: list[tuple[int, int]]) -> list[tuple[str, list[Cmd]]]:
+    return [(name, build(items)) for name, build in CASES]
+
+
+def _expected(cases: list[tuple[str, list[Cmd]]]) -> list[list[bytes]]:
+    # mismo guión contra el simulador: bytes de respuesta de cada comando
+    host = SimHost(cycle_accurate=True)
+    ser = host.ser
+    out = []
+    for _, cmds in cases:
+        resp = []
+        for _, data, _ in cmds:
+            ser.write(data)
+            resp.append(ser.read(ser.in_waiting) if ser.in_waiting else b"")
+        out.append(resp)
+    if ser.run_timeouts:
+        raise SystemExit("[ERROR] 'G' no llegó a HALT en el simulador")
+    return out
+
+
+def _write_cmds(path: str, cases: list[tuple[str, list[Cmd]]]):
+    with open(path, "w") as f:
+        for _, cmds in cases:
+            for _, data, wait in cmds:
+                f.writelines(f"s {b:02x}\n" for b in data)
+                if wait is not None:
+                    f.write(f"q {wait:x}\n")
+
+
+def _run_iverilog(out_dir: str, cmds: str, got: str) -> bool:
+    srcs = sorted(os.path.join(_SRC, f) for f in os.listdir(_SRC) if f.endswith(".v") and f not in _SKIP_SRC)
+    vvp = os.path.join(out_dir, "tb_debug_uart.vvp")
+    r = subprocess.run(["iverilog", "-g2012", "-DSIM", "-s", "tb_debug_uart", "-o", vvp, _TB, *srcs],
+                       capture_output=True, text=True)
+    if r.returncode:
+        print(r.stdout + r.stderr)
+        raise SystemExit("[ERROR] iverilog no compiló el testbench")
+    r = subprocess.run(["vvp", "-n", vvp, f"+CMDS={cmds}", f"+OUT={got}"], capture_output=True, text=True)
+    print(r.stdout.strip())
+    # vvp termina con 0 aunque el TB avise errores (stop bit, FIFO RX, MAX_CYCLES)
+    return r.returncode == 0 and "[TB] ERROR" not in r.stdout
+
+
+def _compare(cases: list[tuple[str, list[Cmd]]], expected: list[list[bytes]], got: bytes) -> int:
+    # después de la primera diferencia la salida queda desfasada: el resto no se compara
+    pos = 0
+    for (name, cmds), resp in zip(cases, expected):
+        n = sum(map(len, resp))
+        for (label, _, _), exp in zip(cmds, resp):
+            seg = got[pos:pos + len(exp)]
+            if seg != exp:
+                i = next((k for k in range(min(len(seg), len(exp))) if seg[k] != exp[k]), min(len(seg), len(exp)))
+                print(f"[ERROR] {name}: '{label}', byte {i} de la respuesta (offset {pos + i} de la salida): "
+                      f"HDL {seg[i:i + 8].hex()} vs SimHost {exp[i:i + 8].hex()}")
+                return 1
+            pos += len(exp)
+        print(f"[OK] {name}: {len(cmds)} comandos, {n} bytes iguales")
+    if pos != len(got):
+        print(f"[ERROR] el HDL mandó {len(got) - pos} bytes de más al final: {got[pos:pos + 16].hex()}")
+        return 1
+    print(f"[OK] {len(got)} bytes del HDL iguales a SimHost")
+    return 0
+
+
+def main(argv: list[str]) -> int:
+    prog = argv[1] if len(argv) > 1 else os.path.join(_GUI, "src", "prog1.mem")
+    out_dir = argv[2] if len(argv) > 2 else os.path.join(tempfile.gettempdir(), "hdl_equiv")
+    os.makedirs(out_dir, exist_ok=True)
+
+    cases = _script(parse_program_file(prog))
+    expected = _expected(cases)
+    cmds = os.path.join(out_dir, "cmds.txt")
+    exp_path = os.path.join(out_dir, "expected.hex")
+    _write_cmds(cmds, cases)
+    with open(exp_path, "w") as f:
+        f.writelines(f"{b:02x}\n" for resp in expected for b in b"".join(resp))
+    for (name, c), resp in zip(cases, expected):
+        print(f"[INFO] {name}: {len(c)} comandos, {sum(map(len, resp))} bytes esperados")
+    print(f"[INFO] guión y esperado en {out_dir}")
+
+    if not (shutil.which("iverilog") and shutil.which("vvp")):
+        print("[SKIP] sin iverilog: correr tb_debug_uart con +CMDS=cmds.txt +OUT=out.hex (-DSIM) "
+              "y comparar con expected.hex")
+        return 0
+    got_path = os.path.join(out_dir, "out.hex")
+    if not _run_iverilog(out_dir, cmds, got_path):
+        raise SystemExit("[ERROR] el testbench no terminó bien")
+    with open(got_path) as f:
+        got = bytes(int(ln, 16) for ln in f if ln.strip())
+    return _compare(cases, expected, got)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,172 @@
+"""
+Hexdump de DMEM con modelo/vista (ui.hexdump): el contenido por modo (byte, half,
+word little-endian, ASCII) tiene que ser el de la memoria, dataChanged sólo cubre las
+filas que cambiaron (y las que pierden el resaltado), "ir a" lleva la fila arriba, y el
+costo de aplicar un dump y repintar lo que Qt marcó sucio (processEvents) no crece con
+el tamaño de la memoria. Se compara con el QPlainTextEdit de antes (líneas regeneradas
+y parcheadas por dump). Con la DMEM de 1 KiB de la placa los dos cuestan lo mismo (las
+filas cambiadas están en pantalla y el repintado domina); la diferencia aparece desde
+4 KiB.
+
+Uso (desde riscv_debug_gui; la GUI corre con QT_QPA_PLATFORM=offscreen):
+    python -m bench.hexdump_view [dumps]
+"""
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtCore, QtGui, QtWidgets
+
+from ui.hexdump import ROW_BYTES, UNIT_BYTE, UNIT_HALF, UNIT_WORD, HexdumpView
+from ui.widgets import monospace_font
+
+from bench.suite import arg_int
+
+SIZES = (1024, 4096, 16384, 65536)
+_BG = QtCore.Qt.ItemDataRole.BackgroundRole
+
+
+def _dumps(size: int, n: int) -> list[bytes]:
+    # un store de 4 bytes por dump, como un paso con sw
+    rnd = random.Random(size)
+    data = bytearray(rnd.getrandbits(8) for _ in range(size))
+    out = [bytes(data)]
+    for _ in range(n):
+        a = rnd.randrange(0, size, 4)
+        data[a:a + 4] = rnd.getrandbits(32).to_bytes(4, "little")
+        out.append(bytes(data))
+    return out
+
+
+def _text_lines(b: bytes) -> list[str]:
+    return [f"{i:04x}: " + " ".join(f"{x:02x}" for x in b[i:i + 16]) for i in range(0, len(b), 16)]
+
+
+def _text_apply(edit: QtWidgets.QPlainTextEdit, mem: bytes, prev: list[str] | None) -> list[str]:
+    # lo de antes: se regeneran todas las líneas y se reescriben las que cambiaron
+    lines = _text_lines(mem)
+    if prev is None:
+        edit.setPlainText("\n".join(lines))
+        return lines
+    doc = edit.document()
+    cur = QtGui.QTextCursor(doc)
+    cur.beginEditBlock()
+    for i, ln in enumerate(lines):
+        if ln != prev[i]:
+            blk = doc.findBlockByNumber(i)
+            cur.setPosition(blk.position())
+            cur.setPosition(blk.position() + blk.length() - 1, QtGui.QTextCursor.KeepAnchor)
+            cur.insertText(ln)
+    cur.endEditBlock()
+    return lines
+
+
+def _check_modes(view: HexdumpView):
+    m = view.hex_model
+    mem = bytes(range(32, 32 + 64))
+    m.set_data(mem, base=0x100)
+    for unit in (UNIT_BYTE, UNIT_HALF, UNIT_WORD):
+        view.set_mode(unit, True)
+        for row in range(m.rowCount()):
+            for c in range(ROW_BYTES // unit):
+                off = row * ROW_BYTES + c * unit
+                want = f"{int.from_bytes(mem[off:off + unit], 'little'):0{2 * unit}x}"
+                if m.data(m.index(row, c)) != want:
+                    raise SystemExit(f"[ERROR] unidad {unit}: fila {row} col {c} distinta")
+            if m.data(m.index(row, m.ascii_column())) != mem[row * 16:row * 16 + 16].decode("ascii"):
+                raise SystemExit(f"[ERROR] columna ASCII distinta en la fila {row}")
+    view.set_mode(UNIT_BYTE, False)
+    if m.columnCount() != ROW_BYTES or m.ascii_column() is not None:
+        raise SystemExit("[ERROR] sin ASCII quedó la columna")
+    view.set_mode(UNIT_BYTE, True)
+    print("[OK] modos byte/half/word/ASCII iguales a la memoria")
+
+
+def _check_changes(view: HexdumpView):
+    m = view.hex_model
+    rows: list[tuple[int, int]] = []
+    m.dataChanged.connect(lambda a, b, _r=None: rows.append((a.row(), b.row())))
+    mem = bytearray(1024)
+    m.set_data(bytes(mem))
+    mem[0x40] = 1
+    mem[0x51] = 2
+    mem[0x3f0] = 3
+    rows.clear()
+    m.set_data(bytes(mem))
+    if rows != [(4, 5), (63, 63)]:
+        raise SystemExit(f"[ERROR] dataChanged de más o de menos: {rows}")
+    if m.data(m.index(5, 1), _BG) is None or m.data(m.index(5, 0), _BG) is not None:
+        raise SystemExit("[ERROR] resaltado en el byte equivocado")
+    rows.clear()
+    m.set_data(bytes(mem))     # igual: sólo se apagan los resaltados
+    if rows != [(4, 5), (63, 63)] or m.data(m.index(5, 1), _BG) is not None:
+        raise SystemExit(f"[ERROR] no se apagaron los resaltados: {rows}")
+    rows.clear()
+    m.set_data(bytes(mem))
+    if rows:
+        raise SystemExit("[ERROR] dump igual sin resaltados emitió dataChanged")
+    print("[OK] dataChanged sólo en filas cambiadas (tramos contiguos juntos)")
+
+
+def _check_goto(view: HexdumpView):
+    m = view.hex_model
+    m.set_data(bytes(4096), base=0x200)
+    view.resize(520, 300)
+    view.show()
+    QtWidgets.QApplication.processEvents()
+    if not view.goto(0x200 + 0x9a4) or view.rowAt(0) != 0x9a4 // 16:
+        raise SystemExit(f"[ERROR] ir a 0x{0x200 + 0x9a4:x}: fila de arriba {view.rowAt(0)}")
+    if view.goto(0x100) or view.goto(0x200 + 4096):
+        raise SystemExit("[ERROR] ir a fuera de la ventana no falló")
+    print("[OK] ir a dirección")
+
+
+def main(argv: list[str]) -> int:
+    n = arg_int(argv, 1, 200)
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+    view = HexdumpView()
+    _check_modes(view)
+    _check_changes(view)
+    _check_goto(view)
+    view.close()
+
+    for size in SIZES:
+        dumps = _dumps(size, n)
+        view = HexdumpView()
+        view.resize(520, 360)
+        view.show()
+        edit = QtWidgets.QPlainTextEdit()
+        edit.setReadOnly(True)
+        edit.setFont(monospace_font(10))
+        edit.resize(520, 360)
+        edit.show()
+        # calentamiento: primeros pintados (fuentes, estilo) fuera de la medición
+        lines = _text_apply(edit, dumps[0], None)
+        for d in dumps[:8]:
+            view.hex_model.set_data(d)
+            lines = _text_apply(edit, d, lines)
+            app.processEvents()
+
+        t0 = time.perf_counter()
+        for d in dumps[1:]:
+            view.hex_model.set_data(d)
+            app.processEvents()
+        t_view = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for d in dumps[1:]:
+            lines = _text_apply(edit, d, lines)
+            app.processEvents()
+        t_text = time.perf_counter() - t0
+        print(f"[BENCH] DMEM {size:6d} B: texto {t_text * 1e6 / n:8.1f} us/dump   "
+              f"modelo/vista {t_view * 1e6 / n:7.1f} us/dump  {t_text / t_view:5.1f}x")
+        view.close()
+        edit.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,99 @@
+"""
+Recarga incremental de IMEM contra una fake_board a baud real: carga completa de un
+programa vs program_image_delta tras editar unas pocas words. Verifica con el checksum
+de la placa ('C') que IMEM quede igual a la imagen, también a través de debug_server.
+
+Uso (desde riscv_debug_gui):
+    python -m bench.imem_delta [words] [editadas] [baud]
+"""
+import random
+import sys
+import time
+
+from debug_server import DebugServer
+from debughost import DebugHost, P_RECORD, imem_checksum
+from fake_board import FakeBoard
+from pipe_decode import PIPE_WORDS
+from sim_host import IMEM_WORDS, INSTR_NOP
+
+from bench.suite import arg_int
+
+
+def _check(host: DebugHost, items: list[tuple[int, int]], what: str):
+    cs = host.imem_checksum(items[0][0], len(items), timeout_s=2.0)
+    if cs != imem_checksum(d for _, d in items):
+        raise SystemExit(f"[ERROR] {what}: checksum de IMEM distinto a la imagen")
+    if host.verify_imem_shadow(timeout_s=2.0) is not True:
+        raise SystemExit(f"[ERROR] {what}: la sombra de IMEM no coincide con la placa")
+
+
+def main(argv: list[str]) -> int:
+    n = arg_int(argv, 1, IMEM_WORDS)
+    n_edit = arg_int(argv, 2, 2)
+    baud = arg_int(argv, 3, 115200)
+
+    rnd = random.Random(1)
+    # addi x1..x31 con inmediatos al azar: nada que ejecutar, sólo contenido
+    image = [(4*k, (rnd.randrange(2048) << 20) | (rnd.randrange(1, 32) << 7) | INSTR_NOP) for k in range(n)]
+    edited = list(image)
+    for k in rnd.sample(range(n), n_edit):
+        edited[k] = (edited[k][0], edited[k][1] ^ (1 << 20))
+
+    board = FakeBoard(baud=baud, latency_s=1e-3)
+    host = DebugHost(board.url, baud, PIPE_WORDS)
+    try:
+        t0 = time.perf_counter()
+        host.program_image(image)
+        _check(host, image, "carga completa")
+        dt_full = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        sent, skipped = host.program_image_delta(edited)
+        _check(host, edited, "carga delta")
+        dt_delta = time.perf_counter() - t0
+        if (sent, skipped) != (n_edit, n - n_edit):
+            raise SystemExit(f"[ERROR] delta mandó {sent} words (esperadas {n_edit})")
+        print(f"[BENCH] {n} words @ {baud}: completa {dt_full*1e3:7.1f} ms  "
+              f"delta {dt_delta*1e3:6.1f} ms  ({sent} enviadas, {skipped * P_RECORD.size} bytes ahorrados)")
+
+        # sin cambios: no se manda nada
+        if host.program_image_delta(edited) != (0, n):
+            raise SystemExit("[ERROR] recarga idéntica mandó words")
+
+        # IMEM cambia por fuera de la sombra (otra herramienta, JTAG...): verify=True
+        # detecta la sombra vieja y manda todo
+        host.ser.write(P_RECORD.pack(b"P", 0, INSTR_NOP))
+        sent, _ = host.program_image_delta(edited, verify=True)
+        if sent != n:
+            raise SystemExit(f"[ERROR] verify=True no detectó IMEM modificada ({sent} enviadas)")
+        _check(host, edited, "recarga verificada")
+        print("[OK] checksum de IMEM coincide; verify=True detecta cambios hechos por fuera")
+
+        # bytes viejos con 0xC5 pendientes (cola de un dump): sin el eco de addr/n_words
+        # no se toman como respuesta y la respuesta real no queda encolada
+        host.framer.feed(b"\xc5\x11\x22\x33\x44\x00\xc5")
+        _check(host, edited, "con bytes 0xC5 viejos")
+        _check(host, edited, "después de los bytes viejos")
+        print("[OK] 'C' ignora bytes 0xC5 sueltos (eco de addr/n_words)")
+    finally:
+        host.close()
+
+    # mismo comando a través del debug_server
+    owner = DebugHost(board.url, baud, PIPE_WORDS)
+    srv = DebugServer(owner, ("127.0.0.1", 0), log=lambda s: None)
+    try:
+        cli = DebugHost(srv.url, 0, PIPE_WORDS)
+        cs = cli.imem_checksum(0, n, timeout_s=2.0)
+        cli.close()
+        if cs != imem_checksum(d for _, d in edited):
+            raise SystemExit("[ERROR] 'C' vía debug_server: checksum distinto")
+        print("[OK] 'C' vía debug_server")
+    finally:
+        srv.close()
+        owner.close()
+        board.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,144 @@
+"""
+Lectura de DMEM ('X') con el cache de páginas de DebugHost.read_mem: después de cada
+paso el cache tiene que coincidir con la DMEM del simulador (los stores vistos en
+EX/MEM invalidan sus páginas; 'N' sin muestras y 'G' invalidan todo), y recorrer toda
+la DMEM cuesta una transferencia por página sucia en vez de un re-dump entero.
+
+Uso (desde riscv_debug_gui):
+    python -m bench.mem_read [pasos] [baud]
+"""
+import sys
+import time
+
+from debug_server import DebugServer
+from debughost import MEM_PAGE_BYTES, DebugHost
+from dump_frame import DumpFrame
+from fake_board import FakeBoard
+from framer import SEC_MEM, SEC_PC, SEC_PIPE
+from pipe_decode import PIPE_WORDS
+from sim_host import SimHost
+
+from bench.suite import arg_int, load_asm
+
+# un sw por vuelta que recorre todas las páginas, más un sh y un sb fijos
+_PROG = """
+    li   x1, 0
+    li   x3, 0
+loop:
+    addi x1, x1, 1
+    addi x3, x3, 68
+    andi x3, x3, 0x3fc
+    sw   x1, 0(x3)
+    sh   x1, 510(x0)
+    sb   x1, 1023(x0)
+    j    loop
+"""
+
+
+def _check(host: SimHost, what: str):
+    got = host.read_mem(0, host.mem_bytes)
+    want = bytes(host.sim.dmem[:host.mem_bytes])
+    if got != want:
+        bad = next(i for i in range(len(got)) if got[i] != want[i])
+        raise SystemExit(f"[ERROR] {what}: DMEM del cache distinta en 0x{bad:03x}")
+
+
+def _equiv(n: int):
+    h = SimHost(cycle_accurate=True)
+    load_asm(h, _PROG)
+    _check(h, "inicio")
+    reads = h.mem_reads
+    for k in range(n):
+        h.send_cmd("S")
+        h.read_frame(5.0, expect=1)
+        _check(h, f"paso {k + 1}")
+    per_step = (h.mem_reads - reads) / n
+    h.step(37)
+    _check(h, "'N' sin muestras")
+    h.step(20, every=1)
+    _check(h, "'N' cada 1")
+    h.send_cmd("D")
+    h.read_frame(5.0, expect=3)
+    # tramos que cruzan páginas y dan la vuelta
+    for addr, size in ((60, 10), (1020, 8), (5, 1024), (0, 0)):
+        want = bytes(h.sim.dmem[(addr + i) % h.mem_bytes] for i in range(size))
+        if h.read_mem(addr, size) != want:
+            raise SystemExit(f"[ERROR] read_mem({addr}, {size}) distinto")
+    print(f"[OK] cache igual a la DMEM en {n} pasos, 'N' y tramos cruzados "
+          f"({per_step:.2f} transferencias 'X' por paso)")
+
+
+def main(argv: list[str]) -> int:
+    n = arg_int(argv, 1, 100)
+    baud = arg_int(argv, 2, 115200)
+
+    _equiv(n)
+
+    # --- cable a baud real: recorrer los 1024 B después de cada paso ---
+    board = FakeBoard(baud=baud, latency_s=1e-3, cycle_accurate=True)
+    host = DebugHost(board.url, baud, PIPE_WORDS)
+    try:
+        load_asm(host, _PROG)
+        size = host.mem_bytes
+        steps = 20
+
+        # re-dump: cada STEP trae la DMEM entera ('M' con ventana de todo el tamaño)
+        host.set_sections(SEC_PC | SEC_PIPE | SEC_MEM, 0, size)
+        w0 = host.framer.wire_bytes
+        t0 = time.perf_counter()
+        for _ in range(steps):
+            host.send_cmd("S")
+            DumpFrame(host.read_frame(5.0, expect=1), host.pipe_words).mem.tobytes()
+        t_dump = time.perf_counter() - t0
+        b_dump = host.framer.wire_bytes - w0
+        host.set_sections()
+
+        # read_mem: el paso trae el frame completo (EX/MEM) y después sólo páginas sucias
+        host.read_mem(0, size)
+        r0, rb0 = host.mem_reads, host.mem_read_bytes
+        w0 = host.framer.wire_bytes
+        t0 = time.perf_counter()
+        for _ in range(steps):
+            host.send_cmd("S")
+            host.read_frame(5.0, expect=1)
+            host.read_mem(0, size)
+        t_cache = time.perf_counter() - t0
+        b_frames = host.framer.wire_bytes - w0
+        b_mem = host.mem_read_bytes - rb0 + 5 * (host.mem_reads - r0)
+        print(f"[BENCH] {steps} pasos + DMEM {size} B @ {baud}: re-dump {t_dump * 1e3 / steps:6.1f} ms/paso "
+              f"({b_dump / steps:5.0f} B)   read_mem {t_cache * 1e3 / steps:6.1f} ms/paso "
+              f"({(b_mem + b_frames) / steps:5.0f} B, {(host.mem_reads - r0) / steps:.2f} 'X' de "
+              f"{MEM_PAGE_BYTES} B)  {t_dump / t_cache:4.1f}x")
+
+        # sin pasos en el medio la DMEM no cambia: cero transferencias
+        r0 = host.mem_reads
+        t0 = time.perf_counter()
+        for _ in range(steps):
+            host.read_mem(0, size)
+        dt = time.perf_counter() - t0
+        if host.mem_reads != r0:
+            raise SystemExit("[ERROR] read_mem repetido sin pasos fue a la placa")
+        print(f"[BENCH] read_mem repetido sin pasos: {dt * 1e6 / steps:.1f} us, 0 transferencias")
+    finally:
+        host.close()
+
+    # --- a través de debug_server: la respuesta va sólo a quien la pidió ---
+    owner = DebugHost(board.url, baud, PIPE_WORDS)
+    srv = DebugServer(owner, ("127.0.0.1", 0), log=lambda s: None)
+    try:
+        cli = DebugHost(srv.url, 0, PIPE_WORDS)
+        ref = owner.read_mem_raw(0, 256)
+        got = cli.read_mem(0, 256)
+        cli.close()
+        if got != ref:
+            raise SystemExit("[ERROR] 'X' vía debug_server distinto")
+        print("[OK] 'X' vía debug_server")
+    finally:
+        srv.close()
+        owner.close()
+        board.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
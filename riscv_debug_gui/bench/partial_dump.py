@@ -0,0 +1,109 @@
+"""
+Dumps parciales ('M'): bytes por dump y tiempo de un 'D' según las secciones pedidas,
+contra una fake_board a baud real. Verifica que cada sección parcial sea igual a la
+del frame completo, directo y a través de debug_server (que recorta por cliente).
+
+Uso (desde riscv_debug_gui):
+    python -m bench.partial_dump [dumps] [baud]
+"""
+import sys
+import time
+
+from debug_server import DebugServer
+from debughost import DebugHost
+from dump_frame import DumpFrame
+from fake_board import FakeBoard
+from framer import SEC_ALL, SEC_MEM, SEC_PC, SEC_PIPE, SEC_REGS
+from pipe_decode import PIPE_WORDS
+
+from bench.suite import arg_int, load_asm
+
+# escribe DMEM y registros para que las secciones no sean todas cero
+_PROG = """
+    li   x1, 0x11
+    li   x2, 0x2233
+    sw   x1, 0(x0)
+    sw   x2, 20(x0)
+    add  x3, x1, x2
+    sw   x3, 36(x0)
+    ebreak
+"""
+
+# (nombre, máscara, addr, len): lo que pide cada pestaña de la GUI, más ventanas chicas
+CASES = [
+    ("completo", SEC_ALL, 0, None),
+    ("regs", SEC_PC | SEC_MEM | SEC_REGS, 0, None),
+    ("pipeline", SEC_PC | SEC_MEM | SEC_PIPE, 0, None),
+    ("imem (pc+dmem)", SEC_PC | SEC_MEM, 0, None),
+    ("sólo pc", SEC_PC, 0, None),
+    ("dmem 16B @0x10", SEC_MEM, 0x10, 16),
+]
+
+
+def _check(full: DumpFrame, d: DumpFrame, what: str):
+    if d.has(SEC_PC) and d.pc != full.pc:
+        raise SystemExit(f"[ERROR] {what}: PC distinto")
+    if d.has(SEC_PIPE) and d.pipe_words != full.pipe_words:
+        raise SystemExit(f"[ERROR] {what}: pipeline distinto")
+    if d.has(SEC_REGS) and d.regs != full.regs:
+        raise SystemExit(f"[ERROR] {what}: registros distintos")
+    if d.has(SEC_MEM) and bytes(d.mem) != bytes(full.mem)[d.mem_addr:d.mem_addr + d.dm_bytes]:
+        raise SystemExit(f"[ERROR] {what}: ventana de DMEM distinta")
+
+
+def _dump(host: DebugHost) -> DumpFrame:
+    host.send_cmd("D")
+    return DumpFrame(host.read_frame(5.0), host.pipe_words, host.dm_dump_bytes)
+
+
+def main(argv: list[str]) -> int:
+    n = arg_int(argv, 1, 20)
+    baud = arg_int(argv, 2, 115200)
+
+    board = FakeBoard(baud=baud, latency_s=1e-3, cycle_accurate=True)
+    host = DebugHost(board.url, baud, PIPE_WORDS)
+    try:
+        load_asm(host, _PROG)
+        host.send_cmd("G")
+        host.read_frame(5.0, expect=2)
+
+        full = _dump(host)
+        t_full = None
+        for name, mask, addr, mlen in CASES:
+            host.set_sections(mask, addr, mlen)
+            d = _dump(host)
+            _check(full, d, name)
+            t0 = time.perf_counter()
+            for _ in range(n):
+                _dump(host)
+            dt = (time.perf_counter() - t0) / n
+            t_full = t_full or dt
+            print(f"[BENCH] {name:16s} {len(d.buf):4d} B/dump  {dt*1e3:6.2f} ms/dump  "
+                  f"{t_full / dt:5.1f}x vs completo")
+        host.set_sections()
+        print("[OK] secciones parciales iguales al frame completo")
+    finally:
+        host.close()
+
+    # a través de debug_server: cada cliente recibe el frame recortado a su 'M'
+    owner = DebugHost(board.url, baud, PIPE_WORDS)
+    srv = DebugServer(owner, ("127.0.0.1", 0), log=lambda s: None)
+    try:
+        cli = DebugHost(srv.url, 0, PIPE_WORDS)
+        for name, mask, addr, mlen in CASES:
+            cli.set_sections(mask, addr, mlen)
+            d = _dump(cli)
+            if len(d.buf) != cli.dump_len():
+                raise SystemExit(f"[ERROR] {name} vía debug_server: {len(d.buf)} B (esperados {cli.dump_len()})")
+            _check(full, d, f"{name} vía debug_server")
+        cli.close()
+        print("[OK] 'M' vía debug_server")
+    finally:
+        srv.close()
+        owner.close()
+        board.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
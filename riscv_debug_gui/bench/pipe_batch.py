@@ -0,0 +1,79 @@
+"""
+Benchmark + chequeo de equivalencia: decode_pipe_batch (NumPy) vs decode_pipe_words.
+
+Uso (desde riscv_debug_gui):
+    python -m bench.pipe_batch [n_cycles] [trace.rvtrace]
+"""
+import sys
+import time
+
+import numpy as np
+
+from pipe_batch import COLUMNS, decode_pipe_batch, trace_pipe_words
+from pipe_decode import PIPE_WORDS, decode_pipe_words
+from trace_file import TraceReader
+
+from bench.suite import arg_int
+
+
+def _flatten(d: dict, prefix: str = "") -> dict:
+    out = {}
+    for k, v in d.items():
+        if isinstance(v, dict):
+            out.update(_flatten(v, f"{prefix}{k}."))
+        else:
+            out[f"{prefix}{k}"] = v
+    return out
+
+
+def check_equivalence(pw: np.ndarray, rows: int = 5000) -> int:
+    cols = decode_pipe_batch(pw)
+    idx = np.linspace(0, len(pw) - 1, min(rows, len(pw))).astype(np.int64)
+    for i in idx:
+        ref = _flatten(decode_pipe_words([int(x) for x in pw[i]]))
+        ref.pop("raw_words")
+        if sorted(ref) != sorted(COLUMNS):
+            raise SystemExit(f"[ERROR] columnas distintas: {sorted(set(ref) ^ set(COLUMNS))}")
+        for k, v in ref.items():
+            if int(cols[k][i]) != v:
+                raise SystemExit(f"[ERROR] fila {i} {k}: batch={int(cols[k][i])} escalar={v}")
+    return len(idx)
+
+
+def _bench(label: str, pw: np.ndarray):
+    n = len(pw)
+    t0 = time.perf_counter()
+    decode_pipe_batch(pw)
+    dt = time.perf_counter() - t0
+
+    m = min(n, 50000)
+    rows = pw[:m].tolist()
+    t0 = time.perf_counter()
+    for r in rows:
+        decode_pipe_words(r)
+    dt_s = (time.perf_counter() - t0) * n / m
+
+    print(f"{label:<22} N={n:>9}  batch {dt*1e3:8.1f} ms  escalar ~{dt_s*1e3:9.1f} ms  ({dt_s / dt:6.0f}x)")
+
+
+def main(argv: list[str]) -> int:
+    n = arg_int(argv, 1, 2_000_000)
+
+    rng = np.random.default_rng(1)
+    pw = rng.integers(0, 1 << 32, size=(n, PIPE_WORDS), dtype=np.uint32)
+    k = check_equivalence(pw)
+    print(f"[OK] equivalencia con decode_pipe_words en {k} filas aleatorias")
+    _bench("aleatorio (contiguo)", pw)
+
+    if len(argv) > 2:
+        with TraceReader(argv[2]) as r:
+            tpw = trace_pipe_words(r)
+            k = check_equivalence(tpw)
+            print(f"[OK] equivalencia en {k} filas de {argv[2]}")
+            _bench("trace (vista mmap)", tpw)
+            del tpw
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,70 @@
+"""
+Benchmark de DebugHost.stream (comandos en pipeline) contra fake_board, que impone
+los tiempos de una UART real: baud, latencia por sentido y FIFO RX de la placa.
+Compara frames/s por tamaño de ventana contra el límite de cable (baud/10/frame_len)
+y verifica que cada ventana devuelva exactamente los mismos frames que window=1.
+
+Uso (desde riscv_debug_gui):
+    python -m bench.pipeline_window [n_steps] [latencia_ms] [baud]
+"""
+import sys
+import time
+
+from debughost import DebugHost
+from fake_board import FakeBoard
+from pipe_decode import PIPE_WORDS
+
+from bench.suite import arg_int
+
+# addi x1,x1,1 ; sw x1,0(x0) ; jal x0,-8  (no llega nunca a HALT)
+_PROG = [(0, 0x00108093), (4, 0x00102023), (8, 0xFF9FF06F)]
+
+
+def _run(n: int, window: int, latency_s: float, baud: int, rx_fifo: int = 32):
+    with FakeBoard(baud=baud, latency_s=latency_s, rx_fifo=rx_fifo) as board:
+        host = DebugHost(board.url, baud, PIPE_WORDS)
+        try:
+            host.program_image(_PROG)
+            host.send_cmd("R")
+            frames = []
+            t0 = time.perf_counter()
+            try:
+                for _, fr in host.stream(["S"] * n, window=window, timeout_s=1.0):
+                    frames.append(fr)
+            except TimeoutError:
+                pass
+            dt = time.perf_counter() - t0
+        finally:
+            host.close()
+        return frames, dt, board.dropped_bytes
+
+
+def main(argv: list[str]) -> int:
+    n = arg_int(argv, 1, 200)
+    latency_s = float(argv[2]) / 1e3 if len(argv) > 2 else 2.0e-3
+    baud = arg_int(argv, 3, 115200)
+
+    frame_len = 4 + 4 + PIPE_WORDS * 4 + 32 * 4 + 64
+    wire_fps = baud / 10 / frame_len
+    print(f"[BENCH] steps={n} baud={baud} latencia={latency_s*1e3:.1f} ms "
+          f"frame={frame_len} B  límite de cable={wire_fps:.2f} frames/s")
+
+    ref = None
+    for window in (1, 2, 4, 8):
+        frames, dt, dropped = _run(n, window, latency_s, baud)
+        if ref is None:
+            ref = frames
+        if len(frames) != n or frames != ref:
+            raise SystemExit(f"[ERROR] window={window}: frames distintos a window=1 "
+                             f"({len(frames)}/{n}, descartados={dropped})")
+        fps = n / dt
+        print(f"window={window:<2} {fps:8.2f} frames/s  ({fps / wire_fps * 100:5.1f}% del cable)")
+
+    # Sin FIFO RX (bitstream viejo) los comandos que llegan durante un DUMP se pierden
+    frames, _, dropped = _run(n, 4, latency_s, baud, rx_fifo=0)
+    print(f"[INFO] sin FIFO RX, window=4: {len(frames)}/{n} frames, {dropped} bytes descartados")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,99 @@
+"""
+Benchmark de programación de IMEM: program_word (3 writes por word) vs
+program_image (un buffer, escritura en bloques), sobre loop:// de pyserial.
+loop:// no limita por baudrate: el resultado es el costo del lado host, que
+se compara contra el límite del cable (baud/10/9 words/s).
+
+Uso (desde riscv_debug_gui):
+    python -m bench.program_image [n_words] [baud] [repeticiones]
+"""
+import sys
+import threading
+import time
+
+from debughost import DebugHost, P_RECORD
+from pipe_decode import PIPE_WORDS
+
+from bench.suite import arg_int
+
+
+def _items(n: int) -> list[tuple[int, int]]:
+    return [(4 * i, (0x00000013 + (i << 20)) & 0xFFFFFFFF) for i in range(n)]
+
+
+def _expected(items: list[tuple[int, int]]) -> bytes:
+    return b"".join(P_RECORD.pack(b"P", a, d) for a, d in items)
+
+
+class _Drain:
+    """Vacía el loop:// en paralelo (su cola es acotada: sin lector, write se bloquea)."""
+
+    def __init__(self, ser):
+        self.ser = ser
+        self.data = bytearray()
+        self._stop = threading.Event()
+        self._th = threading.Thread(target=self._run, daemon=True)
+        self._th.start()
+
+    def _run(self):
+        while not self._stop.is_set() or self.ser.in_waiting:
+            self.data += self.ser.read(4096)
+
+    def finish(self) -> bytes:
+        self._stop.set()
+        self._th.join()
+        return bytes(self.data)
+
+
+def _bench(label: str, fn, host: DebugHost, items, reps: int, wire_wps: float):
+    best = float("inf")
+    expected = _expected(items)
+    for _ in range(reps):
+        host.ser.reset_input_buffer()
+        drain = _Drain(host.ser)
+        t0 = time.perf_counter()
+        fn(host, items)
+        dt = time.perf_counter() - t0
+        best = min(best, dt)
+
+        # Verificación: lo que sale por el loop debe ser exactamente la secuencia de registros
+        if drain.finish() != expected:
+            raise SystemExit(f"[ERROR] {label}: bytes enviados no coinciden")
+
+    wps = len(items) / best
+    print(f"{label:<14} {best*1e3:9.3f} ms  {wps:12.0f} words/s  ({wps / wire_wps:8.1f}x límite de cable)")
+    return wps
+
+
+def main(argv: list[str]) -> int:
+    n = arg_int(argv, 1, 256)
+    baud = arg_int(argv, 2, 115200)
+    reps = arg_int(argv, 3, 5)
+
+    # 8N1: 10 bits por byte, 9 bytes por word
+    wire_wps = baud / 10 / P_RECORD.size
+    print(f"[BENCH] n={n} baud={baud} límite de cable={wire_wps:.0f} words/s")
+
+    host = DebugHost("loop://", baud, PIPE_WORDS, timeout_s=0.05)
+    try:
+        items = _items(n)
+
+        def per_word(h, it):
+            for a, d in it:
+                h.program_word(a, d)
+
+        calls = []
+
+        def image(h, it):
+            h.program_image(it, progress=lambda done, total: calls.append(done))
+
+        w0 = _bench("program_word", per_word, host, items, reps, wire_wps)
+        w1 = _bench("program_image", image, host, items, reps, wire_wps)
+        print(f"[BENCH] speedup={w1 / w0:.1f}x  callbacks de progreso={len(calls) / reps:.1f} por imagen")
+    finally:
+        host.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
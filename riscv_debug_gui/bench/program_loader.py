@@ -0,0 +1,205 @@
+"""
+Benchmark + chequeo de program_parser: la misma imagen escrita como texto $readmemh, texto
+con @addr/ADDR:DATA/comentarios, .bin, Intel HEX y ELF RV32 tiene que cargar idéntica, y
+un texto / Intel HEX con regiones separadas tiene que quedar disperso (sin relleno entre
+regiones). Compara el parser de texto anterior (línea por línea, lista de tuplas) contra
+la carga en frío del mismo archivo y contra una carga repetida (cache).
+
+Uso (desde riscv_debug_gui):
+    python -m bench.program_loader [n_words] [repeticiones]
+"""
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+
+from program_parser import clear_program_cache, image_items, load_program, parse_program_file
+
+from bench.suite import arg_int, timed
+
+
+# --- implementación anterior de parse_program_file ---
+def _strip_comment(line: str) -> str:
+    if "//" in line:
+        line = line.split("//", 1)[0]
+    if "#" in line:
+        line = line.split("#", 1)[0]
+    return line.strip()
+
+
+def _legacy_parse(path: str) -> list[tuple[int, int]]:
+    items = []
+    base = 0
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for raw in f:
+            s = _strip_comment(raw)
+            if not s:
+                continue
+            if s.startswith("@"):
+                addr_s = s[1:].strip()
+                base = int(addr_s, 16) if not addr_s.lower().startswith("0x") else int(addr_s, 0)
+                continue
+            if ":" in s:
+                a_s, d_s = s.split(":", 1)
+                a_s, d_s = a_s.strip(), d_s.strip()
+                addr = int(a_s, 0) if a_s.lower().startswith("0x") else int(a_s, 16)
+                word = int(d_s, 0) if d_s.lower().startswith("0x") else int(d_s, 16)
+                items.append((addr & 0xFFFFFFFF, word & 0xFFFFFFFF))
+                continue
+            word = int(s, 0) if s.lower().startswith("0x") else int(s, 16)
+            items.append((base & 0xFFFFFFFF, word & 0xFFFFFFFF))
+            base = (base + 4) & 0xFFFFFFFF
+    return items
+
+
+# --- escritores de cada formato ---
+def _write_mem(path: str, words: list[int]):
+    with open(path, "w") as f:
+        f.write("".join(f"{w:08x}\n" for w in words))
+
+
+def _write_mixed(path: str, words: list[int]):
+    half = len(words) // 2
+    with open(path, "w") as f:
+        f.write("// primera mitad con @addr\n@0\n")
+        f.write("".join(f"0x{w:08X}  # w{k}\n" for k, w in enumerate(words[:half])))
+        f.write("".join(f"{4*k:x} : {w:08x}\n" for k, w in enumerate(words) if k >= half))
+
+
+def _write_sparse(path: str, words: list[int]):
+    """Dos regiones lejanas y una word reescrita: la última escritura gana."""
+    half = len(words) // 2
+    with open(path, "w") as f:
+        f.write("@0\n" + "".join(f"{w:08x}\n" for w in words[:half]))
+        f.write(f"@{0x100000:x}\n" + "".join(f"{w:08x}\n" for w in words[half:]))
+        f.write(f"0 : {words[0] ^ 1:08x}\n")
+
+
+def _sparse_expected(words: list[int]) -> list[tuple[int, int]]:
+    half = len(words) // 2
+    exp = [(4*k, w) for k, w in enumerate(words[:half])]
+    exp += [(0x100000 + 4*k, w) for k, w in enumerate(words[half:])]
+    exp[0] = (0, words[0] ^ 1)
+    return exp
+
+
+def _write_bin(path: str, words: list[int]):
+    with open(path, "wb") as f:
+        f.write(struct.pack(f"<{len(words)}I", *words))
+
+
+def _write_ihex(path: str, words: list[int]):
+    data = struct.pack(f"<{len(words)}I", *words)
+    lines = []
+    for off in range(0, len(data), 16):
+        if off % 0x10000 == 0:
+            rec = bytes((2, 0, 0, 4)) + (off >> 16).to_bytes(2, "big")
+            lines.append(":" + (rec + bytes(((-sum(rec)) & 0xFF,))).hex().upper())
+        chunk = data[off:off + 16]
+        rec = bytes((len(chunk), (off >> 8) & 0xFF, off & 0xFF, 0)) + chunk
+        lines.append(":" + (rec + bytes(((-sum(rec)) & 0xFF,))).hex().upper())
+    lines.append(":00000001FF")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def _write_ihex_sparse(path: str, words: list[int]):
+    """Dos regiones de 16 bytes separadas por 64 KiB (registro 04 entre medio)."""
+    data = struct.pack("<8I", *words[:8])
+    lines = []
+    for upper, off, chunk in ((0, 0, data[:16]), (1, 0, data[16:])):
+        rec = bytes((2, 0, 0, 4)) + upper.to_bytes(2, "big")
+        lines.append(":" + (rec + bytes(((-sum(rec)) & 0xFF,))).hex().upper())
+        rec = bytes((len(chunk), 0, off, 0)) + chunk
+        lines.append(":" + (rec + bytes(((-sum(rec)) & 0xFF,))).hex().upper())
+    lines.append(":00000001FF")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def _write_elf(path: str, words: list[int]):
+    code = struct.pack(f"<{len(words)}I", *words)
+    data = b"\xAA" * 64                 # segmento de datos (no ejecutable): se ignora
+    ehdr_sz, phdr_sz = 52, 32
+    off_code = ehdr_sz + 2 * phdr_sz
+    off_data = off_code + len(code)
+    ident = b"\x7fELF" + bytes((1, 1, 1)) + bytes(9)
+    ehdr = struct.pack("<16sHHIIIIIHHHHHH", ident, 2, 0xF3, 1, 0, ehdr_sz, 0, 0,
+                       ehdr_sz, phdr_sz, 2, 40, 0, 0)
+    ph_code = struct.pack("<IIIIIIII", 1, off_code, 0, 0, len(code), len(code), 5, 4)
+    ph_data = struct.pack("<IIIIIIII", 1, off_data, 0x10000, 0x10000, len(data), len(data), 6, 4)
+    with open(path, "wb") as f:
+        f.write(ehdr + ph_code + ph_data + code + data)
+
+
+_FORMATS = [("mem", _write_mem), ("mixed.mem", _write_mixed), ("bin", _write_bin),
+            ("hex", _write_ihex), ("elf", _write_elf)]
+
+
+def main(argv: list[str]) -> int:
+    n = arg_int(argv, 1, 65536)
+    reps = arg_int(argv, 2, 5)
+
+    rnd = random.Random(1)
+    words = [rnd.getrandbits(32) for _ in range(n)]
+    expected = [(4*k, w) for k, w in enumerate(words)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {}
+        for ext, writer in _FORMATS:
+            paths[ext] = os.path.join(tmp, f"prog.{ext}")
+            writer(paths[ext], words)
+
+        for ext, path in paths.items():
+            clear_program_cache()
+            if image_items(*load_program(path)) != expected:
+                raise SystemExit(f"[ERROR] .{ext}: la imagen no coincide")
+            if parse_program_file(path) != expected:
+                raise SystemExit(f"[ERROR] .{ext}: parse_program_file no coincide")
+        for ext in ("mem", "mixed.mem"):
+            if _legacy_parse(paths[ext]) != expected:
+                raise SystemExit(f"[ERROR] parser anterior .{ext}: la imagen no coincide")
+        print(f"[OK] {n} words idénticas en {', '.join(paths)}")
+
+        # dispersos: sólo lo que el archivo escribe, ordenado, sin NOP entre regiones
+        sparse = os.path.join(tmp, "sparse.mem")
+        _write_sparse(sparse, words)
+        if parse_program_file(sparse) != _sparse_expected(words):
+            raise SystemExit("[ERROR] texto disperso: parse_program_file rellenó o desordenó")
+        sparse_hex = os.path.join(tmp, "sparse.hex")
+        _write_ihex_sparse(sparse_hex, words)
+        if parse_program_file(sparse_hex) != ([(4*k, w) for k, w in enumerate(words[:4])]
+                                              + [(0x10000 + 4*k, w) for k, w in enumerate(words[4:8])]):
+            raise SystemExit("[ERROR] Intel HEX disperso: parse_program_file rellenó")
+        print("[OK] texto e Intel HEX dispersos sin relleno entre regiones")
+
+        dt_old = {ext: timed(lambda p=paths[ext]: _legacy_parse(p), reps)[0]
+                  for ext in ("mem", "mixed.mem")}
+        for ext in dt_old:
+            print(f"{'anterior .' + ext:18s} {dt_old[ext]*1e3:8.2f} ms")
+        for ext, path in paths.items():
+            def cold(path=path):
+                clear_program_cache()
+                parse_program_file(path)
+            dt = timed(cold, reps)[0]
+            ref = dt_old.get(ext)
+            vs = f"  speedup={ref / dt:6.1f}x" if ref else ""
+            print(f"{'frío .' + ext:18s} {dt*1e3:8.2f} ms{vs}")
+        parse_program_file(paths["mem"])
+        dt = timed(lambda: parse_program_file(paths["mem"]), reps * 20)[0]
+        print(f"{'cache .mem':18s} {dt*1e3:8.3f} ms  speedup={dt_old['mem'] / dt:6.0f}x")
+
+        # el cache se invalida si el archivo cambia
+        words[0] ^= 1
+        _write_mem(paths["mem"], words)
+        os.utime(paths["mem"], ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+        if load_program(paths["mem"])[1][0] != words[0]:
+            raise SystemExit("[ERROR] el cache no se invalidó al modificar el archivo")
+        print("[OK] cache invalidado al modificar el archivo")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,100 @@
+"""
+'N' (n pasos con un solo comando) contra 'S' repetido: mismo estado final y mismas
+muestras cada k ciclos en el simulador ciclo a ciclo, y tiempo/bytes en el cable
+contra una fake_board a baud real, también a través de debug_server.
+
+Uso (desde riscv_debug_gui):
+    python -m bench.step_n [ciclos] [cada] [baud]
+"""
+import sys
+import time
+
+from debug_server import DebugServer
+from debughost import DUMP_STEP_SAMPLE, DebugHost
+from fake_board import FakeBoard
+from pipe_decode import PIPE_WORDS
+from sim_host import SimHost
+
+from bench.suite import arg_int, load_asm, step_frames
+
+# cuenta hasta 100000: no llega a HALT dentro de lo que se mide
+_PROG = """
+    li   x1, 0
+    li   x2, 100000
+loop:
+    addi x1, x1, 1
+    sw   x1, 0(x0)
+    bne  x1, x2, loop
+    ebreak
+"""
+
+
+def _body(fr: bytes) -> bytes:
+    # todo menos el dump_type (STEP_SAMPLE vs STEP)
+    return fr[:1] + fr[2:]
+
+
+def main(argv: list[str]) -> int:
+    n = arg_int(argv, 1, 200)
+    every = arg_int(argv, 2, 50)
+    baud = arg_int(argv, 3, 115200)
+
+    # --- equivalencia en el simulador ciclo a ciclo ---
+    a = SimHost(cycle_accurate=True)
+    b = SimHost(cycle_accurate=True)
+    load_asm(a, _PROG)
+    load_asm(b, _PROG)
+    ref = step_frames(a, n)
+    frames = b.step(n, every=every)
+    want = [ref[k - 1] for k in range(every, n, every)] if every else []
+    if frames[-1] != ref[-1]:
+        raise SystemExit("[ERROR] 'N': el frame final no coincide con n 'S'")
+    if [_body(f) for f in frames[:-1]] != [_body(f) for f in want]:
+        raise SystemExit("[ERROR] 'N': las muestras no coinciden con los 'S' equivalentes")
+    if any(f[1] != DUMP_STEP_SAMPLE for f in frames[:-1]):
+        raise SystemExit("[ERROR] 'N': muestra con dump_type distinto de STEP_SAMPLE")
+    print(f"[OK] N {n} cada {every}: final y {len(frames) - 1} muestras iguales a {n} 'S'")
+
+    fr = b.step(0)
+    if fr != [frames[-1]]:
+        raise SystemExit("[ERROR] 'N' con n=0 debería sólo dumpear el estado")
+
+    # --- cable a baud real ---
+    board = FakeBoard(baud=baud, latency_s=1e-3, cycle_accurate=True)
+    host = DebugHost(board.url, baud, PIPE_WORDS)
+    try:
+        load_asm(host, _PROG)
+        t0 = time.perf_counter()
+        step_frames(host, n)
+        dt_s = time.perf_counter() - t0
+        rx_s = n * host.frame_len
+
+        for k in (0, every):
+            t0 = time.perf_counter()
+            got = host.step(n, every=k)
+            dt = time.perf_counter() - t0
+            print(f"[BENCH] {n} ciclos @ {baud}: S x{n} {dt_s*1e3:8.1f} ms ({rx_s} B)  "
+                  f"N cada {k:<4} {dt*1e3:7.1f} ms ({len(got) * host.frame_len} B)  "
+                  f"{dt_s / dt:6.1f}x")
+    finally:
+        host.close()
+
+    # --- a través de debug_server: todos los frames llegan a quien mandó 'N' ---
+    owner = DebugHost(board.url, baud, PIPE_WORDS)
+    srv = DebugServer(owner, ("127.0.0.1", 0), log=lambda s: None)
+    try:
+        cli = DebugHost(srv.url, 0, PIPE_WORDS)
+        got = cli.step(n, every=every)
+        cli.close()
+        if len(got) != len(frames):
+            raise SystemExit(f"[ERROR] 'N' vía debug_server: {len(got)} frames (esperados {len(frames)})")
+        print("[OK] 'N' vía debug_server")
+    finally:
+        srv.close()
+        owner.close()
+        board.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,491 @@
+"""
+Suite de micro-benchmarks del lado host: framing, decodificación, parseo de programas,
+render y round trips por puerto serie. Todo con datos sintéticos y deterministas
+(frames del modelo de pipeline sobre un programa fijo, imágenes con semilla fija).
+
+Salida JSON (stdout o --out). Con --baseline compara contra un resultado guardado y
+marca como regresión todo caso que tarde más de (1 + --tolerance) veces lo de la base;
+el código de salida es 1 si hubo regresiones (cada una se remide --confirm veces antes
+de reportarla, para no marcar ruido). --save-baseline guarda la corrida.
+
+Uso (desde riscv_debug_gui; la GUI corre con QT_QPA_PLATFORM=offscreen):
+    python -m bench.suite [-k filtro] [--repeat 7] [--out res.json]
+    python -m bench.suite --baseline bench/baseline.json
+    python -m bench.suite --save-baseline bench/baseline.json
+
+Los tiempos dependen de la máquina: la base del repo sirve de referencia en la misma
+PC; en otra, regenerarla antes de comparar.
+
+Las utilidades de arriba (argumentos, tiempos, frames del modelo, carga de un programa
+ensamblado, pasos 'S', stream en memoria) las comparten los demás bench/*.py.
+"""
+import argparse
+import atexit
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+from assembler import assemble
+from dump_frame import DumpFrame
+from framer import Framer
+from pipe_decode import PIPE_WORDS, decode_pipe_words
+from pipeline_model import PipelineModel
+from program_parser import clear_program_cache, image_items, load_program
+from sim_host import DUMP_STEP
+
+DM_BYTES = 64
+N_FRAMES = 2000
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# loop con stores: los frames cambian regs, DMEM y todas las etapas del pipeline
+_PROG = """
+        li   x1, 0
+        li   x2, 60
+loop:   addi x1, x1, 1
+        sw   x1, 0(x0)
+        lw   x3, 0(x0)
+        add  x4, x3, x1
+        sb   x4, 5(x0)
+        bne  x1, x2, loop
+        halt
+        nop
+        nop
+"""
+
+# nombre -> (factory, descripción); factory() devuelve (fn, ops) o None si no aplica
+CASES: dict[str, tuple] = {}
+
+
+def case(name: str, desc: str):
+    def deco(factory):
+        CASES[name] = (factory, desc)
+        return factory
+    return deco
+
+
+# ---------------- utilidades compartidas con los bench/*.py ----------------
+def arg_int(argv: list[str], k: int, default: int) -> int:
+    """argv[k] como entero (acepta 0x...), o default si no vino."""
+    return int(argv[k], 0) if len(argv) > k else default
+
+
+def timed(fn, reps: int) -> tuple[float, object]:
+    """Tiempo medio por llamada de fn() en reps llamadas, y lo que devolvió la última."""
+    out = None
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        out = fn()
+    return (time.perf_counter() - t0) / reps, out
+
+
+def model_frames(items, n: int, pipe_words: int = PIPE_WORDS, dm_bytes: int = DM_BYTES) -> list[bytes]:
+    """n frames STEP del modelo de pipeline sobre [(addr, word)]; en HALT vuelve a 0."""
+    m = PipelineModel()
+    for addr, w in items:
+        m.write_imem(addr, w)
+    m.reset_fetch(0)
+    frames = []
+    while len(frames) < n:
+        m.step()
+        frames.append(m.dump_frame(DUMP_STEP, pipe_words, dm_bytes))
+        if m.halt_seen:
+            m.reset_fetch(0)
+    return frames
+
+
+def load_asm(host, src: str):
+    """Ensambla src, lo carga en IMEM y manda 'R'."""
+    asm = assemble(src)
+    host.program_image(image_items(asm.base, asm.words))
+    host.send_cmd("R")
+
+
+def step_frames(host, n: int) -> list[bytes]:
+    """n pasos ('S'), cada uno con su frame STEP."""
+    out = []
+    for _ in range(n):
+        host.send_cmd("S")
+        out.append(host.read_frame(5.0, expect=1))
+    return out
+
+
+class MemSerial:
+    """Stream fijo en memoria con la interfaz de pyserial que usa Framer; cuenta read()."""
+
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.off = 0
+        self.reads = 0
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self.data) - self.off
+
+    def read(self, n: int = 1) -> bytes:
+        self.reads += 1
+        out = bytes(self.data[self.off:self.off + n])
+        self.off += len(out)
+        return out
+
+
+_frames_cache: list[bytes] | None = None
+
+
+def synth_frames(n: int = N_FRAMES) -> list[bytes]:
+    """Frames STEP del modelo de pipeline (ciclo a ciclo) corriendo _PROG en loop."""
+    global _frames_cache
+    if _frames_cache is None or len(_frames_cache) < n:
+        asm = assemble(_PROG)
+        _frames_cache = model_frames(image_items(asm.base, asm.words), n)
+    return _frames_cache[:n]
+
+
+# ---------------- framing ----------------
+@case("frame.framer", "Framer.read_frame sobre un stream con basura entre frames")
+def _framer():
+    frames = synth_frames()
+    rnd = random.Random(1)
+    stream = b"".join(bytes(rnd.getrandbits(8) & 0x7F for _ in range(rnd.randrange(8))) + f for f in frames)
+    frame_len = len(frames[0])
+
+    def fn():
+        fr = Framer(MemSerial(stream), frame_len, off_reg=8 + PIPE_WORDS * 4)
+        for _ in frames:
+            fr.read_frame(1.0)
+    return fn, len(frames)
+
+
+@case("frame.dumpframe", "DumpFrame + regs + PC + IF/ID (lo que lee un render)")
+def _dumpframe():
+    frames = synth_frames()
+
+    def fn():
+        for f in frames:
+            d = DumpFrame(f, PIPE_WORDS, DM_BYTES)
+            d.regs
+            d.pc
+            d.ifid
+    return fn, len(frames)
+
+
+# ---------------- decodificación ----------------
+@case("pipe.decode_scalar", "decode_pipe_words por frame")
+def _decode_scalar():
+    rows = [list(DumpFrame(f, PIPE_WORDS, DM_BYTES).pipe_words) for f in synth_frames()]
+
+    def fn():
+        for r in rows:
+            decode_pipe_words(r)
+    return fn, len(rows)
+
+
+@case("pipe.decode_batch", "decode_pipe_batch (NumPy), costo por fila")
+def _decode_batch():
+    try:
+        import numpy as np
+        from pipe_batch import decode_pipe_batch
+    except ImportError:
+        return None
+    rows = [list(DumpFrame(f, PIPE_WORDS, DM_BYTES).pipe_words) for f in synth_frames()]
+    pw = np.array(rows * 50, dtype=np.uint32)
+
+    def fn():
+        decode_pipe_batch(pw)
+    return fn, len(pw)
+
+
+@case("disasm.annotate", "disasm de IF/ID + reconstrucción de ID/EX por frame")
+def _disasm():
+    from disasm import disasm, idex_disasm
+    rows = [tuple(DumpFrame(f, PIPE_WORDS, DM_BYTES).pipe_words) for f in synth_frames()]
+
+    def fn():
+        for pw in rows:
+            disasm(pw[2], pw[0])
+            idex_disasm(pw[8], pw[9], pw[10])
+    return fn, len(rows)
+
+
+# ---------------- parseo de programas ----------------
+def _image_file(tmp: str, ext: str, n: int = 65536) -> str:
+    rnd = random.Random(2)
+    words = [rnd.getrandbits(32) for _ in range(n)]
+    path = os.path.join(tmp, f"img.{ext}")
+    if ext == "bin":
+        with open(path, "wb") as f:
+            f.write(struct.pack(f"<{n}I", *words))
+    else:
+        with open(path, "w") as f:
+            f.write("".join(f"{w:08x}\n" for w in words))
+    return path
+
+
+def _parse_case(ext: str, cached: bool):
+    tmp = tempfile.mkdtemp(prefix="rvbench-")
+    atexit.register(shutil.rmtree, tmp, True)
+    path = _image_file(tmp, ext)
+
+    if cached:
+        load_program(path)
+
+        def fn():
+            for _ in range(200):
+                load_program(path)
+        return fn, 200
+
+    def fn():
+        clear_program_cache()
+        load_program(path)
+    return fn, 1
+
+
+@case("parse.mem_64k", "load_program de un .mem de 64Ki words (sin cache)")
+def _parse_mem():
+    return _parse_case("mem", False)
+
+
+@case("parse.bin_64k", "load_program de un .bin de 64Ki words (sin cache)")
+def _parse_bin():
+    return _parse_case("bin", False)
+
+
+@case("parse.cached_64k", "load_program repetido (cache por path/mtime/size)")
+def _parse_cached():
+    return _parse_case("mem", True)
+
+
+# ---------------- render ----------------
+def _qt():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PySide6 import QtWidgets
+    except ImportError:
+        return None
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@case("ui.hexdump_1k", "hexdump_lines sobre 1 KiB (DMEM completa)")
+def _hexdump_text():
+    # el hexdump de texto sigue en la GUI Tk; el caso queda para no perder su base
+    try:
+        from gui import hexdump_lines
+    except ImportError:
+        return None
+    rnd = random.Random(3)
+    data = bytes(rnd.getrandbits(8) for _ in range(1024))
+
+    def fn():
+        for _ in range(100):
+            hexdump_lines(data)
+    return fn, 100
+
+
+@case("ui.hexdump_model_1k", "HexdumpModel.set_data sobre 1 KiB con una fila cambiada por dump")
+def _hexdump():
+    if _qt() is None:
+        return None
+    from ui.hexdump import HexdumpModel
+    rnd = random.Random(3)
+    data = bytearray(rnd.getrandbits(8) for _ in range(1024))
+    dumps = []
+    for i in range(100):
+        data[(i * 68) % 1024] ^= 0xFF
+        dumps.append(bytes(data))
+    m = HexdumpModel()
+    m.set_data(dumps[-1])
+
+    def fn():
+        for d in dumps:
+            m.set_data(d)
+    fn._keep = m
+    return fn, len(dumps)
+
+
+@case("ui.apply_dump", "MainWindow.apply_dump por frame (Qt offscreen)")
+def _apply_dump():
+    app = _qt()
+    if app is None:
+        return None
+    from ui.main_window import MainWindow
+    w = MainWindow()
+    frames = [DumpFrame(f, PIPE_WORDS, DM_BYTES) for f in synth_frames(500)]
+    w.apply_dump(frames[0], quiet=True)
+
+    def fn():
+        for d in frames:
+            w.apply_dump(d, quiet=True)
+        app.processEvents()
+    fn._keep = w
+    return fn, len(frames)
+
+
+# ---------------- puerto serie ----------------
+@case("serial.loop_frame", "frame completo escrito y releído por loop:// + Framer")
+def _loop():
+    import serial
+    frames = synth_frames(200)
+    ser = serial.serial_for_url("loop://", timeout=1.0)
+    fr = Framer(ser, len(frames[0]), off_reg=8 + PIPE_WORDS * 4)
+
+    def fn():
+        for f in frames:
+            ser.write(f)
+            fr.read_frame(1.0)
+    fn._keep = ser
+    return fn, len(frames)
+
+
+@case("serial.pty_roundtrip", "'D' -> frame por una pty con un responder (placa falsa mínima)")
+def _pty():
+    if not hasattr(os, "openpty"):
+        return None
+    import serial
+    import tty
+    frames = synth_frames(200)
+    master, slave = os.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    ser = serial.Serial(os.ttyname(slave), 115200, timeout=1.0)
+    fr = Framer(ser, len(frames[0]), off_reg=8 + PIPE_WORDS * 4)
+    stop = threading.Event()
+
+    def responder():
+        k = 0
+        while not stop.is_set():
+            cmd = os.read(master, 1)
+            if cmd == b"D":
+                os.write(master, frames[k % len(frames)])
+                k += 1
+    th = threading.Thread(target=responder, daemon=True)
+    th.start()
+
+    def fn():
+        for _ in frames:
+            ser.write(b"D")
+            fr.read_frame(1.0)
+    fn._keep = (ser, master, slave, stop, th)
+    return fn, len(frames)
+
+
+# ---------------- runner ----------------
+def run_case(name: str, repeat: int) -> dict | None:
+    factory, desc = CASES[name]
+    made = factory()
+    if made is None:
+        return None
+    fn, ops = made
+    fn()    # calentamiento (caches, imports perezosos)
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter_ns()
+        fn()
+        times.append(time.perf_counter_ns() - t0)
+    best = min(times)
+    return {
+        "desc": desc,
+        "ops": ops,
+        "ns_per_op": round(best / ops, 1),
+        "median_ns_per_op": round(statistics.median(times) / ops, 1),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Casos más lentos que la base por más de tolerance (ratio sobre el mejor tiempo)."""
+    out = []
+    for name, r in results.items():
+        b = baseline.get(name)
+        if b is None:
+            continue
+        ratio = r["ns_per_op"] / b["ns_per_op"]
+        r["baseline_ns_per_op"] = b["ns_per_op"]
+        r["ratio"] = round(ratio, 3)
+        if ratio > 1 + tolerance:
+            out.append(name)
+    return out
+
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(prog="bench.suite", description="Micro-benchmarks del host")
+    ap.add_argument("-k", dest="filter", default="", help="sólo casos cuyo nombre contenga esto")
+    ap.add_argument("--repeat", type=int, default=7)
+    ap.add_argument("--out", help="archivo JSON de resultados (por defecto stdout)")
+    ap.add_argument("--baseline", nargs="?", const=DEFAULT_BASELINE, help="JSON de base a comparar")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="regresión si ratio > 1 + tol")
+    ap.add_argument("--confirm", type=int, default=2, help="remediciones antes de reportar una regresión")
+    ap.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, help="guardar la corrida como base")
+    ap.add_argument("--list", action="store_true", help="listar los casos y salir")
+    args = ap.parse_args(argv[1:])
+
+    if args.list:
+        for name, (_, desc) in CASES.items():
+            print(f"{name:24s} {desc}")
+        return 0
+
+    results = {}
+    for name in CASES:
+        if args.filter not in name:
+            continue
+        r = run_case(name, args.repeat)
+        if r is None:
+            print(f"[SKIP] {name}: dependencia no disponible", file=sys.stderr)
+            continue
+        results[name] = r
+        print(f"{name:24s} {r['ns_per_op']:12.1f} ns/op", file=sys.stderr)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            base = json.load(f)["results"]
+        regressions = compare(results, base, args.tolerance)
+        # una PC compartida mete ruido: lo que parece regresión se vuelve a medir y se
+        # queda el mejor tiempo antes de reportarlo
+        for _ in range(args.confirm):
+            if not regressions:
+                break
+            for name in regressions:
+                r = run_case(name, args.repeat)
+                if r["ns_per_op"] < results[name]["ns_per_op"]:
+                    results[name] = r
+            regressions = compare(results, base, args.tolerance)
+        for name in regressions:
+            r = results[name]
+            print(f"[REGRESIÓN] {name}: {r['ns_per_op']:.1f} ns/op vs {r['baseline_ns_per_op']:.1f} "
+                  f"({r['ratio']:.2f}x)", file=sys.stderr)
+        if not regressions:
+            print(f"[OK] sin regresiones (tolerancia {args.tolerance:.0%})", file=sys.stderr)
+
+    doc = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "repeat": args.repeat,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+        "regressions": regressions,
+    }
+    text = json.dumps(doc, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    elif not args.save_baseline:
+        print(text)
+    if args.save_baseline:
+        doc.pop("regressions")
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(json.dumps(doc, indent=2, ensure_ascii=False) + "\n")
+        print(f"[INFO] base guardada en {args.save_baseline}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,389 @@
+"""
+Bridge TCP: un proceso es dueño de la placa (DebugHost/SimHost) y la comparte con
+varios clientes por TCP, con el mismo protocolo de bytes que la UART.
+
+    python debug_server.py COM3 [--baud 115200] [--listen 127.0.0.1:5555]
+    python debug_server.py sim://
+
+Los clientes se conectan como a cualquier puerto: DebugHost("tcp://127.0.0.1:5555", ...)
+o la GUI con Puerto = tcp://127.0.0.1:5555.
+
+- Scheduler justo: round robin entre clientes con comandos pendientes, un comando por
+  turno (las ráfagas de 'P' van de a P_QUANTUM registros).
+- Cache del último frame: un 'D' sin comandos que cambien el estado desde el último
+  frame se contesta del cache (con dump_type = MANUAL), sin ir a la placa.
+- Fan-out: un cliente que manda 'W' recibe además los frames que piden los demás
+  ('w' lo da de baja). La debug unit ignora esos bytes, así que no chocan con comandos.
+- 'C' (checksum de IMEM) y 'X' (lectura de DMEM) se reenvían a la placa y la respuesta
+  va sólo a quien la pidió.
+- 'N' (n pasos con dumps cada k) ocupa un turno entero: se leen todos sus frames
+  hasta el STEP final y cada uno se entrega como cualquier otro frame.
+- 'M' (secciones del dump) es por cliente: la placa sigue mandando frames completos y
+  cada cliente los recibe recortados a lo que pidió. La ventana de DMEM sale de los
+  DM_DUMP_BYTES del frame completo (una ventana más allá llega recortada).
+- 'K' (dumps delta) de un cliente se ignora: el dueño reconstruye los frames y por TCP
+  van siempre completos. Con --key-every el enlace con la placa sí usa delta.
+"""
+import argparse
+import queue
+import socket
+import sys
+import threading
+from collections import deque
+
+from debughost import (CKSUM_TAG, DUMP_STEP_SAMPLE, DUMP_TYPE_OF, K_RECORD, M_RECORD, X_RECORD, XMEM_TAG,
+                       DebugHost, P_RECORD)
+from dump_frame import partial_frame
+from pipe_decode import PIPE_WORDS
+from sim_host import SimHost
+
+DEFAULT_LISTEN = ("127.0.0.1", 5555)
+P_QUANTUM = 64
+DUMP_MANUAL = 3
+
+# Comandos de un byte que cambian el estado de la CPU (invalidan el cache)
+_STATE_CMDS = b"RTSG"
+
+
+class _Client:
+    def __init__(self, sock: socket.socket, addr):
+        self.sock = sock
+        self.addr = addr
+        self.cmds: deque = deque()       # (cmd, payload)
+        self.watch = False
+        self.sections: tuple | None = None   # (máscara, addr, len) del último 'M'; None = completo
+        self.alive = True
+        self.sendq: queue.SimpleQueue = queue.SimpleQueue()
+
+    def __repr__(self):
+        return f"{self.addr[0]}:{self.addr[1]}"
+
+
+class DebugServer:
+    """
+    Dueño único de `host`. Un thread por cliente parsea su stream de comandos; un solo
+    thread (scheduler) habla con la placa; cada cliente tiene su propio thread de
+    envío, así un visor lento no frena a la placa.
+    """
+    def __init__(self, host: DebugHost, listen: tuple[str, int] = DEFAULT_LISTEN,
+                 frame_timeout_s: float = 8.0, run_timeout_s: float = 12.0, log=print):
+        self.host = host
+        host.set_sections()     # la placa manda siempre frames completos; 'M' se aplica por cliente
+        self.frame_timeout_s = frame_timeout_s
+        self.run_timeout_s = run_timeout_s
+        self.log = log
+
+        self._srv = socket.create_server(listen)
+        self.address = self._srv.getsockname()[:2]
+        self.url = f"tcp://{self.address[0]}:{self.address[1]}"
+
+        self._clients: list[_Client] = []
+        self._rr = 0
+        self._cv = threading.Condition()
+        self._stop = threading.Event()
+
+        self._cache: bytes | None = None
+        self.commands = 0
+        self.board_frames = 0
+        self.cache_hits = 0
+        self.fanout_frames = 0
+
+        self._threads = [
+            threading.Thread(target=self._accept_loop, name="dbgsrv-accept", daemon=True),
+            threading.Thread(target=self._schedule_loop, name="dbgsrv-board", daemon=True),
+        ]
+        for th in self._threads:
+            th.start()
+
+    def close(self):
+        self._stop.set()
+        try:
+            self._srv.close()
+        except OSError:
+            pass
+        with self._cv:
+            clients = list(self._clients)
+            self._cv.notify_all()
+        for c in clients:
+            self._drop(c)
+        for th in self._threads:
+            th.join(timeout=2.0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def serve_forever(self):
+        while not self._stop.wait(0.5):
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "clients": len(self._clients),
+            "commands": self.commands,
+            "board_frames": self.board_frames,
+            "cache_hits": self.cache_hits,
+            "fanout_frames": self.fanout_frames,
+        }
+
+    # ---------------- clientes ----------------
+    def _accept_loop(self):
+        self._srv.settimeout(0.2)
+        while not self._stop.is_set():
+            try:
+                sock, addr = self._srv.accept()
+            except (socket.timeout, OSError):
+                continue
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            c = _Client(sock, addr)
+            with self._cv:
+                self._clients.append(c)
+            threading.Thread(target=self._client_reader, args=(c,), name=f"dbgsrv-rx-{c}", daemon=True).start()
+            threading.Thread(target=self._client_writer, args=(c,), name=f"dbgsrv-tx-{c}", daemon=True).start()
+            self.log(f"[INFO] Cliente conectado: {c}")
+
+    def _drop(self, c: _Client):
+        with self._cv:
+            if not c.alive:
+                return
+            c.alive = False
+            c.cmds.clear()
+            if c in self._clients:
+                self._clients.remove(c)
+        c.sendq.put(None)
+        try:
+            c.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        c.sock.close()
+        self.log(f"[INFO] Cliente desconectado: {c}")
+
+    def _client_reader(self, c: _Client):
+        buf = bytearray()
+        while c.alive and not self._stop.is_set():
+            try:
+                data = c.sock.recv(4096)
+            except OSError:
+                data = b""
+            if not data:
+                break
+            buf += data
+
+            # Mismo parser que la FSM de la debug unit: 'P'/'C'/'N' + 8 bytes, 'M' + 5, 'X' + 4,
+            # 'K' + 2, resto de a 1 byte
+            cmds = []
+            i = 0
+            while i < len(buf):
+                b = buf[i]
+                if b in b"PCN":
+                    if len(buf) - i < P_RECORD.size:
+                        break
+                    cmds.append((chr(b), bytes(buf[i:i + P_RECORD.size])))
+                    i += P_RECORD.size
+                    continue
+                if b == ord("M"):
+                    if len(buf) - i < M_RECORD.size:
+                        break
+                    cmds.append(("M", bytes(buf[i:i + M_RECORD.size])))
+                    i += M_RECORD.size
+                    continue
+                if b == ord("X"):
+                    if len(buf) - i < X_RECORD.size:
+                        break
+                    cmds.append(("X", bytes(buf[i:i + X_RECORD.size])))
+                    i += X_RECORD.size
+                    continue
+                if b == ord("K"):
+                    if len(buf) - i < K_RECORD.size:
+                        break
+                    i += K_RECORD.size
+                    continue
+                i += 1
+                if b == ord("W"):
+                    c.watch = True
+                elif b == ord("w"):
+                    c.watch = False
+                elif b in b"RTDSG":
+                    cmds.append((chr(b), None))
+                # otros bytes: ignorados, como en la placa
+            del buf[:i]
+
+            if cmds:
+                with self._cv:
+                    c.cmds.extend(cmds)
+                    self._cv.notify()
+        self._drop(c)
+
+    def _client_writer(self, c: _Client):
+        while True:
+            data = c.sendq.get()
+            if data is None:
+                return
+            try:
+                c.sock.sendall(data)
+            except OSError:
+                self._drop(c)
+                return
+
+    # ---------------- placa ----------------
+    def _next_turn(self) -> tuple[_Client, list] | None:
+        # round robin: arranca después del último cliente atendido
+        with self._cv:
+            while not self._stop.is_set():
+                n = len(self._clients)
+                for k in range(n):
+                    idx = (self._rr + k) % n
+                    c = self._clients[idx]
+                    if c.cmds:
+                        self._rr = idx + 1
+                        batch = [c.cmds.popleft()]
+                        if batch[0][0] == "P":
+                            while c.cmds and c.cmds[0][0] == "P" and len(batch) < P_QUANTUM:
+                                batch.append(c.cmds.popleft())
+                        return c, batch
+                self._cv.wait(0.2)
+        return None
+
+    def _schedule_loop(self):
+        while True:
+            turn = self._next_turn()
+            if turn is None:
+                return
+            c, batch = turn
+            try:
+                self._execute(c, batch)
+            except Exception as e:
+                self.log(f"[ERROR] {c}: {type(e).__name__}: {e}")
+
+    def _execute(self, c: _Client, batch: list):
+        host = self.host
+        cmd = batch[0][0]
+        self.commands += len(batch)
+
+        if cmd == "M":
+            # en orden con el resto de los comandos del cliente, pero sin tocar la placa
+            _, mask, addr, n = M_RECORD.unpack(batch[0][1])
+            c.sections = (mask, addr, n)
+            return
+        if cmd == "P":
+            self._cache = None
+            host.ser.write(b"".join(p for _, p in batch))
+            return
+        if cmd == "C":
+            # no cambia el estado: el cache sigue valiendo
+            rec = batch[0][1]
+            host.ser.write(rec)
+            try:
+                resp = host.framer.read_tagged(CKSUM_TAG, 4, self.frame_timeout_s, hdr=rec[1:])
+            except TimeoutError as e:
+                self.log(f"[WARN] {c}: 'C' sin respuesta ({e})")
+                return
+            if c.alive:
+                c.sendq.put(bytes([CKSUM_TAG]) + rec[1:] + resp)
+            return
+        if cmd == "X":
+            # tampoco cambia el estado
+            rec = batch[0][1]
+            _, _, n = X_RECORD.unpack(rec)
+            host.ser.write(rec)
+            try:
+                resp = host.framer.read_tagged(XMEM_TAG, n, self.frame_timeout_s, hdr=rec[1:])
+            except TimeoutError as e:
+                self.log(f"[WARN] {c}: 'X' sin respuesta ({e})")
+                return
+            if c.alive:
+                c.sendq.put(bytes([XMEM_TAG]) + rec[1:] + resp)
+            return
+        if cmd == "N":
+            self._cache = None
+            host.ser.write(batch[0][1])
+            while True:
+                try:
+                    frame = host.read_frame(self.frame_timeout_s)
+                except TimeoutError as e:
+                    self.log(f"[WARN] {c}: 'N' sin frame ({e})")
+                    return
+                if frame[1] not in (DUMP_TYPE_OF["S"], DUMP_STEP_SAMPLE):
+                    continue
+                self.board_frames += 1
+                self._deliver(c, frame)
+                if frame[1] == DUMP_TYPE_OF["S"]:
+                    self._cache = frame
+                    return
+        if cmd == "D" and self._cache is not None:
+            frame = bytearray(self._cache)
+            frame[1] = DUMP_MANUAL
+            self.cache_hits += 1
+            self._deliver(c, bytes(frame))
+            return
+
+        if cmd.encode() in _STATE_CMDS:
+            self._cache = None
+        host.send_cmd(cmd)
+        if cmd not in DUMP_TYPE_OF:
+            return
+        try:
+            frame = host.read_frame(self.run_timeout_s if cmd == "G" else self.frame_timeout_s,
+                                    expect=DUMP_TYPE_OF[cmd])
+        except TimeoutError as e:
+            # el cliente vence su propio timeout; acá sólo se avisa
+            self.log(f"[WARN] {c}: '{cmd}' sin frame ({e})")
+            return
+        self.board_frames += 1
+        self._cache = frame
+        self._deliver(c, frame)
+
+    def _shape(self, c: _Client, frame: bytes) -> bytes:
+        if c.sections is None:
+            return frame
+        return partial_frame(frame, self.host.pipe_words, *c.sections)
+
+    def _deliver(self, origin: _Client, frame: bytes):
+        if origin.alive:
+            origin.sendq.put(self._shape(origin, frame))
+        with self._cv:
+            watchers = [w for w in self._clients if w.watch and w is not origin]
+        for w in watchers:
+            w.sendq.put(self._shape(w, frame))
+        self.fanout_frames += len(watchers)
+
+
+def _parse_listen(s: str) -> tuple[str, int]:
+    host, _, port = s.rpartition(":")
+    return host or DEFAULT_LISTEN[0], int(port)
+
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(prog="debug_server.py", description="Comparte una placa por TCP")
+    ap.add_argument("port", help="COM3, /dev/ttyUSB1, sim:// o sim://pipeline")
+    ap.add_argument("--baud", type=int, default=115200)
+    ap.add_argument("--dm", type=int, default=64, help="DM_DUMP_BYTES del bitstream")
+    ap.add_argument("--listen", default=f"{DEFAULT_LISTEN[0]}:{DEFAULT_LISTEN[1]}")
+    ap.add_argument("--key-every", type=int, default=0,
+                    help="dumps delta con la placa, keyframe cada N dumps (0 = sin delta)")
+    args = ap.parse_args(argv[1:])
+
+    if args.port.startswith("sim://"):
+        host = SimHost(PIPE_WORDS, args.dm, cycle_accurate=(args.port == "sim://pipeline"))
+    else:
+        host = DebugHost(args.port, args.baud, PIPE_WORDS, args.dm)
+
+    if args.key_every:
+        host.set_delta(args.key_every)
+    srv = DebugServer(host, _parse_listen(args.listen))
+    print(f"[INFO] {args.port} compartido en {srv.url} (Ctrl+C para salir)")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.close()
+        host.close()
+        print(f"[INFO] {srv.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -1,41 +1,101 @@
+import itertools
+import queue
 import struct
+import threading
 import time
 import serial
 
-MAGIC = 0xD0
+from framer import MAGIC, SEC_ALL, SEC_MEM, SEC_PC, SEC_PIPE, Framer, section_offsets
+from latency import CmdTiming, LatencyStats
+
+# dump_type que devuelve cada comando (ver debug_unit_uart)
+DUMP_TYPE_OF = {"S": 1, "G": 2, "D": 3}
+# dumps intermedios de 'N' (cada `every` ciclos); el último es un STEP normal
+DUMP_STEP_SAMPLE = 4
+
+# Registro de programación: 'P' + addr(4B LE) + data(4B LE)
+P_RECORD = struct.Struct("<cII")
+
+# Checksum de IMEM: 'C' + addr(4B LE) + n_words(4B LE) -> 0xC5 + addr + n_words + checksum(4B LE)
+CKSUM_TAG = 0xC5
+CKSUM_HDR = struct.Struct("<II")
+
+# Secciones de los dumps: 'M' + máscara(1B) + addr(2B LE) + len(2B LE) de la ventana de DMEM
+M_RECORD = struct.Struct("<cBHH")
+
+# Dumps delta: 'K' + every(2B LE), keyframe cada `every` dumps (0 = sin delta)
+K_RECORD = struct.Struct("<cH")
+
+# Lectura de DMEM: 'X' + addr(2B LE) + len(2B LE) -> 0xA5 + addr + len + len bytes
+X_RECORD = struct.Struct("<cHH")
+XMEM_TAG = 0xA5
+XMEM_HDR = struct.Struct("<HH")
+
+# DMEM real (cpu_top instancia mem_stage con DM_BYTES=1024) y páginas del cache de read_mem
+DMEM_BYTES = 1024
+MEM_PAGE_BYTES = 64
+
+# EX/MEM en los pipe words (ver pipe_decode.decode_exmem): alu_result, funct3 y ctrl
+_EXMEM_ALU, _EXMEM_F3, _EXMEM_CTRL = 11, 15, 16
+_U32 = struct.Struct("<I")
 
 def u32_le(x: int) -> bytes:
     return struct.pack("<I", x & 0xFFFFFFFF)
 
-def read_exact(ser: serial.Serial, n: int) -> bytes:
-    data = bytearray()
-    while len(data) < n:
-        chunk = ser.read(n - len(data))
-        if not chunk:
-            raise TimeoutError(f"Timeout leyendo {n} bytes (llegaron {len(data)})")
-        data += chunk
-    return bytes(data)
-
-def sync_to_magic(ser: serial.Serial, deadline_s: float) -> None:
-    while time.time() < deadline_s:
-        b = ser.read(1)
-        if b and b[0] == MAGIC:
-            return
-    raise TimeoutError("Timeout esperando MAGIC 0xD0")
+def imem_checksum(words) -> int:
+    """Mismo checksum que el comando 'C' de debug_unit_uart: rotl(cs, 1) ^ word."""
+    cs = 0
+    for w in words:
+        cs = (((cs << 1) | (cs >> 31)) & 0xFFFFFFFF) ^ (w & 0xFFFFFFFF)
+    return cs
 
 class DebugHost:
     """
     Host UART. Frame:
       4B header + 4B PC + PIPE_WORDS*4 + 32*4 regs + DM bytes
     """
-    def __init__(self, port: str, baud: int, pipe_words: int, dm_dump_bytes: int = 64, timeout_s: float = 0.2):
+    def __init__(self, port: str, baud: int, pipe_words: int, dm_dump_bytes: int = 64, timeout_s: float = 0.2,
+                 mem_bytes: int = DMEM_BYTES):
+        self.baud = baud
         self.pipe_words = pipe_words
         self.dm_dump_bytes = dm_dump_bytes
         self.frame_len = 4 + 4 + pipe_words*4 + 32*4 + dm_dump_bytes
 
-        self.ser = serial.Serial(port, baud, timeout=timeout_s)
+        self.ser = self._open_serial(port, baud, timeout_s)
         self.ser.reset_input_buffer()
         self.ser.reset_output_buffer()
+        self.framer = Framer(self.ser, self.frame_len, off_reg=8 + self.pipe_words*4, pipe_words=pipe_words)
+
+        # (máscara, addr, len) de lo último mandado con 'M'; al conectar, el de reset
+        self.sections = (SEC_ALL, 0, dm_dump_bytes)
+        # intervalo de keyframes del último 'K' (0 = frames normales, el de reset)
+        self.key_every = 0
+
+        # Sombra de IMEM: lo que esta sesión escribió ({addr: word}). Nace vacía en cada
+        # conexión; 'R' no toca IMEM, así que no la invalida.
+        self.imem_shadow: dict[int, int] = {}
+
+        # Cache de DMEM para read_mem: página -> bytes. Se invalida con los stores que se
+        # ven en EX/MEM de los frames STEP (también en el frame siguiente, por si el
+        # store se escribe después del dump) y entero con RUN_END, 'N' sin muestrear
+        # cada ciclo o un timeout. Con debug_server sólo se ven los frames propios (o
+        # todos con 'W'): lo que ejecuten otros clientes hay que invalidarlo a mano.
+        self.mem_bytes = mem_bytes
+        self.mem_pages: dict[int, bytes] = {}
+        self._store_pages: set[int] = set()
+        self.mem_reads = 0          # transferencias 'X'
+        self.mem_read_bytes = 0
+        self.mem_hits = 0           # páginas servidas del cache
+
+        # latencia por comando (D/S/G por command(), P por program_word/program_image)
+        self.latency = LatencyStats(baud)
+
+    def _open_serial(self, port: str, baud: int, timeout_s: float):
+        # serial_for_url acepta tanto "COM3"/"/dev/ttyUSB1" como URLs (loop://, socket://);
+        # tcp://host:port (debug_server) es un alias de socket://
+        if port.startswith("tcp://"):
+            port = "socket://" + port[len("tcp://"):]
+        return serial.serial_for_url(port, baud, timeout=timeout_s)
 
     def close(self):
         try:
@@ -46,13 +106,395 @@ class DebugHost:
     def send_cmd(self, c: str):
         self.ser.write(c.encode("ascii"))
 
+    def set_sections(self, sections: int = SEC_ALL, mem_addr: int = 0, mem_len: int | None = None) -> bool:
+        """
+        Elige qué traen los próximos dumps ('M', ver framer.SEC_*): PC, pipeline,
+        registros y/o una ventana de DMEM de mem_len bytes desde mem_addr (por defecto
+        la de siempre, DM_DUMP_BYTES desde 0). Sin argumentos vuelve al frame completo.
+        Sólo manda 'M' si cambia algo; devuelve si lo mandó. Necesita el bitstream con 'M'.
+        """
+        if mem_len is None:
+            mem_len = self.dm_dump_bytes
+        if not 0 <= mem_addr <= 0xFFFF or not 0 <= mem_len <= 4096:
+            raise ValueError("Ventana de DMEM fuera de rango")
+        cfg = (sections & SEC_ALL, mem_addr, mem_len)
+        if cfg == self.sections:
+            return False
+        self.ser.write(M_RECORD.pack(b"M", *cfg))
+        self.sections = cfg
+        return True
+
+    def set_delta(self, key_every: int) -> None:
+        """
+        Dumps delta ('K'): la placa manda sólo los registros y bytes de la ventana de
+        DMEM que cambiaron desde el dump anterior, con un keyframe cada key_every dumps
+        (0 = apagado). Siempre manda 'K', así el próximo dump es keyframe. El Framer
+        reconstruye los frames: read_frame/wait_dump devuelven siempre estado completo.
+        El bitstream por defecto (top_debug_system DELTA_EN=0) acepta 'K' pero manda
+        siempre frames completos; SimHost y FakeBoard hacen el delta como DELTA_EN=1.
+        """
+        if not 0 <= key_every <= 0xFFFF:
+            raise ValueError("key_every fuera de rango")
+        self.ser.write(K_RECORD.pack(b"K", key_every))
+        self.key_every = key_every
+
+    def dump_len(self) -> int:
+        """Largo de los dumps con las secciones actuales (un keyframe, si hay delta)."""
+        mask, addr, n = self.sections
+        if self.sections == (SEC_ALL, 0, self.dm_dump_bytes):
+            return self.frame_len
+        return section_offsets(mask, self.pipe_words)[4] + (n if mask & SEC_MEM else 0)
+
+    def command(self, cmd: str, timeout_s: float = 5.0) -> tuple[bytes, CmdTiming]:
+        """
+        Manda un comando con dump de respuesta (D/S/G) y espera su frame, registrando
+        las fases tx/first/magic/frame. El llamador completa parse/ui (si aplica) y
+        entrega la medición a self.latency.add(); si falla no se registra nada.
+        """
+        t = CmdTiming(cmd, tx_bytes=1, rx_bytes=self.dump_len())
+        fr = self.framer
+        fr.arm()
+        wire = fr.wire_bytes
+        self.send_cmd(cmd)
+        self.ser.flush()
+        t.mark("tx")
+        # primer byte de a uno; el resto del frame, con las lecturas grandes de siempre
+        deadline = time.monotonic() + timeout_s
+        fr.wait_byte(timeout_s)
+        frame = self.read_frame(max(0.0, deadline - time.monotonic()), expect=DUMP_TYPE_OF.get(cmd))
+        t.mark("frame")
+        t.first, t.magic = fr.t_first, fr.t_magic
+        t.rx_bytes = fr.wire_bytes - wire
+        return frame, t
+
+    def step(self, n: int = 1, every: int = 0, timeout_s: float = 5.0, on_frame=None) -> list[bytes]:
+        """
+        Avanza n ciclos con un único comando 'N' + n(4B LE) + every(4B LE): la placa
+        dumpea cada `every` ciclos (0 = sólo al final) y siempre al terminar; el estado
+        final es el mismo que con n 'S'. Devuelve los frames en orden (el último es el
+        STEP final); con on_frame(frame) se entregan a medida que llegan y no se acumulan,
+        salvo el último. timeout_s vale por frame.
+        n=1 manda un 'S' común (sirve también con bitstreams sin 'N'), medido como 'S'.
+        """
+        if n < 0 or every < 0:
+            raise ValueError("n y every deben ser >= 0")
+        if n == 1:
+            frame, t = self.command("S", timeout_s)
+            self.latency.add(t)
+            if on_frame is not None:
+                on_frame(frame)
+            return [frame]
+
+        if n > 1 and every != 1:
+            self.invalidate_mem()   # ciclos sin frame: stores que no se ven
+        n_samples = (n - 1) // every if every else 0
+        t = CmdTiming("N", tx_bytes=P_RECORD.size, rx_bytes=(n_samples + 1) * self.dump_len())
+        fr = self.framer
+        fr.arm()
+        wire = fr.wire_bytes
+        self.ser.write(P_RECORD.pack(b"N", n & 0xFFFFFFFF, every & 0xFFFFFFFF))
+        self.ser.flush()
+        t.mark("tx")
+        frames = []
+        while True:
+            frame = self.read_frame(timeout_s)
+            if frame[1] not in (DUMP_TYPE_OF["S"], DUMP_STEP_SAMPLE):
+                continue    # dump de otro comando (ej. uno viejo que llegó tarde)
+            if on_frame is not None:
+                on_frame(frame)
+            if frame[1] == DUMP_TYPE_OF["S"]:
+                break
+            if on_frame is None:
+                frames.append(frame)
+        t.mark("frame")
+        t.first, t.magic = fr.t_first, fr.t_magic
+        t.rx_bytes = fr.wire_bytes - wire
+        self.latency.add(t)
+        frames.append(frame)
+        return frames
+
     def program_word(self, addr: int, data: int):
+        t = CmdTiming("P", tx_bytes=P_RECORD.size)
         self.send_cmd("P")
         self.ser.write(u32_le(addr))
         self.ser.write(u32_le(data))
+        self.imem_shadow[addr & 0xFFFFFFFF] = data & 0xFFFFFFFF
+        t.mark("tx")
+        self.latency.add(t)
+
+    def program_image(self, items: list[tuple[int, int]], progress=None,
+                      chunk_bytes: int = 4096, progress_interval_s: float = 0.1) -> int:
+        """
+        Programa una imagen completa: arma todos los registros P en un único buffer
+        y lo escribe en bloques de chunk_bytes. progress(done, total) se llama como
+        mucho cada progress_interval_s y siempre al terminar. Devuelve words escritas.
+        """
+        n = len(items)
+        t = CmdTiming("P", tx_bytes=n * P_RECORD.size)
+        buf = bytearray(n * P_RECORD.size)
+        for k, (addr, data) in enumerate(items):
+            P_RECORD.pack_into(buf, k * P_RECORD.size, b"P", addr & 0xFFFFFFFF, data & 0xFFFFFFFF)
+
+        chunk = max(P_RECORD.size, chunk_bytes - chunk_bytes % P_RECORD.size)
+        mv = memoryview(buf)
+        last = time.monotonic()
+        try:
+            for off in range(0, len(buf), chunk):
+                self.ser.write(mv[off:off + chunk])
+                if progress is not None:
+                    now = time.monotonic()
+                    if now - last >= progress_interval_s:
+                        last = now
+                        progress(min(n, (off + chunk) // P_RECORD.size), n)
+            self.ser.flush()
+        except BaseException:
+            # no se sabe qué llegó: la sombra deja de ser confiable
+            self.imem_shadow.clear()
+            raise
+        self.imem_shadow.update((a & 0xFFFFFFFF, d & 0xFFFFFFFF) for a, d in items)
+        t.mark("tx")
+        self.latency.add(t)
+        if progress is not None:
+            progress(n, n)
+        return n
+
+    def program_image_delta(self, items: list[tuple[int, int]], progress=None,
+                            progress_interval_s: float = 0.1, verify: bool = False) -> tuple[int, int]:
+        """
+        Como program_image, pero sólo manda las words que difieren de la sombra de IMEM.
+        verify=True confirma antes la sombra con el checksum de la placa ('C'); si no
+        coincide (o el bitstream no tiene 'C') se manda la imagen completa.
+        Devuelve (words enviadas, words salteadas).
+        """
+        if verify and self.imem_shadow and not self.verify_imem_shadow():
+            self.imem_shadow.clear()
+        shadow = self.imem_shadow
+        todo = [(a, d) for a, d in items if shadow.get(a & 0xFFFFFFFF) != d & 0xFFFFFFFF]
+        if todo:
+            self.program_image(todo, progress=progress, progress_interval_s=progress_interval_s)
+        elif progress is not None:
+            progress(0, 0)
+        return len(todo), len(items) - len(todo)
+
+    def invalidate_imem_shadow(self):
+        """Olvida la sombra (ej. la placa se reprogramó o se reseteó por fuera)."""
+        self.imem_shadow.clear()
+
+    def imem_checksum(self, addr: int, n_words: int, timeout_s: float = 1.0) -> int:
+        """Checksum de n_words de IMEM desde addr, calculado en la placa (comando 'C')."""
+        rec = P_RECORD.pack(b"C", addr & 0xFFFFFFFF, n_words & 0xFFFFFFFF)
+        self.ser.write(rec)
+        # la respuesta trae el eco de addr/n_words: un 0xC5 suelto de un dump no se toma
+        return int.from_bytes(self.framer.read_tagged(CKSUM_TAG, 4, timeout_s, hdr=rec[1:]), "little")
+
+    def verify_imem_shadow(self, timeout_s: float = 1.0) -> bool | None:
+        """
+        Compara la sombra contra la placa, un 'C' por tramo contiguo de direcciones.
+        None si el bitstream no responde a 'C'.
+        """
+        addrs = sorted(self.imem_shadow)
+        k = 0
+        while k < len(addrs):
+            j = k + 1
+            while j < len(addrs) and addrs[j] == addrs[j - 1] + 4:
+                j += 1
+            run = [self.imem_shadow[a] for a in addrs[k:j]]
+            try:
+                cs = self.imem_checksum(addrs[k], len(run), timeout_s)
+            except TimeoutError:
+                return None
+            if cs != imem_checksum(run):
+                return False
+            k = j
+        return True
 
     def wait_dump(self, timeout_s: float = 5.0) -> bytes:
-        deadline = time.time() + timeout_s
-        sync_to_magic(self.ser, deadline)
-        rest = read_exact(self.ser, self.frame_len - 1)
-        return bytes([MAGIC]) + rest
+        return self.read_frame(timeout_s)
+
+    def read_frame(self, timeout_s: float = 5.0, expect: int | None = None) -> bytes:
+        """
+        Como wait_dump; expect fija el dump_type esperado (ver framer.Framer).
+        Si se tiró un frame delta sin referencia, repite el último 'K': el próximo dump
+        es keyframe (o sin delta, si la placa quedó en delta de una sesión anterior).
+        """
+        fr = self.framer
+        misses = fr.delta_misses
+        try:
+            frame = fr.read_frame(timeout_s, expect)
+        except TimeoutError:
+            self.invalidate_mem()   # no se sabe qué ejecutó la CPU
+            raise
+        finally:
+            if fr.delta_misses != misses:
+                self.ser.write(K_RECORD.pack(b"K", self.key_every))
+        self._observe_stores(frame)
+        return frame
+
+    # ---------------- DMEM ----------------
+    def _store_range(self, frame: bytes) -> tuple[int, int] | None:
+        # (addr, bytes) del store en EX/MEM; (0, 0) si no hay; None si el frame no trae PIPE
+        pad = frame[3]
+        if pad and not pad & SEC_PIPE:
+            return None
+        off = 8 if pad == 0 or pad & SEC_PC else 4
+        ctrl = _U32.unpack_from(frame, off + 4 * _EXMEM_CTRL)[0]
+        if ctrl & 0x11 != 0x11:     # valid + mem_write
+            return 0, 0
+        addr = _U32.unpack_from(frame, off + 4 * _EXMEM_ALU)[0]
+        f3 = (_U32.unpack_from(frame, off + 4 * _EXMEM_F3)[0] >> 10) & 0x3
+        return addr, 1 << f3
+
+    def _observe_stores(self, frame: bytes):
+        dtype = frame[1]
+        if dtype == DUMP_TYPE_OF["G"]:
+            self.invalidate_mem()
+            return
+        if dtype not in (DUMP_TYPE_OF["S"], DUMP_STEP_SAMPLE):
+            return
+        st = self._store_range(frame)
+        if st is None:
+            self.invalidate_mem()
+            return
+        pages = self._pages_of(*st)
+        for pg in self._store_pages | pages:
+            self.mem_pages.pop(pg, None)
+        self._store_pages = pages
+
+    def _pages_of(self, addr: int, n: int) -> set[int]:
+        return {((addr + i) % self.mem_bytes) // MEM_PAGE_BYTES for i in range(n)}
+
+    def invalidate_mem(self, addr: int | None = None, n: int = 1):
+        """Olvida el cache de DMEM (todo, o las páginas de [addr, addr+n))."""
+        if addr is None:
+            self.mem_pages.clear()
+        else:
+            for pg in self._pages_of(addr, n):
+                self.mem_pages.pop(pg, None)
+
+    def read_mem_raw(self, addr: int, n: int, timeout_s: float = 1.0) -> bytes:
+        """
+        n bytes de DMEM desde addr con un único 'X', sin cache. La dirección da la
+        vuelta en mem_bytes como en la placa. Necesita el bitstream con 'X'.
+        """
+        if not 0 <= n <= self.mem_bytes:
+            raise ValueError("Largo fuera de rango")
+        addr %= self.mem_bytes
+        rec = X_RECORD.pack(b"X", addr, n)
+        self.ser.write(rec)
+        resp = self.framer.read_tagged(XMEM_TAG, n, timeout_s, hdr=rec[1:])
+        self.mem_reads += 1
+        self.mem_read_bytes += n
+        return resp
+
+    def read_mem(self, addr: int, n: int, timeout_s: float = 1.0) -> bytes:
+        """
+        n bytes de DMEM desde addr, de a páginas de MEM_PAGE_BYTES: las que están en el
+        cache no van a la placa y las que faltan se piden con un 'X' por tramo
+        contiguo (ver __init__ para cuándo se invalida). mem_bytes tiene que ser
+        múltiplo de MEM_PAGE_BYTES.
+        """
+        if not 0 <= n <= self.mem_bytes:
+            raise ValueError("Largo fuera de rango")
+        npages = -(-self.mem_bytes // MEM_PAGE_BYTES)
+        first = (addr % self.mem_bytes) // MEM_PAGE_BYTES
+        last = first + (addr % MEM_PAGE_BYTES + n - 1) // MEM_PAGE_BYTES if n else first - 1
+        want = [pg % npages for pg in range(first, last + 1)]
+        k = 0
+        while k < len(want):
+            if want[k] in self.mem_pages:
+                self.mem_hits += 1
+                k += 1
+                continue
+            j = k
+            while j + 1 < len(want) and want[j + 1] == want[j] + 1 and want[j + 1] not in self.mem_pages:
+                j += 1
+            base = want[k] * MEM_PAGE_BYTES
+            size = min(self.mem_bytes, (want[j] + 1) * MEM_PAGE_BYTES) - base
+            data = self.read_mem_raw(base, size, timeout_s)
+            for i, pg in enumerate(want[k:j + 1]):
+                self.mem_pages[pg] = data[i * MEM_PAGE_BYTES:(i + 1) * MEM_PAGE_BYTES]
+            k = j + 1
+        buf = b"".join(self.mem_pages[pg] for pg in want)
+        off = addr % MEM_PAGE_BYTES
+        return buf[off:off + n]
+
+    def stream(self, cmds, window: int = 4, timeout_s: float = 5.0, on_frame=None):
+        """
+        Emisión en pipeline: manda los comandos S/D de cmds dejando hasta `window` en
+        vuelo y va devolviendo (cmd, frame) en orden FIFO. Un thread lector arma los
+        frames mientras se sigue escribiendo, así la línea TX no queda ociosa entre frames.
+        on_frame(cmd, frame), si se pasa, se llama antes de cada yield.
+        window > 1 necesita el bitstream con FIFO RX (top_debug_system.RX_FIFO_W): sin
+        ella la FSM descarta los comandos que llegan mientras transmite.
+        Si se corta la iteración, los frames ya pedidos se leen y se descartan.
+        """
+        if window < 1:
+            raise ValueError("window debe ser >= 1")
+        sent: queue.SimpleQueue = queue.SimpleQueue()
+        out: queue.SimpleQueue = queue.SimpleQueue()
+
+        def reader():
+            while True:
+                cmd = sent.get()
+                if cmd is None:
+                    return
+                try:
+                    fr = self.read_frame(timeout_s, expect=DUMP_TYPE_OF[cmd])
+                except Exception as e:
+                    out.put(e)
+                    return
+                out.put((cmd, fr))
+
+        th = threading.Thread(target=reader, name="dbg-reader", daemon=True)
+        th.start()
+        it = iter(cmds)
+        in_flight = 0
+        try:
+            while True:
+                while in_flight < window:
+                    cmd = next(it, None)
+                    if cmd is None:
+                        break
+                    if cmd not in DUMP_TYPE_OF:
+                        raise ValueError(f"Comando sin frame de respuesta: {cmd!r}")
+                    sent.put(cmd)
+                    self.send_cmd(cmd)
+                    in_flight += 1
+                if in_flight == 0:
+                    return
+                r = out.get()
+                if isinstance(r, Exception):
+                    in_flight = 0
+                    raise r
+                in_flight -= 1
+                if on_frame is not None:
+                    on_frame(*r)
+                yield r
+        finally:
+            sent.put(None)
+            th.join(timeout_s * (in_flight + 1))
+
+    def record_trace(self, path: str, max_cycles: int, stop_on_halt: bool = True,
+                     stop_event=None, progress=None, on_frame=None,
+                     window: int = 1) -> tuple[int, bool, bytes | None]:
+        """
+        Graba un trace de STEPs consecutivos en path (ver trace_file).
+        Pensado para correr en un thread de I/O dedicado. Devuelve (ciclos, halt_seen, último frame).
+        Con window > 1 usa stream(): tras HALT pueden ejecutarse hasta window-1 STEPs de más
+        (no se graban).
+        """
+        from trace_file import TRACE_F_VARLEN, TraceWriter, record_steps
+
+        frames = None
+        if window > 1:
+            frames = (fr for _, fr in self.stream(itertools.repeat("S", max_cycles), window))
+        # con secciones parciales (set_sections) cada frame se guarda con su largo
+        flags = 0 if self.sections == (SEC_ALL, 0, self.dm_dump_bytes) else TRACE_F_VARLEN
+        with TraceWriter(path, self.frame_len, self.pipe_words, self.dm_dump_bytes, self.baud, flags=flags) as tw:
+            try:
+                return record_steps(self.send_cmd, self.wait_dump, tw, max_cycles,
+                                    stop_on_halt=stop_on_halt, stop_event=stop_event, progress=progress,
+                                    on_frame=on_frame, frames=frames)
+            finally:
+                if frames is not None:
+                    frames.close()
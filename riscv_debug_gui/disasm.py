@@ -0,0 +1,149 @@
+"""
+Desensamblador RV32I por tablas, memoizado por word: los mismos pocos cientos de
+instrucciones se repiten en miles de frames, así que decodificar cuesta un lookup.
+
+La salida usa la sintaxis de assembler.py (xN, offsets de salto relativos al PC),
+así que una línea desensamblada se vuelve a ensamblar a la misma word.
+"""
+from functools import lru_cache
+
+from assembler import INSTR_HALT, INSTR_NOP, enc_b, enc_i, enc_j, enc_r, enc_s, enc_u
+
+_R = {
+    (0b000, 0x00): "add", (0b000, 0x20): "sub", (0b001, 0x00): "sll", (0b010, 0x00): "slt",
+    (0b011, 0x00): "sltu", (0b100, 0x00): "xor", (0b101, 0x00): "srl", (0b101, 0x20): "sra",
+    (0b110, 0x00): "or", (0b111, 0x00): "and",
+}
+_I = {0b000: "addi", 0b010: "slti", 0b011: "sltiu", 0b100: "xori", 0b110: "ori", 0b111: "andi"}
+_SHIFT = {(0b001, 0x00): "slli", (0b101, 0x00): "srli", (0b101, 0x20): "srai"}
+_LOAD = {0b000: "lb", 0b001: "lh", 0b010: "lw", 0b100: "lbu", 0b101: "lhu"}
+_STORE = {0b000: "sb", 0b001: "sh", 0b010: "sw"}
+# blt..bgeu se muestran aunque este CPU sólo salte con beq/bne
+_BRANCH = {0b000: "beq", 0b001: "bne", 0b100: "blt", 0b101: "bge", 0b110: "bltu", 0b111: "bgeu"}
+
+
+def _sext(x: int, bits: int) -> int:
+    return x - (1 << bits) if x & (1 << (bits - 1)) else x
+
+
+def _op_r(w, rd, f3, rs1, rs2):
+    name = _R.get((f3, w >> 25))
+    return (f"{name} x{rd}, x{rs1}, x{rs2}", None) if name else None
+
+
+def _op_imm(w, rd, f3, rs1, rs2):
+    if f3 in (0b001, 0b101):
+        name = _SHIFT.get((f3, w >> 25))
+        return (f"{name} x{rd}, x{rs1}, {rs2}", None) if name else None
+    if w == INSTR_NOP:
+        return "nop", None
+    return f"{_I[f3]} x{rd}, x{rs1}, {_sext(w >> 20, 12)}", None
+
+
+def _op_load(w, rd, f3, rs1, rs2):
+    name = _LOAD.get(f3)
+    return (f"{name} x{rd}, {_sext(w >> 20, 12)}(x{rs1})", None) if name else None
+
+
+def _op_store(w, rd, f3, rs1, rs2):
+    name = _STORE.get(f3)
+    imm = _sext(((w >> 25) << 5) | rd, 12)
+    return (f"{name} x{rs2}, {imm}(x{rs1})", None) if name else None
+
+
+def _op_branch(w, rd, f3, rs1, rs2):
+    name = _BRANCH.get(f3)
+    if not name:
+        return None
+    off = _sext((((w >> 31) & 1) << 12) | (((w >> 7) & 1) << 11) |
+                (((w >> 25) & 0x3F) << 5) | (((w >> 8) & 0xF) << 1), 13)
+    return f"{name} x{rs1}, x{rs2}, {off}", off
+
+
+def _op_jal(w, rd, f3, rs1, rs2):
+    off = _sext((((w >> 31) & 1) << 20) | (((w >> 12) & 0xFF) << 12) |
+                (((w >> 20) & 1) << 11) | (((w >> 21) & 0x3FF) << 1), 21)
+    return f"jal x{rd}, {off}", off
+
+
+def _op_jalr(w, rd, f3, rs1, rs2):
+    return (f"jalr x{rd}, {_sext(w >> 20, 12)}(x{rs1})", None) if f3 == 0 else None
+
+
+def _op_lui(w, rd, f3, rs1, rs2):
+    return f"lui x{rd}, 0x{w >> 12:x}", None
+
+
+def _op_auipc(w, rd, f3, rs1, rs2):
+    return f"auipc x{rd}, 0x{w >> 12:x}", None
+
+
+def _op_system(w, rd, f3, rs1, rs2):
+    return ("ebreak", None) if w == INSTR_HALT else None
+
+
+_OPCODES = {
+    0x33: _op_r, 0x13: _op_imm, 0x03: _op_load, 0x23: _op_store, 0x63: _op_branch,
+    0x6F: _op_jal, 0x67: _op_jalr, 0x37: _op_lui, 0x17: _op_auipc, 0x73: _op_system,
+}
+
+
+@lru_cache(maxsize=4096)
+def decode(word: int) -> tuple[str, int | None]:
+    """word -> (texto, offset de salto o None). Memoizado."""
+    w = word & 0xFFFFFFFF
+    fn = _OPCODES.get(w & 0x7F)
+    res = fn(w, (w >> 7) & 0x1F, (w >> 12) & 0x7, (w >> 15) & 0x1F, (w >> 20) & 0x1F) if fn else None
+    return res or (f".word 0x{w:08x}", None)
+
+
+def disasm(word: int, pc: int | None = None) -> str:
+    """Texto de la instrucción; con pc, los saltos muestran además el destino absoluto."""
+    text, off = decode(word)
+    if off is None or pc is None:
+        return text
+    return f"{text}  # 0x{(pc + off) & 0xFFFFFFFF:x}"
+
+
+@lru_cache(maxsize=1024)
+def idex_word(w8: int, w9: int, w10: int) -> int | None:
+    """
+    Reconstruye la instrucción que está en ID/EX a partir de imm (w8), los campos de
+    w9 y las señales de control (w10); el latch no guarda el opcode. None = burbuja
+    o control en 0.
+    LUI y AUIPC tienen el mismo control: se muestran como lui.
+    """
+    if not w10 & 1:
+        return None
+    rd, rs1, rs2 = (w9 >> 7) & 0x1F, (w9 >> 12) & 0x1F, (w9 >> 17) & 0x1F
+    f3, f7 = (w9 >> 22) & 0x7, (w9 >> 25) & 0x7F
+    reg_write, mem_read, mem_write = (w10 >> 1) & 1, (w10 >> 3) & 1, (w10 >> 4) & 1
+    branch, alu_src, alu_op = (w10 >> 5) & 1, (w10 >> 6) & 1, (w10 >> 7) & 0x3
+    jump, jalr = (w10 >> 9) & 1, (w10 >> 10) & 1
+    imm = w8 & 0xFFFFFFFF
+
+    if mem_read:
+        return enc_i(0x03, f3, rd, rs1, imm)
+    if mem_write:
+        return enc_s(f3, rs1, rs2, imm)
+    if branch:
+        return enc_b(f3, rs1, rs2, imm)
+    if jalr:
+        return enc_i(0x67, 0b000, rd, rs1, imm)
+    if jump:
+        return enc_j(rd, imm)
+    if alu_op == 0b10:
+        return enc_r(f3, f7, rd, rs1, rs2)
+    if alu_op == 0b11:
+        return enc_i(0x13, f3, rd, rs1, imm)
+    if reg_write and alu_src:
+        return enc_u(rd, imm >> 12)
+    # control en 0 (ebreak u opcode desconocido): el latch no alcanza para distinguirlos
+    return None
+
+
+def idex_disasm(w8: int, w9: int, w10: int) -> str:
+    if not w10 & 1:
+        return "(burbuja)"
+    word = idex_word(w8, w9, w10)
+    return "(sin control: ebreak u opcode desconocido)" if word is None else disasm(word)
@@ -0,0 +1,218 @@
+import struct
+
+from framer import (MAGIC, MEM_HDR, PAD_DELTA, PAD_VARLEN, SEC_ALL, SEC_MEM, SEC_PC, SEC_PIPE, SEC_REGS,
+                    frame_layout, section_offsets)
+from pipe_decode import PIPE_WORDS, decode_ifid, decode_idex, decode_exmem, decode_memwb, decode_pipe_words
+
+_U32 = struct.Struct("<I")
+_REGS = struct.Struct("<32I")
+_PIPE = struct.Struct(f"<{PIPE_WORDS}I")
+
+class DumpFrame:
+    """
+    Vista de solo lectura sobre un frame de dump recibido.
+    No copia ni decodifica nada al construirse: regs/pipe_words se desempaquetan
+    del buffer en el primer acceso, mem es una vista sin copia y cada etapa del
+    pipeline se decodifica recién al accederla.
+    Frames parciales ('M'): las secciones que no vinieron (ver sections) devuelven
+    None; mem es la ventana de DMEM que empieza en mem_addr.
+    Leer todo (las cuatro etapas) cuesta lo mismo que el camino dict: la ganancia está
+    en los accesos parciales (header, regs, una etapa).
+    """
+    __slots__ = ("buf", "n_pipe", "dm_bytes", "sections", "off_pc", "off_pipe", "off_reg", "off_mem",
+                 "mem_addr", "_pipe", "_regs", "_ifid", "_idex", "_exmem", "_memwb")
+
+    def __init__(self, frame, pipe_words: int = PIPE_WORDS, dm_bytes: int = 64):
+        if type(frame) is bytes:
+            buf = frame     # ya indexa por byte; la memoryview se arma recién en mem
+        else:
+            buf = memoryview(frame)
+            if buf.ndim != 1 or buf.itemsize != 1:
+                buf = buf.cast("B")
+        if len(buf) < 4:
+            raise ValueError("Frame incompleto")
+        if buf[0] != MAGIC:
+            raise ValueError("MAGIC inválido")
+
+        self.buf = buf
+        self.n_pipe = pipe_words
+        self.mem_addr = 0
+        pad = buf[3]
+        if pad & PAD_DELTA:
+            raise ValueError("Frame delta sin reconstruir (ver framer.apply_delta)")
+        if pad & PAD_VARLEN:
+            self.sections = pad & SEC_ALL
+            self.off_pc, self.off_pipe, self.off_reg, off_mem, n = section_offsets(self.sections, pipe_words)
+            if off_mem is not None:
+                if len(buf) < off_mem + MEM_HDR.size:
+                    raise ValueError("Frame incompleto")
+                self.mem_addr, dm_bytes = MEM_HDR.unpack_from(buf, off_mem)
+                off_mem += MEM_HDR.size
+                n += dm_bytes
+            else:
+                dm_bytes = 0
+            self.off_mem = off_mem
+        else:
+            self.sections = SEC_ALL
+            self.off_pc, self.off_pipe = 4, 8
+            self.off_reg = 8 + pipe_words * 4
+            self.off_mem = self.off_reg + 32 * 4
+            n = self.off_mem + dm_bytes
+        if len(buf) != n:
+            raise ValueError("Frame incompleto")
+        self.dm_bytes = dm_bytes
+        self._pipe = None
+        self._regs = None
+        self._ifid = None
+        self._idex = None
+        self._exmem = None
+        self._memwb = None
+
+    # ---------------- header ----------------
+    @property
+    def dump_type(self) -> int:
+        return self.buf[1]
+
+    @property
+    def flags(self) -> int:
+        return self.buf[2]
+
+    @property
+    def pad(self) -> int:
+        return self.buf[3]
+
+    @property
+    def halt_seen(self) -> int:
+        return self.buf[2] & 1
+
+    @property
+    def pipe_empty(self) -> int:
+        return (self.buf[2] >> 1) & 1
+
+    @property
+    def pc(self) -> int | None:
+        if self.off_pc is None:
+            return None
+        return _U32.unpack_from(self.buf, self.off_pc)[0]
+
+    def has(self, sections: int) -> bool:
+        return self.sections & sections == sections
+
+    # ---------------- vistas ----------------
+    @property
+    def pipe_words(self) -> tuple | None:
+        if self._pipe is None and self.off_pipe is not None:
+            fmt = _PIPE if self.n_pipe == PIPE_WORDS else struct.Struct(f"<{self.n_pipe}I")
+            self._pipe = fmt.unpack_from(self.buf, self.off_pipe)
+        return self._pipe
+
+    @property
+    def regs(self) -> tuple | None:
+        if self._regs is None and self.off_reg is not None:
+            self._regs = _REGS.unpack_from(self.buf, self.off_reg)
+        return self._regs
+
+    @property
+    def mem(self) -> memoryview | None:
+        if self.off_mem is None:
+            return None
+        return memoryview(self.buf)[self.off_mem:self.off_mem + self.dm_bytes]
+
+    # ---------------- etapas (decodificación perezosa; None sin SEC_PIPE) ----------------
+    @property
+    def ifid(self) -> dict | None:
+        if self._ifid is None and self.off_pipe is not None:
+            self._ifid = decode_ifid(self._pipe or self.pipe_words)
+        return self._ifid
+
+    @property
+    def idex(self) -> dict | None:
+        if self._idex is None and self.off_pipe is not None:
+            self._idex = decode_idex(self._pipe or self.pipe_words)
+        return self._idex
+
+    @property
+    def exmem(self) -> dict | None:
+        if self._exmem is None and self.off_pipe is not None:
+            self._exmem = decode_exmem(self._pipe or self.pipe_words)
+        return self._exmem
+
+    @property
+    def memwb(self) -> dict | None:
+        if self._memwb is None and self.off_pipe is not None:
+            self._memwb = decode_memwb(self._pipe or self.pipe_words)
+        return self._memwb
+
+    @property
+    def pipe_decoded(self) -> dict | None:
+        # Compatibilidad con el formato dict de decode_pipe_words
+        if self.off_pipe is None:
+            return None
+        return decode_pipe_words(list(self.pipe_words))
+
+    def bytes(self) -> bytes:
+        return bytes(self.buf)
+
+
+def partial_frame(frame, pipe_words: int, sections: int, mem_addr: int = 0, mem_len: int | None = None,
+                  mem=None) -> bytes:
+    """
+    Frame completo -> lo que manda la placa con 'M' + sections/mem_addr/mem_len.
+    mem son los bytes de DMEM desde mem_addr; si no se pasa, la ventana se recorta de
+    lo que trae el frame (y puede quedar más corta que mem_len). Con todas las
+    secciones y la ventana por defecto (0, DM_DUMP_BYTES) el frame queda completo.
+    """
+    off_mem = 8 + pipe_words * 4 + 32 * 4
+    dm = len(frame) - off_mem
+    if mem_len is None:
+        mem_len = dm
+    if sections == SEC_ALL and mem_addr == 0 and mem_len == dm:
+        return bytes(frame)
+    if mem is None:
+        mem = frame[off_mem + mem_addr:off_mem + min(dm, mem_addr + mem_len)]
+    mem = bytes(mem[:mem_len])
+
+    out = bytearray(frame[:4])
+    out[3] = PAD_VARLEN | sections
+    if sections & SEC_PC:
+        out += frame[4:8]
+    if sections & SEC_PIPE:
+        out += frame[8:8 + pipe_words * 4]
+    if sections & SEC_REGS:
+        out += frame[8 + pipe_words * 4:off_mem]
+    if sections & SEC_MEM:
+        out += MEM_HDR.pack(mem_addr, len(mem)) + mem
+    return bytes(out)
+
+
+def delta_frame(prev, cur, pipe_words: int) -> bytes:
+    """
+    Frame (completo o parcial) -> lo que manda la placa con 'K' si el dump anterior fue
+    prev (mismas secciones y ventana): pipe words, registros y bytes de DMEM que
+    cambiaron. Es la inversa de framer.apply_delta(prev, ...).
+    """
+    sections, off_pipe, off_reg, off_mem, addr, n = frame_layout(cur, pipe_words)
+    out = bytearray(cur[:4])
+    out[3] = PAD_VARLEN | PAD_DELTA | sections
+    if sections & SEC_PC:
+        out += cur[4:8]
+    for off, words, first in ((off_pipe, pipe_words, 0), (off_reg, 32, 1)):
+        if off is None:
+            continue
+        chg = 0
+        vals = bytearray()
+        for k in range(first, words):
+            o = off + 4 * k
+            if cur[o:o + 4] != prev[o:o + 4]:
+                chg |= 1 << k
+                vals += cur[o:o + 4]
+        out += chg.to_bytes(4, "little") + vals
+    if off_mem is not None:
+        bits = 0
+        vals = bytearray()
+        for i in range(n):
+            if cur[off_mem + i] != prev[off_mem + i]:
+                bits |= 1 << i
+                vals.append(cur[off_mem + i])
+        out += MEM_HDR.pack(addr, n) + bits.to_bytes((n + 7) // 8, "little") + vals
+    return bytes(out)
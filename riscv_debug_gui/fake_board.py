@@ -0,0 +1,166 @@
+"""
+Placa de prueba por TCP: habla el protocolo de debug_unit_uart sobre un socket local
+con los tiempos de una UART real (10 bits por byte a `baud`) y una latencia fija por
+sentido (driver USB-serie). Por detrás usa el simulador de sim_host.
+
+Desde el host se abre como cualquier puerto:
+    DebugHost(board.url, board.baud, PIPE_WORDS)      # board.url = "socket://127.0.0.1:<port>"
+
+rx_fifo modela la FIFO RX de top_debug_system: con 0 (bitstream sin FIFO) los bytes que
+llegan mientras la FSM está ocupada (STEP/DUMP/RUN) se pierden, igual que en la placa.
+"""
+import queue
+import socket
+import threading
+import time
+from collections import deque
+
+from pipe_decode import PIPE_WORDS
+from sim_host import RV32Sim, SimSerial
+
+class FakeBoard:
+    def __init__(self, baud: int = 115200, latency_s: float = 0.001, rx_fifo: int = 32,
+                 dm_dump_bytes: int = 64, cycle_accurate: bool = False, sim=None,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.baud = baud
+        self.latency_s = latency_s
+        self.rx_fifo = rx_fifo
+        self.byte_s = 10.0 / baud
+
+        if sim is None:
+            if cycle_accurate:
+                from pipeline_model import PipelineModel
+                sim = PipelineModel()
+            else:
+                sim = RV32Sim()
+        self.sim = sim
+        self.ser = SimSerial(sim, PIPE_WORDS, dm_dump_bytes, timeout=0)
+
+        self.rx_bytes = 0
+        self.dropped_bytes = 0
+        self.frames = 0
+
+        self._srv = socket.create_server((host, port))
+        self.port = self._srv.getsockname()[1]
+        self.url = f"socket://{host}:{self.port}"
+        self._stop = threading.Event()
+        self._th = threading.Thread(target=self._serve, name="fake-board", daemon=True)
+        self._th.start()
+
+    def close(self):
+        self._stop.set()
+        try:
+            self._srv.close()
+        except OSError:
+            pass
+        self._th.join(timeout=1.0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------------- servidor ----------------
+    def _serve(self):
+        self._srv.settimeout(0.1)
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._srv.accept()
+            except (socket.timeout, OSError):
+                continue
+            with conn:
+                self._session(conn)
+
+    def _session(self, conn: socket.socket):
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn.settimeout(0.05)
+        tx_q: deque = deque()
+        tx_ev = threading.Event()
+        done = threading.Event()
+        sender = threading.Thread(target=self._sender, args=(conn, tx_q, tx_ev, done), daemon=True)
+        sender.start()
+        rx_q: queue.SimpleQueue = queue.SimpleQueue()
+        receiver = threading.Thread(target=self._receiver, args=(conn, rx_q, done), daemon=True)
+        receiver.start()
+
+        bt = self.byte_s
+        rx_line_free = 0.0          # cuándo termina de llegar el último byte en el cable RX
+        busy_until = 0.0            # la FSM vuelve a IDLE
+        in_fifo: deque = deque()    # t de consumo de bytes aceptados aún no consumidos
+
+        try:
+            while not self._stop.is_set():
+                try:
+                    t_rx, data = rx_q.get(timeout=0.05)
+                except queue.Empty:
+                    continue
+                if not data:
+                    break
+
+                for b in data:
+                    self.rx_bytes += 1
+                    # el byte termina de llegar serializado a baud
+                    rx_line_free = max(rx_line_free, t_rx) + bt
+                    t_a = rx_line_free
+
+                    while in_fifo and in_fifo[0] <= t_a:
+                        in_fifo.popleft()
+                    if t_a < busy_until and len(in_fifo) >= self.rx_fifo:
+                        self.dropped_bytes += 1
+                        continue
+
+                    t_proc = max(t_a, busy_until)
+                    if t_proc > t_a:
+                        in_fifo.append(t_proc)
+
+                    delay = t_proc - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+
+                    self.ser.write(bytes((b,)))
+                    n = self.ser.in_waiting
+                    if n:
+                        resp = self.ser.read(n)
+                        self.frames += 1
+                        # TX serializado: la FSM vuelve a IDLE cuando arranca el último byte
+                        busy_until = t_proc + (len(resp) - 1) * bt
+                        for k in range(0, len(resp), 32):
+                            chunk = resp[k:k + 32]
+                            tx_q.append((t_proc + (k + len(chunk)) * bt + self.latency_s, chunk))
+                        tx_ev.set()
+        finally:
+            done.set()
+            tx_ev.set()
+            sender.join(timeout=1.0)
+            receiver.join(timeout=1.0)
+
+    def _receiver(self, conn: socket.socket, rx_q: queue.SimpleQueue, done: threading.Event):
+        # timestamp de llegada independiente de lo que tarde la FSM en consumir
+        while not done.is_set() and not self._stop.is_set():
+            try:
+                data = conn.recv(4096)
+            except socket.timeout:
+                continue
+            except OSError:
+                data = b""
+            rx_q.put((time.monotonic() + self.latency_s, data))
+            if not data:
+                return
+
+    def _sender(self, conn: socket.socket, tx_q: deque, tx_ev: threading.Event, done: threading.Event):
+        while True:
+            if not tx_q:
+                if done.is_set():
+                    return
+                tx_ev.wait(0.05)
+                tx_ev.clear()
+                continue
+            t_deliver, chunk = tx_q.popleft()
+            delay = t_deliver - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                conn.sendall(chunk)
+            except OSError:
+                return
@@ -0,0 +1,227 @@
+"""
+Granja de placas: corre un lote de programas .mem sobre todas las placas conectadas
+(y/o instancias de SimHost) en paralelo. Cada trabajo es
+    programar IMEM -> 'R' -> 'G' -> frame RUN_END
+y su resultado (PC, flags, registros, DMEM) sale como una línea JSON.
+
+Uso (desde riscv_debug_gui):
+    python farm.py resultados.jsonl src/prog*.mem [--ports auto|COM3,COM4|socket://h:p] [--sim N]
+
+Ni 'R' ni la carga de IMEM limpian registros ni DMEM, y al cerrar RUN se ejecuta la
+instrucción siguiente al ebreak (ver RV32Sim._halt_at). Para que el resultado no
+dependa del programa anterior, antes de cada trabajo se corre una imagen de limpieza
+(x1..x31 y la ventana de DMEM del dump en 0) y toda imagen lleva NOPs al final.
+"""
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+
+import serial.tools.list_ports
+
+from debughost import DebugHost
+from dump_frame import DumpFrame
+from pipe_decode import PIPE_WORDS
+from program_parser import parse_program_file
+from sim_host import INSTR_HALT, SimHost
+
+# Basys3: FTDI FT2232H; el canal A (interfaz :1.0) es JTAG, el B es la UART
+BASYS3_VID = 0x0403
+BASYS3_PID = 0x6010
+
+INSTR_NOP = 0x00000013      # addi x0,x0,0
+
+
+def discover_ports(vid: int | None = BASYS3_VID, pid: int | None = BASYS3_PID) -> list[str]:
+    """Puertos serie de las placas conectadas (vid/pid None = todos los puertos)."""
+    out = []
+    for p in serial.tools.list_ports.comports():
+        if vid is not None and p.vid != vid:
+            continue
+        if pid is not None and p.pid != pid:
+            continue
+        if p.vid == BASYS3_VID and p.pid == BASYS3_PID and (p.location or "").endswith(".0"):
+            continue
+        out.append(p.device)
+    return sorted(out)
+
+
+def frame_result(frame: bytes, pipe_words: int, dm_bytes: int) -> dict:
+    d = DumpFrame(frame, pipe_words, dm_bytes)
+    return {
+        "dump_type": d.dump_type,
+        "pc": d.pc,
+        "flags": d.flags,
+        "halt_seen": d.halt_seen,
+        "pipe_empty": d.pipe_empty,
+        "regs": list(d.regs),
+        "dmem": d.mem.hex(),
+    }
+
+
+def pad_image(items: list[tuple[int, int]], n: int = 2) -> list[tuple[int, int]]:
+    """Agrega n NOPs después de la última word (cubre la instrucción sombra del ebreak)."""
+    end = max((a for a, _ in items), default=-4) + 4
+    return list(items) + [(end + 4*k, INSTR_NOP) for k in range(n)]
+
+
+def scrub_image(dmem_bytes: int) -> list[tuple[int, int]]:
+    """x1..x31 = 0 y sw x0 sobre los primeros dmem_bytes de DMEM, y ebreak."""
+    words = [INSTR_NOP | (rd << 7) for rd in range(1, 32)]
+    for off in range(0, dmem_bytes, 4):
+        words.append(((off >> 5) << 25) | (0b010 << 12) | ((off & 0x1F) << 7) | 0x23)
+    words.append(INSTR_HALT)
+    return pad_image([(4*k, w) for k, w in enumerate(words)])
+
+
+def run_image(host: DebugHost, items: list[tuple[int, int]], run_timeout_s: float) -> bytes:
+    host.program_image(items)
+    host.send_cmd("R")
+    host.send_cmd("G")
+    return host.read_frame(run_timeout_s, expect=2)
+
+
+def run_job(host: DebugHost, items: list[tuple[int, int]], run_timeout_s: float,
+            scrub: list[tuple[int, int]] | None = None) -> bytes:
+    if scrub:
+        run_image(host, scrub, run_timeout_s)
+    return run_image(host, pad_image(items), run_timeout_s)
+
+
+class Farm:
+    """
+    Un thread por host, todos tomando trabajos de la misma cola: cada placa libre
+    agarra el próximo programa, así el throughput escala con la cantidad de placas.
+    Un TimeoutError reencola el trabajo (hasta `retries` reintentos, en cualquier
+    placa); otros errores lo dan por fallido. on_result(dict) se llama por trabajo
+    terminado (desde el thread del worker). scrub=False saltea la imagen de limpieza.
+    """
+    def __init__(self, hosts: list[tuple[str, DebugHost]], retries: int = 2,
+                 run_timeout_s: float = 5.0, on_result=None, scrub: bool = True):
+        self.hosts = hosts
+        self.retries = retries
+        self.run_timeout_s = run_timeout_s
+        self.on_result = on_result
+        self.scrub = scrub
+
+        self._jobs: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.results: list[dict] = []
+
+    def run(self, programs: list[str]) -> list[dict]:
+        for path in programs:
+            self._jobs.put((path, parse_program_file(path), 1))
+        self._pending = len(programs)
+        if not programs:
+            self._stop_workers()
+
+        threads = [threading.Thread(target=self._worker, args=(name, host), name=f"farm-{name}", daemon=True)
+                   for name, host in self.hosts]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        return self.results
+
+    def _stop_workers(self):
+        # un None por worker: el get() bloqueante de cada uno vuelve apenas termina el lote
+        for _ in self.hosts:
+            self._jobs.put(None)
+
+    def _finish(self, res: dict):
+        with self._lock:
+            self.results.append(res)
+            self._pending -= 1
+            last = self._pending == 0
+        if last:
+            self._stop_workers()
+        if self.on_result is not None:
+            self.on_result(res)
+
+    def _worker(self, name: str, host: DebugHost):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            path, items, attempt = job
+
+            res = {"program": path, "host": name, "attempts": attempt}
+            t0 = time.perf_counter()
+            try:
+                frame = run_job(host, items, self.run_timeout_s,
+                                scrub_image(host.dm_dump_bytes) if self.scrub else None)
+            except TimeoutError as e:
+                # la línea puede tener un frame a medias: se limpia antes de seguir
+                host.ser.reset_input_buffer()
+                host.framer.reset()
+                if attempt <= self.retries:
+                    self._jobs.put((path, items, attempt + 1))
+                    continue
+                res.update(ok=False, error=str(e))
+            except Exception as e:
+                res.update(ok=False, error=f"{type(e).__name__}: {e}")
+            else:
+                res.update(ok=True, **frame_result(frame, host.pipe_words, host.dm_dump_bytes))
+            res["elapsed_s"] = round(time.perf_counter() - t0, 6)
+            self._finish(res)
+
+
+def open_hosts(ports: list[str], baud: int, n_sim: int, dm_dump_bytes: int = 64) -> list[tuple[str, DebugHost]]:
+    hosts = [(p, DebugHost(p, baud, PIPE_WORDS, dm_dump_bytes)) for p in ports]
+    hosts += [(f"sim{k}", SimHost(PIPE_WORDS, dm_dump_bytes, max_run_instr=1_000_000)) for k in range(n_sim)]
+    return hosts
+
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(prog="farm.py", description="Corre programas .mem en paralelo sobre varias placas")
+    ap.add_argument("out", help="archivo JSONL de resultados")
+    ap.add_argument("programs", nargs="+", help="programas .mem")
+    ap.add_argument("--ports", default="auto", help="'auto', 'none' o lista separada por comas")
+    ap.add_argument("--sim", type=int, default=0, help="instancias de SimHost a sumar")
+    ap.add_argument("--baud", type=int, default=115200)
+    ap.add_argument("--dm", type=int, default=64, help="DM_DUMP_BYTES del bitstream")
+    ap.add_argument("--retries", type=int, default=2)
+    ap.add_argument("--timeout", type=float, default=5.0, help="timeout del RUN (s)")
+    ap.add_argument("--no-scrub", action="store_true", help="no limpiar regs/DMEM entre programas")
+    args = ap.parse_args(argv[1:])
+
+    if args.ports == "auto":
+        ports = discover_ports()
+    elif args.ports == "none":
+        ports = []
+    else:
+        ports = [p for p in args.ports.split(",") if p]
+    if not ports and not args.sim:
+        print("[ERROR] sin placas: conectar una, pasar --ports o usar --sim N")
+        return 2
+
+    hosts = open_hosts(ports, args.baud, args.sim, args.dm)
+    print(f"[INFO] {len(hosts)} hosts: {', '.join(name for name, _ in hosts)}")
+
+    lock = threading.Lock()
+    t0 = time.perf_counter()
+    with open(args.out, "w", encoding="utf-8") as f:
+        def on_result(res: dict):
+            with lock:
+                f.write(json.dumps(res) + "\n")
+                f.flush()
+            status = "OK " if res["ok"] else "ERR"
+            print(f"[{status}] {res['program']} @ {res['host']} (intento {res['attempts']})")
+
+        try:
+            results = Farm(hosts, args.retries, args.timeout, on_result, not args.no_scrub).run(args.programs)
+        finally:
+            for _, h in hosts:
+                h.close()
+
+    dt = time.perf_counter() - t0
+    ok = sum(r["ok"] for r in results)
+    print(f"[INFO] {ok}/{len(results)} OK en {dt:.2f} s ({len(results) / dt:.1f} programas/s)")
+    return 0 if ok == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
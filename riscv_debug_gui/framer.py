@@ -0,0 +1,388 @@
+"""
+Framing de dumps sobre la UART: lecturas grandes a un buffer propio y búsqueda de
+MAGIC con bytearray.find, en vez de ser.read(1) por byte. Cada candidato se valida
+(header, dump_type y x0 == 0 en el banco de registros) antes de aceptarlo; si no cierra se descarta ese MAGIC y se
+sigue buscando desde el byte siguiente.
+
+Frames parciales (comando 'M' de debug_unit_uart): con pad = PAD_VARLEN | máscara el
+frame trae sólo las secciones de la máscara, en el orden de siempre; la sección MEM
+empieza con addr(2B LE) + len(2B LE) de la ventana de DMEM. pad = 0 es el frame completo.
+
+Frames delta (comando 'K'): pad = PAD_VARLEN | PAD_DELTA | máscara. El PC viene como
+siempre; PIPE y REGS son una máscara de words cambiadas (4B LE; x0 nunca) y sólo esas
+words; MEM es addr + len + bitmap de bytes cambiados ((len+7)/8 B) y sólo esos bytes,
+respecto del frame anterior. El Framer los reconstruye (apply_delta) sobre
+el último frame entregado, así que afuera sólo se ven frames completos o parciales.
+"""
+import struct
+import time
+
+MAGIC = 0xD0
+DUMP_TYPES = (1, 2, 3, 4)  # STEP, RUN_END, MANUAL, STEP_SAMPLE ('N' cada k ciclos)
+
+# Secciones de un dump (bits de la máscara de 'M')
+SEC_PC, SEC_PIPE, SEC_REGS, SEC_MEM = 0x1, 0x2, 0x4, 0x8
+SEC_ALL = 0xF
+PAD_VARLEN = 0x80
+PAD_DELTA = 0x40
+MEM_HDR = struct.Struct("<HH")   # addr, len de la ventana de DMEM
+MAX_MEM_WINDOW = 4096            # dmem_dbg_addr es de 12 bits
+
+
+def section_offsets(mask: int, pipe_words: int) -> tuple[int | None, int | None, int | None, int | None, int]:
+    """
+    Offsets de PC, PIPE, REGS y MEM (el sub-header) en un frame parcial con esa
+    máscara (None = no viene) y largo sin contar los datos de la ventana de DMEM.
+    """
+    offs = []
+    off = 4
+    for bit, size in ((SEC_PC, 4), (SEC_PIPE, pipe_words * 4), (SEC_REGS, 32 * 4), (SEC_MEM, MEM_HDR.size)):
+        if mask & bit:
+            offs.append(off)
+            off += size
+        else:
+            offs.append(None)
+    return offs[0], offs[1], offs[2], offs[3], off
+
+
+def frame_layout(frame, pipe_words: int) -> tuple[int, int | None, int | None, int | None, int, int]:
+    """
+    (máscara, offset de PIPE, de REGS, de los datos de DMEM, addr, len) de un frame
+    completo o parcial (no delta); None = la sección no viene.
+    """
+    if frame[3] == 0:
+        off_reg = 8 + pipe_words * 4
+        return SEC_ALL, 8, off_reg, off_reg + 32 * 4, 0, len(frame) - off_reg - 32 * 4
+    mask = frame[3] & SEC_ALL
+    _, off_pipe, off_reg, off_mem, _ = section_offsets(mask, pipe_words)
+    if off_mem is None:
+        return mask, off_pipe, off_reg, None, 0, 0
+    addr, n = MEM_HDR.unpack_from(frame, off_mem)
+    return mask, off_pipe, off_reg, off_mem + MEM_HDR.size, addr, n
+
+
+def apply_delta(ref, delta, pipe_words: int) -> bytes:
+    """
+    Frame delta + frame anterior (reconstruido, mismas secciones y ventana) -> frame
+    completo o parcial como el keyframe. ValueError si no corresponden.
+    """
+    mask = delta[3] & SEC_ALL
+    rmask, ref_pipe, ref_reg, ref_mem, addr, n = frame_layout(ref, pipe_words)
+    if rmask != mask:
+        raise ValueError("Frame delta con otras secciones que el anterior")
+    out = bytearray(ref)
+    out[:3] = delta[:3]
+    src = 4
+    if mask & SEC_PC:
+        out[4:8] = delta[4:8]
+        src = 8
+    for bit, dst in ((SEC_PIPE, ref_pipe), (SEC_REGS, ref_reg)):
+        if mask & bit:
+            chg = int.from_bytes(delta[src:src + 4], "little")
+            src += 4
+            k = 0
+            while chg:
+                if chg & 1:
+                    out[dst + 4 * k:dst + 4 * k + 4] = delta[src:src + 4]
+                    src += 4
+                chg >>= 1
+                k += 1
+    if mask & SEC_MEM:
+        if MEM_HDR.unpack_from(delta, src) != (addr, n):
+            raise ValueError("Frame delta con otra ventana de DMEM que el anterior")
+        bmp = src + MEM_HDR.size
+        src = bmp + (n + 7) // 8
+        bits = int.from_bytes(delta[bmp:src], "little")
+        i = 0
+        while bits:
+            if bits & 1:
+                out[ref_mem + i] = delta[src]
+                src += 1
+            bits >>= 1
+            i += 1
+    return bytes(out)
+
+
+# Compactar el buffer cuando lo consumido supera esto (evita mover bytes en cada frame)
+_COMPACT_BYTES = 1 << 16
+
+
+class Framer:
+    """
+    Lector de frames de largo fijo (frame_len) sobre un objeto tipo pyserial.
+    off_reg (offset del banco de registros en el frame) habilita el chequeo de x0.
+    Con pipe_words se aceptan además frames parciales (pad = PAD_VARLEN | máscara),
+    cuyo largo sale del header y del sub-header de la ventana de DMEM, y frames delta,
+    que se devuelven ya reconstruidos. Cualquier byte descartado invalida la referencia
+    del delta: los deltas siguientes se tiran (delta_misses) hasta el próximo keyframe.
+    Sin I/O propio (ser=None) se alimenta con feed() y se consulta con poll().
+    Contadores: frames, resyncs (candidatos MAGIC rechazados o bytes salteados antes
+    de un MAGIC), discarded_bytes, timeouts, delta_frames, delta_misses y wire_bytes
+    (bytes de los frames completos tal como llegaron, delta o no).
+    Para medir latencia, arm() pone en None t_first y t_magic (perf_counter del primer
+    byte leído y del primer header válido de ahí en adelante).
+    """
+    def __init__(self, ser, frame_len: int, off_reg: int | None = None, chunk_bytes: int = 4096,
+                 pipe_words: int | None = None):
+        self.ser = ser
+        self.frame_len = frame_len
+        self.off_reg = off_reg
+        self.chunk_bytes = chunk_bytes
+        self.pipe_words = pipe_words
+        # máscara -> offsets (ver section_offsets); None: sólo frames completos
+        self._layouts = None if pipe_words is None else [section_offsets(m, pipe_words) for m in range(16)]
+        self._ref: bytes | None = None    # último frame entregado (referencia de los delta)
+
+        self.buf = bytearray()
+        self.pos = 0
+
+        self.frames = 0
+        self.resyncs = 0
+        self.discarded_bytes = 0
+        self.timeouts = 0
+        self.delta_frames = 0
+        self.delta_misses = 0
+        self.wire_bytes = 0
+
+        self.t_first: float | None = None
+        self.t_magic: float | None = None
+
+    def arm(self):
+        self.t_first = None
+        self.t_magic = None
+
+    def reset(self):
+        """Descarta lo acumulado (llamar junto con ser.reset_input_buffer())."""
+        self.buf.clear()
+        self.pos = 0
+        self._ref = None
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "resyncs": self.resyncs,
+            "discarded_bytes": self.discarded_bytes,
+            "timeouts": self.timeouts,
+            "delta_frames": self.delta_frames,
+            "delta_misses": self.delta_misses,
+            "wire_bytes": self.wire_bytes,
+        }
+
+    def _fill(self, need: int, deadline: float) -> None:
+        # Pide de una lo que falta para el frame (o lo que ya haya en el driver, si es más)
+        ser = self.ser
+        while True:
+            have = len(self.buf) - self.pos
+            if have >= need:
+                return
+            data = ser.read(max(need - have, min(ser.in_waiting, self.chunk_bytes)))
+            if data:
+                if self.t_first is None:
+                    self.t_first = time.perf_counter()
+                self.buf += data
+            elif time.monotonic() >= deadline:
+                self._timeout(need)
+
+    def _timeout(self, need: int):
+        have = len(self.buf) - self.pos
+        self.timeouts += 1
+        self._discard(have)
+        raise TimeoutError(f"Timeout esperando frame ({need} bytes, llegaron {have})")
+
+    def _discard(self, n: int) -> None:
+        if n:
+            self._ref = None
+        self.discarded_bytes += n
+        self._advance(n)
+
+    def _advance(self, n: int) -> None:
+        self.pos += n
+        if self.pos >= len(self.buf):
+            self.buf.clear()
+            self.pos = 0
+        elif self.pos >= _COMPACT_BYTES:
+            del self.buf[:self.pos]
+            self.pos = 0
+
+    def _header_ok(self, i: int) -> bool:
+        b = self.buf
+        dtype, flags, pad = b[i + 1], b[i + 2], b[i + 3]
+        if flags > 3 or dtype not in DUMP_TYPES:
+            return False
+        return pad == 0 or (self._layouts is not None and pad & 0xB0 == PAD_VARLEN)
+
+    def _delta_len(self, p: int, have: int) -> int:
+        # Largo de un frame delta en buf[p:]; si todavía no se sabe, el mínimo que hace
+        # falta para seguir (> have). -1 si no puede ser un delta válido.
+        b = self.buf
+        pad = b[p + 3]
+        off = 8 if pad & SEC_PC else 4
+        # x0 no cambia nunca; la máscara de PIPE no pasa de pipe_words
+        for bit, bad in ((SEC_PIPE, ~((1 << self.pipe_words) - 1)), (SEC_REGS, 1)):
+            if pad & bit:
+                if have < off + 4:
+                    return off + 4
+                chg = int.from_bytes(b[p + off:p + off + 4], "little")
+                if chg & bad:
+                    return -1
+                off += 4 + 4 * chg.bit_count()
+        if not pad & SEC_MEM:
+            return off
+        if have < off + MEM_HDR.size:
+            return off + MEM_HDR.size
+        _, mlen = MEM_HDR.unpack_from(b, p + off)
+        if mlen > MAX_MEM_WINDOW:
+            return -1
+        bmp = off + MEM_HDR.size
+        nb = (mlen + 7) // 8
+        if have < bmp + nb:
+            return bmp + nb
+        bits = int.from_bytes(b[p + bmp:p + bmp + nb], "little")
+        if bits >> mlen:
+            return -1
+        return bmp + nb + bits.bit_count()
+
+    def feed(self, data: bytes) -> None:
+        """Agrega bytes leídos por fuera (ej. un StreamReader de asyncio)."""
+        if data and self.t_first is None:
+            self.t_first = time.perf_counter()
+        self.buf += data
+
+    def _undelta(self, frame: bytes) -> bytes | None:
+        ref = self._ref
+        try:
+            if ref is None:
+                raise ValueError("Frame delta sin keyframe")
+            out = apply_delta(ref, frame, self.pipe_words)
+        except ValueError:
+            self._ref = None
+            self.delta_misses += 1
+            return None
+        self.delta_frames += 1
+        return out
+
+    def poll(self, expect: int | None = None) -> bytes | int:
+        """
+        Busca un frame válido sólo en lo ya acumulado, sin I/O. Devuelve el frame o,
+        si todavía no alcanza, cuántos bytes (desde pos) hacen falta para decidir.
+        """
+        while True:
+            i = self.buf.find(MAGIC, self.pos)
+            if i < 0:
+                self._discard(len(self.buf) - self.pos)
+                # con frames parciales el largo recién se sabe al ver el header
+                return self.frame_len if self._layouts is None else 4
+            if i > self.pos:
+                self.resyncs += 1
+                self._discard(i - self.pos)
+
+            have = len(self.buf) - self.pos
+            if have < 4:
+                return 4
+            if not self._header_ok(self.pos):
+                self.resyncs += 1
+                self._discard(1)
+                continue
+            if self.t_magic is None:
+                self.t_magic = time.perf_counter()
+
+            p = self.pos
+            pad = self.buf[p + 3]
+            if pad == 0:
+                need, off_reg = self.frame_len, self.off_reg
+            elif pad & PAD_DELTA:
+                need, off_reg = self._delta_len(p, have), None
+            else:
+                _, _, off_reg, off_mem, need = self._layouts[pad & 0xF]
+                if off_mem is not None:
+                    if have < off_mem + MEM_HDR.size:
+                        return off_mem + MEM_HDR.size
+                    _, mlen = MEM_HDR.unpack_from(self.buf, p + off_mem)
+                    need = -1 if mlen > MAX_MEM_WINDOW else need + mlen
+
+            if have < need:
+                return need
+            if need < 0 or (off_reg is not None and any(self.buf[p + off_reg:p + off_reg + 4])):
+                self.t_magic = None
+                self.resyncs += 1
+                self._discard(1)
+                continue
+            frame = bytes(self.buf[p:p + need])
+            self._advance(need)
+            self.wire_bytes += need
+            if pad & PAD_DELTA:
+                # se consume entero aunque no se pueda reconstruir: la placa ya lo mandó
+                frame = self._undelta(frame)
+                if frame is None:
+                    self.discarded_bytes += need
+                    self.t_magic = None
+                    continue
+            self._ref = frame
+            if expect is not None and frame[1] != expect:
+                # frame entero de otro comando: se saltea sin perder la referencia
+                self.discarded_bytes += need
+                self.t_magic = None
+                continue
+            self.frames += 1
+            return frame
+
+    def wait_byte(self, timeout_s: float) -> bool:
+        """
+        Espera hasta que haya al menos un byte sin consumir leyendo de a uno, para que
+        t_first/t_magic midan la llegada y no el fin de una lectura grande. False si no
+        llegó nada a tiempo.
+        """
+        deadline = time.monotonic() + timeout_s
+        while len(self.buf) == self.pos:
+            data = self.ser.read(1)
+            if data:
+                self.feed(data)
+            elif time.monotonic() >= deadline:
+                return False
+        return True
+
+    def read_tagged(self, tag: int, n: int, timeout_s: float = 1.0, hdr: bytes = b"") -> bytes:
+        """
+        Respuesta corta que no es un dump: busca el byte tag seguido de hdr (el eco de los
+        argumentos del comando) y devuelve los n bytes siguientes. Un tag suelto que no
+        trae hdr atrás (un byte de un dump viejo) se descarta como ruido.
+        """
+        deadline = time.monotonic() + timeout_s
+        k = len(hdr)
+        while True:
+            i = self.buf.find(tag, self.pos)
+            if i < 0:
+                self._discard(len(self.buf) - self.pos)
+                if time.monotonic() >= deadline:
+                    self._timeout(1 + k + n)
+                self._fill(1 + k + n, deadline)
+                continue
+            if i > self.pos:
+                self.resyncs += 1
+                self._discard(i - self.pos)
+            self._fill(1 + k, deadline)
+            if self.buf[self.pos + 1:self.pos + 1 + k] != hdr:
+                self.resyncs += 1
+                self._discard(1)
+                continue
+            self._fill(1 + k + n, deadline)
+            out = bytes(self.buf[self.pos + 1 + k:self.pos + 1 + k + n])
+            self._advance(1 + k + n)
+            return out
+
+    def read_frame(self, timeout_s: float = 5.0, expect: int | None = None) -> bytes:
+        """
+        Devuelve el próximo frame válido (bytes; frame_len o el largo del frame parcial).
+        expect fija el dump_type.
+        TimeoutError si no se completa a tiempo (lo parcial se descarta).
+        """
+        deadline = time.monotonic() + timeout_s
+        while True:
+            discarded = self.discarded_bytes
+            r = self.poll(expect)
+            if not isinstance(r, int):
+                return r
+            # con ruido continuo _fill siempre recibe algo: el deadline se controla acá
+            if self.discarded_bytes != discarded and time.monotonic() >= deadline:
+                self._timeout(r)
+            self._fill(r, deadline)
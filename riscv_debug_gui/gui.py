@@ -7,28 +7,14 @@ from tkinter import ttk, messagebox, filedialog
 import serial
 import serial.tools.list_ports
 
-MAGIC = 0xD0
+from framer import MAGIC, Framer
+from trace_file import TraceWriter, record_steps
+
 PIPE_WORDS = 23  # debe coincidir con cpu_top (dbg_pipe_flat)
 
 def u32_le(x: int) -> bytes:
     return struct.pack("<I", x & 0xFFFFFFFF)
 
-def read_exact(ser: serial.Serial, n: int) -> bytes:
-    data = bytearray()
-    while len(data) < n:
-        chunk = ser.read(n - len(data))
-        if not chunk:
-            raise TimeoutError(f"Timeout leyendo {n} bytes (llegaron {len(data)})")
-        data += chunk
-    return bytes(data)
-
-def sync_to_magic(ser: serial.Serial, deadline_s: float) -> None:
-    while time.time() < deadline_s:
-        b = ser.read(1)
-        if b and b[0] == MAGIC:
-            return
-    raise TimeoutError("Timeout esperando MAGIC 0xD0")
-
 def dump_type_str(t: int) -> str:
     return {1: "STEP", 2: "RUN_END", 3: "MANUAL"}.get(t, f"UNKNOWN({t})")
 
@@ -233,11 +219,13 @@ def decode_pipe_words(pw: list[int]) -> dict:
 
 class DebugHost:
     def __init__(self, port: str, baud: int, dm_dump_bytes: int = 64, timeout_s: float = 0.2):
+        self.baud = baud
         self.dm_dump_bytes = dm_dump_bytes
         self.frame_len = 4 + 4 + PIPE_WORDS*4 + 32*4 + dm_dump_bytes
         self.ser = serial.Serial(port, baud, timeout=timeout_s)
         self.ser.reset_input_buffer()
         self.ser.reset_output_buffer()
+        self.framer = Framer(self.ser, self.frame_len, off_reg=8 + PIPE_WORDS*4)
 
     def close(self):
         try:
@@ -253,12 +241,16 @@ class DebugHost:
         self.ser.write(u32_le(addr))
         self.ser.write(u32_le(data))
 
+    def read_frame(self, timeout_s: float = 5.0) -> bytes:
+        return self.framer.read_frame(timeout_s)
+
     def wait_dump(self, timeout_s: float = 5.0):
-        deadline = time.time() + timeout_s
-        sync_to_magic(self.ser, deadline)
-        rest = read_exact(self.ser, self.frame_len - 1)
-        frame = bytes([MAGIC]) + rest
-        return self._parse(frame)
+        return self._parse(self.read_frame(timeout_s))
+
+    def record_trace(self, path: str, max_cycles: int, stop_event=None, progress=None):
+        with TraceWriter(path, self.frame_len, PIPE_WORDS, self.dm_dump_bytes, self.baud) as tw:
+            return record_steps(self.send_cmd, self.read_frame, tw, max_cycles,
+                                stop_event=stop_event, progress=progress)
 
     def _parse(self, frame: bytes) -> dict:
         if len(frame) != self.frame_len:
@@ -306,6 +298,10 @@ class App(tk.Tk):
 
         self.host: DebugHost | None = None
         self.worker_lock = threading.Lock()
+        self.trace_stop: threading.Event | None = None
+        # host desconectado con un trace en curso: se cierra en _trace_done
+        self._close_pending: DebugHost | None = None
+        self._quit_pending = False
 
         self._build_ui()
         self._refresh_ports()
@@ -353,6 +349,12 @@ class App(tk.Tk):
         for b in [self.btn_dump, self.btn_step, self.btn_run, self.btn_rst, self.btn_load]:
             b.pack(side="left", padx=6)
 
+        self.btn_trace = ttk.Button(actions, text="Grabar trace…", command=self.toggle_trace, state="disabled")
+        self.btn_trace.pack(side="left", padx=6)
+        ttk.Label(actions, text="Ciclos máx:").pack(side="left")
+        self.trace_budget_var = tk.StringVar(value="10000")
+        ttk.Entry(actions, width=8, textvariable=self.trace_budget_var).pack(side="left", padx=6)
+
         # Program IMEM
         prog = ttk.LabelFrame(self, text="Programar IMEM (P)", padding=10)
         prog.pack(fill="x", padx=10, pady=(0,10))
@@ -502,13 +504,17 @@ class App(tk.Tk):
         self.btn_connect.config(state=state_off)
         self.btn_disconnect.config(state=state_on)
 
-        for b in [self.btn_dump, self.btn_step, self.btn_run, self.btn_rst, self.btn_prog, self.btn_progseq, self.btn_load]:
+        for b in [self.btn_dump, self.btn_step, self.btn_run, self.btn_rst, self.btn_prog, self.btn_progseq, self.btn_load,
+                  self.btn_trace]:
             b.config(state=state_on)
 
     # ---------------- Connect / Disconnect ----------------
     def connect(self):
         if self.host is not None:
             return
+        if self._close_pending is not None:
+            self.log("[WARN] Todavía se está deteniendo el trace anterior")
+            return
         port = self.port_cb.get().strip()
         if not port:
             messagebox.showerror("Error", "Elegí un puerto.")
@@ -531,15 +537,24 @@ class App(tk.Tk):
     def disconnect(self):
         if self.host is None:
             return
+        host, self.host = self.host, None
+        self.set_controls(False)
+        if self.trace_stop is not None:
+            # el worker del trace todavía usa el puerto: se cierra cuando termine
+            self.trace_stop.set()
+            self._close_pending = host
+            self.log("[INFO] Deteniendo el trace antes de desconectar...")
+            return
         try:
-            self.host.close()
+            host.close()
         finally:
-            self.host = None
-            self.set_controls(False)
             self.log("[INFO] Desconectado")
 
     def on_close(self):
         self.disconnect()
+        if self._close_pending is not None:
+            self._quit_pending = True   # _trace_done cierra el puerto y la ventana
+            return
         self.destroy()
 
     # ---------------- Program loader ----------------
@@ -580,11 +595,73 @@ class App(tk.Tk):
                     self.log(f"[OK] Programa cargado. Rango: 0x{first_addr:08x} .. 0x{last_addr:08x}")
 
                 except Exception as e:
-                    self.after(0, lambda: messagebox.showerror("Error", str(e)))
+                    msg = str(e)
+                    self.after(0, lambda: messagebox.showerror("Error", msg))
                     self.log(f"[ERR] {e}")
 
         threading.Thread(target=worker, daemon=True).start()
 
+    # ---------------- Trace (threaded) ----------------
+    def toggle_trace(self):
+        if self.host is None:
+            return
+        if self.trace_stop is not None:
+            self.trace_stop.set()
+            return
+        path = filedialog.asksaveasfilename(
+            title="Guardar trace",
+            defaultextension=".rvtrace",
+            filetypes=[("Trace", "*.rvtrace"), ("Todos", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            budget = int(self.trace_budget_var.get(), 0)
+        except ValueError:
+            messagebox.showerror("Error", "Ciclos máx inválido")
+            return
+
+        stop = threading.Event()
+        self.trace_stop = stop
+        self.btn_trace.config(text="Detener trace")
+        host = self.host    # disconnect() pone self.host en None mientras el trace sigue
+
+        def worker():
+            with self.worker_lock:
+                try:
+                    self.log(f"[TX] S x{budget} -> {path}")
+                    t0 = time.perf_counter()
+                    cycles, halted, last = host.record_trace(
+                        path, budget, stop_event=stop,
+                        progress=lambda n: self.log(f"[INFO] ... {n} ciclos"))
+                    dt = max(time.perf_counter() - t0, 1e-9)
+                    end = "HALT_SEEN" if halted else ("detenido" if stop.is_set() else "límite de ciclos")
+                    self.log(f"[OK] Trace: {cycles} ciclos en {dt:.2f}s ({cycles / dt:.0f} frames/s), fin por {end}")
+                    if last is not None:
+                        d = host._parse(last)
+                        self.after(0, lambda: self.apply_dump(d))
+                except Exception as e:
+                    # `e` se desliga al salir del except: el lambda corre después, en el loop de Tk
+                    msg = str(e)
+                    self.after(0, lambda: messagebox.showerror("Error", msg))
+                    self.log(f"[ERR] {e}")
+                finally:
+                    self.after(0, self._trace_done)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _trace_done(self):
+        self.trace_stop = None
+        self.btn_trace.config(text="Grabar trace…")
+        host, self._close_pending = self._close_pending, None
+        if host is not None:
+            try:
+                host.close()
+            finally:
+                self.log("[INFO] Desconectado")
+        if self._quit_pending:
+            self.destroy()
+
     # ---------------- Actions (threaded) ----------------
     def run_action(self, action: str):
         if self.host is None:
@@ -632,7 +709,8 @@ class App(tk.Tk):
                             self.host.program_word(base + 4*i, w)
 
                 except Exception as e:
-                    self.after(0, lambda: messagebox.showerror("Error", str(e)))
+                    msg = str(e)
+                    self.after(0, lambda: messagebox.showerror("Error", msg))
                     self.log(f"[ERR] {e}")
 
         threading.Thread(target=worker, daemon=True).start()
@@ -0,0 +1,122 @@
+"""
+Latencia por comando: cada comando guarda los instantes de sus fases y LatencyStats
+mantiene una ventana móvil por (comando, fase) para sacar p50/p95/p99.
+
+Fases (acumuladas desde que se empieza a escribir el comando; time.perf_counter):
+  tx     write + flush del comando terminado
+  first  primer byte leído del puerto después de mandar el comando
+  magic  header válido (MAGIC) encontrado por el Framer
+  frame  frame completo
+  parse  DumpFrame construido
+  ui     frame aplicado en la ventana (MainWindow.apply_dump)
+
+El tiempo teórico en el cable es (bytes TX + bytes RX) * 10 / baud (8N1).
+"""
+import json
+import math
+import time
+from collections import deque
+
+PHASES = ("tx", "first", "magic", "frame", "parse", "ui")
+QUANTILES = (50, 95, 99)
+
+
+def wire_time_s(n_bytes: int, baud: int) -> float | None:
+    """Tiempo de n_bytes en una UART 8N1 (10 bits por byte); None si no hay baud (sim://)."""
+    return n_bytes * 10 / baud if baud > 0 else None
+
+
+def percentile(sorted_vals: list[float], q: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada (no vacía)."""
+    k = max(0, min(len(sorted_vals), math.ceil(q / 100 * len(sorted_vals))) - 1)
+    return sorted_vals[k]
+
+
+class CmdTiming:
+    """Instantes de un comando. Las fases que no aplican (ej. 'P' no tiene frame) quedan en None."""
+    __slots__ = ("cmd", "t0", "tx", "first", "magic", "frame", "parse", "ui", "tx_bytes", "rx_bytes")
+
+    def __init__(self, cmd: str, tx_bytes: int = 1, rx_bytes: int = 0):
+        self.cmd = cmd
+        self.tx_bytes = tx_bytes
+        self.rx_bytes = rx_bytes
+        self.t0 = time.perf_counter()
+        self.tx = self.first = self.magic = self.frame = self.parse = self.ui = None
+
+    def mark(self, phase: str):
+        setattr(self, phase, time.perf_counter())
+
+    def phases(self) -> dict[str, float]:
+        """fase -> segundos desde t0, sólo las registradas."""
+        out = {}
+        for p in PHASES:
+            t = getattr(self, p)
+            if t is not None:
+                out[p] = t - self.t0
+        return out
+
+
+class LatencyStats:
+    """
+    Histogramas móviles por comando: las últimas `window` muestras de cada fase.
+    add() se llama desde el thread de I/O y snapshot() desde la GUI; las deque con
+    maxlen hacen append atómico, así que no hace falta lock.
+    """
+    def __init__(self, baud: int, window: int = 1000):
+        self.baud = baud
+        self.window = window
+        self._samples: dict[str, dict[str, deque]] = {}
+        self._wire: dict[str, deque] = {}
+        self._count: dict[str, int] = {}
+
+    def clear(self):
+        self._samples.clear()
+        self._wire.clear()
+        self._count.clear()
+
+    def add(self, t: CmdTiming):
+        per = self._samples.get(t.cmd)
+        if per is None:
+            # _samples se publica al final: snapshot() recorre sus claves y lee las otras dos
+            per = {p: deque(maxlen=self.window) for p in PHASES}
+            self._wire[t.cmd] = deque(maxlen=self.window)
+            self._count[t.cmd] = 0
+            self._samples[t.cmd] = per
+        for p, dt in t.phases().items():
+            per[p].append(dt)
+        wire = wire_time_s(t.tx_bytes + t.rx_bytes, self.baud)
+        if wire is not None:
+            self._wire[t.cmd].append(wire)
+        self._count[t.cmd] += 1
+
+    def snapshot(self) -> dict:
+        """
+        {cmd: {"count", "wire_ms", "phases": {fase: {"n", "p50", "p95", "p99"}}}} en ms.
+        wire_ms es la mediana del tiempo teórico (para 'P' depende del largo de la imagen).
+        """
+        out = {}
+        for cmd in sorted(list(self._samples)):   # list(): add() puede agregar claves en paralelo
+            per = self._samples.get(cmd)
+            wire = self._wire.get(cmd)
+            if per is None or wire is None:
+                continue    # clear() en el medio
+            phases = {}
+            for p in PHASES:
+                vals = sorted(per[p])
+                if vals:
+                    phases[p] = {"n": len(vals), **{f"p{q}": percentile(vals, q) * 1e3 for q in QUANTILES}}
+            wire = sorted(wire)
+            out[cmd] = {
+                "count": self._count.get(cmd, 0),
+                "wire_ms": percentile(wire, 50) * 1e3 if wire else None,
+                "phases": phases,
+            }
+        return out
+
+    def to_json(self, path: str, extra: dict | None = None):
+        """Exporta snapshot() para dashboards: {"baud", "window", "t", "commands", ...extra}."""
+        doc = {"baud": self.baud, "window": self.window, "t": time.time(), "commands": self.snapshot()}
+        if extra:
+            doc.update(extra)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
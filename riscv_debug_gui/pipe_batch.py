@@ -0,0 +1,118 @@
+"""
+Decodificación vectorizada (NumPy) de muchos frames de pipeline a la vez,
+para análisis offline de traces. Mismos campos que pipe_decode.decode_pipe_words,
+aplanados en columnas: "ifid.pc", "idex.rs1", "idex.ctrl.valid", ...
+"""
+import numpy as np
+
+from pipe_decode import PIPE_WORDS
+from trace_file import TRACE_F_VARLEN, TRACE_HDR, TraceReader
+
+# (etapa, campo, word, shift, máscara); máscara None = word completo
+_FIELDS = [
+    ("ifid", "pc", 0, 0, None),
+    ("ifid", "pc4", 1, 0, None),
+    ("ifid", "instr", 2, 0, None),
+    ("ifid", "valid", 3, 0, 0x1),
+
+    ("idex", "pc", 4, 0, None),
+    ("idex", "pc4", 5, 0, None),
+    ("idex", "rs1_data", 6, 0, None),
+    ("idex", "rs2_data", 7, 0, None),
+    ("idex", "imm", 8, 0, None),
+    ("idex", "rs1", 9, 12, 0x1F),
+    ("idex", "rs2", 9, 17, 0x1F),
+    ("idex", "rd", 9, 7, 0x1F),
+    ("idex", "funct3", 9, 22, 0x7),
+    ("idex", "funct7", 9, 25, 0x7F),
+    ("idex", "ctrl.valid", 10, 0, 1),
+    ("idex", "ctrl.reg_write", 10, 1, 1),
+    ("idex", "ctrl.mem_to_reg", 10, 2, 1),
+    ("idex", "ctrl.mem_read", 10, 3, 1),
+    ("idex", "ctrl.mem_write", 10, 4, 1),
+    ("idex", "ctrl.branch", 10, 5, 1),
+    ("idex", "ctrl.alu_src", 10, 6, 1),
+    ("idex", "ctrl.alu_op", 10, 7, 0x3),
+    ("idex", "ctrl.jump", 10, 9, 1),
+    ("idex", "ctrl.jalr", 10, 10, 1),
+    ("idex", "ctrl.wb_sel_pc4", 10, 11, 1),
+
+    ("exmem", "alu_result", 11, 0, None),
+    ("exmem", "rs2_pass", 12, 0, None),
+    ("exmem", "branch_target", 13, 0, None),
+    ("exmem", "pc4", 14, 0, None),
+    ("exmem", "rd", 15, 5, 0x1F),
+    ("exmem", "funct3", 15, 10, 0x7),
+    ("exmem", "ctrl.valid", 16, 0, 1),
+    ("exmem", "ctrl.reg_write", 16, 1, 1),
+    ("exmem", "ctrl.mem_to_reg", 16, 2, 1),
+    ("exmem", "ctrl.mem_read", 16, 3, 1),
+    ("exmem", "ctrl.mem_write", 16, 4, 1),
+    ("exmem", "ctrl.branch_taken", 16, 5, 1),
+    ("exmem", "ctrl.wb_sel_pc4", 16, 6, 1),
+
+    ("memwb", "mem_read_data", 17, 0, None),
+    ("memwb", "alu_result", 18, 0, None),
+    ("memwb", "pc4", 19, 0, None),
+    ("memwb", "rd", 20, 0, 0x1F),
+    ("memwb", "ctrl.valid", 21, 0, 1),
+    ("memwb", "ctrl.reg_write", 21, 1, 1),
+    ("memwb", "ctrl.mem_to_reg", 21, 2, 1),
+    ("memwb", "ctrl.wb_sel_pc4", 21, 3, 1),
+]
+
+# words de control: bits útiles < 16
+_CTRL_WORDS = (3, 10, 16, 21)
+
+COLUMNS = [f"{stage}.{name}" for stage, name, _, _, _ in _FIELDS]
+
+
+def decode_pipe_batch(pw: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    pw: ndarray [N, PIPE_WORDS] de uint32 (puede ser una vista con strides, ej. sobre un trace).
+    Devuelve {columna: ndarray[N]}; los words completos son vistas uint32, los campos
+    de bits uint8.
+    """
+    pw = np.asarray(pw)
+    if pw.ndim != 2 or pw.shape[1] != PIPE_WORDS:
+        raise ValueError(f"se esperaba [N, {PIPE_WORDS}], llegó {pw.shape}")
+    if pw.dtype != np.uint32:
+        pw = pw.astype(np.uint32)
+
+    cols = {}
+    words = {}
+    for stage, name, wi, sh, mask in _FIELDS:
+        if mask is None:
+            cols[f"{stage}.{name}"] = pw[:, wi]
+            continue
+        w = words.get(wi)
+        if w is None:
+            # una sola pasada por columna (contigua); los words de control entran en 16 bits
+            w = np.ascontiguousarray(pw[:, wi])
+            if wi in _CTRL_WORDS:
+                w = w.astype(np.uint16)
+            words[wi] = w
+        f = w >> w.dtype.type(sh) if sh else w.copy()
+        f &= w.dtype.type(mask)
+        cols[f"{stage}.{name}"] = f.astype(np.uint8, copy=False)
+    return cols
+
+
+def trace_pipe_words(reader: TraceReader) -> np.ndarray:
+    """
+    Matriz [N, pipe_words] de un trace. Con frames de largo fijo es una vista
+    sin copia sobre el mmap (strides = frame_len). ValueError si algún frame parcial
+    no trae la sección PIPE.
+    """
+    n = len(reader)
+    if not reader.flags & TRACE_F_VARLEN:
+        return np.ndarray((n, reader.pipe_words), dtype="<u4", buffer=reader.mm,
+                          offset=TRACE_HDR.size + 8, strides=(reader.frame_len, 4))
+
+    out = np.empty((n, reader.pipe_words), dtype=np.uint32)
+    for i in range(n):
+        pw = reader[i].pipe_words
+        if pw is None:
+            raise ValueError(f"frame {i} del trace sin sección PIPE (grabado con 'M' sin SEC_PIPE)")
+        out[i] = pw
+    return out
@@ -0,0 +1,415 @@
+import struct
+import sys
+
+from debughost import MAGIC
+from dump_frame import DumpFrame, partial_frame
+from framer import PAD_VARLEN, SEC_ALL
+from pipe_decode import PIPE_WORDS, decode_pipe_words
+from sim_host import (
+    IMEM_WORDS, DMEM_BYTES, INSTR_HALT, INSTR_NOP, DUMP_STEP,
+    RV32Sim, _sext, _alu_ctrl, alu,
+)
+
+# opcodes RV32I (control_unit.v / imm_gen.v)
+OP, OP_IMM, LOAD, STORE = 0x33, 0x13, 0x03, 0x23
+BRANCH, JAL, JALR, LUI, AUIPC = 0x63, 0x6F, 0x67, 0x37, 0x17
+
+
+def control(opcode: int) -> tuple:
+    """control_unit: (reg_write, mem_to_reg, mem_read, mem_write, branch, alu_src, alu_op, jump, jalr, wb_sel_pc4)"""
+    if opcode == OP:
+        return (1, 0, 0, 0, 0, 0, 0b10, 0, 0, 0)
+    if opcode == OP_IMM:
+        return (1, 0, 0, 0, 0, 1, 0b11, 0, 0, 0)
+    if opcode == LOAD:
+        return (1, 1, 1, 0, 0, 1, 0b00, 0, 0, 0)
+    if opcode == STORE:
+        return (0, 0, 0, 1, 0, 1, 0b00, 0, 0, 0)
+    if opcode == BRANCH:
+        return (0, 0, 0, 0, 1, 0, 0b01, 0, 0, 0)
+    if opcode == JAL:
+        return (1, 0, 0, 0, 0, 0, 0b00, 1, 0, 1)
+    if opcode == JALR:
+        return (1, 0, 0, 0, 0, 1, 0b00, 0, 1, 1)
+    if opcode in (LUI, AUIPC):
+        return (1, 0, 0, 0, 0, 1, 0b00, 0, 0, 0)
+    return (0, 0, 0, 0, 0, 0, 0b00, 0, 0, 0)
+
+
+def imm_gen(instr: int) -> int:
+    opcode = instr & 0x7F
+    if opcode in (OP_IMM, LOAD, JALR):
+        return _sext(instr >> 20, 12)
+    if opcode == STORE:
+        return _sext(((instr >> 25) << 5) | ((instr >> 7) & 0x1F), 12)
+    if opcode == BRANCH:
+        return _sext((((instr >> 31) & 1) << 12) | (((instr >> 7) & 1) << 11) |
+                     (((instr >> 25) & 0x3F) << 5) | (((instr >> 8) & 0xF) << 1), 13)
+    if opcode in (LUI, AUIPC):
+        return instr & 0xFFFFF000
+    if opcode == JAL:
+        return _sext((((instr >> 31) & 1) << 20) | (((instr >> 12) & 0xFF) << 12) |
+                     (((instr >> 20) & 1) << 11) | (((instr >> 21) & 0x3FF) << 1), 21)
+    return 0
+
+
+class IfId:
+    __slots__ = ("pc", "pc4", "instr", "valid")
+
+    def __init__(self, pc=0, pc4=0, instr=INSTR_NOP, valid=0):
+        self.pc, self.pc4, self.instr, self.valid = pc, pc4, instr, valid
+
+
+class IdEx:
+    __slots__ = ("pc", "pc4", "rs1_data", "rs2_data", "imm", "rs1", "rs2", "rd", "funct3", "funct7",
+                 "reg_write", "mem_to_reg", "mem_read", "mem_write", "branch", "alu_src", "alu_op",
+                 "jump", "jalr", "wb_sel_pc4", "valid")
+
+    def __init__(self):
+        # bubble(): todo en 0
+        for k in self.__slots__:
+            setattr(self, k, 0)
+
+
+class ExMem:
+    __slots__ = ("alu_result", "rs2_pass", "branch_target", "pc4", "rd", "funct3",
+                 "mem_read", "mem_write", "reg_write", "mem_to_reg", "branch_taken", "wb_sel_pc4", "valid")
+
+    def __init__(self):
+        for k in self.__slots__:
+            setattr(self, k, 0)
+
+
+class MemWb:
+    __slots__ = ("mem_read_data", "alu_result", "pc4", "rd", "reg_write", "mem_to_reg", "wb_sel_pc4", "valid")
+
+    def __init__(self):
+        for k in self.__slots__:
+            setattr(self, k, 0)
+
+
+class PipelineModel(RV32Sim):
+    """
+    Modelo ciclo a ciclo de cpu_top (IF/ID/EX/MEM/WB) con hazard_detection_unit,
+    forwarding_unit, flush por salto en EX y los modos de debug_unit_uart
+    (STEP = 1 ciclo, RUN -> DRAIN, 'R' = flush + load_pc). Reutiliza IMEM/DMEM/regs
+    de RV32Sim y produce los mismos 23 pipe words que dbg_pipe_flat.
+    """
+    def __init__(self, imem_words: int = IMEM_WORDS, dmem_bytes: int = DMEM_BYTES):
+        super().__init__(imem_words, dmem_bytes)
+        self.ifid = IfId()
+        self.idex = IdEx()
+        self.exmem = ExMem()
+        self.memwb = MemWb()
+        self.cycles = 0
+
+    # ---------------- señales combinacionales ----------------
+    def pipe_empty(self) -> bool:
+        return not (self.ifid.valid or self.idex.valid or self.exmem.valid or self.memwb.valid)
+
+    def _halt_id(self) -> bool:
+        return bool(self.ifid.valid) and self.ifid.instr == INSTR_HALT
+
+    def _wb(self) -> tuple:
+        m = self.memwb
+        if m.wb_sel_pc4:
+            wd = m.pc4
+        elif m.mem_to_reg:
+            wd = m.mem_read_data
+        else:
+            wd = m.alu_result
+        return m.reg_write, m.rd, wd
+
+    # ---------------- flanco de clock con cpu_ce=1 ----------------
+    def tick(self, drain: bool = False):
+        regs = self.regs
+        ifid, idex, exmem, memwb = self.ifid, self.idex, self.exmem, self.memwb
+
+        # IF
+        pc = self.pc
+        pc4 = (pc + 4) & 0xFFFFFFFF
+        instr_if = self.imem[(pc >> 2) % self.imem_words]
+
+        # WB
+        wb_we, wb_rd, wb_wd = self._wb()
+
+        # ID
+        instr = ifid.instr
+        opcode = instr & 0x7F
+        rd_id = (instr >> 7) & 0x1F
+        f3_id = (instr >> 12) & 0x7
+        rs1_id = (instr >> 15) & 0x1F
+        rs2_id = (instr >> 20) & 0x1F
+        f7_id = (instr >> 25) & 0x7F
+
+        def rf_read(r):
+            if r == 0:
+                return 0
+            if wb_we and wb_rd == r:
+                return wb_wd   # write-first
+            return regs[r]
+
+        # HDU (load-use)
+        stall = bool(idex.mem_read and idex.rd != 0 and (idex.rd == rs1_id or idex.rd == rs2_id))
+
+        # Forwarding
+        def fwd(r, data):
+            if exmem.reg_write and exmem.rd != 0 and exmem.rd == r:
+                return exmem.alu_result
+            if memwb.reg_write and memwb.rd != 0 and memwb.rd == r:
+                return wb_wd
+            return data
+
+        rs1_fwd = fwd(idex.rs1, idex.rs1_data)
+        rs2_fwd = fwd(idex.rs2, idex.rs2_data)
+
+        # EX
+        op = _alu_ctrl(idex.alu_op, idex.funct3, idex.funct7)
+        alu_result = alu(op, rs1_fwd, idex.imm if idex.alu_src else rs2_fwd)
+        branch_target = (idex.pc + idex.imm) & 0xFFFFFFFF
+        jalr_target = (rs1_fwd + idex.imm) & 0xFFFFFFFE
+        eq = rs1_fwd == rs2_fwd
+        cond = eq if idex.funct3 == 0b000 else ((not eq) if idex.funct3 == 0b001 else False)
+        branch_taken = int(bool(idex.branch and cond))
+        pcsrc = bool(branch_taken or idex.jump or idex.jalr)
+        pc_branch = jalr_target if idex.jalr else branch_target
+
+        # MEM (lectura combinacional / escritura en el flanco)
+        mem_read_data = self._load(exmem.funct3, exmem.alu_result) if exmem.mem_read else 0
+        if exmem.mem_write:
+            self._store(exmem.funct3, exmem.alu_result, exmem.rs2_pass)
+
+        # ---- registros ----
+        pc_en = not stall and not drain
+
+        # MEM/WB
+        nmw = MemWb()
+        nmw.mem_read_data = mem_read_data
+        nmw.alu_result = exmem.alu_result
+        nmw.pc4 = exmem.pc4
+        nmw.rd = exmem.rd
+        nmw.reg_write = exmem.reg_write
+        nmw.mem_to_reg = exmem.mem_to_reg
+        nmw.wb_sel_pc4 = exmem.wb_sel_pc4
+        nmw.valid = exmem.valid
+
+        # EX/MEM
+        nem = ExMem()
+        nem.alu_result = alu_result
+        nem.rs2_pass = rs2_fwd
+        nem.branch_target = branch_target
+        nem.pc4 = idex.pc4
+        nem.rd = idex.rd
+        nem.funct3 = idex.funct3
+        nem.mem_read = idex.mem_read
+        nem.mem_write = idex.mem_write
+        nem.reg_write = idex.reg_write
+        nem.mem_to_reg = idex.mem_to_reg
+        nem.branch_taken = branch_taken
+        nem.wb_sel_pc4 = idex.wb_sel_pc4
+        nem.valid = idex.valid
+
+        # ID/EX
+        nie = IdEx()
+        if not (pcsrc or stall or drain):
+            nie.pc = ifid.pc
+            nie.pc4 = ifid.pc4
+            nie.rs1_data = rf_read(rs1_id)
+            nie.rs2_data = rf_read(rs2_id)
+            nie.imm = imm_gen(instr)
+            nie.rs1, nie.rs2, nie.rd = rs1_id, rs2_id, rd_id
+            nie.funct3, nie.funct7 = f3_id, f7_id
+            (nie.reg_write, nie.mem_to_reg, nie.mem_read, nie.mem_write, nie.branch,
+             nie.alu_src, nie.alu_op, nie.jump, nie.jalr, nie.wb_sel_pc4) = control(opcode)
+            nie.valid = ifid.valid
+
+        # IF/ID
+        if pcsrc or drain:
+            nif = IfId()
+        elif not stall:
+            nif = IfId(pc, pc4, instr_if, int(pc_en))
+        else:
+            nif = ifid
+
+        # PC
+        if pc_en:
+            self.pc = pc_branch if pcsrc else pc4
+
+        # regfile (x0 nunca se escribe)
+        if wb_we and wb_rd:
+            regs[wb_rd] = wb_wd
+
+        self.ifid, self.idex, self.exmem, self.memwb = nif, nie, nem, nmw
+        self.cycles += 1
+
+    # ---------------- comandos de debug ----------------
+    def reset_fetch(self, pc: int = 0):
+        # 'R': dbg_flush_pipe vacía IF/ID e ID/EX; EX/MEM y MEM/WB quedan (write_en=cpu_ce=0)
+        self.ifid = IfId()
+        self.idex = IdEx()
+        self.pc = pc & 0xFFFFFFFF
+        self.halt_seen = False
+
+    def step(self):
+        """'S': un único flanco con cpu_ce=1."""
+        hid = self._halt_id()
+        self.tick()
+        # el clock sigue corriendo mientras se arma el dump
+        self.halt_seen = self.halt_seen or hid or self._halt_id()
+
+    def run(self, max_instr: int = 10_000_000) -> bool:
+        """
+        'G': replica ST_RUN/ST_DRAIN ciclo a ciclo. halt_seen es registrado y la FSM
+        lo ve un ciclo después, por eso entran instrucciones extra antes del drain.
+        max_instr acota los ciclos. Devuelve True si terminó en RUN_END.
+        """
+        run_sig, drain_sig, draining = False, False, False
+        for _ in range(max_instr):
+            hs = self.halt_seen
+            pe = self.pipe_empty()
+            hid = self._halt_id()
+            if run_sig or drain_sig:
+                self.tick(drain=drain_sig)
+            if hid:
+                self.halt_seen = True
+
+            if not draining:
+                if hs:
+                    run_sig, drain_sig, draining = False, True, True
+                else:
+                    run_sig = True
+            elif pe:
+                self.halt_seen = self.halt_seen or self._halt_id()
+                return True
+        return False
+
+    # ---------------- dump ----------------
+    def pipe_words(self) -> list[int]:
+        i, e, m, w = self.ifid, self.idex, self.exmem, self.memwb
+        w9 = (e.funct7 << 25) | (e.funct3 << 22) | (e.rs2 << 17) | (e.rs1 << 12) | (e.rd << 7)
+        w10 = (e.valid | (e.reg_write << 1) | (e.mem_to_reg << 2) | (e.mem_read << 3) | (e.mem_write << 4) |
+               (e.branch << 5) | (e.alu_src << 6) | (e.alu_op << 7) | (e.jump << 9) | (e.jalr << 10) |
+               (e.wb_sel_pc4 << 11))
+        w15 = (m.funct3 << 10) | (m.rd << 5)
+        w16 = (m.valid | (m.reg_write << 1) | (m.mem_to_reg << 2) | (m.mem_read << 3) | (m.mem_write << 4) |
+               (m.branch_taken << 5) | (m.wb_sel_pc4 << 6))
+        w21 = w.valid | (w.reg_write << 1) | (w.mem_to_reg << 2) | (w.wb_sel_pc4 << 3)
+        return [
+            i.pc, i.pc4, i.instr, i.valid,
+            e.pc, e.pc4, e.rs1_data, e.rs2_data, e.imm, w9, w10,
+            m.alu_result, m.rs2_pass, m.branch_target, m.pc4, w15, w16,
+            w.mem_read_data, w.alu_result, w.pc4, w.rd, w21,
+            0,
+        ]
+
+    def dump_frame(self, dump_type: int, pipe_words: int = PIPE_WORDS, dm_dump_bytes: int = 64) -> bytes:
+        flags = (int(self.pipe_empty()) << 1) | int(self.halt_seen)
+        pw = (self.pipe_words() + [0] * pipe_words)[:pipe_words]
+        hdr = struct.pack("<BBBBI", MAGIC, dump_type, flags, 0, self.pc)
+        mem = bytes(self.dmem[i % self.dmem_bytes] for i in range(dm_dump_bytes))
+        return hdr + struct.pack(f"<{pipe_words}I", *pw) + struct.pack("<32I", *self.regs) + mem
+
+
+def diff_frames(expected, got, pipe_words: int = PIPE_WORDS) -> list[str]:
+    """
+    Compara dos frames campo a campo (header, pc, w0..wN, x0..x31, DMEM). Sirven
+    frames completos o parciales ('M', PAD_VARLEN): se comparan las secciones que traen.
+    """
+    out = []
+    if len(expected) != len(got):
+        return [f"len {len(expected)} != {len(got)}"]
+    if bytes(expected[:4]) != bytes(got[:4]):
+        out.append(f"hdr {bytes(expected[:4]).hex()} != {bytes(got[:4]).hex()}")
+        if (expected[3] ^ got[3]) & (PAD_VARLEN | SEC_ALL):
+            return out
+    dm = len(expected) - (8 + pipe_words * 4 + 32 * 4)
+    a = DumpFrame(expected, pipe_words, dm)
+    b = DumpFrame(got, pipe_words, dm)
+    if a.pc != b.pc:
+        out.append(f"pc 0x{a.pc:08x} != 0x{b.pc:08x}")
+    for name, x, y in (("w", a.pipe_words, b.pipe_words), ("x", a.regs, b.regs)):
+        if x is not None:
+            out += [f"{name}{k} 0x{v:08x} != 0x{w:08x}" for k, (v, w) in enumerate(zip(x, y)) if v != w]
+    if a.mem is not None:
+        if a.mem_addr != b.mem_addr:
+            out.append(f"ventana DMEM 0x{a.mem_addr:x} != 0x{b.mem_addr:x}")
+        out += [f"dmem[0x{(a.mem_addr + k) % DMEM_BYTES:x}] 0x{v:02x} != 0x{w:02x}"
+                for k, (v, w) in enumerate(zip(a.mem, b.mem)) if v != w]
+    return out
+
+
+def check_step_frames(model: PipelineModel, frames, pipe_words: int = PIPE_WORDS,
+                      dm_dump_bytes: int = 64) -> list[tuple[int, list[str]]]:
+    """
+    Reproduce una secuencia de 'S' grabada de la placa (mismo programa, después de 'R')
+    y devuelve [(ciclo, diferencias)] para cada frame que no coincide. Los frames
+    parciales (trace grabado con 'M') se comparan contra el frame del modelo recortado
+    a las mismas secciones y ventana de DMEM.
+    Todavía no hay una captura de la placa en el repo: el modelo sólo se comparó con
+    SimHost/FakeBoard, que lo usan a él mismo.
+    """
+    bad = []
+    for cyc, frame in enumerate(frames):
+        model.step()
+        want = model.dump_frame(DUMP_STEP, pipe_words, dm_dump_bytes)
+        if frame[3] & PAD_VARLEN:
+            fr = DumpFrame(frame, pipe_words, dm_dump_bytes)
+            n = fr.dm_bytes if fr.mem is not None else 0
+            mem = bytes(model.dmem[(fr.mem_addr + i) % model.dmem_bytes] for i in range(n))
+            want = partial_frame(want, pipe_words, fr.sections, fr.mem_addr, n, mem)
+        d = diff_frames(frame, want, pipe_words)
+        if d:
+            bad.append((cyc, d))
+    return bad
+
+
+def main(argv: list[str]) -> int:
+    # uso: python pipeline_model.py prog.mem [frames.bin | trace.rvtrace] [dm_bytes]
+    from program_parser import parse_program_file
+
+    if len(argv) < 2:
+        print("uso: pipeline_model.py prog.mem [frames_step.bin | trace.rvtrace] [dm_bytes]")
+        return 2
+
+    dm = int(argv[3]) if len(argv) > 3 else 64
+    model = PipelineModel()
+    for addr, word in parse_program_file(argv[1]):
+        model.write_imem(addr, word)
+    model.reset_fetch(0)
+
+    if len(argv) > 2:
+        from trace_file import TRACE_MAGIC, TraceReader
+
+        with open(argv[2], "rb") as f:
+            is_trace = f.read(len(TRACE_MAGIC)) == TRACE_MAGIC
+        if is_trace:
+            # trace grabado por record_trace: el header manda sobre dm_bytes y con
+            # TRACE_F_VARLEN cada frame trae su largo (secciones parciales)
+            with TraceReader(argv[2]) as tr:
+                pw, dm = tr.pipe_words, tr.dm_bytes
+                frames = [bytes(tr.raw(k)) for k in range(len(tr))]
+        else:
+            # captura cruda de frames STEP completos, uno detrás de otro
+            pw = PIPE_WORDS
+            frame_len = 4 + 4 + pw * 4 + 32 * 4 + dm
+            with open(argv[2], "rb") as f:
+                raw = f.read()
+            frames = [raw[k:k + frame_len] for k in range(0, len(raw) - frame_len + 1, frame_len)]
+        bad = check_step_frames(model, frames, pw, dm)
+        for cyc, diffs in bad[:20]:
+            print(f"[DIFF] ciclo {cyc}: " + "; ".join(diffs))
+        print(f"[{'OK' if not bad else 'ERR'}] {len(frames) - len(bad)}/{len(frames)} frames coinciden")
+        return 0 if not bad else 1
+
+    halted = model.run()
+    pd = decode_pipe_words(model.pipe_words())
+    print(f"[INFO] halted={halted} ciclos={model.cycles} pc=0x{model.pc:08x} "
+          f"pipe_empty={int(model.pipe_empty())} MEM/WB v={pd['memwb']['ctrl']['valid']}")
+    for r in range(32):
+        if model.regs[r]:
+            print(f"  x{r:<2d} = 0x{model.regs[r]:08x}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -1,34 +1,255 @@
-def _strip_comment(line: str) -> str:
-    if "//" in line:
-        line = line.split("//", 1)[0]
-    if "#" in line:
-        line = line.split("#", 1)[0]
-    return line.strip()
-
-def parse_program_file(path: str) -> list[tuple[int, int]]:
-    items: list[tuple[int, int]] = []
-    base = 0
-    with open(path, "r", encoding="utf-8", errors="ignore") as f:
-        for raw in f:
-            s = _strip_comment(raw)
-            if not s:
-                continue
-
-            if s.startswith("@"):
-                addr_s = s[1:].strip()
-                base = int(addr_s, 16) if not addr_s.lower().startswith("0x") else int(addr_s, 0)
-                continue
-
-            if ":" in s:
-                a_s, d_s = s.split(":", 1)
-                a_s, d_s = a_s.strip(), d_s.strip()
-                addr = int(a_s, 0) if a_s.lower().startswith("0x") else int(a_s, 16)
-                word = int(d_s, 0) if d_s.lower().startswith("0x") else int(d_s, 16)
-                items.append((addr & 0xFFFFFFFF, word & 0xFFFFFFFF))
-                continue
-
-            word = int(s, 0) if s.lower().startswith("0x") else int(s, 16)
-            items.append((base & 0xFFFFFFFF, word & 0xFFFFFFFF))
-            base = (base + 4) & 0xFFFFFFFF
+"""
+Carga de programas para IMEM. Formatos (se detectan por contenido; .bin por extensión):
+  - texto estilo $readmemh: una word por línea, "@addr" y "ADDR:DATA", comentarios // y #
+  - Intel HEX (líneas ":LLAAAATT...")
+  - ELF RV32 little endian: segmentos PT_LOAD ejecutables (o todos si no hay), vía mmap
+  - .bin: words little endian crudas desde la dirección 0
+  - .s/.asm: ensamblador RV32I incluido (assembler.py)
+
+parse_program_file devuelve [(addr, word)] ordenado: para el texto y el Intel HEX sólo
+las words que el archivo escribe (la última escritura gana), así 'P' no pisa la IMEM entre
+regiones. .bin, ELF y .s/.asm son imágenes contiguas. load_program devuelve siempre
+(base, array('I')) contiguo, con los huecos en NOP (el contenido inicial de imem_simple).
+Todo se cachea por (path, mtime, size).
+"""
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+
+from assembler import ASM_EXTS, assemble_file
+
+INSTR_NOP = 0x00000013      # addi x0,x0,0
+MAX_IMAGE_WORDS = 1 << 20   # 4 MiB de span: más que eso es un archivo equivocado
+
+_ELF_MAGIC = b"\x7fELF"
+_EM_RISCV = 0xF3
+_PT_LOAD = 1
+_PF_X = 1
+_ELF32_EHDR = struct.Struct("<16sHHIIIIIHHHHHH")
+_ELF32_PHDR = struct.Struct("<IIIIIIII")
+
+_COMMENT = re.compile(r"//.*|#.*")
+
+Image = tuple[int, array]
+Items = list[tuple[int, int]]
+
+# abspath -> (mtime_ns, size, imagen | None, items | None); al menos uno de los dos está,
+# el otro se arma la primera vez que se pide
+_cache: dict[str, list] = {}
+
+
+def _hex(s: str) -> int:
+    # int(s, 16) acepta también el prefijo 0x
+    return int(s, 16) & 0xFFFFFFFF
+
 
+# ---------------- ensamblado de la imagen ----------------
+def _image_from_words(items) -> Image:
+    """(addr, word) en cualquier orden -> imagen contigua; la última escritura gana."""
+    mem = dict(items)
+    if not mem:
+        return 0, array("I")
+    lo = min(mem) & ~3
+    hi = max(mem) & ~3
+    n = (hi - lo) // 4 + 1
+    if n > MAX_IMAGE_WORDS:
+        raise ValueError(f"Imagen demasiado dispersa: 0x{lo:08x}..0x{hi:08x}")
+    words = array("I", [INSTR_NOP]) * n
+    for a, w in mem.items():
+        words[((a & ~3) - lo) >> 2] = w
+    return lo, words
+
+
+def _image_from_chunks(chunks: list[tuple[int, bytes]]) -> Image:
+    """Trozos de bytes (addr, data) -> imagen contigua de words LE."""
+    chunks = [(a, d) for a, d in chunks if d]
+    if not chunks:
+        return 0, array("I")
+    lo = min(a for a, _ in chunks) & ~3
+    hi = max(a + len(d) for a, d in chunks)
+    n = (hi - lo + 3) // 4
+    if n > MAX_IMAGE_WORDS:
+        raise ValueError(f"Imagen demasiado dispersa: 0x{lo:08x}..0x{hi:08x}")
+    buf = bytearray(struct.pack("<I", INSTR_NOP) * n)
+    for a, d in chunks:
+        buf[a - lo:a - lo + len(d)] = d
+    return lo, _words_le(buf)
+
+
+def _items_from_chunks(chunks: list[tuple[int, bytes]]) -> Items:
+    """Como _image_from_chunks pero sin rellenar entre tramos: sólo las words que tocan."""
+    spans = sorted((a & ~3, (a + len(d) + 3) & ~3, k)
+                   for k, (a, d) in enumerate(chunks) if d)
+    items: Items = []
+    run: list[int] = []     # índices de los trozos que se solapan o tocan (orden de escritura)
+    end = 0
+    for lo, hi, k in spans:
+        if run and lo > end:
+            items += image_items(*_image_from_chunks([chunks[j] for j in sorted(run)]))
+            run = []
+        if not run:
+            end = hi
+        run.append(k)
+        end = max(end, hi)
+    if run:
+        items += image_items(*_image_from_chunks([chunks[j] for j in sorted(run)]))
     return items
+
+
+def _words_le(data) -> array:
+    words = array("I")
+    words.frombytes(data)
+    if sys.byteorder != "little":
+        words.byteswap()
+    return words
+
+
+# ---------------- formatos ----------------
+def _parse_text(text: str) -> Image | Items:
+    # camino rápido: sólo words, una tras otra desde 0 (imagen contigua)
+    if "@" not in text and ":" not in text and "//" not in text and "#" not in text:
+        try:
+            return 0, array("I", map(_hex, text.split()))
+        except ValueError:
+            pass    # token inválido: el camino lento da el mismo error con contexto
+
+    if "//" in text or "#" in text:
+        text = _COMMENT.sub("", text)
+    mem: dict[int, int] = {}
+    base = 0
+    for s in text.splitlines():
+        s = s.strip()
+        if not s:
+            continue
+        if s[0] == "@":
+            base = _hex(s[1:])
+            continue
+        if ":" in s:
+            a_s, d_s = s.split(":", 1)
+            mem[_hex(a_s)] = _hex(d_s)
+            continue
+        mem[base] = _hex(s)
+        base = (base + 4) & 0xFFFFFFFF
+    return sorted(mem.items())
+
+
+def _parse_ihex(text: str) -> Items:
+    chunks: list[tuple[int, bytes]] = []
+    upper = 0
+    for lineno, raw in enumerate(text.splitlines(), 1):
+        s = raw.strip()
+        if not s:
+            continue
+        if not s.startswith(":"):
+            raise ValueError(f"Intel HEX línea {lineno}: falta ':'")
+        rec = bytes.fromhex(s[1:])
+        if len(rec) < 5 or len(rec) != rec[0] + 5:
+            raise ValueError(f"Intel HEX línea {lineno}: largo inválido")
+        if sum(rec) & 0xFF:
+            raise ValueError(f"Intel HEX línea {lineno}: checksum inválido")
+        n, addr, rtype, data = rec[0], (rec[1] << 8) | rec[2], rec[3], rec[4:4 + rec[0]]
+        if rtype == 0x00:
+            chunks.append((upper + addr, data))
+        elif rtype == 0x01:
+            break
+        elif rtype == 0x02:
+            upper = int.from_bytes(data, "big") << 4
+        elif rtype == 0x04:
+            upper = int.from_bytes(data, "big") << 16
+        # 0x03/0x05 (dirección de arranque): sin efecto, la CPU arranca en 0
+    return _items_from_chunks(chunks)
+
+
+def _parse_elf(mm) -> Image:
+    if len(mm) < _ELF32_EHDR.size:
+        raise ValueError("ELF truncado")
+    ident, _, machine, _, _, phoff, _, _, _, phentsize, phnum, _, _, _ = _ELF32_EHDR.unpack_from(mm, 0)
+    if ident[4] != 1 or ident[5] != 1:
+        raise ValueError("Sólo ELF de 32 bits little endian (RV32)")
+    if machine != _EM_RISCV:
+        raise ValueError(f"ELF para otra arquitectura (e_machine=0x{machine:x})")
+
+    loads = []
+    for k in range(phnum):
+        ptype, off, vaddr, _, filesz, _, flags, _ = _ELF32_PHDR.unpack_from(mm, phoff + k * phentsize)
+        if ptype == _PT_LOAD and filesz:
+            loads.append((flags, off, vaddr, filesz))
+    # IMEM sólo recibe código: los segmentos de datos van a DMEM, que no se programa por 'P'
+    code = [s for s in loads if s[0] & _PF_X] or loads
+    mv = memoryview(mm)
+    try:
+        return _image_from_chunks([(vaddr, mv[off:off + filesz]) for _, off, vaddr, filesz in code])
+    finally:
+        mv.release()
+
+
+def _load_uncached(path: str) -> Image | Items:
+    """Imagen contigua (base, words) o lista dispersa de (addr, word), según el formato."""
+    if path.lower().endswith(ASM_EXTS):
+        asm = assemble_file(path)
+        return asm.base, asm.words
+
+    with open(path, "rb") as f:
+        head = f.read(4)
+        if head == _ELF_MAGIC:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return _parse_elf(mm)
+        f.seek(0)
+        data = f.read()
+
+    if path.lower().endswith(".bin"):
+        data += bytes(-len(data) % 4)
+        return 0, _words_le(data)
+
+    text = data.decode("utf-8", errors="ignore")
+    if text.lstrip().startswith(":"):
+        return _parse_ihex(text)
+    return _parse_text(text)
+
+
+# ---------------- API ----------------
+def _entry(path: str) -> list:
+    key = os.path.abspath(path)
+    st = os.stat(key)
+    hit = _cache.get(key)
+    if hit is None or hit[0] != st.st_mtime_ns or hit[1] != st.st_size:
+        got = _load_uncached(key)
+        if isinstance(got, list):
+            hit = [st.st_mtime_ns, st.st_size, None, got]
+        else:
+            hit = [st.st_mtime_ns, st.st_size, got, None]
+        _cache[key] = hit
+    return hit
+
+
+def load_program(path: str) -> Image:
+    """Imagen de IMEM del archivo: (dirección base, words), huecos en NOP. Cacheada."""
+    hit = _entry(path)
+    if hit[2] is None:
+        hit[2] = _image_from_words(hit[3])
+    base, words = hit[2]
+    # copia: quien la reciba puede modificarla sin tocar el cache
+    return base, array("I", words)
+
+
+def clear_program_cache():
+    _cache.clear()
+
+
+def image_items(base: int, words: array) -> Items:
+    """(base, words) -> [(addr, word)] para DebugHost.program_image."""
+    end = base + 4*len(words)
+    if end <= 0x1_0000_0000:
+        return list(zip(range(base, end, 4), words))
+    return [((base + 4*k) & 0xFFFFFFFF, w) for k, w in enumerate(words)]
+
+
+def parse_program_file(path: str) -> Items:
+    """[(addr, word)] ordenado por dirección, sólo lo que el archivo escribe. Cacheado."""
+    hit = _entry(path)
+    if hit[3] is None:
+        hit[3] = image_items(*hit[2])
+    return list(hit[3])
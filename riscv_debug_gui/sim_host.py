@@ -0,0 +1,537 @@
+import struct
+import time
+
+from debughost import (CKSUM_HDR, CKSUM_TAG, DMEM_BYTES, K_RECORD, M_RECORD, X_RECORD, XMEM_HDR, XMEM_TAG, DebugHost, MAGIC,
+                       imem_checksum)
+from dump_frame import delta_frame, partial_frame
+from framer import SEC_ALL
+from pipe_decode import PIPE_WORDS
+
+# Parámetros del hardware (cpu_top / if_stage / mem_stage)
+IMEM_WORDS = 256            # if_stage IM_DEPTH (DMEM_BYTES viene de debughost)
+INSTR_HALT = 0x00100073     # ebreak
+INSTR_NOP  = 0x00000013     # addi x0,x0,0
+
+DUMP_STEP, DUMP_RUN_END, DUMP_MANUAL, DUMP_STEP_SAMPLE = 1, 2, 3, 4
+
+# alu_ctrl (mismos códigos que alu.v)
+ALU_ADD, ALU_SUB, ALU_AND, ALU_OR, ALU_XOR = 0, 1, 2, 3, 4
+ALU_SLT, ALU_SLTU, ALU_SLL, ALU_SRL, ALU_SRA = 5, 6, 7, 8, 9
+
+# Tipos de instrucción pre-decodificada
+K_ALU, K_LOAD, K_STORE, K_BRANCH, K_JAL, K_JALR, K_NOP, K_HALT = range(8)
+
+_U32 = struct.Struct("<I")
+_U16 = struct.Struct("<H")
+
+
+def _sext(x: int, bits: int) -> int:
+    sign = 1 << (bits - 1)
+    return ((x & (sign - 1)) - (x & sign)) & 0xFFFFFFFF
+
+
+def _alu_ctrl(alu_op: int, funct3: int, funct7: int) -> int:
+    # Igual que alu_control.v
+    if alu_op == 0b00:
+        return ALU_ADD
+    if alu_op == 0b01:
+        return ALU_SUB
+    alt = (funct7 >> 5) & 1
+    if funct3 == 0b000:
+        return ALU_SUB if (alu_op == 0b10 and alt) else ALU_ADD
+    return {
+        0b111: ALU_AND, 0b110: ALU_OR, 0b100: ALU_XOR, 0b010: ALU_SLT,
+        0b011: ALU_SLTU, 0b001: ALU_SLL, 0b101: ALU_SRA if alt else ALU_SRL,
+    }[funct3]
+
+
+def decode_instr(instr: int) -> tuple:
+    """
+    Pre-decodifica una instrucción a (kind, rd, rs1, rs2, imm, f3, alu, use_imm).
+    Sigue control_unit/imm_gen/ex_stage del hardware, incluyendo sus particularidades:
+      - LUI/AUIPC: la ALU suma x[instr[19:15]] + imm (alu_a siempre es rs1_data).
+      - Branch: solo BEQ/BNE; el resto de funct3 nunca salta.
+      - Opcodes desconocidos se comportan como NOP.
+    """
+    instr &= 0xFFFFFFFF
+    if instr == INSTR_HALT:
+        return (K_HALT, 0, 0, 0, 0, 0, 0, 0)
+
+    opcode = instr & 0x7F
+    rd     = (instr >> 7) & 0x1F
+    funct3 = (instr >> 12) & 0x7
+    rs1    = (instr >> 15) & 0x1F
+    rs2    = (instr >> 20) & 0x1F
+    funct7 = (instr >> 25) & 0x7F
+
+    imm_i = _sext(instr >> 20, 12)
+    if opcode == 0x33:   # OP
+        return (K_ALU, rd, rs1, rs2, 0, funct3, _alu_ctrl(0b10, funct3, funct7), 0)
+    if opcode == 0x13:   # OP_IMM
+        return (K_ALU, rd, rs1, 0, imm_i, funct3, _alu_ctrl(0b11, funct3, funct7), 1)
+    if opcode == 0x03:   # LOAD
+        return (K_LOAD, rd, rs1, 0, imm_i, funct3, ALU_ADD, 1)
+    if opcode == 0x23:   # STORE
+        imm_s = _sext(((instr >> 25) << 5) | rd, 12)
+        return (K_STORE, 0, rs1, rs2, imm_s, funct3, ALU_ADD, 1)
+    if opcode == 0x63:   # BRANCH
+        imm_b = _sext((((instr >> 31) & 1) << 12) | (((instr >> 7) & 1) << 11) |
+                      (((instr >> 25) & 0x3F) << 5) | (((instr >> 8) & 0xF) << 1), 13)
+        return (K_BRANCH, 0, rs1, rs2, imm_b, funct3, ALU_SUB, 0)
+    if opcode == 0x6F:   # JAL
+        imm_j = _sext((((instr >> 31) & 1) << 20) | (((instr >> 12) & 0xFF) << 12) |
+                      (((instr >> 20) & 1) << 11) | (((instr >> 21) & 0x3FF) << 1), 21)
+        return (K_JAL, rd, 0, 0, imm_j, funct3, ALU_ADD, 0)
+    if opcode == 0x67:   # JALR
+        return (K_JALR, rd, rs1, 0, imm_i, funct3, ALU_ADD, 1)
+    if opcode in (0x37, 0x17):   # LUI / AUIPC
+        return (K_ALU, rd, rs1, 0, instr & 0xFFFFF000, funct3, ALU_ADD, 1)
+    return (K_NOP, 0, 0, 0, 0, 0, 0, 0)
+
+
+def alu(op: int, a: int, b: int) -> int:
+    if op == ALU_ADD:
+        return (a + b) & 0xFFFFFFFF
+    if op == ALU_SUB:
+        return (a - b) & 0xFFFFFFFF
+    if op == ALU_AND:
+        return a & b
+    if op == ALU_OR:
+        return a | b
+    if op == ALU_XOR:
+        return a ^ b
+    if op == ALU_SLT:
+        return int((a ^ 0x80000000) < (b ^ 0x80000000))
+    if op == ALU_SLTU:
+        return int(a < b)
+    if op == ALU_SLL:
+        return (a << (b & 0x1F)) & 0xFFFFFFFF
+    if op == ALU_SRL:
+        return a >> (b & 0x1F)
+    if op == ALU_SRA:
+        return ((a - ((a & 0x80000000) << 1)) >> (b & 0x1F)) & 0xFFFFFFFF
+    return 0
+
+
+def empty_pipe_words(n: int = PIPE_WORDS) -> list[int]:
+    # Pipeline drenado: todo en 0 salvo instr_ifid = NOP (if_id_reg flush)
+    w = [0] * n
+    if n > 2:
+        w[2] = INSTR_NOP
+    return w
+
+
+class RV32Sim:
+    """
+    Simulador funcional (una instrucción por paso) del subset RV32I del README.
+    Mantiene IMEM/regs/DMEM con el mismo tamaño y wrap de direcciones que el hardware.
+    """
+    def __init__(self, imem_words: int = IMEM_WORDS, dmem_bytes: int = DMEM_BYTES):
+        self.imem_words = imem_words
+        self.dmem_bytes = dmem_bytes
+        self.imem = [INSTR_NOP] * imem_words
+        self._dec = [decode_instr(INSTR_NOP)] * imem_words
+        self.regs = [0] * 32
+        self.dmem = bytearray(dmem_bytes)
+        self.pc = 0
+        self.halt_seen = False
+        self.instret = 0
+
+    # ---------------- debug (comandos) ----------------
+    def write_imem(self, addr: int, data: int):
+        idx = (addr >> 2) % self.imem_words
+        self.imem[idx] = data & 0xFFFFFFFF
+        self._dec[idx] = decode_instr(data)
+
+    def reset_fetch(self, pc: int = 0):
+        # 'R': flush + load_pc; regs y DMEM se conservan
+        self.pc = pc & 0xFFFFFFFF
+        self.halt_seen = False
+
+    # ---------------- memoria ----------------
+    def _load(self, f3: int, addr: int) -> int:
+        mem = self.dmem
+        base = (addr & ~3) % self.dmem_bytes
+        if f3 == 0b010:
+            return _U32.unpack_from(mem, base)[0]
+        if f3 == 0b000:
+            return _sext(mem[base | (addr & 3)], 8)
+        if f3 == 0b100:
+            return mem[base | (addr & 3)]
+        if f3 == 0b001:
+            return _sext(_U16.unpack_from(mem, base | (addr & 2))[0], 16)
+        if f3 == 0b101:
+            return _U16.unpack_from(mem, base | (addr & 2))[0]
+        return 0
+
+    def _store(self, f3: int, addr: int, v: int):
+        mem = self.dmem
+        base = (addr & ~3) % self.dmem_bytes
+        if f3 == 0b010:
+            _U32.pack_into(mem, base, v)
+        elif f3 == 0b000:
+            mem[base | (addr & 3)] = v & 0xFF
+        elif f3 == 0b001:
+            _U16.pack_into(mem, base | (addr & 2), v & 0xFFFF)
+
+    # ---------------- ejecución ----------------
+    def _exec_one(self, d: tuple, pc: int) -> int:
+        """Ejecuta una instrucción pre-decodificada y devuelve el próximo PC."""
+        kind, rd, rs1, rs2, imm, f3, op, use_imm = d
+        regs = self.regs
+        nxt = (pc + 4) & 0xFFFFFFFF
+        if kind == K_ALU:
+            res = alu(op, regs[rs1], imm if use_imm else regs[rs2])
+            if rd:
+                regs[rd] = res
+        elif kind == K_LOAD:
+            res = self._load(f3, (regs[rs1] + imm) & 0xFFFFFFFF)
+            if rd:
+                regs[rd] = res
+        elif kind == K_STORE:
+            self._store(f3, (regs[rs1] + imm) & 0xFFFFFFFF, regs[rs2])
+        elif kind == K_BRANCH:
+            eq = regs[rs1] == regs[rs2]
+            if (f3 == 0b000 and eq) or (f3 == 0b001 and not eq):
+                nxt = (pc + imm) & 0xFFFFFFFF
+        elif kind == K_JAL:
+            if rd:
+                regs[rd] = nxt
+            nxt = (pc + imm) & 0xFFFFFFFF
+        elif kind == K_JALR:
+            target = (regs[rs1] + imm) & 0xFFFFFFFE
+            if rd:
+                regs[rd] = nxt
+            nxt = target
+        elif kind == K_HALT:
+            self.halt_seen = True
+        self.instret += 1
+        return nxt
+
+    def step(self):
+        """Avanza una instrucción (ebreak solo marca halt_seen, como en modo STEP)."""
+        self.pc = self._exec_one(self._dec[(self.pc >> 2) % self.imem_words], self.pc)
+
+    def _halt_at(self, pc: int):
+        """
+        Reproduce el cierre de RUN del hardware: ebreak se detecta en IF/ID y la
+        FSM tarda 2 ciclos en pasar a DRAIN, así que la instrucción siguiente al
+        ebreak (ya en ID/EX) se completa; la de pc+8 se flushea. PC final = pc+12.
+        """
+        self.halt_seen = True
+        shadow = self._dec[((pc + 4) >> 2) % self.imem_words]
+        if shadow[0] != K_HALT:
+            self._exec_one(shadow, (pc + 4) & 0xFFFFFFFF)   # PC no se actualiza en DRAIN
+        self.pc = (pc + 12) & 0xFFFFFFFF
+
+    def run(self, max_instr: int = 10_000_000) -> bool:
+        """
+        Modo continuo ('G'): ejecuta hasta ebreak o max_instr instrucciones.
+        Devuelve True si terminó por HALT.
+        """
+        if self.halt_seen:
+            # ST_RUN con halt_seen ya en 1 pasa directo a DRAIN
+            return True
+
+        regs = self.regs
+        dec = self._dec
+        nwords = self.imem_words
+        load = self._load
+        store = self._store
+        pc = self.pc
+        n = 0
+
+        while n < max_instr:
+            kind, rd, rs1, rs2, imm, f3, op, use_imm = dec[(pc >> 2) % nwords]
+            n += 1
+
+            if kind == K_ALU:
+                a = regs[rs1]
+                b = imm if use_imm else regs[rs2]
+                if op == ALU_ADD:
+                    res = (a + b) & 0xFFFFFFFF
+                elif op == ALU_SUB:
+                    res = (a - b) & 0xFFFFFFFF
+                else:
+                    res = alu(op, a, b)
+                if rd:
+                    regs[rd] = res
+                pc = (pc + 4) & 0xFFFFFFFF
+                continue
+
+            if kind == K_LOAD:
+                res = load(f3, (regs[rs1] + imm) & 0xFFFFFFFF)
+                if rd:
+                    regs[rd] = res
+                pc = (pc + 4) & 0xFFFFFFFF
+                continue
+
+            if kind == K_STORE:
+                store(f3, (regs[rs1] + imm) & 0xFFFFFFFF, regs[rs2])
+                pc = (pc + 4) & 0xFFFFFFFF
+                continue
+
+            if kind == K_HALT:
+                n -= 1
+                self.instret += n
+                self._halt_at(pc)
+                return True
+
+            if kind == K_NOP:
+                pc = (pc + 4) & 0xFFFFFFFF
+                continue
+
+            # Saltos: target resuelto en EX
+            link = (pc + 4) & 0xFFFFFFFF
+            if kind == K_BRANCH:
+                eq = regs[rs1] == regs[rs2]
+                if not ((f3 == 0b000 and eq) or (f3 == 0b001 and not eq)):
+                    pc = link
+                    continue
+                target = (pc + imm) & 0xFFFFFFFF
+            elif kind == K_JAL:
+                target = (pc + imm) & 0xFFFFFFFF
+                if rd:
+                    regs[rd] = link
+            else:   # K_JALR
+                target = (regs[rs1] + imm) & 0xFFFFFFFE
+                if rd:
+                    regs[rd] = link
+
+            if dec[(link >> 2) % nwords][0] == K_HALT:
+                # ebreak en el slot del salto: llega a IF/ID (valid) antes del
+                # flush y dispara halt_seen igual; el target no llega a ejecutarse.
+                self.halt_seen = True
+                self.instret += n
+                self.pc = (target + 4) & 0xFFFFFFFF
+                return True
+            pc = target
+
+        self.instret += n
+        self.pc = pc
+        return False
+
+    # ---------------- dump ----------------
+    def dump_frame(self, dump_type: int, pipe_words: int = PIPE_WORDS, dm_dump_bytes: int = 64) -> bytes:
+        flags = (1 << 1) | (1 if self.halt_seen else 0)   # pipe_empty siempre 1 (modelo funcional)
+        hdr = struct.pack("<BBBBI", MAGIC, dump_type, flags, 0, self.pc)
+        pw = struct.pack(f"<{pipe_words}I", *empty_pipe_words(pipe_words))
+        regs = struct.pack("<32I", *self.regs)
+        if dm_dump_bytes <= self.dmem_bytes:
+            mem = bytes(self.dmem[:dm_dump_bytes])
+        else:
+            mem = bytes(self.dmem[i % self.dmem_bytes] for i in range(dm_dump_bytes))
+        return hdr + pw + regs + mem
+
+
+class SimSerial:
+    """
+    Objeto tipo serial.Serial que interpreta el protocolo de debug_unit_uart
+    (P/R/T/D/S/G/C/N/M/K/X) contra un RV32Sim y deja los dumps en el buffer de lectura.
+    """
+    def __init__(self, sim: RV32Sim, pipe_words: int = PIPE_WORDS, dm_dump_bytes: int = 64,
+                 timeout: float = 0.2, max_run_instr: int = 10_000_000):
+        self.sim = sim
+        self.pipe_words = pipe_words
+        self.dm_dump_bytes = dm_dump_bytes
+        self.timeout = timeout
+        self.max_run_instr = max_run_instr
+        self.is_open = True
+        self.run_timeouts = 0
+
+        self._rx = bytearray()      # bytes host -> placa pendientes de un comando
+        self._tx = bytearray()      # bytes placa -> host
+        self._p_pending = False
+        self._c_pending = False
+        self._n_pending = False
+        self._m_pending = False
+
+        # secciones de los dumps ('M'); mem_len None = DM_DUMP_BYTES
+        self.sections = SEC_ALL
+        self.mem_addr = 0
+        self.mem_len: int | None = None
+
+        # dumps delta ('K'): _shadow es el último frame mandado (None = próximo keyframe)
+        self.key_every = 0
+        self._key_cnt = 0
+        self._shadow: bytes | None = None
+        self._k_pending = False
+        self._x_pending = False
+
+    # ---------------- API tipo pyserial ----------------
+    @property
+    def in_waiting(self) -> int:
+        return len(self._tx)
+
+    def reset_input_buffer(self):
+        self._tx.clear()
+
+    def reset_output_buffer(self):
+        pass
+
+    def close(self):
+        self.is_open = False
+
+    def flush(self):
+        pass
+
+    def write(self, data: bytes) -> int:
+        self._rx += data
+        self._process()
+        return len(data)
+
+    def read(self, n: int = 1) -> bytes:
+        if not self._tx:
+            # sin datos: comportarse como un timeout de lectura
+            if self.timeout:
+                time.sleep(self.timeout)
+            return b""
+        out = bytes(self._tx[:n])
+        del self._tx[:n]
+        return out
+
+    # ---------------- FSM de comandos ----------------
+    def _emit(self, dump_type: int):
+        frame = self.sim.dump_frame(dump_type, self.pipe_words, self.dm_dump_bytes)
+        n = self.dm_dump_bytes if self.mem_len is None else self.mem_len
+        if (self.sections, self.mem_addr, self.mem_len) != (SEC_ALL, 0, None):
+            sim = self.sim
+            mem = bytes(sim.dmem[(self.mem_addr + i) % sim.dmem_bytes] for i in range(n))
+            frame = partial_frame(frame, self.pipe_words, self.sections, self.mem_addr, n, mem)
+        if not self.key_every:
+            self._tx += frame
+            return
+        # como debug_unit_uart: delta si hay sombra, no toca keyframe y la ventana entra en ella
+        if self._shadow is not None and self._key_cnt and n <= self.dm_dump_bytes:
+            self._tx += delta_frame(self._shadow, frame, self.pipe_words)
+        else:
+            self._tx += frame
+        self._shadow = frame
+        self._key_cnt = (self._key_cnt + 1) % self.key_every
+
+    def _keyframe(self):
+        self._shadow = None
+        self._key_cnt = 0
+
+    def _step_n(self, n: int, every: int):
+        # 'N': como ST_STEP/ST_STEP_WAIT de debug_unit_uart, dump STEP_SAMPLE cada `every`
+        # ciclos y STEP al final
+        sim = self.sim
+        for i in range(1, n + 1):
+            sim.step()
+            if every and i % every == 0 and i != n:
+                self._emit(DUMP_STEP_SAMPLE)
+        self._emit(DUMP_STEP)
+
+    def _process(self):
+        rx = self._rx
+        while rx:
+            if self._p_pending:
+                if len(rx) < 8:
+                    return
+                addr, data = struct.unpack_from("<II", rx, 0)
+                del rx[:8]
+                self.sim.write_imem(addr, data)
+                self._p_pending = False
+                continue
+            if self._c_pending:
+                if len(rx) < 8:
+                    return
+                addr, n = struct.unpack_from("<II", rx, 0)
+                del rx[:8]
+                words = self.sim.imem
+                base = addr >> 2
+                cs = imem_checksum(words[(base + k) % len(words)] for k in range(n))
+                self._tx += bytes([CKSUM_TAG]) + CKSUM_HDR.pack(addr, n) + struct.pack("<I", cs)
+                self._c_pending = False
+                continue
+            if self._m_pending:
+                if len(rx) < M_RECORD.size - 1:
+                    return
+                _, mask, addr, n = M_RECORD.unpack_from(b"M" + rx[:M_RECORD.size - 1])
+                del rx[:M_RECORD.size - 1]
+                self._m_pending = False
+                self.sections, self.mem_addr, self.mem_len = mask & SEC_ALL, addr, n
+                self._keyframe()
+                continue
+            if self._k_pending:
+                if len(rx) < K_RECORD.size - 1:
+                    return
+                _, self.key_every = K_RECORD.unpack_from(b"K" + rx[:K_RECORD.size - 1])
+                del rx[:K_RECORD.size - 1]
+                self._k_pending = False
+                self._keyframe()
+                continue
+            if self._x_pending:
+                if len(rx) < X_RECORD.size - 1:
+                    return
+                _, addr, n = X_RECORD.unpack_from(b"X" + rx[:X_RECORD.size - 1])
+                del rx[:X_RECORD.size - 1]
+                self._x_pending = False
+                sim = self.sim
+                self._tx += bytes([XMEM_TAG]) + XMEM_HDR.pack(addr, n)
+                self._tx += bytes(sim.dmem[(addr + i) % sim.dmem_bytes] for i in range(n))
+                continue
+            if self._n_pending:
+                if len(rx) < 8:
+                    return
+                n, every = struct.unpack_from("<II", rx, 0)
+                del rx[:8]
+                self._n_pending = False
+                self._step_n(n, every)
+                continue
+
+            c = rx[0]
+            del rx[:1]
+            if c == ord("P"):
+                self._p_pending = True
+            elif c == ord("C"):
+                self._c_pending = True
+            elif c == ord("N"):
+                self._n_pending = True
+            elif c == ord("M"):
+                self._m_pending = True
+            elif c == ord("K"):
+                self._k_pending = True
+            elif c == ord("X"):
+                self._x_pending = True
+            elif c == ord("R"):
+                self.sim.reset_fetch(0)
+                self._keyframe()
+            elif c == ord("D"):
+                self._emit(DUMP_MANUAL)
+            elif c == ord("S"):
+                self.sim.step()
+                self._emit(DUMP_STEP)
+            elif c == ord("G"):
+                if self.sim.run(self.max_run_instr):
+                    self._emit(DUMP_RUN_END)
+                else:
+                    # En la placa la FSM quedaría en ST_RUN; acá solo no hay dump
+                    self.run_timeouts += 1
+            # 'T' y bytes desconocidos: sin efecto
+
+
+class SimHost(DebugHost):
+    """
+    DebugHost contra el simulador en proceso (sin placa). Mismos send_cmd /
+    program_word / wait_dump y mismos frames de 4+4+PIPE_WORDS*4+128+DM bytes.
+    Con cycle_accurate=False es un modelo funcional: 'S' avanza una instrucción
+    (no un ciclo) y los pipe words siempre reflejan el pipeline vacío. Con
+    cycle_accurate=True usa pipeline_model.PipelineModel ('S' = 1 ciclo).
+    """
+    def __init__(self, pipe_words: int = PIPE_WORDS, dm_dump_bytes: int = 64, timeout_s: float = 0.2,
+                 max_run_instr: int = 10_000_000, sim: RV32Sim | None = None, cycle_accurate: bool = False):
+        if sim is None:
+            if cycle_accurate:
+                from pipeline_model import PipelineModel
+                sim = PipelineModel()
+            else:
+                sim = RV32Sim()
+        self.sim = sim
+        self.max_run_instr = max_run_instr
+        super().__init__("sim://", 0, pipe_words, dm_dump_bytes, timeout_s, mem_bytes=sim.dmem_bytes)
+
+    def _open_serial(self, port: str, baud: int, timeout_s: float):
+        return SimSerial(self.sim, self.pipe_words, self.dm_dump_bytes,
+                         timeout=timeout_s, max_run_instr=self.max_run_instr)
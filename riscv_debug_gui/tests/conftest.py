@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+# el código usa imports planos: los tests corren como si estuvieran en riscv_debug_gui
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.suite import synth_frames  # noqa: E402
+from pipe_decode import PIPE_WORDS  # noqa: E402
+
+DM_BYTES = 64
+FRAME_LEN = 8 + PIPE_WORDS * 4 + 32 * 4 + DM_BYTES
+OFF_REG = 8 + PIPE_WORDS * 4
+
+
+@pytest.fixture(scope="session")
+def frames() -> list[bytes]:
+    """Frames STEP reales del modelo de pipeline (bench.suite._PROG en loop)."""
+    return synth_frames(300)
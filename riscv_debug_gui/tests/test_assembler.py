@@ -0,0 +1,70 @@
+import pytest
+
+from assembler import INSTR_HALT, AsmError, Assembler, assemble
+from sim_host import RV32Sim
+
+
+@pytest.mark.parametrize("src,word", [
+    ("addi x1, x0, 5", 0x00500093),
+    ("sw x1, 8(x2)", 0x00112423),
+    ("lbu x3, -1(x4)", 0xFFF24183),
+    ("lui x5, 0x12345", 0x123452B7),
+    ("add x6, x7, x8", 0x00838333),
+    ("sub x6, x7, x8", 0x40838333),
+    ("srai x9, x9, 3", 0x4034D493),
+    ("jalr x0, 0(x1)", 0x00008067),
+    ("halt", INSTR_HALT),
+])
+def test_codificacion(src, word):
+    assert list(assemble(src).words) == [word]
+
+
+def test_labels_y_simbolos():
+    a = assemble("start: addi x1, x0, 5\n"
+                 ".equ K, 8\n"
+                 "sw x1, K(x2)\n"
+                 "nop\n"
+                 "bne x1, x2, start\n"
+                 "jal x1, start\n")
+    assert a.symbols == {"start": 0, "K": 8}
+    assert a.words[3] == 0xFE209AE3
+    assert a.words[4] == 0xFF1FF0EF
+    assert a.lines[4] == 3
+
+
+def test_li_en_el_simulador():
+    a = assemble("li x1, 0x12345678\n"
+                 "li x2, -1\n"
+                 "li x3, 0x800\n"
+                 "halt\n")
+    sim = RV32Sim()
+    for k, w in enumerate(a.words):
+        sim.write_imem(a.base + 4 * k, w)
+    sim.reset_fetch(a.base)
+    sim.run(10000)
+    assert sim.halt_seen
+    assert sim.regs[1:4] == [0x12345678, 0xFFFFFFFF, 0x800]
+
+
+@pytest.mark.parametrize("src,msg", [
+    ("nop\naddi x1, x0, 5000", "inmediato fuera de rango"),
+    ("nop\nfoo x1, x2", "instrucción desconocida"),
+    ("nop\nblt x1, x2, 0", "no está implementada"),
+    ("nop\naddi x1, x0", "operandos"),
+])
+def test_errores_con_numero_de_linea(src, msg):
+    with pytest.raises(AsmError, match=msg) as exc:
+        assemble(src)
+    assert exc.value.lineno == 2
+
+
+def test_reensamblado_incremental_igual_al_completo():
+    src = "".join(f"l{k}: addi x{k % 31 + 1}, x0, {k}\nbeq x0, x0, l{k}\n" for k in range(50))
+    asm = Assembler()
+    asm.assemble(src)
+    edited = src.replace("addi x11, x0, 10\n", "addi x11, x0, 11\nnop\n")
+    inc = asm.assemble(edited)
+    ref = assemble(edited)
+    assert list(inc.words) == list(ref.words)
+    assert inc.symbols == ref.symbols
+    assert inc.reused > 0
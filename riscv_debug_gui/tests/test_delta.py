@@ -0,0 +1,54 @@
+import pytest
+
+from conftest import FRAME_LEN, OFF_REG
+from dump_frame import delta_frame, partial_frame
+from framer import SEC_MEM, SEC_PC, SEC_PIPE, SEC_REGS, Framer, apply_delta
+from pipe_decode import PIPE_WORDS
+
+_SECTIONS = [(SEC_PC | SEC_REGS, 0, None), (SEC_PC | SEC_PIPE | SEC_MEM, 0, None), (SEC_MEM, 4, 16)]
+
+
+def test_delta_completo_ida_y_vuelta(frames):
+    for prev, cur in zip(frames, frames[1:]):
+        assert apply_delta(prev, delta_frame(prev, cur, PIPE_WORDS), PIPE_WORDS) == cur
+
+
+@pytest.mark.parametrize("sections,addr,mlen", _SECTIONS)
+def test_delta_parcial_ida_y_vuelta(frames, sections, addr, mlen):
+    parts = [partial_frame(fr, PIPE_WORDS, sections, addr, mlen) for fr in frames[:60]]
+    for prev, cur in zip(parts, parts[1:]):
+        assert apply_delta(prev, delta_frame(prev, cur, PIPE_WORDS), PIPE_WORDS) == cur
+
+
+def test_delta_sin_cambios_es_chico(frames):
+    d = delta_frame(frames[0], frames[0], PIPE_WORDS)
+    assert len(d) < 100
+    assert apply_delta(frames[0], d, PIPE_WORDS) == frames[0]
+
+
+def test_delta_con_otras_secciones_falla(frames):
+    prev = partial_frame(frames[0], PIPE_WORDS, SEC_PC)
+    cur = partial_frame(frames[1], PIPE_WORDS, SEC_PC | SEC_REGS)
+    with pytest.raises(ValueError):
+        apply_delta(prev, delta_frame(cur, cur, PIPE_WORDS), PIPE_WORDS)
+
+
+def test_framer_reconstruye_deltas(frames):
+    stream = frames[0] + b"".join(delta_frame(a, b, PIPE_WORDS) for a, b in zip(frames[:40], frames[1:41]))
+    fm = Framer(None, FRAME_LEN, OFF_REG, pipe_words=PIPE_WORDS)
+    fm.feed(stream)
+    assert [fm.poll() for _ in range(41)] == frames[:41]
+    assert fm.delta_frames == 40
+    assert fm.wire_bytes == len(stream)
+
+
+def test_framer_tira_deltas_sin_referencia_hasta_el_keyframe(frames):
+    deltas = [delta_frame(a, b, PIPE_WORDS) for a, b in zip(frames, frames[1:6])]
+    fm = Framer(None, FRAME_LEN, OFF_REG, pipe_words=PIPE_WORDS)
+    # basura antes del primer delta: se pierde la referencia
+    fm.feed(frames[0] + b"\x00" + b"".join(deltas[:3]) + frames[4] + deltas[4])
+    assert fm.poll() == frames[0]
+    assert fm.poll() == frames[4]
+    assert fm.poll() == frames[5]
+    assert fm.delta_misses == 3
+    assert fm.delta_frames == 1
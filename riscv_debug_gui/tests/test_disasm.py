@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from assembler import INSTR_HALT, INSTR_NOP, assemble
+from disasm import disasm, idex_word
+from dump_frame import DumpFrame
+
+from bench.suite import _PROG
+
+
+@pytest.mark.parametrize("word,text", [
+    (0x00500093, "addi x1, x0, 5"),
+    (0x00100073, "ebreak"),
+    (0xFFFFFFFF, ".word 0xffffffff"),
+])
+def test_texto(word, text):
+    assert disasm(word) == text
+
+
+def test_destino_de_salto_con_pc():
+    assert disasm(0xFE209AE3) == "bne x1, x2, -12"
+    assert disasm(0xFE209AE3, 12) == "bne x1, x2, -12  # 0x0"
+
+
+def test_ida_y_vuelta_con_el_ensamblador():
+    rnd = random.Random(7)
+    checked = 0
+    for _ in range(3000):
+        w = rnd.getrandbits(32)
+        text = disasm(w)
+        if text.startswith((".word", "blt", "bge", "auipc")):
+            continue
+        assert assemble(text).words[0] == w, text
+        checked += 1
+    assert checked > 100
+
+
+def test_idex_reconstruye_la_instruccion(frames):
+    asm = assemble(_PROG)
+    imem = {asm.base + 4 * k: w for k, w in enumerate(asm.words)}
+    n = 0
+    for fr in frames:
+        f = DumpFrame(fr)
+        w8, w9, w10 = f.pipe_words[8:11]
+        if not w10 & 1:
+            continue    # burbuja
+        exp = imem.get(f.idex["pc"], INSTR_NOP)
+        got = idex_word(w8, w9, w10)
+        assert got == exp or (got is None and exp == INSTR_HALT)
+        n += 1
+    assert n > 100
@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from conftest import FRAME_LEN, OFF_REG
+from dump_frame import partial_frame
+from framer import MAGIC, SEC_MEM, SEC_PC, SEC_REGS, Framer
+from pipe_decode import PIPE_WORDS
+
+from bench.suite import MemSerial
+
+
+def _framer(ser=None, varlen: bool = False) -> Framer:
+    return Framer(ser, FRAME_LEN, OFF_REG, pipe_words=PIPE_WORDS if varlen else None)
+
+
+def test_resync_sobre_basura(frames):
+    rnd = random.Random(1)
+    stream = bytearray()
+    for fr in frames[:50]:
+        # basura con MAGIC sueltos: candidatos falsos que hay que descartar
+        stream += bytes(rnd.choice((MAGIC, rnd.randrange(256))) for _ in range(rnd.randrange(40)))
+        stream += fr
+    fm = _framer(MemSerial(bytes(stream)))
+    got = [fm.read_frame(1.0) for _ in range(50)]
+    assert got == frames[:50]
+    assert fm.frames == 50
+    assert fm.resyncs > 0
+    assert fm.discarded_bytes == len(stream) - 50 * FRAME_LEN
+
+
+def test_rechaza_candidato_con_x0_distinto_de_cero(frames):
+    fake = bytearray(frames[0])
+    fake[OFF_REG] = 1
+    fm = _framer()
+    fm.feed(bytes(fake) + frames[1])
+    assert fm.poll() == frames[1]
+    assert fm.resyncs >= 1
+
+
+def test_frame_partido_entre_feeds(frames):
+    fm = _framer()
+    fm.feed(frames[0][:100])
+    assert fm.poll() == FRAME_LEN
+    fm.feed(frames[0][100:])
+    assert fm.poll() == frames[0]
+    assert fm.stats()["discarded_bytes"] == 0
+
+
+def test_expect_saltea_otros_dump_type(frames):
+    other = bytearray(frames[0])
+    other[1] = 3
+    fm = _framer()
+    fm.feed(bytes(other) + frames[1])
+    assert fm.poll(expect=1) == frames[1]
+    assert fm.discarded_bytes == FRAME_LEN
+
+
+def test_frames_parciales(frames):
+    parts = [partial_frame(frames[0], PIPE_WORDS, SEC_PC),
+             partial_frame(frames[1], PIPE_WORDS, SEC_PC | SEC_REGS),
+             partial_frame(frames[2], PIPE_WORDS, SEC_MEM, 0x10, 16),
+             frames[3]]
+    fm = _framer(varlen=True)
+    fm.feed(b"\x00\xd0" + b"".join(parts))
+    assert [fm.poll() for _ in parts] == parts
+    assert isinstance(fm.poll(), int)
+
+
+def test_parcial_incompleto_pide_lo_que_falta(frames):
+    fr = partial_frame(frames[0], PIPE_WORDS, SEC_PC | SEC_MEM, 0, 32)
+    fm = _framer(varlen=True)
+    fm.feed(fr[:10])
+    need = fm.poll()
+    assert isinstance(need, int) and 10 < need <= len(fr)
+    fm.feed(fr[10:])
+    assert fm.poll() == fr
+
+
+def test_timeout_descarta_lo_parcial(frames):
+    fm = _framer(MemSerial(frames[0][:50]))
+    with pytest.raises(TimeoutError):
+        fm.read_frame(0.05)
+    assert fm.timeouts == 1
+    assert fm.discarded_bytes == 50
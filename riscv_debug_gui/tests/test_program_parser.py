@@ -0,0 +1,85 @@
+import os
+import random
+import struct
+
+import pytest
+
+from program_parser import (INSTR_NOP, clear_program_cache, image_items, load_program,
+                            parse_program_file)
+
+from bench.program_loader import (_sparse_expected, _write_bin, _write_elf, _write_ihex,
+                                  _write_ihex_sparse, _write_mem, _write_mixed, _write_sparse)
+
+_WORDS = [random.Random(3).getrandbits(32) for _ in range(64)]
+
+
+@pytest.fixture(autouse=True)
+def _sin_cache():
+    clear_program_cache()
+    yield
+    clear_program_cache()
+
+
+@pytest.mark.parametrize("ext,writer", [("mem", _write_mem), ("mixed.mem", _write_mixed),
+                                        ("bin", _write_bin), ("hex", _write_ihex), ("elf", _write_elf)])
+def test_todos_los_formatos_dan_la_misma_imagen(tmp_path, ext, writer):
+    p = str(tmp_path / f"prog.{ext}")
+    writer(p, _WORDS)
+    base, words = load_program(p)
+    assert base == 0 and list(words) == _WORDS
+    assert parse_program_file(p) == image_items(0, words)
+
+
+def test_texto_disperso_sin_relleno(tmp_path):
+    p = str(tmp_path / "sparse.mem")
+    _write_sparse(p, _WORDS)
+    assert parse_program_file(p) == _sparse_expected(_WORDS)
+
+
+def test_texto_ultima_escritura_gana_y_ordenado(tmp_path):
+    p = tmp_path / "o.mem"
+    p.write_text("@10\n11111111\n// comentario\n0 : 22222222 # otro\n10: 33333333\n")
+    assert parse_program_file(str(p)) == [(0x0, 0x22222222), (0x10, 0x33333333)]
+    base, words = load_program(str(p))
+    assert base == 0 and list(words) == [0x22222222, INSTR_NOP, INSTR_NOP, INSTR_NOP, 0x33333333]
+
+
+def test_ihex_disperso(tmp_path):
+    p = str(tmp_path / "sparse.hex")
+    _write_ihex_sparse(p, _WORDS)
+    exp = [(4 * k, w) for k, w in enumerate(_WORDS[:4])]
+    exp += [(0x10000 + 4 * k, w) for k, w in enumerate(_WORDS[4:8])]
+    assert parse_program_file(p) == exp
+
+
+def test_ihex_checksum_invalido(tmp_path):
+    p = tmp_path / "bad.hex"
+    rec = bytes((4, 0, 0, 0)) + struct.pack("<I", 0x13)
+    p.write_text(":" + (rec + bytes(((-sum(rec) + 1) & 0xFF,))).hex().upper() + "\n:00000001FF\n")
+    with pytest.raises(ValueError, match="checksum"):
+        load_program(str(p))
+
+
+def test_muy_disperso_solo_con_parse(tmp_path):
+    p = tmp_path / "far.mem"
+    p.write_text("00000013\n@80000000\n00100073\n")
+    assert parse_program_file(str(p)) == [(0, 0x13), (0x80000000, 0x00100073)]
+    with pytest.raises(ValueError, match="dispersa"):
+        load_program(str(p))
+
+
+def test_cache_se_invalida_al_cambiar_el_archivo(tmp_path):
+    p = str(tmp_path / "c.mem")
+    _write_mem(p, _WORDS)
+    first = load_program(p)
+    assert load_program(p)[1] == first[1]
+    _write_mem(p, _WORDS[:8])
+    st = os.stat(p)
+    os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert list(load_program(p)[1]) == _WORDS[:8]
+
+
+def test_asm(tmp_path):
+    p = tmp_path / "p.s"
+    p.write_text("addi x1, x0, 5\nhalt\n")
+    assert parse_program_file(str(p)) == [(0, 0x00500093), (4, 0x00100073)]
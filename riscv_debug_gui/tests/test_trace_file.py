@@ -0,0 +1,57 @@
+import pytest
+
+from conftest import DM_BYTES, FRAME_LEN
+from dump_frame import partial_frame
+from framer import SEC_MEM, SEC_PC, SEC_REGS
+from pipe_decode import PIPE_WORDS
+from trace_file import TRACE_F_VARLEN, TraceReader, TraceWriter
+
+
+def _write(path, frs, flags=0):
+    with TraceWriter(str(path), FRAME_LEN, PIPE_WORDS, DM_BYTES, 115200, flags) as w:
+        for fr in frs:
+            w.append(fr)
+
+
+def test_trace_fijo(tmp_path, frames):
+    p = tmp_path / "t.rvtr"
+    _write(p, frames[:20])
+    with TraceReader(str(p)) as r:
+        assert len(r) == 20
+        assert bytes(r.raw(7)) == frames[7]
+        assert r[3].pc == int.from_bytes(frames[3][4:8], "little")
+
+
+def test_trace_varlen_indexa_largos_mezclados(tmp_path, frames):
+    masks = [SEC_PC, SEC_PC | SEC_REGS, 0xF, SEC_MEM]
+    frs = [frames[k] if masks[k % 4] == 0xF else partial_frame(frames[k], PIPE_WORDS, masks[k % 4])
+           for k in range(30)]
+    p = tmp_path / "v.rvtr"
+    _write(p, frs, TRACE_F_VARLEN)
+    with TraceReader(str(p)) as r:
+        assert len(r) == 30
+        assert [bytes(r.raw(k)) for k in range(30)] == frs
+        assert bytes(r.raw(-1)) == frs[-1]
+        assert r[1].regs is not None and r[0].regs is None
+        with pytest.raises(IndexError):
+            r.raw(30)
+        with pytest.raises(IndexError):
+            r.raw(-31)
+
+
+@pytest.mark.parametrize("flags", [0, TRACE_F_VARLEN])
+def test_trace_ignora_la_cola_cortada(tmp_path, frames, flags):
+    p = tmp_path / "c.rvtr"
+    _write(p, frames[:5], flags)
+    with open(p, "ab") as f:
+        f.write(frames[5][:100] if not flags else (FRAME_LEN).to_bytes(4, "little") + frames[5][:100])
+    with TraceReader(str(p)) as r:
+        assert len(r) == 5
+        assert bytes(r.raw(-1)) == frames[4]
+
+
+def test_trace_sin_header(tmp_path):
+    p = tmp_path / "x.rvtr"
+    p.write_bytes(b"RVTR")
+    with pytest.raises(ValueError):
+        TraceReader(str(p))
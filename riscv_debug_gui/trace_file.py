@@ -0,0 +1,223 @@
+import mmap
+import queue
+import struct
+import threading
+import time
+from array import array
+
+from dump_frame import DumpFrame
+
+# Header fijo de 32 bytes:
+#   magic(4) version(2) flags(2) frame_len(4) pipe_words(4) dm_bytes(4) baud(4) reservado(8)
+# A continuación, los frames crudos (tal cual llegan por UART) uno detrás de otro.
+TRACE_MAGIC = b"RVTR"
+TRACE_VERSION = 1
+TRACE_HDR = struct.Struct("<4sHHIIII8x")
+
+# flags: con TRACE_F_VARLEN cada frame va precedido por su largo (u32 LE)
+TRACE_F_VARLEN = 0x1
+_LEN = struct.Struct("<I")
+
+class TraceWriter:
+    """
+    Escritura append-only de un trace. append() sólo encola el frame: un thread
+    propio lo pasa a disco con un buffer grande, así el lector serie nunca espera
+    por el disco.
+    """
+    def __init__(self, path: str, frame_len: int, pipe_words: int, dm_bytes: int, baud: int,
+                 flags: int = 0, buffer_bytes: int = 1 << 20):
+        self.path = path
+        self.frames = 0
+        self.varlen = bool(flags & TRACE_F_VARLEN)
+        self.f = open(path, "wb", buffering=buffer_bytes)
+        self.f.write(TRACE_HDR.pack(TRACE_MAGIC, TRACE_VERSION, flags, frame_len, pipe_words, dm_bytes, baud))
+
+        self._q: queue.SimpleQueue = queue.SimpleQueue()
+        self._err: Exception | None = None
+        self._th = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+        self._th.start()
+
+    def _run(self):
+        write = self.f.write
+        q = self._q
+        while True:
+            fr = q.get()
+            if fr is None:
+                break
+            try:
+                write(fr)
+            except Exception as e:
+                self._err = e
+                break
+
+    def append(self, frame: bytes):
+        if self._err is not None:
+            raise self._err
+        if self.varlen:
+            self._q.put(_LEN.pack(len(frame)))
+        self._q.put(frame)
+        self.frames += 1
+
+    def close(self):
+        if self.f.closed:
+            return
+        self._q.put(None)
+        self._th.join()
+        self.f.close()
+        if self._err is not None:
+            raise self._err
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _step_frames(send_cmd, read_frame):
+    while True:
+        send_cmd("S")
+        yield read_frame()
+
+
+def record_steps(send_cmd, read_frame, writer: TraceWriter, max_cycles: int,
+                 stop_on_halt: bool = True, stop_event: threading.Event | None = None,
+                 progress=None, progress_interval_s: float = 0.25,
+                 on_frame=None, frames=None) -> tuple[int, bool, bytes | None]:
+    """
+    Lazo de grabación: 'S' -> frame -> writer, hasta HALT_SEEN, max_cycles o stop_event.
+    on_frame(frame), si se pasa, recibe cada frame (vista en vivo); no debe bloquear.
+    Por defecto hay un solo 'S' en vuelo y el próximo sale apenas se completa el frame
+    anterior; frames (ej. DebugHost.stream) reemplaza a send_cmd/read_frame con un
+    iterador de frames ya pedidos en pipeline.
+    Devuelve (ciclos, halt_seen, último frame).
+    """
+    if frames is None:
+        frames = _step_frames(send_cmd, read_frame)
+    frames = iter(frames)
+    cycles = 0
+    halted = False
+    last = None
+    t_prog = time.monotonic()
+    while cycles < max_cycles:
+        if stop_event is not None and stop_event.is_set():
+            break
+        fr = next(frames, None)
+        if fr is None:
+            break
+        last = fr
+        writer.append(last)
+        cycles += 1
+        if on_frame is not None:
+            on_frame(last)
+
+        if progress is not None:
+            now = time.monotonic()
+            if now - t_prog >= progress_interval_s:
+                t_prog = now
+                progress(cycles)
+
+        if stop_on_halt and (last[2] & 1):
+            halted = True
+            break
+
+    if progress is not None:
+        progress(cycles)
+    return cycles, halted, last
+
+
+class TraceReader:
+    """
+    Lectura aleatoria de un trace vía mmap: reader[n] devuelve un DumpFrame que es
+    una vista sin copia del ciclo n. Con frames de largo fijo el offset sale de
+    frame_len en O(1); con TRACE_F_VARLEN se arma un índice de offsets una sola vez.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.f = open(path, "rb")
+        try:
+            self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.f.close()
+            raise ValueError("Trace vacío")
+        self.buf = memoryview(self.mm)
+
+        if len(self.buf) < TRACE_HDR.size:
+            self.close()
+            raise ValueError("Trace sin header")
+        magic, version, flags, frame_len, pipe_words, dm_bytes, baud = TRACE_HDR.unpack_from(self.buf)
+        if magic != TRACE_MAGIC or version != TRACE_VERSION:
+            self.close()
+            raise ValueError("No es un trace válido (magic/versión)")
+        if not (flags & TRACE_F_VARLEN) and frame_len == 0:
+            self.close()
+            raise ValueError("Trace con frame_len=0")
+
+        self.flags = flags
+        self.frame_len = frame_len
+        self.pipe_words = pipe_words
+        self.dm_bytes = dm_bytes
+        self.baud = baud
+
+        self._offs: array | None = None
+        self._lens: array | None = None
+        if flags & TRACE_F_VARLEN:
+            self._build_index()
+            self._n = len(self._offs)
+        else:
+            # un frame cortado al final (grabación interrumpida) se ignora
+            self._n = (len(self.buf) - TRACE_HDR.size) // frame_len
+
+    def _build_index(self):
+        offs = array("Q")
+        lens = array("I")
+        buf = self.buf
+        end = len(buf)
+        off = TRACE_HDR.size
+        while off + _LEN.size <= end:
+            (n,) = _LEN.unpack_from(buf, off)
+            off += _LEN.size
+            if off + n > end:
+                break
+            offs.append(off)
+            lens.append(n)
+            off += n
+        self._offs = offs
+        self._lens = lens
+
+    def __len__(self) -> int:
+        return self._n
+
+    def raw(self, n: int) -> memoryview:
+        if n < 0:
+            n += self._n
+        if not 0 <= n < self._n:
+            raise IndexError(f"ciclo {n} fuera de rango (0..{self._n - 1})")
+        if self._offs is not None:
+            off = self._offs[n]
+            return self.buf[off:off + self._lens[n]]
+        off = TRACE_HDR.size + n * self.frame_len
+        return self.buf[off:off + self.frame_len]
+
+    def __getitem__(self, n: int) -> DumpFrame:
+        return DumpFrame(self.raw(n), self.pipe_words, self.dm_bytes)
+
+    def __iter__(self):
+        for n in range(self._n):
+            yield self[n]
+
+    def close(self):
+        # Con vistas vivas (DumpFrame en la UI) el mmap no se puede cerrar todavía;
+        # queda para el GC cuando se liberen.
+        try:
+            self.buf.release()
+            self.mm.close()
+        except BufferError:
+            pass
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,221 @@
+from PySide6 import QtCore, QtGui, QtWidgets
+
+from .widgets import monospace_font, CHANGED_BG
+
+ROW_BYTES = 16
+_BLOCK = 16 * ROW_BYTES
+
+# unidad de cada columna hex (bytes, little-endian como la DMEM)
+UNIT_BYTE = 1
+UNIT_HALF = 2
+UNIT_WORD = 4
+
+# data() se llama por celda visible y por rol: leer QtCore.Qt.X cada vez cuesta µs en PySide6
+_DISPLAY = QtCore.Qt.ItemDataRole.DisplayRole
+_BACKGROUND = QtCore.Qt.ItemDataRole.BackgroundRole
+_ALIGN = QtCore.Qt.ItemDataRole.TextAlignmentRole
+_VERTICAL = QtCore.Qt.Orientation.Vertical
+_ALIGN_HEX = QtCore.Qt.AlignmentFlag.AlignCenter
+_ALIGN_ASCII = QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignVCenter
+_ROLES = [_DISPLAY, _BACKGROUND]
+
+
+def _ascii(chunk: bytes) -> str:
+    return "".join(chr(b) if 32 <= b < 127 else "." for b in chunk)
+
+
+def _runs(rows: list[int]) -> list[tuple[int, int]]:
+    """Filas ordenadas -> tramos contiguos [(desde, hasta)]."""
+    out = []
+    for r in rows:
+        if out and out[-1][1] == r - 1:
+            out[-1] = (out[-1][0], r)
+        else:
+            out.append((r, r))
+    return out
+
+
+class HexdumpModel(QtCore.QAbstractTableModel):
+    """
+    Hexdump de DMEM en filas fijas de 16 bytes sobre un buffer de bytes. La vista sólo
+    pide las celdas visibles; set_data() compara fila por fila y emite dataChanged para
+    las filas que cambiaron y las que tenían resaltado del dump anterior.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._mem = b""
+        self._base = 0
+        self._unit = UNIT_BYTE
+        self._ascii = True
+        self._chg: dict[int, int] = {}  # fila -> máscara de bytes que cambiaron (bit k = byte k)
+        self._brush = QtGui.QBrush(QtGui.QColor(CHANGED_BG))
+
+    # --- contenido ---
+    @property
+    def base(self) -> int:
+        return self._base
+
+    @property
+    def size(self) -> int:
+        return len(self._mem)
+
+    @property
+    def unit(self) -> int:
+        return self._unit
+
+    @property
+    def show_ascii(self) -> bool:
+        return self._ascii
+
+    def set_data(self, mem: bytes, base: int = 0) -> int:
+        """Carga un dump nuevo. Devuelve cuántas filas se notificaron a la vista."""
+        mem = bytes(mem)
+        prev = self._mem
+        if base != self._base or len(mem) != len(prev):
+            # otra ventana: no hay con qué comparar
+            self.beginResetModel()
+            self._mem = mem
+            self._base = base
+            self._chg = {}
+            self.endResetModel()
+            return self.rowCount()
+        if mem == prev and not self._chg:
+            return 0
+        chg = {}
+        if mem != prev:
+            # de a bloques de 16 filas: lo que no cambió se saltea sin mirar fila por fila
+            for blk in range(0, len(mem), _BLOCK):
+                if mem[blk:blk + _BLOCK] == prev[blk:blk + _BLOCK]:
+                    continue
+                for i in range(blk, min(blk + _BLOCK, len(mem)), ROW_BYTES):
+                    a = mem[i:i + ROW_BYTES]
+                    b = prev[i:i + ROW_BYTES]
+                    if a != b:
+                        chg[i // ROW_BYTES] = sum(1 << k for k in range(len(a)) if a[k] != b[k])
+        rows = sorted(chg.keys() | self._chg.keys())
+        self._mem = mem
+        self._chg = chg
+        last = self.columnCount() - 1
+        for lo, hi in _runs(rows):
+            self.dataChanged.emit(self.index(lo, 0), self.index(hi, last), _ROLES)
+        return len(rows)
+
+    def set_mode(self, unit: int, show_ascii: bool = True):
+        if (unit, show_ascii) == (self._unit, self._ascii):
+            return
+        if ROW_BYTES % unit:
+            raise ValueError(f"unidad inválida: {unit}")
+        self.beginResetModel()
+        self._unit = unit
+        self._ascii = show_ascii
+        self.endResetModel()
+
+    def row_of(self, addr: int) -> int | None:
+        """Fila que contiene addr, o None si está fuera de la ventana mostrada."""
+        off = addr - self._base
+        if 0 <= off < len(self._mem):
+            return off // ROW_BYTES
+        return None
+
+    def ascii_column(self) -> int | None:
+        return ROW_BYTES // self._unit if self._ascii else None
+
+    # --- QAbstractTableModel ---
+    def rowCount(self, parent=QtCore.QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return (len(self._mem) + ROW_BYTES - 1) // ROW_BYTES
+
+    def columnCount(self, parent=QtCore.QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return ROW_BYTES // self._unit + (1 if self._ascii else 0)
+
+    def headerData(self, section: int, orientation, role=_DISPLAY):
+        if role != _DISPLAY:
+            return None
+        if orientation == _VERTICAL:
+            return f"{self._base + section * ROW_BYTES:04x}"
+        if section == self.ascii_column():
+            return "ASCII"
+        return f"{section * self._unit:x}"
+
+    def data(self, index: QtCore.QModelIndex, role=_DISPLAY):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        off = row * ROW_BYTES
+        is_ascii = col == self.ascii_column()
+        if role == _DISPLAY:
+            if is_ascii:
+                return _ascii(self._mem[off:off + ROW_BYTES])
+            off += col * self._unit
+            chunk = self._mem[off:off + self._unit]
+            if not chunk:
+                return None
+            return f"{int.from_bytes(chunk, 'little'):0{2 * len(chunk)}x}"
+        if role == _BACKGROUND:
+            mask = self._chg.get(row, 0)
+            if not is_ascii:
+                mask = (mask >> (col * self._unit)) & ((1 << self._unit) - 1)
+            return self._brush if mask else None
+        if role == _ALIGN:
+            return _ALIGN_ASCII if is_ascii else _ALIGN_HEX
+        return None
+
+
+class HexdumpView(QtWidgets.QTableView):
+    """
+    Tabla del hexdump con alto de fila y ancho de columna fijos: Qt no mide contenido,
+    así que repintar cuesta lo que las filas visibles y no lo que el tamaño de la DMEM.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.hex_model = HexdumpModel(self)
+        self.setModel(self.hex_model)
+        font = monospace_font(10)
+        self.setFont(font)
+        self.setShowGrid(False)
+        self.setWordWrap(False)
+        self.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self._fm = QtGui.QFontMetrics(font)
+        vh = self.verticalHeader()
+        vh.setFont(font)
+        vh.setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        vh.setDefaultSectionSize(self._fm.height() + 4)
+        hh = self.horizontalHeader()
+        hh.setMinimumSectionSize(1)
+        hh.setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        hh.setStretchLastSection(True)
+        self._fit_columns()
+
+    def _fit_columns(self):
+        m = self.hex_model
+        cw = self._fm.horizontalAdvance("0")
+        hex_w = cw * (2 * m.unit + 1)
+        for c in range(ROW_BYTES // m.unit):
+            self.setColumnWidth(c, hex_w)
+        a = m.ascii_column()
+        if a is not None:
+            self.setColumnWidth(a, cw * (ROW_BYTES + 2))
+
+    def set_mode(self, unit: int, show_ascii: bool = True):
+        # el reset del modelo manda al principio: se vuelve a la fila que estaba arriba
+        top = self.rowAt(0)
+        self.hex_model.set_mode(unit, show_ascii)
+        self._fit_columns()
+        if top >= 0:
+            self.scrollTo(self.hex_model.index(top, 0), QtWidgets.QAbstractItemView.PositionAtTop)
+
+    def goto(self, addr: int) -> bool:
+        """Lleva la fila de addr arriba de todo y la selecciona. False si no está en la ventana."""
+        row = self.hex_model.row_of(addr)
+        if row is None:
+            return False
+        self.scrollTo(self.hex_model.index(row, 0), QtWidgets.QAbstractItemView.PositionAtTop)
+        self.selectRow(row)
+        return True
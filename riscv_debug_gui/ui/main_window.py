@@ -1,28 +1,37 @@
-import struct
 import threading
-from PySide6 import QtCore, QtWidgets
+import time
+from PySide6 import QtCore, QtGui, QtWidgets
 from PySide6.QtWidgets import QFileDialog, QMessageBox
 
-from debughost import DebugHost, MAGIC
-from program_parser import parse_program_file
-from pipe_decode import PIPE_WORDS, decode_pipe_words, signed32
-from .widgets import monospace_font, make_badge
+from debughost import DUMP_STEP_SAMPLE, DebugHost, P_RECORD
+from disasm import disasm, idex_disasm
+from dump_frame import DumpFrame
+from framer import SEC_ALL, SEC_MEM, SEC_PC, SEC_PIPE, SEC_REGS
+from sim_host import SimHost
+from trace_file import TraceReader
+from latency import PHASES, QUANTILES
+from assembler import ASM_EXTS, assemble_file
+from program_parser import image_items, parse_program_file
+from pipe_decode import PIPE_WORDS, signed32
+from .widgets import monospace_font, make_badge, CHANGED_BG
+from .refresh import RefreshScheduler
+from .hexdump import HexdumpView, UNIT_BYTE, UNIT_HALF, UNIT_WORD
+
+_KEEP = QtGui.QTextCursor.KeepAnchor
+
+# keyframe cada tantos dumps con "Dump delta" ('K')
+DELTA_KEY_EVERY = 32
 
 def dump_type_str(t: int) -> str:
-    return {1: "STEP", 2: "RUN_END", 3: "MANUAL"}.get(t, f"UNKNOWN({t})")
+    return {1: "STEP", 2: "RUN_END", 3: "MANUAL", 4: "STEP_SAMPLE"}.get(t, f"UNKNOWN({t})")
 
-def hexdump_lines(b: bytes, base: int = 0) -> list[str]:
-    lines = []
-    for i in range(0, len(b), 16):
-        chunk = b[i:i+16]
-        hexs = " ".join(f"{x:02x}" for x in chunk)
-        lines.append(f"{base+i:04x}: {hexs}")
-    return lines
+def _pc_str(pc: int | None) -> str:
+    return "?" if pc is None else f"0x{pc:08x}"
 
 class WorkerSignals(QtCore.QObject):
     log = QtCore.Signal(str)
     error = QtCore.Signal(str)
-    dump = QtCore.Signal(dict)
+    dump = QtCore.Signal(object)
     done = QtCore.Signal()
 
 class ActionWorker(QtCore.QRunnable):
@@ -37,7 +46,7 @@ class ActionWorker(QtCore.QRunnable):
     def run(self):
         try:
             res = self.fn(self.signals, *self.args, **self.kwargs)
-            if isinstance(res, dict):
+            if isinstance(res, DumpFrame):
                 self.signals.dump.emit(res)
         except Exception as e:
             self.signals.error.emit(str(e))
@@ -53,6 +62,35 @@ class MainWindow(QtWidgets.QMainWindow):
         self.host: DebugHost | None = None
         self.threadpool = QtCore.QThreadPool.globalInstance()
         self.worker_lock = threading.Lock()
+        self.trace_stop: threading.Event | None = None
+        self.trace: TraceReader | None = None
+        # host desconectado con un trace en curso: se cierra en _trace_done
+        self._close_pending: DebugHost | None = None
+
+        # refresco incremental: último estado mostrado + celdas/líneas resaltadas
+        self._chg_brush = QtGui.QBrush(QtGui.QColor(CHANGED_BG))
+        self._fmt_plain = QtGui.QTextCharFormat()
+        self._fmt_changed = QtGui.QTextCharFormat()
+        self._fmt_changed.setBackground(self._chg_brush)
+        self._last_regs: tuple | None = None
+        self._reg_hl: set[int] = set()
+        self._last_pipe: tuple | None = None
+        self._last_badges: tuple | None = None
+        self._imem_src: dict[int, int] | None = None   # sombra de IMEM del listado actual
+        self._imem_base: list[str] = []
+        self._imem_index: dict[int, int] = {}
+        self.apply_ms = 0.0
+        # (DumpFrame, CmdTiming, LatencyStats) del último comando medido, hasta que se aplique
+        self._timed = None
+        self._timed_lock = threading.Lock()
+        # secciones a pedir en los dumps ('M'); se calculan en la GUI y el worker las aplica
+        self._sections_want = (SEC_ALL, 0, None)
+        self._delta_want = 0
+        self._last_sections = SEC_ALL
+
+        # los frames pasan por el scheduler: se renderiza sólo el último, a tasa acotada
+        self.refresh = RefreshScheduler(lambda d: self.apply_dump(d, quiet=True), max_fps=30, parent=self)
+        self.refresh.stats.connect(self._on_refresh_stats)
 
         self._build_ui()
         self._refresh_ports()
@@ -73,6 +111,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.port_cb = QtWidgets.QComboBox()
         self.port_cb.setMinimumWidth(160)
+        self.port_cb.setEditable(True)  # permite tipear tcp://host:port (debug_server)
         bar.addWidget(QtWidgets.QLabel("Puerto"))
         bar.addWidget(self.port_cb)
 
@@ -86,6 +125,18 @@ class MainWindow(QtWidgets.QMainWindow):
         bar.addWidget(QtWidgets.QLabel("DM bytes"))
         bar.addWidget(self.dm_edit)
 
+        self.chk_partial = QtWidgets.QCheckBox("Dump parcial")
+        self.chk_partial.setToolTip("Pedir sólo PC, DMEM y lo que muestra la pestaña visible ('M')")
+        self.chk_partial.setChecked(True)
+        self.chk_partial.toggled.connect(self._update_sections)
+        bar.addWidget(self.chk_partial)
+
+        self.chk_delta = QtWidgets.QCheckBox("Dump delta")
+        self.chk_delta.setToolTip(f"Sólo registros y bytes de DMEM que cambiaron, keyframe cada "
+                                  f"{DELTA_KEY_EVERY} dumps ('K', bitstream con DELTA_EN=1)")
+        self.chk_delta.toggled.connect(self._update_sections)
+        bar.addWidget(self.chk_delta)
+
         self.btn_refresh = QtWidgets.QPushButton("Refrescar")
         self.btn_refresh.clicked.connect(self._refresh_ports)
         bar.addWidget(self.btn_refresh)
@@ -109,16 +160,57 @@ class MainWindow(QtWidgets.QMainWindow):
         self.btn_run  = QtWidgets.QPushButton("Run (G)")
         self.btn_rst  = QtWidgets.QPushButton("Reset fetch (R)")
         self.btn_load = QtWidgets.QPushButton("Cargar programa…")
+        self.btn_asm  = QtWidgets.QPushButton("Abrir .s…")
 
         self.btn_dump.clicked.connect(lambda: self.run_action("dump"))
         self.btn_step.clicked.connect(lambda: self.run_action("step"))
         self.btn_run.clicked.connect(lambda: self.run_action("run"))
         self.btn_rst.clicked.connect(lambda: self.run_action("reset"))
         self.btn_load.clicked.connect(self.load_program_dialog)
+        self.btn_asm.clicked.connect(self.open_asm_dialog)
 
-        for b in [self.btn_dump, self.btn_step, self.btn_run, self.btn_rst, self.btn_load]:
+        for b in [self.btn_dump, self.btn_step, self.btn_run, self.btn_rst, self.btn_load, self.btn_asm]:
             actions.addWidget(b)
 
+        # 'N': n ciclos con un solo comando, dump al final (o cada k ciclos)
+        self.btn_stepn = QtWidgets.QPushButton("Step ×N")
+        self.btn_stepn.clicked.connect(lambda: self.run_action("stepn"))
+        self.stepn_edit = QtWidgets.QLineEdit("100")
+        self.stepn_edit.setMaximumWidth(80)
+        self.every_edit = QtWidgets.QLineEdit("0")
+        self.every_edit.setMaximumWidth(60)
+        self.every_edit.setToolTip("Dump cada k ciclos (0 = sólo al final)")
+        actions.addWidget(self.btn_stepn)
+        actions.addWidget(QtWidgets.QLabel("N"))
+        actions.addWidget(self.stepn_edit)
+        actions.addWidget(QtWidgets.QLabel("cada"))
+        actions.addWidget(self.every_edit)
+
+        self.btn_trace = QtWidgets.QPushButton("Grabar trace…")
+        self.btn_trace.clicked.connect(self.toggle_trace)
+        self.trace_budget_edit = QtWidgets.QLineEdit("10000")
+        self.trace_budget_edit.setMaximumWidth(90)
+        actions.addWidget(self.btn_trace)
+        actions.addWidget(QtWidgets.QLabel("Ciclos máx"))
+        actions.addWidget(self.trace_budget_edit)
+
+        # --- Trace replay ---
+        scrub = QtWidgets.QHBoxLayout()
+        main.addLayout(scrub)
+
+        self.btn_open_trace = QtWidgets.QPushButton("Abrir trace…")
+        self.btn_open_trace.clicked.connect(self.open_trace_dialog)
+        scrub.addWidget(self.btn_open_trace)
+
+        self.trace_slider = QtWidgets.QSlider(QtCore.Qt.Horizontal)
+        self.trace_slider.setEnabled(False)
+        self.trace_slider.valueChanged.connect(self.show_trace_cycle)
+        scrub.addWidget(self.trace_slider, 1)
+
+        self.lbl_trace = QtWidgets.QLabel("Sin trace")
+        self.lbl_trace.setMinimumWidth(220)
+        scrub.addWidget(self.lbl_trace)
+
         actions.addStretch(1)
 
         # --- Split content ---
@@ -239,9 +331,53 @@ class MainWindow(QtWidgets.QMainWindow):
         self.raw_text = QtWidgets.QPlainTextEdit()
         self.raw_text.setReadOnly(True)
         self.raw_text.setFont(monospace_font(10))
+        self.raw_text._lines = None
+        self.raw_text._marked = set()
         raw_l.addWidget(self.raw_text)
         self.tabs.addTab(raw_tab, "RAW")
 
+        # --- IMEM tab: listado desensamblado de lo programado en esta sesión ---
+        imem_tab = QtWidgets.QWidget()
+        imem_l = QtWidgets.QVBoxLayout(imem_tab)
+        self.imem_text = QtWidgets.QPlainTextEdit()
+        self.imem_text.setReadOnly(True)
+        self.imem_text.setFont(monospace_font(10))
+        self.imem_text.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
+        self.imem_text._lines = None
+        self.imem_text._marked = set()
+        imem_l.addWidget(self.imem_text)
+        self.tabs.addTab(imem_tab, "IMEM")
+
+        # --- Latencia tab: percentiles por comando y fase (ver latency.py) ---
+        lat_tab = QtWidgets.QWidget()
+        lat_l = QtWidgets.QVBoxLayout(lat_tab)
+        lat_bar = QtWidgets.QHBoxLayout()
+        lat_l.addLayout(lat_bar)
+        self.lbl_latency = QtWidgets.QLabel("(sin comandos medidos)")
+        self.lbl_latency.setFont(monospace_font(9))
+        lat_bar.addWidget(self.lbl_latency, 1)
+        self.btn_lat_clear = QtWidgets.QPushButton("Limpiar")
+        self.btn_lat_clear.clicked.connect(self.clear_latency)
+        self.btn_lat_export = QtWidgets.QPushButton("Exportar JSON…")
+        self.btn_lat_export.clicked.connect(self.export_latency_dialog)
+        lat_bar.addWidget(self.btn_lat_clear)
+        lat_bar.addWidget(self.btn_lat_export)
+
+        self.lat_table = QtWidgets.QTableWidget(0, 3 + len(QUANTILES))
+        self.lat_table.setHorizontalHeaderLabels(["Cmd", "Fase", "n"] + [f"p{q} ms" for q in QUANTILES])
+        self.lat_table.verticalHeader().setVisible(False)
+        self.lat_table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.lat_table.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
+        self.lat_table.setFont(monospace_font(10))
+        self.lat_table.horizontalHeader().setStretchLastSection(True)
+        self.lat_table._snap = None
+        lat_l.addWidget(self.lat_table, 1)
+        self.tabs.addTab(lat_tab, "Latencia")
+
+        # lo que necesita cada pestaña además de PC y DMEM (siempre visibles)
+        self._tab_sections = {regs_tab: SEC_REGS, pipe_tab: SEC_PIPE, raw_tab: SEC_PIPE, imem_tab: 0, lat_tab: 0}
+        self.tabs.currentChanged.connect(self._on_tab_changed)
+
         # Right layout
         R = QtWidgets.QVBoxLayout(right)
         R.setContentsMargins(0, 0, 0, 0)
@@ -249,10 +385,42 @@ class MainWindow(QtWidgets.QMainWindow):
 
         mem = QtWidgets.QGroupBox("DMEM Hexdump")
         ml = QtWidgets.QVBoxLayout(mem)
-        self.mem_text = QtWidgets.QPlainTextEdit()
-        self.mem_text.setReadOnly(True)
-        self.mem_text.setFont(monospace_font(10))
-        ml.addWidget(self.mem_text)
+        win = QtWidgets.QHBoxLayout()
+        ml.addLayout(win)
+        self.win_addr_edit = QtWidgets.QLineEdit("0x0")
+        self.win_addr_edit.setMaximumWidth(90)
+        self.win_len_edit = QtWidgets.QLineEdit("")
+        self.win_len_edit.setPlaceholderText("DM bytes")
+        self.win_len_edit.setMaximumWidth(90)
+        for e in (self.win_addr_edit, self.win_len_edit):
+            e.editingFinished.connect(self._update_sections)
+        win.addWidget(QtWidgets.QLabel("Ventana desde"))
+        win.addWidget(self.win_addr_edit)
+        win.addWidget(QtWidgets.QLabel("bytes"))
+        win.addWidget(self.win_len_edit)
+        win.addStretch(1)
+        view = QtWidgets.QHBoxLayout()
+        ml.addLayout(view)
+        self.mem_unit_cb = QtWidgets.QComboBox()
+        for name, unit in (("Bytes", UNIT_BYTE), ("Half", UNIT_HALF), ("Word", UNIT_WORD)):
+            self.mem_unit_cb.addItem(name, unit)
+        self.chk_mem_ascii = QtWidgets.QCheckBox("ASCII")
+        self.chk_mem_ascii.setChecked(True)
+        self.mem_unit_cb.currentIndexChanged.connect(self._on_mem_mode)
+        self.chk_mem_ascii.toggled.connect(self._on_mem_mode)
+        self.mem_goto_edit = QtWidgets.QLineEdit()
+        self.mem_goto_edit.setPlaceholderText("0x...")
+        self.mem_goto_edit.setMaximumWidth(90)
+        self.mem_goto_edit.returnPressed.connect(self._on_mem_goto)
+        view.addWidget(QtWidgets.QLabel("Vista"))
+        view.addWidget(self.mem_unit_cb)
+        view.addWidget(self.chk_mem_ascii)
+        view.addWidget(QtWidgets.QLabel("Ir a"))
+        view.addWidget(self.mem_goto_edit)
+        view.addStretch(1)
+        # modelo/vista: sólo se pintan las filas visibles y se notifican las que cambiaron
+        self.mem_view = HexdumpView()
+        ml.addWidget(self.mem_view)
         R.addWidget(mem, 2)
 
         log = QtWidgets.QGroupBox("Log")
@@ -263,6 +431,10 @@ class MainWindow(QtWidgets.QMainWindow):
         ll.addWidget(self.log_text)
         R.addWidget(log, 1)
 
+        self.lbl_rate = QtWidgets.QLabel("rx 0/s | render 0/s")
+        self.lbl_rate.setFont(monospace_font(9))
+        self.statusBar().addPermanentWidget(self.lbl_rate)
+
         self.statusBar().showMessage("Listo.")
 
     def _make_kv_table(self, title: str) -> QtWidgets.QGroupBox:
@@ -278,14 +450,70 @@ class MainWindow(QtWidgets.QMainWindow):
         tbl.horizontalHeader().setStretchLastSection(True)
         lay.addWidget(tbl)
         box._tbl = tbl  # hack simple para acceder
+        box._vals = None
+        box._hl = set()
         return box
 
     def _set_kv_rows(self, box: QtWidgets.QGroupBox, rows: list[tuple[str, str]]):
         tbl: QtWidgets.QTableWidget = box._tbl
-        tbl.setRowCount(len(rows))
-        for r, (k, v) in enumerate(rows):
-            tbl.setItem(r, 0, QtWidgets.QTableWidgetItem(k))
-            tbl.setItem(r, 1, QtWidgets.QTableWidgetItem(v))
+        prev = box._vals
+        if prev is None or len(prev) != len(rows):
+            tbl.setRowCount(len(rows))
+            for r, (k, v) in enumerate(rows):
+                tbl.setItem(r, 0, QtWidgets.QTableWidgetItem(k))
+                tbl.setItem(r, 1, QtWidgets.QTableWidgetItem(v))
+            box._vals = [v for _, v in rows]
+            box._hl = set()
+            return
+
+        # mismas filas: se reutilizan los items y sólo se toca lo que cambió
+        hl = set()
+        for r, (_, v) in enumerate(rows):
+            if v != prev[r]:
+                tbl.item(r, 1).setText(v)
+                prev[r] = v
+                hl.add(r)
+        self._swap_highlight(tbl, 1, box._hl, hl)
+        box._hl = hl
+
+    def _swap_highlight(self, tbl: QtWidgets.QTableWidget, col: int, old: set[int], new: set[int]):
+        for r in old - new:
+            tbl.item(r, col).setData(QtCore.Qt.BackgroundRole, None)
+        for r in new - old:
+            tbl.item(r, col).setBackground(self._chg_brush)
+
+    def _patch_lines(self, edit: QtWidgets.QPlainTextEdit, lines: list[str], marks: dict[int, list[tuple[int, int]]]):
+        """Reescribe sólo las líneas que cambiaron. marks: línea -> [(col, largo)] a resaltar."""
+        prev = edit._lines
+        if prev is None or len(prev) != len(lines):
+            edit.setPlainText("\n".join(lines))
+            edit._lines = lines
+            edit._marked = set()
+            return
+
+        todo = {i for i, ln in enumerate(lines) if ln != prev[i]} | edit._marked | marks.keys()
+        if not todo:
+            return
+        doc = edit.document()
+        cur = QtGui.QTextCursor(doc)
+        cur.beginEditBlock()
+        for i in sorted(todo):
+            blk = doc.findBlockByNumber(i)
+            pos = blk.position()
+            cur.setPosition(pos)
+            cur.setPosition(pos + blk.length() - 1, _KEEP)
+            m = marks.get(i, ())
+            if len(m) == 1 and m[0] == (0, len(lines[i])):
+                cur.insertText(lines[i], self._fmt_changed)
+                continue
+            cur.insertText(lines[i], self._fmt_plain)
+            for col, n in m:
+                cur.setPosition(pos + col)
+                cur.setPosition(pos + col + n, _KEEP)
+                cur.setCharFormat(self._fmt_changed)
+        cur.endEditBlock()
+        edit._lines = lines
+        edit._marked = set(marks)
 
     # ---------------- helpers ----------------
     def log(self, msg: str):
@@ -296,13 +524,14 @@ class MainWindow(QtWidgets.QMainWindow):
         self.btn_connect.setEnabled(not connected)
         self.btn_disconnect.setEnabled(connected)
 
-        for b in [self.btn_dump, self.btn_step, self.btn_run, self.btn_rst, self.btn_load,
-                  self.btn_prog, self.btn_progseq]:
+        for b in [self.btn_dump, self.btn_step, self.btn_stepn, self.btn_run, self.btn_rst, self.btn_load,
+                  self.btn_asm, self.btn_prog, self.btn_progseq, self.btn_trace, self.btn_lat_clear, self.btn_lat_export]:
             b.setEnabled(connected)
 
     def _refresh_ports(self):
         import serial.tools.list_ports
         ports = [p.device for p in serial.tools.list_ports.comports()]
+        ports += ["sim://", "sim://pipeline"]  # simulador en proceso: funcional / ciclo a ciclo
         self.port_cb.clear()
         self.port_cb.addItems(ports)
         if ports:
@@ -312,6 +541,9 @@ class MainWindow(QtWidgets.QMainWindow):
     def connect(self):
         if self.host is not None:
             return
+        if self._close_pending is not None:
+            self.log("[WARN] Todavía se está deteniendo el trace anterior")
+            return
         port = self.port_cb.currentText().strip()
         if not port:
             QMessageBox.critical(self, "Error", "Elegí un puerto.")
@@ -325,8 +557,13 @@ class MainWindow(QtWidgets.QMainWindow):
             return
 
         try:
-            self.host = DebugHost(port, baud, pipe_words=PIPE_WORDS, dm_dump_bytes=dm)
+            if port.startswith("sim://"):
+                self.host = SimHost(pipe_words=PIPE_WORDS, dm_dump_bytes=dm,
+                                    cycle_accurate=(port == "sim://pipeline"))
+            else:
+                self.host = DebugHost(port, baud, pipe_words=PIPE_WORDS, dm_dump_bytes=dm)
             self._set_connected(True)
+            self._update_sections()
             self.log(f"[INFO] Conectado a {port} @ {baud}, DM={dm}, PIPE_WORDS={PIPE_WORDS}")
         except Exception as e:
             self.host = None
@@ -335,11 +572,17 @@ class MainWindow(QtWidgets.QMainWindow):
     def disconnect(self):
         if self.host is None:
             return
+        host, self.host = self.host, None
+        self._set_connected(False)
+        if self.trace_stop is not None:
+            # el worker del trace todavía usa el puerto (con worker_lock): se cierra cuando termine
+            self.trace_stop.set()
+            self._close_pending = host
+            self.log("[INFO] Deteniendo el trace antes de desconectar...")
+            return
         try:
-            self.host.close()
+            host.close()
         finally:
-            self.host = None
-            self._set_connected(False)
             self.log("[INFO] Desconectado")
 
     # ---------------- load program ----------------
@@ -347,93 +590,295 @@ class MainWindow(QtWidgets.QMainWindow):
         if self.host is None:
             return
         path, _ = QFileDialog.getOpenFileName(
-            self, "Seleccionar programa (.mem/.hex)", "", "Mem/Hex (*.mem *.hex *.txt);;Todos (*.*)"
+            self, "Seleccionar programa", "",
+            "Programas (*.mem *.hex *.txt *.bin *.elf *.s *.asm);;Todos (*.*)"
         )
         if not path:
             return
         self.run_load_program(path)
 
+    def open_asm_dialog(self):
+        if self.host is None:
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "Abrir ensamblador", "", "Assembler (*.s *.S *.asm);;Todos (*.*)")
+        if not path:
+            return
+        self.run_load_program(path)
+
     def run_load_program(self, path: str):
         def fn(sig: WorkerSignals):
             with self.worker_lock:
-                items = parse_program_file(path)
+                if path.lower().endswith(ASM_EXTS):
+                    asm = assemble_file(path)
+                    items = image_items(asm.base, asm.words)
+                    sig.log.emit(f"[INFO] Ensamblado: {len(asm.words)} words "
+                                 f"({asm.encoded} líneas codificadas, {asm.reused} sin cambios)")
+                    syms = ", ".join(f"{k}=0x{v:x}" for k, v in asm.symbols.items())
+                    if syms:
+                        sig.log.emit(f"[INFO] Símbolos: {syms}")
+                else:
+                    items = parse_program_file(path)
                 if not items:
                     raise ValueError("El archivo no tiene words parseables.")
 
                 sig.log.emit(f"[INFO] Cargando programa: {path}")
                 sig.log.emit(f"[INFO] Words a programar: {len(items)}")
 
-                for k, (addr, word) in enumerate(items):
-                    self.host.program_word(addr, word)
-                    if (k + 1) % 64 == 0:
-                        sig.log.emit(f"[INFO] ... {k+1}/{len(items)}")
+                sent, skipped = self.host.program_image_delta(
+                    items, progress=lambda done, total: sig.log.emit(f"[INFO] ... {done}/{total}"),
+                    progress_interval_s=0.25)
 
-                sig.log.emit("[OK] Programa cargado.")
+                if skipped:
+                    sig.log.emit(f"[INFO] {skipped} words sin cambios respecto a IMEM "
+                                 f"({skipped * P_RECORD.size} bytes ahorrados)")
+                sig.log.emit(f"[OK] Programa cargado ({sent} words enviadas).")
                 return {}
 
         self._run_worker(fn)
 
-    # ---------------- actions ----------------
-    def run_action(self, action: str):
+    # ---------------- trace ----------------
+    def toggle_trace(self):
         if self.host is None:
             return
+        if self.trace_stop is not None:
+            self.trace_stop.set()
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Guardar trace", "", "Trace (*.rvtrace);;Todos (*.*)")
+        if not path:
+            return
+        self.run_record_trace(path)
 
-        def parse_frame(frame: bytes) -> dict:
-            if len(frame) != self.host.frame_len:
-                raise ValueError("Frame incompleto")
+    def run_record_trace(self, path: str):
+        try:
+            budget = int(self.trace_budget_edit.text(), 0)
+        except Exception:
+            QMessageBox.critical(self, "Error", "Ciclos máx inválido")
+            return
 
-            magic, dump_type, flags, pad = frame[0], frame[1], frame[2], frame[3]
-            if magic != MAGIC:
-                raise ValueError("MAGIC inválido")
+        stop = threading.Event()
+        self.trace_stop = stop
+        self.btn_trace.setText("Detener trace")
+        host = self.host    # disconnect() pone self.host en None mientras el trace sigue
 
-            pipe_empty = (flags >> 1) & 1
-            halt_seen  = (flags >> 0) & 1
+        def fn(sig: WorkerSignals):
+            with self.worker_lock:
+                # el trace se graba con frames completos (el replay muestra todas las pestañas)
+                host.set_sections()
+                sig.log.emit(f"[TX] S x{budget} -> {path}")
+                t0 = time.perf_counter()
+                pw, dm = host.pipe_words, host.dm_dump_bytes
+                cycles, halted, last = host.record_trace(
+                    path, budget, stop_event=stop,
+                    progress=lambda n: sig.log.emit(f"[INFO] ... {n} ciclos"),
+                    on_frame=lambda fr: self.refresh.submit(DumpFrame(fr, pw, dm)))
+                dt = max(time.perf_counter() - t0, 1e-9)
+                end = "HALT_SEEN" if halted else ("detenido" if stop.is_set() else "límite de ciclos")
+                sig.log.emit(f"[OK] Trace: {cycles} ciclos en {dt:.2f}s ({cycles / dt:.0f} frames/s), fin por {end}")
+                if last is None:
+                    return None
+                return DumpFrame(last, pw, dm)
+
+        self._run_worker(fn, on_done=self._trace_done)
+
+    def _trace_done(self):
+        self.trace_stop = None
+        self.btn_trace.setText("Grabar trace…")
+        host, self._close_pending = self._close_pending, None
+        if host is not None:
+            try:
+                host.close()
+            finally:
+                self.log("[INFO] Desconectado")
+
+    def open_trace_dialog(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Abrir trace", "", "Trace (*.rvtrace);;Todos (*.*)")
+        if not path:
+            return
+        self.open_trace(path)
 
-            off = 4
-            pc = struct.unpack_from("<I", frame, off)[0]
-            off += 4
+    def open_trace(self, path: str):
+        try:
+            reader = TraceReader(path)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"No pude abrir el trace: {e}")
+            return
+        if len(reader) == 0:
+            reader.close()
+            QMessageBox.warning(self, "Trace", "El trace no tiene frames.")
+            return
 
-            pipe_words = list(struct.unpack_from(f"<{PIPE_WORDS}I", frame, off))
-            off += PIPE_WORDS * 4
+        if self.trace is not None:
+            self.trace.close()
+        self.trace = reader
+        n = len(reader)
+        self.log(f"[INFO] Trace: {path} ({n} ciclos, frame={reader.frame_len}B, DM={reader.dm_bytes}, baud={reader.baud})")
+
+        self.trace_slider.blockSignals(True)
+        self.trace_slider.setRange(0, n - 1)
+        self.trace_slider.setPageStep(max(1, n // 100))
+        self.trace_slider.setValue(0)
+        self.trace_slider.blockSignals(False)
+        self.trace_slider.setEnabled(True)
+        self.show_trace_cycle(0)
+
+    def show_trace_cycle(self, n: int):
+        if self.trace is None:
+            return
+        self.lbl_trace.setText(f"Ciclo {n} / {len(self.trace) - 1}")
+        self.refresh.submit(self.trace[n])
+
+    # ---------------- secciones del dump ----------------
+    def _update_sections(self):
+        mask = SEC_ALL
+        if self.chk_partial.isChecked():
+            mask = SEC_PC | SEC_MEM | self._tab_sections.get(self.tabs.currentWidget(), 0)
+        try:
+            addr = int(self.win_addr_edit.text() or "0", 0)
+            n = int(self.win_len_edit.text(), 0) if self.win_len_edit.text().strip() else None
+        except ValueError:
+            self.log("[WARN] Ventana de DMEM inválida: se usa la de siempre")
+            addr, n = 0, None
+        self._sections_want = (mask, addr, n)
+        self._delta_want = DELTA_KEY_EVERY if self.chk_delta.isChecked() else 0
+
+    def _on_tab_changed(self, _idx: int):
+        self._update_sections()
+        # la pestaña nueva necesita algo que el último frame no trajo: se pide un 'D'
+        need = self._sections_want[0]
+        if self.host is not None and self.trace_stop is None and need & ~self._last_sections:
+            self.run_action("dump")
+
+    def _sync_sections(self, sig: WorkerSignals):
+        # desde el worker, con worker_lock tomado
+        mask, addr, n = self._sections_want
+        if self.host.set_sections(mask, addr, n):
+            sig.log.emit(f"[TX] M secciones=0x{mask:x} DMEM 0x{addr:x}+{self.host.sections[2]}")
+        key_every = self._delta_want
+        if self.host.key_every != key_every:
+            self.host.set_delta(key_every)
+            sig.log.emit(f"[TX] K keyframe cada {key_every}" if key_every else "[TX] K sin delta")
+
+    # ---------------- latencia ----------------
+    def _track_timing(self, d: DumpFrame, t, stats):
+        # llamado desde el worker: la medición se cierra en apply_dump (fase ui)
+        with self._timed_lock:
+            prev, self._timed = self._timed, (d, t, stats)
+        if prev is not None:
+            prev[2].add(prev[1])    # el scheduler la pisó antes de renderizar: sin fase ui
+
+    def _finish_timing(self, d: DumpFrame):
+        with self._timed_lock:
+            timed = self._timed
+            if timed is None or timed[0] is not d:
+                return
+            self._timed = None
+        timed[1].mark("ui")
+        timed[2].add(timed[1])
+
+    def _apply_latency(self):
+        if self.host is None:
+            return
+        stats = self.host.latency
+        snap = stats.snapshot()
+        if snap == self.lat_table._snap:
+            return
+        self.lat_table._snap = snap
+        rows = []
+        for cmd, st in snap.items():
+            for p in PHASES:
+                ph = st["phases"].get(p)
+                if ph is not None:
+                    rows.append((cmd, p, str(ph["n"])) + tuple(f"{ph[f'p{q}']:.3f}" for q in QUANTILES))
+            if st["wire_ms"] is not None:
+                rows.append((cmd, "cable (teórico)", "") + (f"{st['wire_ms']:.3f}",) + ("",) * (len(QUANTILES) - 1))
+        self.lat_table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            for c, v in enumerate(row):
+                self.lat_table.setItem(r, c, QtWidgets.QTableWidgetItem(v))
+
+        parts = []
+        for cmd, st in snap.items():
+            fr = st["phases"].get("frame")
+            if fr is not None and st["wire_ms"]:
+                parts.append(f"{cmd}: frame p50 {fr['p50']:.2f}ms = {fr['p50'] / st['wire_ms']:.2f}x cable")
+        baud = f"{stats.baud} baud" if stats.baud else "sin baud (sim)"
+        self.lbl_latency.setText(f"{baud} | " + (" | ".join(parts) if parts else f"{len(snap)} comandos"))
+
+    def clear_latency(self):
+        if self.host is not None:
+            self.host.latency.clear()
+            self._apply_latency()
 
-            regs = list(struct.unpack_from("<32I", frame, off))
-            off += 32 * 4
+    def export_latency_dialog(self):
+        if self.host is None:
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Exportar latencias", "latency.json", "JSON (*.json);;Todos (*.*)")
+        if not path:
+            return
+        try:
+            self.host.latency.to_json(path, extra={
+                "port": self.port_cb.currentText().strip(),
+                "frame_len": self.host.frame_len,
+                "framer": self.host.framer.stats(),
+            })
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"No pude exportar: {e}")
+            return
+        self.log(f"[INFO] Latencias exportadas a {path}")
 
-            mem = frame[off: off + self.host.dm_dump_bytes]
-            pd = decode_pipe_words(pipe_words)
+    # ---------------- actions ----------------
+    def run_action(self, action: str):
+        if self.host is None:
+            return
 
-            return {
-                "dump_type": dump_type,
-                "flags": flags,
-                "pipe_empty": pipe_empty,
-                "halt_seen": halt_seen,
-                "pad": pad,
-                "pc": pc,
-                "pipe_words": pipe_words,
-                "pipe_decoded": pd,
-                "regs": regs,
-                "mem": mem,
-            }
+        def timed_cmd(cmd: str, timeout_s: float) -> DumpFrame:
+            host = self.host
+            frame, t = host.command(cmd, timeout_s=timeout_s)
+            d = DumpFrame(frame, host.pipe_words, host.dm_dump_bytes)
+            t.mark("parse")
+            self._track_timing(d, t, host.latency)
+            return d
 
         def fn(sig: WorkerSignals):
             with self.worker_lock:
+                if action in ("dump", "step", "stepn", "run"):
+                    self._sync_sections(sig)
+
                 if action == "dump":
                     sig.log.emit("[TX] D (dump)")
-                    self.host.send_cmd("D")
-                    frame = self.host.wait_dump(timeout_s=5.0)
-                    return parse_frame(frame)
+                    return timed_cmd("D", 5.0)
 
                 if action == "step":
                     sig.log.emit("[TX] S (step)")
-                    self.host.send_cmd("S")
-                    frame = self.host.wait_dump(timeout_s=8.0)
-                    return parse_frame(frame)
+                    return timed_cmd("S", 8.0)
+
+                if action == "stepn":
+                    n = int(self.stepn_edit.text(), 0)
+                    every = int(self.every_edit.text(), 0)
+                    sig.log.emit(f"[TX] N n={n} cada={every}")
+                    host = self.host
+                    pw, dm = host.pipe_words, host.dm_dump_bytes
+                    samples = 0
+
+                    def on_frame(fr: bytes):
+                        nonlocal samples
+                        if fr[1] == DUMP_STEP_SAMPLE:
+                            samples += 1
+                            self.refresh.submit(DumpFrame(fr, pw, dm))
+
+                    # bytes recibidos de verdad (con 'M'/'K' los frames no miden frame_len)
+                    w0 = host.framer.wire_bytes
+                    t0 = time.perf_counter()
+                    frames = host.step(n, every=every, timeout_s=8.0, on_frame=on_frame)
+                    dt = time.perf_counter() - t0
+                    rx = host.framer.wire_bytes - w0
+                    sig.log.emit(f"[OK] N: {n} ciclos en {dt * 1e3:.1f}ms, {samples} muestras + final "
+                                 f"({rx} bytes vs {n * host.dump_len()} con 'S')")
+                    return DumpFrame(frames[-1], pw, dm)
 
                 if action == "run":
                     sig.log.emit("[TX] G (run)")
-                    self.host.send_cmd("G")
-                    frame = self.host.wait_dump(timeout_s=12.0)
-                    return parse_frame(frame)
+                    return timed_cmd("G", 12.0)
 
                 if action == "reset":
                     sig.log.emit("[TX] R (reset fetch)")
@@ -454,58 +899,147 @@ class MainWindow(QtWidgets.QMainWindow):
                         raise ValueError("Secuencia vacía")
                     words = [int(tok, 0) for tok in words_s.split()]
                     sig.log.emit(f"[TX] P(seq) base=0x{base:08x} n={len(words)}")
-                    for i, w in enumerate(words):
-                        self.host.program_word(base + 4*i, w)
+                    self.host.program_image([(base + 4*i, w) for i, w in enumerate(words)])
                     return {}
 
                 return {}
 
         self._run_worker(fn)
 
-    def _run_worker(self, fn):
+    def _run_worker(self, fn, on_done=None):
         w = ActionWorker(fn)
         w.signals.log.connect(self.log)
         w.signals.error.connect(lambda s: QMessageBox.critical(self, "Error", s))
-        w.signals.dump.connect(self.apply_dump)
+        w.signals.dump.connect(self._on_dump)
+        if on_done is not None:
+            w.signals.done.connect(on_done)
         self.threadpool.start(w)
 
+    def _on_dump(self, d: DumpFrame):
+        self.log(f"[RX] DUMP type={dump_type_str(d.dump_type)} flags=0x{d.flags:02x} pc={_pc_str(d.pc)} "
+                 f"({len(d.buf)} bytes)")
+        self.refresh.submit(d)
+
+    def _on_refresh_stats(self, rx: float, rendered: float, dropped: int):
+        self.lbl_rate.setText(f"rx {rx:.0f}/s | render {rendered:.0f}/s | apply {self.apply_ms:.2f}ms")
+        self._apply_latency()
+        if dropped:
+            self.log(f"[RATE] rx={rx:.0f}/s render={rendered:.0f}/s descartados={dropped} "
+                     f"(total {self.refresh.dropped}/{self.refresh.received})")
+
     # ---------------- apply dump ----------------
-    def apply_dump(self, d: dict):
-        t = dump_type_str(d["dump_type"])
-        flags = d["flags"]
-        pe = d["pipe_empty"]
-        hs = d["halt_seen"]
-        pc = d["pc"]
-        pad = d["pad"]
-
-        # badges
-        self.badge_pipe.setText(f"PIPE_EMPTY: {pe}")
-        self.badge_halt.setText(f"HALT_SEEN: {hs}")
-        self.badge_pipe.setStyleSheet(self.badge_pipe.styleSheet().replace("#173a2a", "#173a2a" if pe else "#3a1b1b"))
-        self.badge_halt.setStyleSheet(self.badge_halt.styleSheet().replace("#173a2a", "#173a2a" if not hs else "#3a1b1b"))
-
-        self.lbl_status.setText(
-            f"type={t}  flags=0x{flags:02x}  pc=0x{pc:08x}  pad=0x{pad:02x}"
-        )
-        self.log(f"[RX] DUMP type={t} flags=0x{flags:02x} pc=0x{pc:08x}")
+    def apply_dump(self, d: DumpFrame, quiet: bool = False):
+        t0 = time.perf_counter()
+        t = dump_type_str(d.dump_type)
+        flags = d.flags
+        pe = d.pipe_empty
+        hs = d.halt_seen
+        pc = d.pc
+        pad = d.pad
+
+        # badges (setStyleSheet es caro: sólo si cambió algo)
+        if self._last_badges != (pe, hs):
+            self._last_badges = (pe, hs)
+            self.badge_pipe.setText(f"PIPE_EMPTY: {pe}")
+            self.badge_halt.setText(f"HALT_SEEN: {hs}")
+            self.badge_pipe.setStyleSheet(self.badge_pipe.styleSheet().replace("#173a2a", "#173a2a" if pe else "#3a1b1b"))
+            self.badge_halt.setStyleSheet(self.badge_halt.styleSheet().replace("#173a2a", "#173a2a" if not hs else "#3a1b1b"))
+
+        status = f"type={t}  flags=0x{flags:02x}  pc={_pc_str(pc)}  pad=0x{pad:02x}"
+        if not quiet:
+            self.log(f"[RX] DUMP type={t} flags=0x{flags:02x} pc={_pc_str(pc)}")
+
+        # frame parcial: sólo se tocan las vistas cuyas secciones vinieron
+        self._last_sections = d.sections
+        try:
+            if d.regs is not None:
+                self._apply_regs(d.regs)
+            if d.mem is not None:
+                self._apply_mem(bytes(d.mem), d.mem_addr)
+            if d.pipe_words is not None:
+                self._apply_pipe(d, t)
+            if pc is not None:
+                self._apply_imem(pc)
+        finally:
+            self.apply_ms = (time.perf_counter() - t0) * 1e3
+            self.lbl_status.setText(f"{status}  apply={self.apply_ms:.2f}ms")
+            self._finish_timing(d)
 
-        # regs
-        regs = d["regs"]
+    def _apply_regs(self, regs: tuple):
+        prev = self._last_regs
+        hl = set()
         for i in range(32):
             val = regs[i] & 0xFFFFFFFF
+            if prev is not None and val == prev[i]:
+                continue
             self.reg_table.item(i, 1).setText(f"0x{val:08x}")
             self.reg_table.item(i, 2).setText(str(signed32(val)))
+            if prev is not None:
+                hl.add(i)
+        if hl != self._reg_hl:
+            self._swap_highlight(self.reg_table, 1, self._reg_hl, hl)
+            self._swap_highlight(self.reg_table, 2, self._reg_hl, hl)
+            self._reg_hl = hl
+        self._last_regs = tuple(regs)
+
+    def _apply_mem(self, mem: bytes, base: int = 0):
+        self.mem_view.hex_model.set_data(mem, base)
 
-        # mem hexdump
-        self.mem_text.setPlainText("\n".join(hexdump_lines(d["mem"], base=0)))
+    def _on_mem_mode(self, *_):
+        self.mem_view.set_mode(self.mem_unit_cb.currentData(), self.chk_mem_ascii.isChecked())
+
+    def _on_mem_goto(self):
+        try:
+            addr = int(self.mem_goto_edit.text(), 0)
+        except ValueError:
+            self.log(f"[WARN] Dirección inválida: {self.mem_goto_edit.text()!r}")
+            return
+        if not self.mem_view.goto(addr):
+            m = self.mem_view.hex_model
+            self.log(f"[WARN] 0x{addr:x} fuera de la ventana de DMEM mostrada "
+                     f"(0x{m.base:x}+{m.size})")
+
+    def _apply_imem(self, pc: int):
+        # el listado se rearma sólo si cambió la sombra de IMEM; por frame se mueve la marca del PC
+        shadow = self.host.imem_shadow if self.host is not None else {}
+        if shadow != self._imem_src:
+            self._imem_src = dict(shadow)
+            addrs = sorted(self._imem_src)
+            self._imem_base = [f"   0x{a:04x}: {self._imem_src[a]:08x}  {disasm(self._imem_src[a], a)}"
+                               for a in addrs] or ["   (IMEM sin programar en esta sesión)"]
+            self._imem_index = {a: i for i, a in enumerate(addrs)}
+        lines = self._imem_base
+        marks = {}
+        i = self._imem_index.get(pc)
+        if i is not None:
+            lines = list(lines)
+            lines[i] = "=>" + lines[i][2:]
+            marks[i] = [(0, len(lines[i]))]
+        self._patch_lines(self.imem_text, lines, marks)
+
+    def _apply_pipe(self, d: DumpFrame, t: str):
+        if d.n_pipe != PIPE_WORDS:
+            self.pipe_summary.setText(f"[PIPE] ERROR: pipe_words len={d.n_pipe} != {PIPE_WORDS}")
+            return
 
-        # pipe
-        pd = d.get("pipe_decoded", {})
-        if "error" in pd:
-            self.pipe_summary.setText(f"[PIPE] ERROR: {pd['error']}")
+        pw = tuple(d.pipe_words)
+        raw_lines = [f"PC={_pc_str(d.pc)}  type={t} flags=0x{d.flags:02x}", "", "PIPE words (w0..w22):"]
+        raw_lines += [f"  w{i:02d} = 0x{w:08x}" for i, w in enumerate(pw)]
+        prev_raw = self.raw_text._lines
+        marks = {}
+        if prev_raw is not None and len(prev_raw) == len(raw_lines):
+            marks = {i: [(0, len(ln))] for i, ln in enumerate(raw_lines) if i >= 3 and ln != prev_raw[i]}
+        self._patch_lines(self.raw_text, raw_lines, marks)
+
+        if pw == self._last_pipe:
+            # latches iguales: no se decodifica nada, sólo se apagan los resaltados
+            for box in (self.ifid_tbl, self.idex_tbl, self.exmem_tbl, self.memwb_tbl):
+                self._swap_highlight(box._tbl, 1, box._hl, set())
+                box._hl = set()
             return
+        self._last_pipe = pw
 
-        ifid = pd["ifid"]; idex = pd["idex"]; exmem = pd["exmem"]; memwb = pd["memwb"]
+        ifid = d.ifid; idex = d.idex; exmem = d.exmem; memwb = d.memwb
         self.pipe_summary.setText(
             f"IF/ID v={ifid['valid']} | ID/EX v={idex['ctrl']['valid']} | EX/MEM v={exmem['ctrl']['valid']} | MEM/WB v={memwb['ctrl']['valid']}"
         )
@@ -514,7 +1048,7 @@ class MainWindow(QtWidgets.QMainWindow):
             ("valid", str(ifid["valid"])),
             ("pc", f"0x{ifid['pc']:08x}"),
             ("pc+4", f"0x{ifid['pc4']:08x}"),
-            ("instr", f"0x{ifid['instr']:08x}"),
+            ("instr", f"0x{ifid['instr']:08x}  {disasm(ifid['instr'], ifid['pc'])}"),
         ])
 
         c = idex["ctrl"]
@@ -522,6 +1056,7 @@ class MainWindow(QtWidgets.QMainWindow):
             ("valid", str(c["valid"])),
             ("pc", f"0x{idex['pc']:08x}"),
             ("pc+4", f"0x{idex['pc4']:08x}"),
+            ("instr", idex_disasm(pw[8], pw[9], pw[10])),
             ("rs1_data", f"0x{idex['rs1_data']:08x} ({signed32(idex['rs1_data'])})"),
             ("rs2_data", f"0x{idex['rs2_data']:08x} ({signed32(idex['rs2_data'])})"),
             ("imm", f"0x{idex['imm']:08x} ({signed32(idex['imm'])})"),
@@ -553,12 +1088,3 @@ class MainWindow(QtWidgets.QMainWindow):
             ("rd", str(memwb["rd"])),
             ("ctrl", f"RW={c['reg_write']} M2R={c['mem_to_reg']} PC4={c['wb_sel_pc4']}"),
         ])
-
-        # RAW view
-        raw_lines = []
-        raw_lines.append(f"PC=0x{d['pc']:08x}  type={t} flags=0x{flags:02x}")
-        raw_lines.append("")
-        raw_lines.append("PIPE words (w0..w22):")
-        for i, w in enumerate(d["pipe_words"]):
-            raw_lines.append(f"  w{i:02d} = 0x{w:08x}")
-        self.raw_text.setPlainText("\n".join(raw_lines))
@@ -0,0 +1,69 @@
+import threading
+import time
+
+from PySide6 import QtCore
+
+class RefreshScheduler(QtCore.QObject):
+    """
+    Coalesce frames para la UI: submit() (desde cualquier thread) sólo guarda el
+    último frame y cuenta; un QTimer en el thread de la GUI renderiza como mucho
+    max_fps veces por segundo. Los frames pisados antes de renderizarse cuentan
+    como descartados. Una vez por segundo emite las tasas recibidas/renderizadas.
+    """
+    stats = QtCore.Signal(float, float, int)  # rx/s, render/s, descartados en la ventana
+
+    def __init__(self, render, max_fps: int = 30, parent=None):
+        super().__init__(parent)
+        self.render = render
+        self._lock = threading.Lock()
+        self._pending = None
+
+        self.received = 0
+        self.rendered = 0
+        self.dropped = 0
+        self._win_t = time.monotonic()
+        self._win_rx = 0
+        self._win_render = 0
+        self._win_drop = 0
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.timeout.connect(self._tick)
+        self.set_max_fps(max_fps)
+        self.timer.start()
+
+    def set_max_fps(self, fps: int):
+        self.timer.setInterval(max(1, int(1000 / max(1, fps))))
+
+    def submit(self, frame):
+        with self._lock:
+            if self._pending is not None:
+                self.dropped += 1
+                self._win_drop += 1
+            self._pending = frame
+            self.received += 1
+            self._win_rx += 1
+
+    def flush(self):
+        self._tick()
+
+    def _tick(self):
+        with self._lock:
+            frame = self._pending
+            self._pending = None
+
+        if frame is not None:
+            self.render(frame)
+            self.rendered += 1
+            self._win_render += 1
+
+        now = time.monotonic()
+        dt = now - self._win_t
+        if dt >= 1.0:
+            with self._lock:
+                rx, drop = self._win_rx, self._win_drop
+                self._win_rx = 0
+                self._win_drop = 0
+            ren = self._win_render
+            self._win_render = 0
+            self._win_t = now
+            self.stats.emit(rx / dt, ren / dt, drop)
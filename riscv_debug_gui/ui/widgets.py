@@ -21,3 +21,6 @@ def make_badge(text: str, ok: bool) -> QtWidgets.QLabel:
         }}
     """)
     return lbl
+
+# Fondo para valores que cambiaron respecto del dump anterior
+CHANGED_BG = "#4d3b0f"